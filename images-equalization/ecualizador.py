@@ -18,15 +18,27 @@ Autor: Francisco Martínez Picó
 Fecha: 25/10/2020
 """
 from multiprocessing import Process, Queue, Array
-from time import time
+import os
+import sys
 import traceback
 
+import numpy as np
+
+# La instrumentación (medicion.py), los núcleos vectorizados (nucleos.py) y el
+# lector de PPM/PGM (pnm.py) están en images-pipeline.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "images-pipeline"))
+
+import medicion
+import nucleos
+import pnm
+
 class MaxMin(Process):
     """
     Clase que hereda del objeto Process (módulo multiprocessing).
     """
     def __init__ (self, array_rojo, array_verde, array_azul, inicio, final,
-                  cola_roja, cola_verde, cola_azul):
+                  cola_roja, cola_verde, cola_azul, cola_medicion = None):
         """
         Inicializa el objeto.
         """
@@ -39,64 +51,36 @@ class MaxMin(Process):
         self.cola_roja = cola_roja # Cola donde se añadirán máximos y mínimos.
         self.cola_verde = cola_verde # Cola donde se añadirán máximos y mínimos.
         self.cola_azul = cola_azul # Cola donde se añadirán máximos y mínimos.
+        self.cola_medicion = cola_medicion # Ver medicion.trabajador().
 
     def run(self):
         """
         Código que se ejecuta al lanzar el proceso. Se añaden máximos y mínimos
         a la cola del color correspondiente. Por cada proceso, se añadirán dos
-        valores (uno máximo y otro mínimo) a estas colas.
+        valores (uno máximo y otro mínimo) a estas colas, salvo si no tiene
+        valores asignados. Los arrays compartidos se ven como arrays de NumPy
+        (sin copiarlos; ver nucleos.extremos()).
         """
-        # Rojo:
-        max_val = self.rojo[0]
-        min_val = self.rojo[0]
-
-        for j in range(self.inicio, self.final):
-
-            if self.rojo[j] > max_val:
-                max_val = self.rojo[j]
-
-            elif self.rojo[j] < min_val:
-                min_val = self.rojo[j]
-
-        self.cola_roja.put(max_val)
-        self.cola_roja.put(min_val)
-
-        # Verde:
-        max_val = self.verde[0]
-        min_val = self.verde[0]
-
-        for j in range(self.inicio, self.final):
-
-            if self.verde[j] > max_val:
-                max_val = self.verde[j]
-
-            elif self.verde[j] < min_val:
-                min_val = self.verde[j]
-
-        self.cola_verde.put(max_val)
-        self.cola_verde.put(min_val)
-
-        # Azul:
-        max_val = self.azul[0]
-        min_val = self.azul[0]
-
-        for j in range(self.inicio, self.final):
-
-            if self.azul[j] > max_val:
-                max_val = self.azul[j]
-
-            elif self.azul[j] < min_val:
-                min_val = self.azul[j]
-
-        self.cola_azul.put(max_val)
-        self.cola_azul.put(min_val)
+        with medicion.trabajador(self.cola_medicion, self.name,
+                                 self.final - self.inicio):
+            for array, cola in ((self.rojo, self.cola_roja),
+                                (self.verde, self.cola_verde),
+                                (self.azul, self.cola_azul)):
+                valores = nucleos.extremos(
+                    nucleos.vista(array)[self.inicio:self.final])
+
+                # Con más procesos que píxeles, alguno no tiene valores.
+                if valores is not None:
+                    max_val, min_val = valores
+                    cola.put(max_val)
+                    cola.put(min_val)
 
 class Ecualizar(Process):
     """
     Clase que hereda del objeto Process (módulo multiprocessing).
     """
     def __init__ (self, array_rojo, array_verde, array_azul,
-                  inicio, final, colores):
+                  inicio, final, colores, cola_medicion = None):
         """
         Inicializa el objeto.
         """
@@ -107,6 +91,7 @@ class Ecualizar(Process):
         self.inicio = inicio # Índice del primer píxel.
         self.final = final # Índice del último píxel.
         self.colores = colores # Diccionario con los max/min por color.
+        self.cola_medicion = cola_medicion # Ver medicion.trabajador().
 
     def run (self):
         """
@@ -114,38 +99,25 @@ class Ecualizar(Process):
         normalización de los píxeles teniendo en cuenta los máximos y mínimos
         mediante la siguiente fórmula:
         val_norm = int((val_ori – min) / (max – min) * 255)
+        Se calcula para toda la banda de una vez con NumPy (ver
+        nucleos.normalizar()). Un color constante (max = min) queda a 0.
         """
-        # Rojo:
-        max_rojo = self.colores["rojos"][0]
-        min_rojo = self.colores["rojos"][1]
-        rango_rojo = max_rojo - min_rojo
-        for j in range(self.inicio, self.final):
-            self.rojo[j] = int((self.rojo[j] - min_rojo) /
-                               (rango_rojo) * 255)
-
-        # Verde:
-        max_verde = self.colores["verdes"][0]
-        min_verde = self.colores["verdes"][1]
-        rango_verde = max_verde - min_verde
-        for j in range(self.inicio, self.final):
-            self.verde[j] = int((self.verde[j] - min_verde) /
-                                (rango_verde) * 255)
-
-        # Azul:
-        max_azul = self.colores["azules"][0]
-        min_azul = self.colores["azules"][1]
-        rango_azul = max_azul - min_azul
-        for j in range(self.inicio, self.final):
-            self.azul[j] = int((self.azul[j] - min_azul) /
-                               (rango_azul) * 255)
+        with medicion.trabajador(self.cola_medicion, self.name,
+                                 self.final - self.inicio):
+            for array, clave in ((self.rojo, "rojos"), (self.verde, "verdes"),
+                                 (self.azul, "azules")):
+                max_val, min_val = self.colores[clave]
+                valores = nucleos.vista(array)[self.inicio:self.final]
+                nucleos.normalizar(valores, max_val, min_val, salida = valores)
 
 def leer_fichero(nombre):
     """
-    Función encargada de leer el fichero. Se comprueba el número mágico P3 para
-    verificar que es un archivo en el formato correcto. Seguidamente, se obtiene
-    información de las dimensiones y se va leyendo el archivo guardando la
-    información de los colores RGB para cada píxel en tres arrays (uno para cada
-    color R, G y B). Esto lo consigue utilizando la función guardar_rgb().
+    Función encargada de leer el fichero con pnm.leer_imagen(), que comprueba
+    el número mágico para verificar que es un archivo en el formato correcto:
+    PPM en ASCII (P3) o binario (P6), o PGM (P2 o P5), cuyo gris se toma como
+    los tres colores. Seguidamente, se guarda la información de los colores RGB
+    para cada píxel en tres arrays (uno para cada color R, G y B). Esto lo
+    consigue utilizando la función guardar_arrays().
     Guardamos la información en arrays ya que utilizaremos concurrencia/procesos
     en la ejecución del programa.
     ARGS:
@@ -161,35 +133,27 @@ def leer_fichero(nombre):
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
     """
     try:
-        in_file = open(nombre, 'r')
+        imagen, cabecera = pnm.leer_imagen(nombre)
 
-    except:
+    except OSError:
         print("No se ha podido abrir el fichero")
         print(traceback.print_exc()) # Devuelve el error (si se produce).
 
-    else:
-        cabecera = in_file.readline()
-        cabecera = cabecera.rstrip()
-
-        if (cabecera == 'P3'): # Comprobamos número mágico.
-            dimension = in_file.readline() # Dimensión = nº filas x nº columnas.
-            dimension = dimension.rstrip()
-            a, b = dimension.split()
-            fil = int(a)
-            col = int(b)
+    except ValueError: # Número mágico o datos incorrectos.
+        print("Error, el fichero introducido no tiene el formato adecuado")
 
-            in_file.readline() # Valor máximo dentro de los RGB.
-
-            rojo, verde, azul = guardar_arrays(fil, col, in_file)
-
-            return fil, col, rojo, verde, azul
+    else:
+        # Como antes, el primer número de la dimensión es fil y el segundo col
+        # (la imagen de salida los escribe en el mismo orden).
+        fil = cabecera.ancho
+        col = cabecera.alto
 
-        else:
-            print("Error, el fichero introducido no tiene el formato adecuado")
+        rojo, verde, azul = guardar_arrays(fil, col, imagen.reshape(
+            -1, cabecera.canales)) # RGB.
 
-        in_file.close()
+        return fil, col, rojo, verde, azul
 
-def guardar_arrays(fil, col, in_file):
+def guardar_arrays(fil, col, muestras):
     """
     Se guardan, para cada pixel, sus valores correspondientes al rojo, verde y
     azul en un array (un array para cada color). Se utiliza este objeto para
@@ -197,7 +161,8 @@ def guardar_arrays(fil, col, in_file):
     ARGS:
         - fil (int): número de filas.
         - col (int): número de columnas.
-        - in_file (file): fichero abierto.
+        - muestras (np.ndarray): muestras de la imagen (ver pnm.leer_imagen()),
+        una fila por píxel y una columna por canal.
     RETURNS:
         - rojo (array): array con valores correspondientes al color rojo.
         - verde (array): array con valores correspondientes al color verde.
@@ -207,19 +172,10 @@ def guardar_arrays(fil, col, in_file):
     array_verde = Array('i', fil * col, lock = False)
     array_azul = Array('i', fil * col, lock = False)
 
-    i = 0 # Contador.
-
-    while i < (fil * col):
-        linea = in_file.readline()
-        linea = linea.rstrip()
-        lista = linea.split()
-
-        while lista:
-            array_rojo[i] = int(lista.pop(0))
-            array_verde[i] = int(lista.pop(0))
-            array_azul[i] = int(lista.pop(0))
-
-            i += 1
+    # Cada color se copia de una vez de su canal (en una imagen en gris, los
+    # tres colores son el mismo canal).
+    for k, array in enumerate((array_rojo, array_verde, array_azul)):
+        nucleos.vista(array)[:] = muestras[:, k % muestras.shape[1]]
 
     return array_rojo, array_verde, array_azul
 
@@ -284,6 +240,8 @@ def generar_imagen(fil, col, rojo, verde, azul, fich):
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
         - fich (str): nombre inicial del archivo. Se modificará para escribir el
         archivo de salida.
+    RETURNS:
+        - nombre (str): nombre del archivo de salida.
     """
     # Busca el último punto del nombre del fichero (.ppm).
     index = fich.rfind('.')
@@ -298,125 +256,126 @@ def generar_imagen(fil, col, rojo, verde, azul, fich):
     dimension = str(fil) + " " + str(col) + "\n"
     fout.write(dimension)
 
-    max_val = max(max(rojo), max(verde), max(azul))
+    # Se vuelven a intercalar los colores: cada fila es rojo, verde, azul...
+    filas = np.stack([np.asarray(rojo), np.asarray(verde), np.asarray(azul)],
+                     axis = 1).reshape(fil, col * 3)
+
+    max_val = filas.max()
     max_val = str(max_val) + "\n"
     fout.write(max_val)
 
-    contador = 0
-
-    # Vamos escribiendo los valores de gris desplazándonos con un contador:
-    for i in range(fil):
-        for j in range(col):
-            fout.write(str(rojo[contador]))
-            fout.write(" ")
-            fout.write(str(verde[contador]))
-            fout.write(" ")
-            fout.write(str(azul[contador]))
-
-            contador += 1
-
-            # Si no es el último valor, introducimos un espacio.
-            if j != col - 1:
-                fout.write(" ")
-
-        fout.write("\n")
+    # Cada fila se escribe de una vez, con los valores separados por espacios.
+    fout.write("".join(" ".join(map(str, fila)) + "\n"
+                       for fila in filas.tolist()))
 
     fout.write("\n")
 
     fout.close()
 
-def main():
-    # Tomamos el tiempo inicial.
-    tiempo_inicio = time()
+    return nombre
 
+def main():
     # 1) Pedimos nombre del fichero y el nº de procesos a utilizar:
     fich = input("Introduzca el nombre del fichero: ")
 
     p = int(input("Introduzca el numero de procesos: "))
 
-    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ tipo ‘ascii’.
-    # Comprobamos el número mágico ("P3") y se guarda en memoria.
-    fil, col, rojo, verde, azul = leer_fichero(fich)
-
-    # 3) Paralelizamos el problema en varios procesos:
-    lista_procesos = []
-
-    # Declaramos las colas utilizadas para hayar valores máximos y mínimos de
-    # cada color.
-    cola_roja = Queue()
-    cola_verde = Queue()
-    cola_azul = Queue()
-
-    dim = fil * col # Nº de valores RGB en la imagen (cada píxel tendrá 3).
-    n = dim // p # Cuantos valores RGB calculará 1 proceso.
-    resto  = dim % p # Guardamos por si la división no es exacta y sobran.
-
-    inicio = 0
-
-    for i in range(p):
-        final = inicio + n
-
-        # Puede que al dividir entre procesos, el reparto de valores RGB no sea
-        # exacto (y tenga un resto). Por ello, se reparten estos píxeles entre
-        # procesos.
-        if resto != 0:
-            final += 1
-            resto -= 1
-
-        # 4) Calculamos máximos y mínimos de cada color utilizando procesos.
-        # Realmente se obtienen colas con los valores máximos y mínimos de cada
-        # porción paralelizada.
-        lista_procesos.append(MaxMin(rojo, verde, azul, inicio, final,
-                                     cola_roja, cola_verde, cola_azul))
-        lista_procesos[i].start()
-
-        # El inicio del nuevo proceso será el final del anterior.
-        inicio = final
-
-    # Comprobamos que los procesos han acabado.
-    for i in range(p):
-        lista_procesos[i].join()
-
-    # Función auxiliar para guardar los máximos y mínimos en un diccionario por
-    # colores.
-    colores = max_min_colores(cola_roja, cola_verde, cola_azul)
-
-    # 5) De nuevo, paralelizamos el problema en varios procesos para la
-    # normalización de los valores RGB de la imagen:
-    lista_procesos = []
-
-    dim = fil * col
-    n = dim // p
-    resto  = dim % p
-    inicio = 0
-
-    for i in range(p):
-        final = inicio + n
-
-        if resto != 0:
-            final += 1
-            resto -= 1
-
-        lista_procesos.append(Ecualizar(rojo, verde, azul,
-                                        inicio, final, colores))
-        lista_procesos[i].start()
-
-        # El inicio del nuevo proceso será el final del anterior.
-        inicio = final
-
-    # Comprobamos que los procesos han acabado.
-    for i in range(p):
-        lista_procesos[i].join()
+    # Medimos cada etapa (ver medicion.py en images-pipeline). Los procesos
+    # envían su tiempo por la cola de la medición.
+    medida = medicion.Medicion("ecualizador", fichero = fich, procesos = p)
+    cola_medicion = medida.cola_trabajadores()
+
+    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ (ascii o
+    # binario). Comprobamos el número mágico ("P3" o "P6") y se guarda en
+    # memoria.
+    with medida.etapa("decodificacion") as etapa:
+        fil, col, rojo, verde, azul = leer_fichero(fich)
+        etapa.bytes += os.path.getsize(fich)
+        etapa.pixeles += fil * col
+
+    with medida.etapa("calculo", pixeles = fil * col):
+        # 3) Paralelizamos el problema en varios procesos:
+        lista_procesos = []
+
+        # Declaramos las colas utilizadas para hayar valores máximos y mínimos
+        # de cada color.
+        cola_roja = Queue()
+        cola_verde = Queue()
+        cola_azul = Queue()
+
+        dim = fil * col # Nº de valores RGB en la imagen (cada píxel tendrá 3).
+        n = dim // p # Cuantos valores RGB calculará 1 proceso.
+        resto  = dim % p # Guardamos por si la división no es exacta y sobran.
+
+        inicio = 0
+
+        for i in range(p):
+            final = inicio + n
+
+            # Puede que al dividir entre procesos, el reparto de valores RGB no
+            # sea exacto (y tenga un resto). Por ello, se reparten estos
+            # píxeles entre procesos.
+            if resto != 0:
+                final += 1
+                resto -= 1
+
+            # 4) Calculamos máximos y mínimos de cada color utilizando
+            # procesos. Realmente se obtienen colas con los valores máximos y
+            # mínimos de cada porción paralelizada.
+            lista_procesos.append(MaxMin(rojo, verde, azul, inicio, final,
+                                         cola_roja, cola_verde, cola_azul,
+                                         cola_medicion))
+            lista_procesos[i].start()
+
+            # El inicio del nuevo proceso será el final del anterior.
+            inicio = final
+
+        # Comprobamos que los procesos han acabado.
+        for i in range(p):
+            lista_procesos[i].join()
+
+        # Función auxiliar para guardar los máximos y mínimos en un diccionario
+        # por colores.
+        colores = max_min_colores(cola_roja, cola_verde, cola_azul)
+
+        # 5) De nuevo, paralelizamos el problema en varios procesos para la
+        # normalización de los valores RGB de la imagen:
+        lista_procesos = []
+
+        dim = fil * col
+        n = dim // p
+        resto  = dim % p
+        inicio = 0
+
+        for i in range(p):
+            final = inicio + n
+
+            if resto != 0:
+                final += 1
+                resto -= 1
+
+            lista_procesos.append(Ecualizar(rojo, verde, azul, inicio, final,
+                                            colores, cola_medicion))
+            lista_procesos[i].start()
+
+            # El inicio del nuevo proceso será el final del anterior.
+            inicio = final
+
+        # Comprobamos que los procesos han acabado.
+        for i in range(p):
+            lista_procesos[i].join()
 
     # 6) En último lugar, se genera la nueva imagen ecualizada (con el
     # histograma de colores ampliado/más uniforme).
-    generar_imagen(fil, col, rojo, verde, azul, fich)
+    with medida.etapa("codificacion", pixeles = fil * col) as etapa:
+        nombre = generar_imagen(fil, col, rojo, verde, azul, fich)
+        etapa.bytes += os.path.getsize(nombre)
 
-    # Tomamos tiempo final.
-    tiempo_final = time()
+    # Se emite el registro de la ejecución (una línea JSON).
+    registro = medida.terminar()
 
     print("La ejecución del programa con %i procesos ha tardado:" %p)
-    print(tiempo_final - tiempo_inicio)
+    print(registro["segundos"])
 
 if __name__ == '__main__':
     main ()
@@ -3,9 +3,9 @@
 """
 G02_color_procesos.py
 
-Este programa recibe como entrada una imagen en formato ppm (ascii) y elimina su
-información del color que contiene, devolviendo la misma imagen pero en una
-escala de grises en formato pgm (ascii).
+Este programa recibe como entrada una imagen en formato ppm (ascii o binario) y
+elimina su información del color que contiene, devolviendo la misma imagen pero
+en una escala de grises en formato pgm (ascii).
 
 Este programa corresponde con la versión paralelizada con el uso de procesos.
 
@@ -15,14 +15,27 @@ Autor: Francisco Martínez Picó
 Fecha: 25/10/2020
 """
 from multiprocessing import Process, Array
-from time import time
+import os
+import sys
 import traceback
 
+import numpy as np
+
+# La instrumentación (medicion.py), los núcleos vectorizados (nucleos.py) y el
+# lector de PPM/PGM (pnm.py) están en images-pipeline.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "images-pipeline"))
+
+import medicion
+import nucleos
+import pnm
+
 class EliminarColor(Process):
     """
     Clase que hereda del objeto Process (módulo multiprocessing).
     """
-    def __init__ (self, array_rojo, array_verde, array_azul, inicio, final):
+    def __init__ (self, array_rojo, array_verde, array_azul, inicio, final,
+                  cola = None):
         """
         Inicializa el objeto.
         """
@@ -32,25 +45,32 @@ class EliminarColor(Process):
         self.azul = array_azul
         self.inicio = inicio # Índice del primer pixel.
         self.final = final # Índice del último pixel.
+        self.cola = cola # Cola de la medición (ver medicion.trabajador()).
 
     def run (self):
         """
-        Para lanzar el proceso.
+        Para lanzar el proceso. Los arrays compartidos se ven como arrays de
+        NumPy (sin copiarlos) y el gris de toda la banda se calcula de una vez
+        (ver nucleos.gris()).
         """
-        for j in range(self.inicio,(self.final)):
-            suma = ((self.rojo[j] + self.verde[j] + self.azul[j]) // 3)
+        with medicion.trabajador(self.cola, self.name,
+                                 self.final - self.inicio):
+            rojo, verde, azul = (nucleos.vista(array)[self.inicio:self.final]
+                                 for array in (self.rojo, self.verde,
+                                               self.azul))
 
-            # Arbitrariamente, se guardan los nuevos valores de gris en el array
-            # que contenía los valores para el rojo.
-            self.rojo[j] = suma
+            # Arbitrariamente, se guardan los nuevos valores de gris en el
+            # array que contenía los valores para el rojo.
+            nucleos.gris(rojo, verde, azul, salida = rojo)
 
 def leer_fichero(nombre):
     """
-    Función encargada de leer el fichero. Se comprueba el número mágico para
-    verificar que es un archivo en el formato correcto. Seguidamente, se obtiene
-    información de las dimensiones y se va leyendo el archivo guardando la
-    información de los colores RGB para cada píxel en tres listas (una para cada
-    color R, G y B). Esto lo consigue utilizando la función guardar_rgb().
+    Función encargada de leer el fichero con pnm.leer_imagen(), que comprueba
+    el número mágico para verificar que es un archivo en el formato correcto:
+    PPM en ASCII (P3) o binario (P6), o PGM (P2 o P5), cuyo gris se toma como
+    los tres colores. Seguidamente, se guarda la información de los colores RGB
+    para cada píxel en tres arrays (uno para cada color R, G y B). Esto lo
+    consigue utilizando la función guardar_arrays().
     ARGS:
         - nombre (str): nombre del archivo a abrir.
     RETURNS:
@@ -64,35 +84,27 @@ def leer_fichero(nombre):
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
     """
     try:
-        in_file = open(nombre, 'r')
+        imagen, cabecera = pnm.leer_imagen(nombre)
 
-    except:
+    except OSError:
         print("No se ha podido abrir el fichero")
         print(traceback.print_exc()) # Devuelve el error (si se produce).
 
-    else:
-        cabecera = in_file.readline()
-        cabecera = cabecera.rstrip()
-
-        if (cabecera == 'P3'): # Comprobamos número mágico.
-            dimension = in_file.readline()
-            dimension = dimension.rstrip() # Dimensión.
-            a, b = dimension.split()
-            fil = int(a)
-            col = int(b)
-
-            in_file.readline() # Valor máximo.
-
-            rojo, verde, azul = guardar_arrays(fil, col, in_file) # RGB.
+    except ValueError: # Número mágico o datos incorrectos.
+        print("Error, el fichero introducido no tiene el formato adecuado")
 
-            return fil, col, rojo, verde, azul
+    else:
+        # Como antes, el primer número de la dimensión es fil y el segundo col
+        # (la imagen de salida los escribe en el mismo orden).
+        fil = cabecera.ancho
+        col = cabecera.alto
 
-        else:
-            print("Error, el fichero introducido no tiene el formato adecuado")
+        rojo, verde, azul = guardar_arrays(fil, col, imagen.reshape(
+            -1, cabecera.canales)) # RGB.
 
-        in_file.close()
+        return fil, col, rojo, verde, azul
 
-def guardar_arrays(fil, col, in_file):
+def guardar_arrays(fil, col, muestras):
     """
     Se guardan, para cada pixel, sus valores correspondientes al rojo, verde y
     azul en un array (un array para cada color). Se utiliza este objeto para
@@ -100,7 +112,8 @@ def guardar_arrays(fil, col, in_file):
     ARGS:
         - fil (int): número de filas.
         - col (int): número de columnas.
-        - in_file (file): fichero abierto.
+        - muestras (np.ndarray): muestras de la imagen (ver pnm.leer_imagen()),
+        una fila por píxel y una columna por canal.
     RETURNS:
         - rojo (array): array con valores correspondientes al color rojo.
         - verde (array): array con valores correspondientes al color verde.
@@ -110,22 +123,10 @@ def guardar_arrays(fil, col, in_file):
     array_verde = Array('i', fil * col, lock = False)
     array_azul = Array('i', fil * col, lock = False)
 
-    i = 0
-
-    while i < (fil * col):
-        linea = in_file.readline()
-        linea = linea.rstrip()
-        lista = linea.split()
-
-        n = 0
-
-        for j in range(col):
-            array_rojo[i] = int(lista[n])
-            array_verde[i]= int(lista[n + 1])
-            array_azul[i] = int(lista[n + 2])
-
-            i += 1
-            n += 3
+    # Cada color se copia de una vez de su canal (en una imagen en gris, los
+    # tres colores son el mismo canal).
+    for k, array in enumerate((array_rojo, array_verde, array_azul)):
+        nucleos.vista(array)[:] = muestras[:, k % muestras.shape[1]]
 
     return array_rojo, array_verde, array_azul
 
@@ -142,6 +143,8 @@ def generar_imagen(fil, col, gris, fich):
         procesos.
         - fich (str): nombre inicial del archivo. Se modificará para escribir el
         archivo de salida.
+    RETURNS:
+        - nombre (str): nombre del archivo de salida.
     """
     # Busca el último punto (.ppm)
     index = fich.rfind('.')
@@ -155,96 +158,86 @@ def generar_imagen(fil, col, gris, fich):
     dimension = str(fil) + " " + str(col) + "\n"
     fout.write(dimension)
 
-    maxi = max(gris)
+    filas = np.asarray(gris).reshape(fil, col)
+
+    maxi = filas.max()
     maxi = str(maxi) + "\n"
     fout.write(maxi)
 
-    contador = 0
-
-    # Vamos escribiendo los valores de gris desplazándonos con un contador:
-    for i in range(fil):
-        for j in range(col):
-            fout.write(str(gris[contador]))
-            contador += 1
-            # Si no es el último valor, introducimos un espacio.
-            if j != col - 1:
-                fout.write(" ")
-
-        fout.write("\n")
+    # Cada fila se escribe de una vez, con los valores separados por espacios.
+    fout.write("".join(" ".join(map(str, fila)) + "\n"
+                       for fila in filas.tolist()))
 
     fout.write("\n")
 
     fout.close()
 
+    return nombre
+
 def main():
     # 1) Pedimos nombre del fichero y el nº de procesos a utilizar:
     fich = input("Introduzca el nombre del fichero: ")
 
     p = int(input("Introduzca el numero de procesos: "))
 
-    # Medimos el tiempo inicial.
-    tiempo_inicio = time()
-
-    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ tipo ‘ascii’. Se
-    # guarda.
-    fil, col, rojo, verde, azul = leer_fichero(fich)
-    tiempo_lectura = time()
-
-    # 3) Paralelizamos el problema en varios procesos:
-    tiempo_inicio_paralel = time()
-
-    lista_procesos = []
-
-    dim = fil * col
-    n = dim // p
-    resto  = dim % p
-    inicio = 0
-    for i in range(p):
-        final = inicio + n
-        if resto != 0:
-            final += 1
-            resto -= 1
-        lista_procesos.append(EliminarColor(rojo, verde, azul, inicio, final))
-        lista_procesos[i].start()
-        inicio = final
+    # Medimos cada etapa (ver medicion.py en images-pipeline).
+    medida = medicion.Medicion("color_procesos", fichero = fich, procesos = p)
+
+    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ (ascii o
+    # binario). Se guarda.
+    with medida.etapa("decodificacion") as etapa:
+        fil, col, rojo, verde, azul = leer_fichero(fich)
+        etapa.bytes += os.path.getsize(fich)
+        etapa.pixeles += fil * col
+
+    # 3) Paralelizamos el problema en varios procesos. Cada proceso envía su
+    # tiempo por la cola de la medición.
+    cola = medida.cola_trabajadores()
+
+    with medida.etapa("calculo", pixeles = fil * col):
+        lista_procesos = []
+
+        dim = fil * col
+        n = dim // p
+        resto  = dim % p
+        inicio = 0
+        for i in range(p):
+            final = inicio + n
+            if resto != 0:
+                final += 1
+                resto -= 1
+            lista_procesos.append(EliminarColor(rojo, verde, azul, inicio,
+                                                final, cola))
+            lista_procesos[i].start()
+            inicio = final
 
         # Comprobamos que los procesos han acabado.
-    for i in range(p):
-        lista_procesos[i].join()
-
-    tiempo_fin_paralel = time()
+        for i in range(p):
+            lista_procesos[i].join()
 
     # 4) Se guarda la nueva imagen añadiendo al nombre que tenía ‘_gray’ y la
     # extensión "".pgm".
-    tiempo_inicio_imagen = time()
-
-    generar_imagen(fil, col, rojo, fich)
-
-    tiempo_fin_imagen = time()
-
-    # Medimos los diferentes tiempos de ejecucion y cremos un fichero de
-    # resultados.
-    tiempo_final = time()
+    with medida.etapa("codificacion", pixeles = fil * col) as etapa:
+        nombre = generar_imagen(fil, col, rojo, fich)
+        etapa.bytes += os.path.getsize(nombre)
 
-    # Escribemos un fichero de salida con información respecto a los tiempos que
-    # de cada parte.
-    tiempo_ejec_total = tiempo_final - tiempo_inicio
-    tiempo_ejec_lectura = tiempo_lectura - tiempo_inicio
-    tiempo_ejec_paralel = (tiempo_fin_paralel - tiempo_inicio_paralel)
-    tiempo_salvar_imagen = (tiempo_fin_imagen - tiempo_inicio_imagen)
+    # Se emite el registro de la ejecución (una línea JSON) y, como antes, un
+    # fichero de resultados con los tiempos de cada parte.
+    registro = medida.terminar()
+    etapas = registro["etapas"]
 
     out = 'tiempo_' + str(p) + 'procesos.out'
 
     resultados = open(out, 'w')
     resultados.write('\nEjecutando el problema con %d proceso(s)...' %p)
     resultados.write('\nEl tiempo de ejecución total es de %5.4f segundos'
-                     %tiempo_ejec_total)
+                     %registro["segundos"])
     resultados.write('\nEl tiempo de lectura del fichero es de %5.4f segundos'
-                     %tiempo_ejec_lectura)
+                     %etapas["decodificacion"]["segundos"])
     resultados.write('\nEl tiempo que se tarda en generar la imagen en gris es')
-    resultados.write(' de %5.4f segundos' %tiempo_ejec_paralel)
+    resultados.write(' de %5.4f segundos' %etapas["calculo"]["segundos"])
     resultados.write('\nEl tiempo que se tarda en guardar la imagen es')
-    resultados.write(' de %5.4f segundos' %tiempo_salvar_imagen)
+    resultados.write(' de %5.4f segundos' %etapas["codificacion"]["segundos"])
 
     resultados.close()
 
@@ -3,9 +3,9 @@
 """
 color_secuencial.py
 
-Este programa recibe como entrada una imagen en formato ppm (ascii) y elimina su
-información del color que contiene, devolviendo la misma imagen pero en una
-escala de grises en formato pgm (ascii).
+Este programa recibe como entrada una imagen en formato ppm (ascii o binario) y
+elimina su información del color que contiene, devolviendo la misma imagen pero
+en una escala de grises en formato pgm (ascii).
 
 Este programa corresponde con la versión secuencial.
 
@@ -14,16 +14,29 @@ Autor: Francisco Martínez Picó
 
 Fecha: 25/10/2020
 """
-from time import time
+import os
+import sys
 import traceback
 
+import numpy as np
+
+# La instrumentación (medicion.py), los núcleos vectorizados (nucleos.py) y el
+# lector de PPM/PGM (pnm.py) están en images-pipeline.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "images-pipeline"))
+
+import medicion
+import nucleos
+import pnm
+
 def leer_fichero(nombre):
     """
-    Función encargada de leer el fichero. Se comprueba el número mágico para
-    verificar que es un archivo en el formato correcto. Seguidamente, se obtiene
-    información de las dimensiones y se va leyendo el archivo guardando la
-    información de los colores RGB para cada píxel en tres listas (una para cada
-    color R, G y B). Esto lo consigue utilizando la función guardar_listas().
+    Función encargada de leer el fichero con pnm.leer_imagen(), que comprueba
+    el número mágico para verificar que es un archivo en el formato correcto:
+    PPM en ASCII (P3) o binario (P6), o PGM (P2 o P5), cuyo gris se toma como
+    los tres colores. Seguidamente, se guarda la información de los colores RGB
+    para cada píxel en tres listas (una para cada color R, G y B). Esto lo
+    consigue utilizando la función guardar_listas().
     ARGS:
         - nombre (str): nombre del archivo a abrir.
     RETURNS:
@@ -37,65 +50,45 @@ def leer_fichero(nombre):
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
     """
     try:
-        in_file = open(nombre, 'r')
+        imagen, cabecera = pnm.leer_imagen(nombre)
 
-    except:
+    except OSError:
         print("No se ha podido abrir el fichero")
         print(traceback.print_exc()) # Devuelve el error (si se produce).
 
-    else:
-        cabecera = in_file.readline()
-        cabecera = cabecera.rstrip()
-
-        if (cabecera == 'P3'): # Comprobamos número mágico.
-            dimension = in_file.readline()
-            dimension = dimension.rstrip()
-            a, b = dimension.split() # Dimensión.
-            fil = int(a)
-            col = int(b)
+    except ValueError: # Número mágico o datos incorrectos.
+        print("Error, el fichero introducido no tiene el formato adecuado")
 
-            in_file.readline() # Valor máximo.
-
-            rojo, verde, azul = guardar_listas(fil, col, in_file) # RGB.
-
-            return fil, col, rojo, verde, azul
+    else:
+        # Como antes, el primer número de la dimensión es fil y el segundo col
+        # (la imagen de salida los escribe en el mismo orden).
+        fil = cabecera.ancho
+        col = cabecera.alto
 
-        else:
-            print("Error, el fichero introducido no tiene el formato adecuado")
+        rojo, verde, azul = guardar_listas(fil, col, imagen.reshape(
+            -1, cabecera.canales)) # RGB.
 
-        in_file.close()
+        return fil, col, rojo, verde, azul
 
-def guardar_listas(fil, col, in_file):
+def guardar_listas(fil, col, muestras):
     """
     Se guardan, para cada pixel, sus valores correspondientes al rojo, verde y
     azul en una lista (una lista para cada color).
     ARGS:
         - fil (int): número de filas.
         - col (int): número de columnas.
-        - in_file (file): fichero abierto.
+        - muestras (np.ndarray): muestras de la imagen (ver pnm.leer_imagen()),
+        una fila por píxel y una columna por canal.
 
     RETURNS:
         - rojo (list): lista con pixeles correspondientes al color rojo.
         - verde (list): lista con pixeles correspondientes al color verde.
         - azul (list): lista con pixeles correspondientes al color azul.
     """
-    # Inicializamos las listas.
-    rojo = [int] * (fil * col)
-    verde = [int] * (fil * col)
-    azul = [int] * (fil * col)
-
-    pos = 0 # Posición, contador para crear las listas en orden.
-
-    for i in range(fil):
-        linea = in_file.readline()
-        linea = linea.rstrip()
-        linea = linea.split()
-
-        for j in range(0, col * 3, 3):
-            rojo[pos] = int(linea[j])
-            verde[pos] = int(linea[j + 1])
-            azul[pos] = int(linea[j + 2])
-            pos += 1
+    # Cada color se toma de una vez de su canal (en una imagen en gris, los
+    # tres colores son el mismo canal).
+    rojo, verde, azul = (muestras[:, k % muestras.shape[1]].tolist()
+                         for k in range(3))
 
     return rojo, verde, azul
 
@@ -120,11 +113,10 @@ def eliminar_color(fil, col, rojo, verde, azul):
         - gris (list): lista con los valores de gris. Cada posición
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
     """
-    gris = []
-
-    for x, y, z in zip(rojo, verde, azul):
-        nuevo_valor = (x + y + z)//3
-        gris.append(nuevo_valor)
+    # Se suman los tres canales como arrays (de una vez, sin recorrer los
+    # píxeles en Python; ver nucleos.gris()).
+    gris = nucleos.gris(np.array(rojo), np.array(verde),
+                        np.array(azul)).tolist()
 
     # Eliminamos las listas con los colores anteriores para liberar memoria.
     rojo.clear()
@@ -144,6 +136,8 @@ def generar_imagen(fil, col, gris, fich):
         corresponde a un píxel. Se guardan en orden (1ª posición = 1º píxel...).
         - fich (str): nombre inicial del archivo. Se modificará para escribir el
         archivo de salida.
+    RETURNS:
+        - nombre (str): nombre del archivo de salida.
     """
     # Busca el último punto (.ppm).
     index = fich.rfind('.')
@@ -158,41 +152,49 @@ def generar_imagen(fil, col, gris, fich):
     dimension = str(fil) + " " + str(col) + "\n"
     fout.write(dimension)
 
-    maxi = max(gris)
+    filas = np.asarray(gris).reshape(fil, col)
+
+    maxi = filas.max()
     maxi = str(maxi) + "\n"
     fout.write(maxi)
 
-    contador = 0
-
-    # Vamos escribiendo los valores de gris desplazándonos con un contador:
-    for i in range(fil):
-        for j in range(col):
-            fout.write(str(gris[contador]))
-            contador += 1
-            # Si no es el último valor, introducimos un espacio.
-            if j != col-1:
-                fout.write(" ")
-
-        fout.write("\n")
+    # Cada fila se escribe de una vez, con los valores separados por espacios.
+    fout.write("".join(" ".join(map(str, fila)) + "\n"
+                       for fila in filas.tolist()))
 
     fout.write("\n")
 
     fout.close()
 
+    return nombre
+
 def main():
     # 1) Pedimos el nombre del fichero. Debe estar en el directorio actual:
     fich = input("Introduzca el nombre del fichero: ")
 
-    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ tipo ‘ascii’ y
-    # se guarda en una matriz.
-    fil, col, rojo, verde, azul = leer_fichero(fich)
+    # Medimos cada etapa (ver medicion.py en images-pipeline).
+    medida = medicion.Medicion("color_secuencial", fichero = fich,
+                               procesos = 1)
+
+    # 2) Leemos la imagen, comprobamos que es un fichero ‘ppm’ (ascii o
+    # binario) y se guarda en una matriz.
+    with medida.etapa("decodificacion") as etapa:
+        fil, col, rojo, verde, azul = leer_fichero(fich)
+        etapa.bytes += os.path.getsize(fich)
+        etapa.pixeles += fil * col
 
     # 3) Generamos la nueva imagen cambiando el color a escala de grises.
-    gris = eliminar_color(fil,col,rojo,verde,azul)
+    with medida.etapa("calculo", pixeles = fil * col):
+        gris = eliminar_color(fil,col,rojo,verde,azul)
 
     # 4) Se guarda la nueva imagen cambiando el nombre al que tenía mas
     # ‘_gray’ y el formato a '.pgm'.
-    generar_imagen(fil,col,gris,fich)
+    with medida.etapa("codificacion", pixeles = fil * col) as etapa:
+        nombre = generar_imagen(fil,col,gris,fich)
+        etapa.bytes += os.path.getsize(nombre)
+
+    # Se emite el registro de la ejecución (una línea JSON).
+    medida.terminar()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,486 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+
+Banco de pruebas de los programas de imágenes. Genera imágenes sintéticas
+reproducibles (a partir de una semilla), PPM y PGM, en ASCII (P3/P2) y en
+binario (P6/P5), con las resoluciones pedidas, y ejecuta sobre cada una las
+dos operaciones originales con cada motor y cada número de procesos:
+
+    - secuencial: color_secuencial.py (sólo gris, un proceso).
+    - procesos: color_procesos.py (gris) y ecualizador.py (ecualizar).
+    - tuberia: la tubería de bandas con NumPy (ver tuberia.py).
+    - teselas: la imagen teselada en disco (ver teselas.py).
+
+Los programas originales sólo convierten PPM (P3 o P6); con las imágenes PGM se
+omiten. Cada ejecución se hace en un proceso nuevo (para medir su memoria sin
+la de las anteriores) y deja su registro de medicion.py, del que se toman el
+tiempo, la fracción de E/S (decodificación y codificación) y la memoria
+máxima. Con ellos se calculan los megapíxeles por segundo, la aceleración y la
+eficiencia paralela respecto al menor número de procesos medido. Los píxeles de
+cada salida se comparan con los calculados directamente con NumPy, así que
+todos los motores deben dar el mismo resultado.
+
+Ejemplos:
+
+    python3 benchmark.py
+    python3 benchmark.py --resoluciones 640x480 4096x4096 -p 1 2 4 8
+    python3 benchmark.py --formatos binario --motores tuberia teselas --json r.json
+    python3 benchmark.py --grafica escalado.png
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from lotes import operadores
+from medicion import Medicion, VARIABLE
+from teselas import aplicar, ImagenTeselada, TAM_TESELA
+from tuberia import FILAS_BANDA, Tuberia
+import pnm
+
+MOTORES = ("secuencial", "procesos", "tuberia", "teselas")
+
+OPERACIONES = ("gris", "ecualizar")
+
+TIPOS = {"ppm": 3, "pgm": 1}
+
+FORMATOS = ("ascii", "binario")
+
+# Programas originales de cada motor y operación: directorio, programa y
+# sufijo que añaden al nombre de la entrada para la salida.
+PROGRAMAS = {
+    ("secuencial", "gris"): ("images-gray_conversion", "color_secuencial.py",
+                             "_gray.pgm"),
+    ("procesos", "gris"): ("images-gray_conversion", "color_procesos.py",
+                           "_gray.pgm"),
+    ("procesos", "ecualizar"): ("images-equalization", "ecualizador.py",
+                                "_ecual.ppm"),
+}
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Rango de las muestras generadas (sin llegar a 0 ni a 255, para que la
+# normalización cambie la imagen) y desviación del ruido.
+MINIMO, MAXIMO = 16, 239
+RUIDO = 12
+
+def leer_resolucion(cadena):
+    """
+    Convierte una resolución como 1024x768 en una tupla (ancho, alto).
+    """
+    ancho, _, alto = cadena.lower().partition("x")
+
+    try:
+        return int(ancho), int(alto)
+    except ValueError:
+        raise argparse.ArgumentTypeError("resolución no válida: %s" % cadena)
+
+def generar_imagen(fichero, ancho, alto, canales = 3, binario = True,
+                   semilla = 0):
+    """
+    Escribe una imagen sintética: un degradado diagonal distinto en cada canal
+    con ruido gaussiano, en [MINIMO, MAXIMO]. Se genera por bandas, cada una
+    con su propio generador (semilla, número de banda), así que la memoria no
+    depende del tamaño y los mismos parámetros dan siempre el mismo fichero.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero PPM o PGM.
+        - ancho (tipo integer): columnas.
+        - alto (tipo integer): filas.
+        - canales (tipo integer): 3 (PPM) o 1 (PGM).
+        - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+        - semilla (tipo integer): semilla de los generadores aleatorios.
+    """
+    x = np.arange(ancho) / max(ancho - 1, 1)
+    fase = np.arange(canales) / canales
+
+    with pnm.EscritorPNM(fichero, ancho, alto, canales, 255,
+                         binario) as escritor:
+        for k, inicio in enumerate(range(0, alto, FILAS_BANDA)):
+            n = min(FILAS_BANDA, alto - inicio)
+            rng = np.random.default_rng([semilla, k])
+            y = np.arange(inicio, inicio + n) / max(alto - 1, 1)
+
+            # (n, ancho, canales) con valores en [0, 1).
+            degradado = ((x[None, :, None] + y[:, None, None]) / 2 +
+                         fase) % 1.0
+            valores = (MINIMO + degradado * (MAXIMO - MINIMO) +
+                       rng.normal(0, RUIDO, (n, ancho, canales)))
+
+            escritor.escribir(np.clip(np.rint(valores), MINIMO,
+                                      MAXIMO).astype(np.uint8))
+
+def imagen_prueba(directorio, ancho, alto, tipo, formato, semilla = 0):
+    """
+    Devuelve el fichero de la imagen pedida, generándolo sólo si no existe
+    (las imágenes grandes tardan en crearse y se reutilizan entre ejecuciones).
+    """
+    fichero = os.path.join(directorio, "prueba_%dx%d_%s_%d.%s" %
+                           (ancho, alto, formato, semilla, tipo))
+
+    if not os.path.exists(fichero):
+        temporal = fichero + ".tmp"
+        generar_imagen(temporal, ancho, alto, TIPOS[tipo],
+                       formato == "binario", semilla)
+        os.replace(temporal, fichero)
+
+    return fichero
+
+def referencia(entrada, operacion):
+    """
+    Resultado esperado de una operación, calculado directamente con NumPy:
+    (r + g + b) // 3 para gris y (v - min) / (max - min) * 255 (truncado) en
+    cada canal para ecualizar.
+    """
+    imagen, _ = pnm.leer_imagen(entrada)
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1).astype(
+        np.int64)
+
+    if operacion == "gris":
+        return imagen.sum(axis = 2) // imagen.shape[2]
+
+    minimos = imagen.min(axis = (0, 1))
+    rango = imagen.max(axis = (0, 1)) - minimos
+
+    return ((imagen - minimos) / rango * 255).astype(np.int64)
+
+def disponible(motor, operacion, canales, p):
+    """
+    Indica si un motor puede ejecutar una operación sobre una imagen. Los
+    programas originales sólo convierten PPM (siempre a una salida en color o
+    en gris de tres canales) y el secuencial sólo tiene un proceso.
+    """
+    if motor in ("secuencial", "procesos"):
+        return ((motor, operacion) in PROGRAMAS and canales == 3 and
+                (motor != "secuencial" or p == 1))
+
+    return True
+
+def _ejecutar_programa(motor, operacion, entrada, salida, p, registros):
+    """
+    Ejecuta un programa original (que pregunta el fichero y los procesos por
+    la entrada estándar) y mueve su salida al fichero indicado.
+    """
+    directorio, programa, sufijo = PROGRAMAS[(motor, operacion)]
+    respuestas = entrada + "\n"
+
+    if motor == "procesos":
+        respuestas += "%d\n" % p
+
+    # color_procesos escribe tiempo_Nprocesos.out en el directorio actual.
+    subprocess.run([sys.executable, os.path.join(RAIZ, directorio, programa)],
+                   input = respuestas, text = True, check = True,
+                   cwd = os.path.dirname(registros),
+                   env = dict(os.environ, **{VARIABLE: registros}),
+                   stdout = subprocess.DEVNULL)
+
+    os.replace(os.path.splitext(entrada)[0] + sufijo, salida)
+
+def _ejecutar_motor(motor, operacion, entrada, salida, p, binario, registros,
+                    tesela):
+    """
+    Ejecuta la tubería o las teselas, midiendo sus etapas (en un proceso
+    nuevo).
+    """
+    medida = Medicion(motor, fichero = entrada, operacion = operacion,
+                      procesos = p)
+
+    if motor == "tuberia":
+        Tuberia(operadores(operacion), FILAS_BANDA, p).ejecutar(
+            entrada, salida, binario, medicion = medida)
+        medida.terminar(registros)
+        return
+
+    cabecera = pnm.leer_cabecera(entrada)
+    pixeles = cabecera.ancho * cabecera.alto
+    teselada = os.path.join(os.path.dirname(registros), "entrada.tes")
+    resultado = os.path.join(os.path.dirname(registros), "salida.tes")
+    tiempos = []
+
+    with medida.etapa("decodificacion", os.path.getsize(entrada), pixeles):
+        ImagenTeselada.desde_pnm(entrada, teselada, tesela).cerrar()
+
+    with medida.etapa("calculo", pixeles = pixeles):
+        imagen = aplicar(teselada, resultado, operadores(operacion), p,
+                         tiempos)
+
+    with medida.etapa("codificacion", pixeles = pixeles) as etapa:
+        imagen.a_pnm(salida, binario = binario)
+        imagen.cerrar()
+        etapa.bytes += os.path.getsize(salida)
+
+    # Tiempo de cálculo de cada proceso del pool (la suma de sus teselas).
+    for pid in sorted(set(t[2] for t in tiempos)):
+        suyas = [t for t in tiempos if t[2] == pid]
+        medida.trabajadores.append({"nombre": "teselas", "pid": pid,
+                                    "teselas": len(suyas),
+                                    "segundos": sum(t[1] for t in suyas)})
+
+    os.remove(teselada)
+    os.remove(resultado)
+    medida.terminar(registros)
+
+def medir(motor, operacion, entrada, salida, p, binario = True,
+          tesela = TAM_TESELA):
+    """
+    Mide una operación con un motor y un número de procesos.
+
+    INPUTS:
+        - motor (tipo string): nombre del motor (ver MOTORES).
+        - operacion (tipo string): "gris" o "ecualizar".
+        - entrada (tipo string): fichero PPM o PGM.
+        - salida (tipo string): fichero de salida.
+        - p (tipo integer): número de procesos.
+        - binario (tipo booleano): salida P6/P5 si es True, P3/P2 si es False
+        (los programas originales siempre escriben ASCII).
+        - tesela (tipo tupla): filas y columnas de las teselas.
+
+    RETURN:
+        - (tipo diccionario): registro de la ejecución (ver
+        medicion.Medicion.registro()).
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        registros = os.path.join(directorio, "registros.jsonl")
+
+        if motor in ("secuencial", "procesos"):
+            _ejecutar_programa(motor, operacion, entrada, salida, p,
+                               registros)
+        else:
+            proceso = Process(target = _ejecutar_motor,
+                              args = (motor, operacion, entrada, salida, p,
+                                      binario, registros, tesela))
+            proceso.start()
+            proceso.join()
+
+            if proceso.exitcode != 0:
+                raise RuntimeError("%s ha terminado con el código %d" %
+                                   (motor, proceso.exitcode))
+
+        with open(registros, encoding = "utf-8") as f:
+            return json.loads(f.readlines()[-1])
+
+def benchmark(resoluciones, tipos, formatos, operaciones, motores, procesos,
+              directorio = None, semilla = 0, tesela = TAM_TESELA,
+              mostrar = print):
+    """
+    Ejecuta todas las combinaciones de imagen, operación, motor y número de
+    procesos.
+
+    INPUTS:
+        - resoluciones (tipo lista): tuplas (ancho, alto).
+        - tipos (tipo lista): "ppm" y/o "pgm".
+        - formatos (tipo lista): "ascii" y/o "binario".
+        - operaciones (tipo lista): "gris" y/o "ecualizar".
+        - motores (tipo lista): nombres de los motores (ver MOTORES).
+        - procesos (tipo lista): números de procesos.
+        - directorio (tipo string): directorio de las imágenes generadas.
+        - semilla (tipo integer): semilla de las imágenes.
+        - tesela (tipo tupla): filas y columnas de las teselas.
+        - mostrar (tipo función): función a la que se pasa cada línea de la
+        tabla de resultados (None para no mostrar nada).
+
+    RETURN:
+        - resultados (tipo lista): un diccionario por ejecución.
+    """
+    directorio = directorio or os.path.join(tempfile.gettempdir(),
+                                            "benchmark-imagenes")
+    os.makedirs(directorio, exist_ok = True)
+    procesos = sorted(procesos)
+    resultados = []
+
+    if mostrar:
+        mostrar("%-24s %-10s %-11s %3s %9s %8s %6s %6s %5s %8s %s" %
+                ("imagen", "operación", "motor", "p", "tiempo(s)", "MP/s",
+                 "acel.", "efic.", "E/S%", "RSS(MB)", "correcto"))
+
+    for ancho, alto in resoluciones:
+        for tipo in tipos:
+            for formato in formatos:
+                entrada = imagen_prueba(directorio, ancho, alto, tipo,
+                                        formato, semilla)
+                binario = formato == "binario"
+                nombre = "%dx%d %s %s" % (ancho, alto, tipo, formato)
+
+                for operacion in operaciones:
+                    esperada = referencia(entrada, operacion)
+
+                    for motor in motores:
+                        base = None
+
+                        for p in procesos:
+                            if not disponible(motor, operacion, TIPOS[tipo],
+                                              p):
+                                continue
+
+                            salida = os.path.join(directorio, "salida_%s.%s"
+                                                  % (motor, "pgm" if
+                                                     operacion == "gris" or
+                                                     tipo == "pgm" else "ppm"))
+                            registro = medir(motor, operacion, entrada,
+                                             salida, p, binario, tesela)
+                            obtenida, _ = pnm.leer_imagen(salida)
+                            os.remove(salida)
+
+                            tiempo = registro["segundos"]
+
+                            # Aceleración y eficiencia respecto al menor
+                            # número de procesos medido con este motor.
+                            base = base or (tiempo * p)
+
+                            resultado = {
+                                "ancho": ancho,
+                                "alto": alto,
+                                "tipo": tipo,
+                                "formato": formato,
+                                "operacion": operacion,
+                                "motor": motor,
+                                "procesos": p,
+                                "tiempo": tiempo,
+                                "mp_s": ancho * alto / 1e6 / tiempo,
+                                "aceleracion": base / tiempo,
+                                "eficiencia": base / (p * tiempo),
+                                "fraccion_es": registro["fraccion_es"],
+                                "rss_mb": registro["rss_maximo_mb"]["propio"],
+                                "rss_hijos_mb":
+                                    registro["rss_maximo_mb"]["hijos"],
+                                "etapas": registro["etapas"],
+                                "trabajadores": registro["trabajadores"],
+                                "correcto": np.array_equal(
+                                    obtenida.ravel(), esperada.ravel()),
+                            }
+                            resultados.append(resultado)
+
+                            if mostrar:
+                                mostrar("%-24s %-10s %-11s %3d %9.3f %8.2f "
+                                        "%6.2f %6.2f %5.1f %8.1f %s" %
+                                        (nombre, operacion, motor, p, tiempo,
+                                         resultado["mp_s"],
+                                         resultado["aceleracion"],
+                                         resultado["eficiencia"],
+                                         100 * (resultado["fraccion_es"] or 0),
+                                         max(resultado["rss_mb"],
+                                             resultado["rss_hijos_mb"]),
+                                         "sí" if resultado["correcto"]
+                                         else "NO"))
+
+    return resultados
+
+def graficar(resultados, fichero):
+    """
+    Guarda una gráfica de escalado: la aceleración y la eficiencia de cada
+    motor frente al número de procesos, con la mayor imagen medida de cada
+    tipo y formato (una columna por operación).
+
+    INPUTS:
+        - resultados (tipo lista): resultados de benchmark().
+        - fichero (tipo string): fichero de la imagen de la gráfica.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    operaciones = sorted(set(r["operacion"] for r in resultados))
+    figura, ejes = plt.subplots(2, len(operaciones), squeeze = False,
+                                figsize = (6 * len(operaciones), 8))
+
+    for columna, operacion in enumerate(operaciones):
+        suyos = [r for r in resultados if r["operacion"] == operacion]
+        pixeles = max(r["ancho"] * r["alto"] for r in suyos)
+        suyos = [r for r in suyos if r["ancho"] * r["alto"] == pixeles]
+        series = sorted(set((r["motor"], r["tipo"], r["formato"])
+                            for r in suyos))
+        maximo = max(r["procesos"] for r in suyos)
+
+        for motor, tipo, formato in series:
+            puntos = [r for r in suyos if (r["motor"], r["tipo"],
+                                           r["formato"]) == (motor, tipo,
+                                                             formato)]
+            etiqueta = "%s (%s %s)" % (motor, tipo, formato)
+            p = [r["procesos"] for r in puntos]
+
+            ejes[0][columna].plot(p, [r["aceleracion"] for r in puntos],
+                                  marker = "o", label = etiqueta)
+            ejes[1][columna].plot(p, [r["eficiencia"] for r in puntos],
+                                  marker = "o", label = etiqueta)
+
+        ejes[0][columna].plot([1, maximo], [1, maximo], "k--",
+                              label = "ideal")
+        ejes[0][columna].set_title("%s, %d píxeles" % (operacion, pixeles))
+        ejes[0][columna].set_ylabel("aceleración")
+        ejes[1][columna].set_ylabel("eficiencia")
+        ejes[1][columna].set_xlabel("procesos")
+        ejes[0][columna].legend(fontsize = "small")
+
+    figura.tight_layout()
+    figura.savefig(fichero)
+
+def main(argv = None):
+    """
+    Función principal.
+    """
+    parser = argparse.ArgumentParser(
+        description = "Banco de pruebas de los programas de imágenes.")
+
+    parser.add_argument("--resoluciones", nargs = "+", type = leer_resolucion,
+                        default = [(256, 256), (1024, 768)],
+                        help = "resoluciones de las imágenes (p. ej. 640x480)")
+    parser.add_argument("--tipos", nargs = "+", choices = sorted(TIPOS),
+                        default = ["ppm", "pgm"], help = "tipos de imagen")
+    parser.add_argument("--formatos", nargs = "+", choices = FORMATOS,
+                        default = list(FORMATOS), help = "formatos de imagen")
+    parser.add_argument("--operaciones", nargs = "+", choices = OPERACIONES,
+                        default = list(OPERACIONES), help = "operaciones")
+    parser.add_argument("--motores", nargs = "+", choices = MOTORES,
+                        default = list(MOTORES), help = "motores")
+    parser.add_argument("-p", "--procesos", nargs = "+", type = int,
+                        default = [1, 2, 4], help = "números de procesos")
+    parser.add_argument("--tesela", type = int, nargs = 2,
+                        default = TAM_TESELA, metavar = ("FILAS", "COLUMNAS"),
+                        help = "tamaño de las teselas")
+    parser.add_argument("-d", "--directorio",
+                        help = "directorio de las imágenes generadas")
+    parser.add_argument("--semilla", type = int, default = 0,
+                        help = "semilla de las imágenes")
+    parser.add_argument("--json", help = "fichero donde guardar los resultados")
+    parser.add_argument("--grafica",
+                        help = "fichero donde guardar la gráfica de escalado "
+                        "(necesita matplotlib)")
+
+    args = parser.parse_args(argv)
+
+    if min(args.procesos) < 1:
+        parser.error("el número de procesos debe ser al menos 1")
+
+    # Se comprueba antes de medir nada, para no perder las mediciones.
+    if args.grafica and importlib.util.find_spec("matplotlib") is None:
+        parser.error("--grafica necesita matplotlib")
+
+    resultados = benchmark(args.resoluciones, args.tipos, args.formatos,
+                           args.operaciones, args.motores, args.procesos,
+                           args.directorio, args.semilla, tuple(args.tesela))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent = 4)
+
+    if args.grafica and resultados:
+        graficar(resultados, args.grafica)
+
+    if not all(r["correcto"] for r in resultados):
+        raise SystemExit("Hay motores que no dan el resultado esperado")
+
+if __name__ == '__main__':
+    main()
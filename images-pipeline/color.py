@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+color.py
+
+Conversiones de espacio de color para la tubería de bandas (ver tuberia.py).
+EliminarColor calcula el gris como la media (r + g + b) // 3, que no coincide
+con la luminancia de las normas ITU-R BT.601 y BT.709:
+
+    Y = kr * R + kg * G + kb * B,    kg = 1 - kr - kb
+
+Como cada componente de salida (Y, Cb, Cr) es una combinación lineal de R, G y
+B, se calcula en aritmética entera de punto fijo con tablas: para cada canal de
+entrada hay una tabla con el producto ya hecho por el coeficiente (escalado por
+2 ** PRECISION), de modo que cada muestra de salida es la suma de tres
+consultas, un redondeo y un desplazamiento. Para imágenes de 8 bits son tres
+tablas de 256 entradas por componente.
+
+El HSV no es lineal y se calcula vectorizado en coma flotante, con los tres
+componentes escalados al rango de la imagen (el tono de [0, 360) a
+[0, maximo]).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from tuberia import Operador
+import pnm
+
+# Bits de la parte fraccionaria de los coeficientes en punto fijo.
+PRECISION = 16
+
+Norma = namedtuple("Norma", "kr kb")
+
+NORMAS = {
+    "601": Norma(0.299, 0.114),
+    "709": Norma(0.2126, 0.0722),
+}
+
+def coeficientes(norma):
+    """
+    Coeficientes de la conversión de RGB a YCbCr de una norma (sin el
+    desplazamiento de la crominancia).
+
+    INPUT:
+        - norma (tipo string): "601" o "709".
+
+    RETURN:
+        - (tipo np.ndarray): matriz 3 x 3; la fila k tiene los coeficientes de
+        R, G y B del componente k (Y, Cb y Cr).
+    """
+    kr, kb = NORMAS[norma]
+    kg = 1 - kr - kb
+
+    return np.array([
+        [kr, kg, kb],
+        [-kr / (2 * (1 - kb)), -kg / (2 * (1 - kb)), 0.5],
+        [0.5, -kg / (2 * (1 - kr)), -kb / (2 * (1 - kr))],
+    ])
+
+def tablas(coeficientes, maximo):
+    """
+    Tablas de punto fijo de una combinación lineal: tabla[k][v] es
+    round(coeficientes[k] * v * 2 ** PRECISION).
+
+    INPUTS:
+        - coeficientes (tipo secuencia): coeficiente de cada canal de entrada.
+        - maximo (tipo integer): valor máximo de la entrada.
+
+    RETURN:
+        - (tipo np.ndarray): array de forma (canales, maximo + 1).
+    """
+    valores = np.arange(maximo + 1, dtype = np.float64)
+    escala = 1 << PRECISION
+    dtype = np.int32 if maximo < 256 else np.int64
+
+    return np.rint(np.outer(coeficientes, valores) * escala).astype(dtype)
+
+def combinar(banda, tablas, desplazamiento, maximo):
+    """
+    Calcula una combinación lineal de los canales de una banda con sus tablas
+    de punto fijo, le suma un desplazamiento y la recorta a [0, maximo].
+
+    INPUTS:
+        - banda (tipo np.ndarray): muestras, de forma (n, ancho, canales).
+        - tablas (tipo np.ndarray): tablas de cada canal (ver tablas()).
+        - desplazamiento (tipo integer): valor que se suma al resultado.
+        - maximo (tipo integer): valor máximo de la salida.
+
+    RETURN:
+        - (tipo np.ndarray): componente, de forma (n, ancho).
+    """
+    suma = tablas[0][banda[:, :, 0]]
+
+    for k in range(1, len(tablas)):
+        suma += tablas[k][banda[:, :, k]]
+
+    # Redondeo al entero más cercano antes de quitar la parte fraccionaria.
+    suma += (desplazamiento << PRECISION) + (1 << (PRECISION - 1))
+    suma >>= PRECISION
+
+    return np.clip(suma, 0, maximo).astype(pnm.tipo_muestra(maximo))
+
+def _solo_color(nombre, canales):
+    """
+    Comprueba que la imagen sea en color (RGB): las conversiones a YCbCr y HSV
+    no tienen sentido sobre una imagen en gris.
+    """
+    if canales != 3:
+        raise ValueError("%s necesita una imagen RGB (tiene %d canal%s)" %
+                         (nombre, canales, "" if canales == 1 else "es"))
+
+class Luma(Operador):
+    """
+    Escala de grises con la luminancia (Y) de la norma BT.601 o BT.709.
+    """
+    def __init__(self, norma = "601"):
+        if norma not in NORMAS:
+            raise ValueError("Norma desconocida: %s" % norma)
+
+        self.norma = norma
+        self.tablas = None
+
+    def configurar(self, ancho, alto, canales, maximo):
+        self.maximo = maximo
+        self.tablas = tablas(coeficientes(self.norma)[0], maximo)
+
+    def salida(self, canales, maximo):
+        return 1, maximo
+
+    def aplicar(self, banda, fila = 0):
+        if banda.shape[2] == 1:
+            return banda
+
+        return combinar(banda, self.tablas, 0, self.maximo)[:, :, None]
+
+class YCbCr(Operador):
+    """
+    Conversión de RGB a YCbCr de rango completo (como en JPEG): la
+    crominancia se centra en (maximo + 1) / 2.
+    """
+    def __init__(self, norma = "601"):
+        if norma not in NORMAS:
+            raise ValueError("Norma desconocida: %s" % norma)
+
+        self.norma = norma
+        self.tablas = None
+
+    def configurar(self, ancho, alto, canales, maximo):
+        _solo_color("YCbCr", canales)
+        self.maximo = maximo
+        self.tablas = [tablas(fila, maximo) for fila
+                       in coeficientes(self.norma)]
+
+    def aplicar(self, banda, fila = 0):
+        centro = (self.maximo + 1) // 2
+
+        return np.stack([combinar(banda, self.tablas[0], 0, self.maximo),
+                         combinar(banda, self.tablas[1], centro, self.maximo),
+                         combinar(banda, self.tablas[2], centro, self.maximo)],
+                        axis = 2)
+
+def ycbcr_a_rgb(banda, maximo = 255, norma = "601"):
+    """
+    Conversión inversa de YCbCr de rango completo a RGB.
+
+    INPUTS:
+        - banda (tipo np.ndarray): muestras Y, Cb, Cr de forma (n, ancho, 3).
+        - maximo (tipo integer): valor máximo de las muestras.
+        - norma (tipo string): "601" o "709".
+
+    RETURN:
+        - (tipo np.ndarray): muestras R, G, B.
+    """
+    inversa = np.linalg.inv(coeficientes(norma))
+    centro = (maximo + 1) // 2
+    ycc = banda.astype(np.float64) - [0, centro, centro]
+    rgb = np.rint(ycc @ inversa.T)
+
+    return np.clip(rgb, 0, maximo).astype(banda.dtype)
+
+def rgb_a_hsv(banda, maximo = 255):
+    """
+    Conversión de RGB a HSV. Los tres componentes se escalan a [0, maximo]:
+    el tono (de 0 a 360 grados) y la saturación y el valor (de 0 a 1).
+
+    INPUTS:
+        - banda (tipo np.ndarray): muestras R, G, B de forma (n, ancho, 3).
+        - maximo (tipo integer): valor máximo de las muestras.
+
+    RETURN:
+        - (tipo np.ndarray): muestras H, S, V.
+    """
+    if banda.shape[2] != 3:
+        raise ValueError("La conversión a HSV necesita muestras R, G, B")
+
+    rgb = banda.astype(np.float64)
+    r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+    valor = rgb.max(axis = 2)
+    croma = valor - rgb.min(axis = 2)
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        saturacion = np.where(valor > 0, croma / valor, 0)
+
+        # Sector del tono (en sextos de vuelta) según el canal máximo.
+        tono = np.where(valor == r, ((g - b) / croma) % 6,
+                        np.where(valor == g, (b - r) / croma + 2,
+                                 (r - g) / croma + 4))
+
+    tono = np.where(croma > 0, tono / 6, 0)
+    hsv = np.stack([tono * maximo, saturacion * maximo, valor], axis = 2)
+
+    return np.clip(np.rint(hsv), 0, maximo).astype(banda.dtype)
+
+class HSV(Operador):
+    """
+    Conversión de RGB a HSV (ver rgb_a_hsv()).
+    """
+    def configurar(self, ancho, alto, canales, maximo):
+        _solo_color("HSV", canales)
+        self.maximo = maximo
+
+    def aplicar(self, banda, fila = 0):
+        return rgb_a_hsv(banda, self.maximo)
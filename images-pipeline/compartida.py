@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+compartida.py
+
+Imágenes en memoria compartida. Los programas originales guardan cada color en
+un multiprocessing.Array('i'), es decir, 4 bytes por muestra de 8 bits, y lo
+rellenan píxel a píxel. Aquí la imagen entera ocupa un solo bloque de
+multiprocessing.shared_memory con muestras uint8 (o uint16 si el valor máximo
+pasa de 255), en una de dos disposiciones:
+
+    - intercalada: forma (alto, ancho, canales), la misma que en el fichero,
+    así que las imágenes binarias se leen directamente en el bloque.
+    - planar: forma (canales, alto, ancho), cada canal contiguo, como los tres
+    Array de los programas originales.
+
+El proceso padre crea el bloque y los procesos hijos se conectan a él con
+adjuntar(*imagen.descriptor); cada uno trabaja sobre su banda de filas
+(banda()), que es una vista sin copia.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nucleos import dividir
+import pnm
+
+DISPOSICIONES = ("intercalada", "planar")
+
+class ImagenCompartida:
+    """
+    Imagen guardada en un bloque de memoria compartida. Se crea en el proceso
+    padre con crear(), desde_array() o cargar() y los procesos hijos la abren
+    con adjuntar().
+    """
+    def __init__(self, shm, alto, ancho, canales, dtype, disposicion,
+                 propietario):
+        """
+        Inicializa el objeto. No se usa directamente: ver crear(),
+        desde_array(), cargar() y adjuntar().
+
+        INPUTS:
+            - shm (tipo SharedMemory): bloque de memoria compartida.
+            - alto (tipo integer): número de filas.
+            - ancho (tipo integer): número de columnas.
+            - canales (tipo integer): número de canales (3 o 1).
+            - dtype (tipo np.dtype): tipo de las muestras (uint8 o uint16).
+            - disposicion (tipo string): "intercalada" o "planar".
+            - propietario (tipo booleano): True si este objeto creó el bloque
+            (y, por tanto, es el encargado de liberarlo).
+        """
+        if disposicion not in DISPOSICIONES:
+            raise ValueError("Disposición no válida: %s" % disposicion)
+
+        self.shm = shm
+        self.alto = alto
+        self.ancho = ancho
+        self.canales = canales
+        self.dtype = np.dtype(dtype)
+        self.disposicion = disposicion
+        self.propietario = propietario
+
+        if disposicion == "intercalada":
+            forma = (alto, ancho, canales)
+        else:
+            forma = (canales, alto, ancho)
+
+        self._array = np.ndarray(forma, dtype = self.dtype, buffer = shm.buf)
+
+    @property
+    def nombre(self):
+        """
+        Nombre del bloque de memoria compartida.
+        """
+        return self.shm.name
+
+    @property
+    def descriptor(self):
+        """
+        Datos que hay que pasar a los procesos hijos para que se conecten a la
+        imagen con adjuntar(*descriptor).
+        """
+        return (self.nombre, self.alto, self.ancho, self.canales,
+                self.dtype.str, self.disposicion)
+
+    @property
+    def array(self):
+        """
+        Vista de toda la imagen: forma (alto, ancho, canales) si es
+        intercalada o (canales, alto, ancho) si es planar.
+        """
+        return self._array
+
+    @classmethod
+    def crear(cls, alto, ancho, canales = 3, dtype = np.uint8,
+              disposicion = "intercalada"):
+        """
+        Crea el bloque de memoria compartida para una imagen (sin inicializar).
+
+        INPUTS:
+            - alto (tipo integer): número de filas.
+            - ancho (tipo integer): número de columnas.
+            - canales (tipo integer): número de canales (3 o 1).
+            - dtype (tipo np.dtype): tipo de las muestras (uint8 o uint16).
+            - disposicion (tipo string): "intercalada" o "planar".
+
+        RETURN:
+            - (tipo ImagenCompartida): imagen en memoria compartida.
+        """
+        tamano = alto * ancho * canales * np.dtype(dtype).itemsize
+
+        # Un bloque de tamaño 0 no está permitido.
+        shm = shared_memory.SharedMemory(create = True, size = max(tamano, 1))
+
+        return cls(shm, alto, ancho, canales, dtype, disposicion, True)
+
+    @classmethod
+    def desde_array(cls, imagen, disposicion = "intercalada"):
+        """
+        Copia en memoria compartida una imagen de forma (alto, ancho, canales)
+        o (alto, ancho).
+
+        RETURN:
+            - (tipo ImagenCompartida): imagen en memoria compartida.
+        """
+        if imagen.ndim == 2:
+            imagen = imagen[:, :, np.newaxis]
+
+        alto, ancho, canales = imagen.shape
+        compartida = cls.crear(alto, ancho, canales, imagen.dtype, disposicion)
+        compartida.intercalada()[...] = imagen
+
+        return compartida
+
+    @classmethod
+    def cargar(cls, fichero, disposicion = "intercalada"):
+        """
+        Lee una imagen PNM directamente en memoria compartida. En disposición
+        intercalada las muestras se copian del fichero al bloque sin pasar por
+        otro buffer; en planar, las imágenes binarias se proyectan en memoria
+        y se copia cada canal.
+
+        INPUTS:
+            - fichero (tipo string): nombre del fichero PPM o PGM.
+            - disposicion (tipo string): "intercalada" o "planar".
+
+        RETURN:
+            - (tipo ImagenCompartida): imagen en memoria compartida.
+        """
+        cabecera = pnm.leer_cabecera(fichero)
+        compartida = cls.crear(cabecera.alto, cabecera.ancho, cabecera.canales,
+                               pnm.tipo_muestra(cabecera.maximo), disposicion)
+
+        try:
+            if disposicion == "intercalada":
+                pnm.leer_imagen(fichero, compartida.array.reshape(
+                    pnm.forma(cabecera)))
+
+            elif cabecera.binario:
+                mapeada, _ = pnm.abrir_mapeada(fichero)
+                compartida.intercalada()[...] = mapeada.reshape(
+                    compartida.alto, compartida.ancho, compartida.canales)
+                del mapeada
+
+            else:
+                imagen, _ = pnm.leer_imagen(fichero)
+                compartida.intercalada()[...] = imagen.reshape(
+                    compartida.alto, compartida.ancho, compartida.canales)
+
+        except BaseException:
+            compartida.cerrar()
+            raise
+
+        return compartida
+
+    @classmethod
+    def adjuntar(cls, nombre, alto, ancho, canales, dtype, disposicion):
+        """
+        Abre, desde un proceso hijo, una imagen creada por el proceso padre.
+        Los argumentos son los de descriptor.
+
+        RETURN:
+            - (tipo ImagenCompartida): imagen en memoria compartida.
+        """
+        return cls(shared_memory.SharedMemory(name = nombre), alto, ancho,
+                   canales, dtype, disposicion, False)
+
+    def intercalada(self):
+        """
+        Vista de la imagen con forma (alto, ancho, canales), sea cual sea la
+        disposición (en planar no es contigua).
+        """
+        if self.disposicion == "intercalada":
+            return self._array
+
+        return self._array.transpose(1, 2, 0)
+
+    def canal(self, k):
+        """
+        Vista del canal k, de forma (alto, ancho). En planar es contigua.
+        """
+        if self.disposicion == "intercalada":
+            return self._array[:, :, k]
+
+        return self._array[k]
+
+    def banda(self, inicio, fin):
+        """
+        Vista de las filas [inicio, fin) de la imagen, sin copiarlas: forma
+        (n, ancho, canales) si es intercalada o (canales, n, ancho) si es
+        planar.
+        """
+        if self.disposicion == "intercalada":
+            return self._array[inicio:fin]
+
+        return self._array[:, inicio:fin]
+
+    def bandas(self, p):
+        """
+        Divide las filas en p bandas consecutivas (ver nucleos.dividir()).
+
+        RETURN:
+            - (tipo lista): tuplas (inicio, fin) de cada banda.
+        """
+        return dividir(self.alto, p)
+
+    def guardar(self, fichero, maximo = None, binario = True):
+        """
+        Guarda la imagen en formato PNM (ver pnm.guardar_imagen()).
+        """
+        imagen = self.intercalada()
+
+        if self.canales == 1:
+            imagen = imagen[:, :, 0]
+
+        pnm.guardar_imagen(fichero, imagen, maximo, binario)
+
+    def cerrar(self):
+        """
+        Cierra el acceso a la memoria compartida. Si este objeto la creó,
+        además la libera. Antes hay que dejar de usar las vistas obtenidas.
+        """
+        self._array = None
+        self.shm.close()
+
+        if self.propietario:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
@@ -0,0 +1,398 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+filtros.py
+
+Filtros de vecindad para las imágenes: desenfoque gaussiano y de caja
+(convoluciones separables), enfoque (máscara de desenfoque) y mediana.
+
+    - Las convoluciones separables se hacen en dos pasadas vectorizadas, una
+    por filas y otra por columnas: cada pasada suma la ventana desplazada una
+    vez por coeficiente del núcleo, así que el coste es 2 * (2r + 1)
+    operaciones por muestra en lugar de (2r + 1) ** 2.
+    - La mediana usa una vista de ventanas deslizantes
+    (sliding_window_view) y np.partition, que sólo ordena lo necesario para
+    encontrar el valor central de cada ventana.
+    - Los bordes se tratan como en np.pad: reflejar (sin repetir el borde),
+    simétrico (repitiéndolo), replicar el borde, envolver o constante (0).
+
+Igual que EliminarColor, la imagen se divide en bandas de filas y cada banda la
+filtra un proceso (Filtrado). La imagen está en memoria compartida (ver
+compartida.py) y cada proceso lee, además de sus filas, las radio filas de
+halo de encima y de debajo directamente de la imagen de entrada, y escribe sus
+filas en la imagen de salida.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process
+from time import perf_counter
+import argparse
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from compartida import ImagenCompartida
+import pnm
+
+# Modos de np.pad de cada tratamiento del borde.
+BORDES = {
+    "reflejar": "reflect",
+    "simetrico": "symmetric",
+    "replicar": "edge",
+    "envolver": "wrap",
+    "constante": "constant",
+}
+
+# Filas que filtra de una vez cada proceso (limita la memoria temporal).
+FILAS_BLOQUE = 64
+
+# Muestras temporales máximas de un bloque de la mediana (la ventana de cada
+# muestra se copia para ordenarla).
+MUESTRAS_MEDIANA = 1 << 24
+
+def nucleo_gaussiano(sigma, radio = None):
+    """
+    Núcleo gaussiano de una dimensión, normalizado (suma 1).
+
+    INPUTS:
+        - sigma (tipo float): desviación típica, en píxeles.
+        - radio (tipo integer): radio del núcleo (por defecto, 3 * sigma).
+
+    RETURN:
+        - (tipo np.ndarray): 2 * radio + 1 coeficientes.
+    """
+    if radio is None:
+        radio = max(int(np.ceil(3 * sigma)), 1)
+
+    x = np.arange(-radio, radio + 1)
+    nucleo = np.exp(-x ** 2 / (2 * sigma ** 2))
+
+    return nucleo / nucleo.sum()
+
+def nucleo_caja(radio):
+    """
+    Núcleo de caja (media) de una dimensión: 2 * radio + 1 coeficientes
+    iguales.
+    """
+    return np.full(2 * radio + 1, 1 / (2 * radio + 1))
+
+def convolucion_separable(ventana, nucleo):
+    """
+    Convolución de una ventana con el mismo núcleo simétrico por filas y por
+    columnas.
+
+    INPUTS:
+        - ventana (tipo np.ndarray): muestras de forma (n + 2r, m + 2r,
+        canales), con r filas y columnas de margen por cada lado.
+        - nucleo (tipo np.ndarray): 2r + 1 coeficientes.
+
+    RETURN:
+        - (tipo np.ndarray): resultado de forma (n, m, canales), en float32.
+    """
+    diametro = len(nucleo)
+    n = ventana.shape[0] - diametro + 1
+    m = ventana.shape[1] - diametro + 1
+    ventana = ventana.astype(np.float32)
+
+    # Pasada por filas: cada columna de salida suma las 2r + 1 columnas de su
+    # ventana.
+    filas = np.zeros((ventana.shape[0], m, ventana.shape[2]),
+                     dtype = np.float32)
+
+    for k, peso in enumerate(nucleo):
+        filas += np.float32(peso) * ventana[:, k:k + m]
+
+    # Pasada por columnas.
+    resultado = np.zeros((n, m, ventana.shape[2]), dtype = np.float32)
+
+    for k, peso in enumerate(nucleo):
+        resultado += np.float32(peso) * filas[k:k + n]
+
+    return resultado
+
+class Filtro:
+    """
+    Filtro de vecindad. radio es el margen (filas y columnas) que necesita
+    alrededor de cada trozo; las subclases redefinen aplicar().
+    """
+    radio = 0
+
+    def aplicar(self, ventana):
+        """
+        Filtra una ventana con radio filas y columnas de margen.
+
+        INPUT:
+            - ventana (tipo np.ndarray): muestras de forma (n + 2r, m + 2r,
+            canales).
+
+        RETURN:
+            - (tipo np.ndarray): resultado de forma (n, m, canales), en
+            coma flotante o del tipo de la ventana.
+        """
+        raise NotImplementedError
+
+class Gaussiano(Filtro):
+    """
+    Desenfoque gaussiano.
+    """
+    def __init__(self, sigma = 1.0, radio = None):
+        self.nucleo = nucleo_gaussiano(sigma, radio)
+        self.radio = len(self.nucleo) // 2
+
+    def aplicar(self, ventana):
+        return convolucion_separable(ventana, self.nucleo)
+
+class Caja(Filtro):
+    """
+    Desenfoque de caja (media de la ventana de 2r + 1 x 2r + 1).
+    """
+    def __init__(self, radio = 1):
+        self.nucleo = nucleo_caja(radio)
+        self.radio = radio
+
+    def aplicar(self, ventana):
+        return convolucion_separable(ventana, self.nucleo)
+
+class Enfocar(Filtro):
+    """
+    Enfoque por máscara de desenfoque: x + cantidad * (x - gaussiano(x)).
+    """
+    def __init__(self, sigma = 1.0, cantidad = 1.0):
+        self.desenfoque = Gaussiano(sigma)
+        self.radio = self.desenfoque.radio
+        self.cantidad = cantidad
+
+    def aplicar(self, ventana):
+        r = self.radio
+        centro = ventana[r:ventana.shape[0] - r,
+                         r:ventana.shape[1] - r].astype(np.float32)
+
+        return centro + self.cantidad * (centro -
+                                         self.desenfoque.aplicar(ventana))
+
+class Mediana(Filtro):
+    """
+    Mediana de la ventana de 2r + 1 x 2r + 1 de cada muestra (por canal).
+    """
+    def __init__(self, radio = 1):
+        self.radio = radio
+
+    def aplicar(self, ventana):
+        diametro = 2 * self.radio + 1
+        n = ventana.shape[0] - diametro + 1
+        resultado = np.empty((n, ventana.shape[1] - diametro + 1,
+                              ventana.shape[2]), dtype = ventana.dtype)
+
+        # Las ventanas se copian al ordenarlas: se procesan por grupos de
+        # filas para no pasar de MUESTRAS_MEDIANA.
+        filas = max(MUESTRAS_MEDIANA // (resultado[0].size *
+                                         diametro ** 2), 1)
+        centro = diametro ** 2 // 2
+
+        for i in range(0, n, filas):
+            trozo = ventana[i:i + filas + diametro - 1]
+            vecinos = sliding_window_view(trozo, (diametro, diametro),
+                                          axis = (0, 1))
+            vecinos = vecinos.reshape(vecinos.shape[:3] + (-1,))
+            resultado[i:i + filas] = np.partition(vecinos, centro,
+                                                  axis = -1)[..., centro]
+
+        return resultado
+
+def indices_borde(n, inicio, fin, radio, borde):
+    """
+    Índices de las posiciones [inicio - radio, fin + radio) de un eje de n
+    posiciones, resolviendo las que caen fuera según el tratamiento del
+    borde. En el borde constante, las de fuera valen -1.
+
+    RETURN:
+        - (tipo np.ndarray): índices de las posiciones.
+    """
+    if borde == "constante":
+        indices = np.arange(inicio - radio, fin + radio)
+        indices[(indices < 0) | (indices >= n)] = -1
+
+        return indices
+
+    return np.pad(np.arange(n), radio, mode = BORDES[borde])[
+        inicio:fin + 2 * radio]
+
+def ventana(imagen, inicio, fin, radio, borde):
+    """
+    Copia las filas [inicio, fin) de la imagen con radio filas y columnas de
+    margen: el halo de las filas vecinas y, en los bordes de la imagen, el
+    margen según el tratamiento del borde.
+
+    INPUTS:
+        - imagen (tipo np.ndarray): muestras de forma (alto, ancho, canales).
+        - inicio (tipo integer): primera fila.
+        - fin (tipo integer): fila siguiente a la última.
+        - radio (tipo integer): margen.
+        - borde (tipo string): tratamiento del borde (ver BORDES).
+
+    RETURN:
+        - (tipo np.ndarray): ventana de forma (n + 2r, ancho + 2r, canales).
+    """
+    alto, ancho = imagen.shape[:2]
+    filas = indices_borde(alto, inicio, fin, radio, borde)
+    columnas = indices_borde(ancho, 0, ancho, radio, borde)
+    resultado = imagen[np.maximum(filas, 0)][:, np.maximum(columnas, 0)]
+
+    if borde == "constante":
+        resultado[filas < 0] = 0
+        resultado[:, columnas < 0] = 0
+
+    return resultado
+
+def filtrar_banda(entrada, salida, inicio, fin, filtro, borde, maximo):
+    """
+    Filtra las filas [inicio, fin) de la imagen de entrada y las escribe en
+    la de salida, por bloques de FILAS_BLOQUE filas.
+
+    INPUTS:
+        - entrada (tipo np.ndarray): imagen de forma (alto, ancho, canales).
+        - salida (tipo np.ndarray): imagen resultado, de la misma forma.
+        - inicio (tipo integer): primera fila de la banda.
+        - fin (tipo integer): fila siguiente a la última.
+        - filtro (tipo Filtro): filtro que se aplica.
+        - borde (tipo string): tratamiento del borde (ver BORDES).
+        - maximo (tipo integer): valor máximo de las muestras.
+    """
+    for i in range(inicio, fin, FILAS_BLOQUE):
+        j = min(i + FILAS_BLOQUE, fin)
+        resultado = filtro.aplicar(ventana(entrada, i, j, filtro.radio,
+                                           borde))
+
+        if resultado.dtype.kind == "f":
+            resultado = np.clip(np.rint(resultado), 0, maximo)
+
+        salida[i:j] = resultado
+
+class Filtrado(Process):
+    """
+    Clase que hereda del objeto Process (módulo multiprocessing).
+    """
+    def __init__(self, entrada, salida, inicio, final, filtro, borde,
+                 maximo):
+        """
+        Inicializa el objeto.
+
+        INPUTS:
+            - entrada (tipo tupla): descriptor de la imagen de entrada (ver
+            ImagenCompartida.descriptor).
+            - salida (tipo tupla): descriptor de la imagen de salida.
+            - inicio (tipo integer): primera fila de la banda.
+            - final (tipo integer): fila siguiente a la última.
+            - filtro (tipo Filtro): filtro que se aplica.
+            - borde (tipo string): tratamiento del borde (ver BORDES).
+            - maximo (tipo integer): valor máximo de las muestras.
+        """
+        Process.__init__(self) # Hereda atributos de Process.
+        self.entrada = entrada
+        self.salida = salida
+        self.inicio = inicio
+        self.final = final
+        self.filtro = filtro
+        self.borde = borde
+        self.maximo = maximo
+
+    def run(self):
+        """
+        Para lanzar el proceso. Se conecta a las dos imágenes compartidas y
+        filtra su banda.
+        """
+        entrada = ImagenCompartida.adjuntar(*self.entrada)
+        salida = ImagenCompartida.adjuntar(*self.salida)
+
+        try:
+            filtrar_banda(entrada.intercalada(), salida.intercalada(),
+                          self.inicio, self.final, self.filtro, self.borde,
+                          self.maximo)
+        finally:
+            entrada.cerrar()
+            salida.cerrar()
+
+def filtrar(entrada, salida, filtro, procesos = 1, borde = "reflejar",
+            binario = True):
+    """
+    Filtra una imagen PPM/PGM repartiendo sus bandas de filas entre procesos.
+
+    INPUTS:
+        - entrada (tipo string): fichero PPM o PGM.
+        - salida (tipo string): fichero de salida.
+        - filtro (tipo Filtro): filtro que se aplica.
+        - procesos (tipo integer): número de procesos.
+        - borde (tipo string): tratamiento del borde (ver BORDES).
+        - binario (tipo booleano): salida P6/P5 si es True, P3/P2 si es False.
+    """
+    if borde not in BORDES:
+        raise ValueError("Borde desconocido: %s" % borde)
+
+    cabecera = pnm.leer_cabecera(entrada)
+
+    with ImagenCompartida.cargar(entrada) as imagen, \
+         ImagenCompartida.crear(imagen.alto, imagen.ancho, imagen.canales,
+                                imagen.dtype) as resultado:
+        lista_procesos = [Filtrado(imagen.descriptor, resultado.descriptor,
+                                   inicio, final, filtro, borde,
+                                   cabecera.maximo)
+                          for inicio, final in imagen.bandas(procesos)]
+
+        for proceso in lista_procesos:
+            proceso.start()
+
+        # Comprobamos que los procesos han acabado.
+        for proceso in lista_procesos:
+            proceso.join()
+
+        if any(proceso.exitcode != 0 for proceso in lista_procesos):
+            raise RuntimeError("Ha fallado algún proceso de filtrado")
+
+        resultado.guardar(salida, cabecera.maximo, binario)
+
+FILTROS = {
+    "gaussiano": lambda args: Gaussiano(args.sigma),
+    "caja": lambda args: Caja(args.radio),
+    "enfocar": lambda args: Enfocar(args.sigma, args.cantidad),
+    "mediana": lambda args: Mediana(args.radio),
+}
+
+def main(argv = None):
+    """
+    Función principal.
+    """
+    parser = argparse.ArgumentParser(
+        description = "Filtros de vecindad para imágenes PPM/PGM.")
+
+    parser.add_argument("entrada", help = "fichero PPM/PGM de entrada")
+    parser.add_argument("salida", help = "fichero PPM/PGM de salida")
+    parser.add_argument("-f", "--filtro", choices = FILTROS,
+                        default = "gaussiano", help = "filtro que se aplica")
+    parser.add_argument("--sigma", type = float, default = 1.0,
+                        help = "desviación típica del gaussiano")
+    parser.add_argument("-r", "--radio", type = int, default = 1,
+                        help = "radio de la caja y de la mediana")
+    parser.add_argument("--cantidad", type = float, default = 1.0,
+                        help = "intensidad del enfoque")
+    parser.add_argument("-b", "--borde", choices = BORDES,
+                        default = "reflejar", help = "tratamiento del borde")
+    parser.add_argument("-p", "--procesos", type = int, default = 1,
+                        help = "número de procesos")
+    parser.add_argument("--ascii", action = "store_true",
+                        help = "escribir P3/P2 en lugar de P6/P5")
+
+    args = parser.parse_args(argv)
+
+    inicio = perf_counter()
+    filtrar(args.entrada, args.salida, FILTROS[args.filtro](args),
+            args.procesos, args.borde, not args.ascii)
+
+    print("El filtrado ha tardado %5.4f segundos." % (perf_counter() - inicio),
+          file = sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+histograma.py
+
+Ecualización por histograma para la tubería de bandas (ver tuberia.py). El
+ecualizador original sólo estira linealmente cada color entre su mínimo y su
+máximo, y si hay unos pocos píxeles muy claros u oscuros apenas mejora el
+contraste. Aquí hay dos operadores:
+
+    - EcualizarHistograma: ecualización clásica. La tabla de cada canal es la
+    función de distribución acumulada (CDF) de su histograma, reescalada al
+    rango de salida.
+    - CLAHE: ecualización adaptativa con contraste limitado. La imagen se
+    divide en una rejilla de teselas, cada una con su propia tabla calculada
+    sobre un histograma recortado (el exceso se reparte entre todos los
+    valores, lo que limita la amplificación del ruido), y cada píxel se
+    obtiene interpolando bilinealmente las tablas de las cuatro teselas más
+    cercanas.
+
+Los histogramas se calculan en la pasada previa de la tubería: cada banda (en
+el proceso del pool que la recibe) cuenta sus valores con np.bincount y los
+histogramas parciales se van sumando. La ecualización se aplica con tablas de
+una entrada por valor posible (256 para imágenes de 8 bits) por canal.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+import numpy as np
+
+from tuberia import FILAS_BANDA, Operador, Tuberia
+import pnm
+
+# Teselas de la rejilla de CLAHE (filas, columnas) y límite de recorte, en
+# múltiplos de la altura media del histograma.
+TESELAS = (8, 8)
+LIMITE = 2.0
+
+def histograma(banda, niveles):
+    """
+    Histograma de cada canal de una banda.
+
+    INPUTS:
+        - banda (tipo np.ndarray): muestras, de forma (n, ancho, canales).
+        - niveles (tipo integer): número de valores posibles (maximo + 1).
+
+    RETURN:
+        - (tipo np.ndarray): array de forma (canales, niveles).
+    """
+    return np.stack([np.bincount(banda[:, :, k].ravel(), minlength = niveles)
+                     for k in range(banda.shape[2])])
+
+def tabla_cdf(histogramas, maximo):
+    """
+    Tabla de ecualización de cada canal a partir de su histograma:
+
+        tabla[v] = round((cdf[v] - cdf_min) / (total - cdf_min) * maximo)
+
+    donde cdf_min es la CDF del primer valor presente. Un canal constante se
+    deja a 0, igual que en Normalizar.
+
+    INPUTS:
+        - histogramas (tipo np.ndarray): histogramas, de forma (..., niveles).
+        - maximo (tipo integer): valor máximo de la salida.
+
+    RETURN:
+        - (tipo np.ndarray): tablas, de la misma forma que los histogramas.
+    """
+    cdf = np.cumsum(histogramas, axis = -1, dtype = np.float64)
+    total = cdf[..., -1:]
+
+    # El primer valor no nulo de la CDF de cada canal.
+    cdf_min = np.take_along_axis(cdf, np.argmax(cdf > 0, axis = -1)[..., None],
+                                 axis = -1)
+    rango = total - cdf_min
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        tabla = np.rint((cdf - cdf_min) / rango * maximo)
+
+    tabla[np.broadcast_to(rango == 0, tabla.shape)] = 0
+
+    return np.clip(tabla, 0, maximo).astype(pnm.tipo_muestra(maximo))
+
+class EcualizarHistograma(Operador):
+    """
+    Ecualización por histograma de cada canal a [0, maximo].
+    """
+    global_ = True
+
+    def __init__(self, maximo = 255):
+        self.maximo = maximo
+        self.niveles = None
+        self.tablas = None
+
+    def configurar(self, ancho, alto, canales, maximo):
+        self.niveles = maximo + 1
+
+    def salida(self, canales, maximo):
+        return canales, self.maximo
+
+    def estadisticos(self, banda, fila = 0):
+        return histograma(banda, self.niveles)
+
+    def preparar(self, parciales):
+        total = None
+
+        for parcial in parciales:
+            total = parcial if total is None else total + parcial
+
+        self.tablas = tabla_cdf(total, self.maximo)
+
+    def aplicar(self, banda, fila = 0):
+        canales = np.arange(banda.shape[2])
+
+        return self.tablas[canales, banda]
+
+def recortar(histogramas, limite):
+    """
+    Recorta cada histograma a limite veces su altura media y reparte el exceso
+    a partes iguales entre todos los valores.
+
+    INPUTS:
+        - histogramas (tipo np.ndarray): histogramas, de forma (..., niveles).
+        - limite (tipo float): límite de recorte (1 equivale a un histograma
+        plano; cuanto mayor, menos se limita el contraste).
+
+    RETURN:
+        - (tipo np.ndarray): histogramas recortados (en coma flotante).
+    """
+    histogramas = histogramas.astype(np.float64)
+    niveles = histogramas.shape[-1]
+    tope = np.maximum(limite * histogramas.sum(axis = -1, keepdims = True) /
+                      niveles, 1)
+    exceso = np.maximum(histogramas - tope, 0).sum(axis = -1, keepdims = True)
+
+    return np.minimum(histogramas, tope) + exceso / niveles
+
+def _interpolacion(posiciones, tam, teselas):
+    """
+    Para cada posición (fila o columna), las dos teselas cuyos centros la
+    rodean y el peso de la segunda.
+
+    RETURN:
+        - (tipo tupla): arrays (primera, segunda, peso).
+    """
+    centro = (posiciones + 0.5) / tam - 0.5
+    primera = np.floor(centro).astype(np.intp)
+    peso = centro - primera
+    segunda = np.clip(primera + 1, 0, teselas - 1)
+    primera = np.clip(primera, 0, teselas - 1)
+
+    return primera, segunda, peso
+
+class CLAHE(Operador):
+    """
+    Ecualización adaptativa por histograma con contraste limitado (CLAHE).
+    """
+    global_ = True
+    por_pixel = False
+
+    def __init__(self, teselas = TESELAS, limite = LIMITE, maximo = 255):
+        """
+        Inicializa el operador.
+
+        INPUTS:
+            - teselas (tipo tupla): filas y columnas de la rejilla.
+            - limite (tipo float): límite de recorte de los histogramas (ver
+            recortar()).
+            - maximo (tipo integer): valor máximo de la salida.
+        """
+        self.teselas = teselas
+        self.limite = limite
+        self.maximo = maximo
+        self.tablas = None
+
+    def configurar(self, ancho, alto, canales, maximo):
+        filas, columnas = self.teselas
+        self.ancho = ancho
+        self.canales = canales
+        self.niveles = maximo + 1
+
+        # Al redondear el tamaño de las teselas hacia arriba puede sobrar
+        # alguna: la rejilla se ajusta para que ninguna quede vacía.
+        alto_tesela = -(-max(alto, 1) // filas)
+        ancho_tesela = -(-max(ancho, 1) // columnas)
+        self.tam = (alto_tesela, ancho_tesela)
+        self.rejilla = (-(-max(alto, 1) // alto_tesela),
+                        -(-max(ancho, 1) // ancho_tesela))
+
+    def salida(self, canales, maximo):
+        return canales, self.maximo
+
+    def estadisticos(self, banda, fila = 0):
+        """
+        Histogramas de las teselas que toca la banda.
+
+        RETURNS:
+            - primera (tipo integer): primera fila de teselas que toca.
+            - (tipo np.ndarray): histogramas, de forma (filas de teselas,
+            columnas de teselas, canales, niveles).
+        """
+        alto_tesela, ancho_tesela = self.tam
+        columnas = self.rejilla[1]
+        filas_teselas = (fila + np.arange(len(banda))) // alto_tesela
+        primera = int(filas_teselas[0])
+        tocadas = int(filas_teselas[-1]) - primera + 1
+
+        # Cada muestra se cuenta en la casilla (tesela, canal, valor).
+        tesela = ((filas_teselas - primera)[:, None] * columnas +
+                  np.arange(self.ancho)[None, :] // ancho_tesela)
+        indice = (tesela[:, :, None] * self.canales +
+                  np.arange(self.canales)) * self.niveles + banda
+
+        histogramas = np.bincount(indice.ravel(), minlength = (
+            tocadas * columnas * self.canales * self.niveles))
+
+        return primera, histogramas.reshape(tocadas, columnas, self.canales,
+                                            self.niveles)
+
+    def preparar(self, parciales):
+        filas, columnas = self.rejilla
+        total = np.zeros((filas, columnas, self.canales, self.niveles),
+                         dtype = np.int64)
+
+        for primera, histogramas in parciales:
+            total[primera:primera + len(histogramas)] += histogramas
+
+        cdf = np.cumsum(recortar(total, self.limite), axis = -1)
+        tablas = np.rint(cdf / cdf[..., -1:] * self.maximo)
+
+        # (canales, filas, columnas, niveles), para indexar por canal.
+        self.tablas = np.clip(tablas, 0, self.maximo).astype(
+            np.float32).transpose(2, 0, 1, 3)
+
+    def aplicar(self, banda, fila = 0):
+        filas, columnas = self.rejilla
+        alto_tesela, ancho_tesela = self.tam
+
+        f0, f1, pf = _interpolacion(fila + np.arange(len(banda)), alto_tesela,
+                                    filas)
+        c0, c1, pc = _interpolacion(np.arange(self.ancho), ancho_tesela,
+                                    columnas)
+
+        f0, f1, pf = f0[:, None, None], f1[:, None, None], pf[:, None, None]
+        c0, c1, pc = c0[None, :, None], c1[None, :, None], pc[None, :, None]
+        k = np.arange(banda.shape[2])[None, None, :]
+        t = self.tablas
+
+        arriba = (1 - pc) * t[k, f0, c0, banda] + pc * t[k, f0, c1, banda]
+        abajo = (1 - pc) * t[k, f1, c0, banda] + pc * t[k, f1, c1, banda]
+
+        return np.rint((1 - pf) * arriba + pf * abajo).astype(
+            pnm.tipo_muestra(self.maximo))
+
+def ecualizar(entrada, salida, filas = FILAS_BANDA, procesos = 1,
+              binario = True):
+    """
+    Ecualización por histograma de cada color.
+    """
+    return Tuberia([EcualizarHistograma()], filas, procesos).ejecutar(
+        entrada, salida, binario)
+
+def clahe(entrada, salida, teselas = TESELAS, limite = LIMITE,
+          filas = FILAS_BANDA, procesos = 1, binario = True):
+    """
+    Ecualización adaptativa con contraste limitado de cada color.
+    """
+    return Tuberia([CLAHE(teselas, limite)], filas, procesos).ejecutar(
+        entrada, salida, binario)
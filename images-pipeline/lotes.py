@@ -0,0 +1,490 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+lotes.py
+
+Procesado por lotes de imágenes PPM/PGM. color_procesos y ecualizador tratan
+un fichero por ejecución (preguntando el nombre) y crean sus procesos cada vez.
+Aquí se procesan todas las imágenes de un directorio, de un patrón glob o de
+un manifiesto (un fichero con una ruta por línea) con un único pool de
+procesos, que dura todo el lote:
+
+    - Las imágenes pequeñas se reparten enteras entre los procesos del pool,
+    cada una procesada por bandas (ver tuberia.py) dentro de un proceso.
+    - Las imágenes grandes (de al menos UMBRAL_BANDAS píxeles) se procesan
+    repartiendo sus bandas entre los procesos del mismo pool, para no dejar al
+    resto esperando a una sola imagen.
+
+El número de procesos se limita por los núcleos y por la memoria disponible
+(cada proceso tiene en memoria unas pocas bandas de la imagen más ancha). Las
+salidas que ya están al día se omiten, comparando la fecha de modificación de
+la entrada y de la salida o, si se pide, un resumen SHA-256 de la entrada
+guardado en el directorio de salida. Con --vigilar el lote se repite
+periódicamente y sólo se procesan las imágenes nuevas o modificadas.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from collections import namedtuple
+from functools import partial
+from multiprocessing import Pool
+from time import perf_counter, sleep
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from color import HSV, Luma, YCbCr
+from histograma import CLAHE, EcualizarHistograma
+from piramide import Piramide, nombre_nivel
+from tuberia import FILAS_BANDA, Gris, Normalizar, Tuberia
+import pnm
+
+# Operaciones disponibles; se pueden encadenar separadas por comas
+# ("gris,clahe").
+OPERACIONES = {
+    "gris": Gris,
+    "ecualizar": Normalizar,
+    "histograma": EcualizarHistograma,
+    "clahe": CLAHE,
+    "luma": Luma,
+    "luma709": partial(Luma, "709"),
+    "ycbcr": YCbCr,
+    "hsv": HSV,
+}
+
+EXTENSIONES = (".ppm", ".pgm", ".pnm")
+
+# Imágenes a partir de las cuales se reparten las bandas entre los procesos.
+UMBRAL_BANDAS = 16 * 10 ** 6
+
+# Fichero del directorio de salida con los resúmenes de las entradas.
+FICHERO_ESTADO = ".lotes.json"
+
+# Memoria que ocupa un proceso por cada byte de una banda (la banda leída,
+# los intermedios en coma flotante y la banda resultante).
+FACTOR_MEMORIA = 16
+
+# Resultado de una imagen: ficheros, número de píxeles, segundos que ha
+# tardado y cómo se ha procesado ("imagen", "bandas", "omitida" o "error").
+Resultado = namedtuple("Resultado", "entrada salida pixeles segundos modo")
+
+def operadores(operacion):
+    """
+    Crea la cadena de operadores de una operación.
+
+    INPUT:
+        - operacion (tipo string): nombres de OPERACIONES separados por comas.
+
+    RETURN:
+        - (tipo lista): Operador que se aplican, en orden.
+    """
+    nombres = operacion.split(",")
+
+    for nombre in nombres:
+        if nombre not in OPERACIONES:
+            raise ValueError("Operación desconocida: %s" % nombre)
+
+    return [OPERACIONES[nombre]() for nombre in nombres]
+
+def buscar_entradas(fuente):
+    """
+    Lista las imágenes de un lote.
+
+    INPUT:
+        - fuente (tipo string): un directorio (se toman sus ficheros .ppm,
+        .pgm y .pnm), un patrón glob o un manifiesto (fichero de texto con una
+        ruta por línea; las vacías y las que empiezan por # se ignoran).
+
+    RETURN:
+        - (tipo lista): rutas de las imágenes, sin repetir y en orden.
+    """
+    if os.path.isdir(fuente):
+        entradas = [os.path.join(fuente, nombre)
+                    for nombre in sorted(os.listdir(fuente))
+                    if nombre.lower().endswith(EXTENSIONES)]
+
+    elif os.path.isfile(fuente) and not fuente.lower().endswith(EXTENSIONES):
+        base = os.path.dirname(fuente)
+        entradas = []
+
+        with open(fuente) as f:
+            for linea in f:
+                linea = linea.strip()
+
+                if linea and not linea.startswith("#"):
+                    entradas.append(os.path.join(base, linea))
+
+    else:
+        entradas = sorted(glob.glob(fuente))
+
+    return list(dict.fromkeys(entradas))
+
+def nombre_salida(entrada, directorio, operacion, canales):
+    """
+    Nombre del fichero de salida: el de la entrada con la operación añadida
+    (como _gray y _ecual en los programas originales) y la extensión según
+    los canales que resultan.
+    """
+    base = os.path.splitext(os.path.basename(entrada))[0]
+    extension = ".pgm" if canales == 1 else ".ppm"
+
+    return os.path.join(directorio, "%s_%s%s" % (base,
+                                                 operacion.replace(",", "_"),
+                                                 extension))
+
+def resumen(fichero):
+    """
+    Resumen SHA-256 de un fichero, leído por trozos.
+    """
+    sha = hashlib.sha256()
+
+    with open(fichero, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            sha.update(trozo)
+
+    return sha.hexdigest()
+
+class Estado:
+    """
+    Registro, en el directorio de salida, de qué entrada (por su resumen) y
+    con qué operación se ha generado cada salida.
+    """
+    def __init__(self, directorio):
+        self.fichero = os.path.join(directorio, FICHERO_ESTADO)
+
+        try:
+            with open(self.fichero) as f:
+                self.salidas = json.load(f)
+
+        except (OSError, ValueError):
+            self.salidas = {}
+
+    def al_dia(self, entrada, salida, operacion, por_resumen, niveles = 0):
+        """
+        Indica si la salida (y los niveles de su pirámide) ya está generada
+        a partir de la entrada actual.
+
+        INPUTS:
+            - entrada (tipo string): imagen de entrada.
+            - salida (tipo string): imagen de salida.
+            - operacion (tipo string): operación que se aplica.
+            - por_resumen (tipo booleano): si es True se compara el resumen
+            de la entrada; si no, la fecha de modificación.
+            - niveles (tipo integer): niveles de la pirámide que deben
+            acompañar a la salida.
+        """
+        ficheros = [salida] + [nombre_nivel(salida, nivel)
+                               for nivel in range(1, niveles + 1)]
+
+        if not all(os.path.exists(fichero) for fichero in ficheros):
+            return False
+
+        if not por_resumen:
+            fecha = os.path.getmtime(entrada)
+
+            return all(os.path.getmtime(fichero) >= fecha
+                       for fichero in ficheros)
+
+        anterior = self.salidas.get(os.path.basename(salida))
+
+        return anterior == [resumen(entrada), operacion, niveles]
+
+    def registrar(self, entrada, salida, operacion, niveles = 0):
+        self.salidas[os.path.basename(salida)] = [resumen(entrada), operacion,
+                                                  niveles]
+
+    def guardar(self):
+        with open(self.fichero, "w") as f:
+            json.dump(self.salidas, f, indent = 4, sort_keys = True)
+
+def memoria_disponible():
+    """
+    Memoria física disponible en bytes (o la total si no se puede saber).
+    """
+    try:
+        paginas = os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        paginas = os.sysconf("SC_PHYS_PAGES")
+
+    return paginas * os.sysconf("SC_PAGE_SIZE")
+
+def numero_procesos(cabeceras, filas = FILAS_BANDA, memoria = None,
+                    maximo = None):
+    """
+    Número de procesos del pool: uno por núcleo, sin pasar de la memoria
+    disponible.
+
+    INPUTS:
+        - cabeceras (tipo lista): Cabecera de las imágenes del lote.
+        - filas (tipo integer): filas de cada banda.
+        - memoria (tipo integer): bytes que puede usar el lote (por defecto,
+        la mitad de la memoria disponible).
+        - maximo (tipo integer): número máximo de procesos (por defecto, el
+        número de núcleos).
+
+    RETURN:
+        - (tipo integer): número de procesos (al menos 1).
+    """
+    if maximo is None:
+        maximo = os.cpu_count() or 1
+
+    if memoria is None:
+        memoria = memoria_disponible() // 2
+
+    banda = max([filas * c.ancho * c.canales *
+                 np.dtype(pnm.tipo_muestra(c.maximo)).itemsize
+                 for c in cabeceras] or [1])
+
+    return max(1, min(maximo, memoria // (banda * FACTOR_MEMORIA)))
+
+def _procesar_imagen(tarea):
+    """
+    Procesa una imagen entera en un proceso del pool.
+
+    INPUT:
+        - tarea (tipo tupla): entrada, salida, operación, filas de cada
+        banda, si la salida es binaria y niveles de la pirámide.
+
+    RETURN:
+        - (tipo tupla): (salida, segundos).
+    """
+    entrada, salida, operacion, filas, binario, niveles = tarea
+
+    inicio = perf_counter()
+    Tuberia(operadores(operacion), filas).ejecutar(
+        entrada, salida, binario, sumideros(salida, niveles, binario))
+
+    return salida, perf_counter() - inicio
+
+def sumideros(salida, niveles, binario):
+    """
+    Sumideros de la tubería de una imagen: la pirámide de sus niveles, si se
+    pide alguno (ver piramide.Piramide).
+    """
+    if niveles <= 0:
+        return []
+
+    return [Piramide(salida, niveles, 2, binario)]
+
+def fallo(entrada, salida, error):
+    """
+    Informa del error de una imagen y borra su salida a medio escribir (si
+    no, parecería al día en el siguiente lote) y los niveles de su pirámide.
+    """
+    print("%s: %s" % (entrada, error), file = sys.stderr)
+    base, extension = os.path.splitext(salida)
+
+    for fichero in [salida] + glob.glob(glob.escape(base) + "_n*" + extension):
+        if os.path.exists(fichero):
+            os.remove(fichero)
+
+def procesar_lote(entradas, directorio, operacion, pool, filas = FILAS_BANDA,
+                  binario = True, por_resumen = False,
+                  umbral = UMBRAL_BANDAS, mostrar = None, niveles = 0):
+    """
+    Procesa un lote de imágenes con el pool indicado.
+
+    INPUTS:
+        - entradas (tipo lista): rutas de las imágenes.
+        - directorio (tipo string): directorio de salida.
+        - operacion (tipo string): operación que se aplica (ver operadores()).
+        - pool (tipo Pool): pool de procesos.
+        - filas (tipo integer): filas de cada banda.
+        - binario (tipo booleano): salida P6/P5 si es True, P3/P2 si es False.
+        - por_resumen (tipo booleano): decidir si una salida está al día por
+        el resumen de la entrada en lugar de por la fecha.
+        - umbral (tipo integer): píxeles a partir de los cuales una imagen se
+        reparte por bandas.
+        - mostrar (tipo función): si se indica, se llama con cada Resultado
+        según se termina.
+        - niveles (tipo integer): niveles de la pirámide (de factor 2) que
+        se generan junto a cada salida, en la misma pasada.
+
+    RETURN:
+        - (tipo lista): Resultado de cada imagen, en el orden de entrada.
+    """
+    os.makedirs(directorio, exist_ok = True)
+    estado = Estado(directorio)
+    resultados = {}
+    pequenas = []
+    grandes = []
+
+    # Sólo se registran las salidas que se acaban de generar: las omitidas ya
+    # lo están y las que han fallado no deben parecer al día.
+    def terminar(resultado):
+        resultados[resultado.entrada] = resultado
+
+        if por_resumen and resultado.modo in ("imagen", "bandas"):
+            estado.registrar(resultado.entrada, resultado.salida, operacion,
+                             niveles)
+
+        if mostrar is not None:
+            mostrar(resultado)
+
+    # Una imagen que falla (por ejemplo, por estar mal formada o por no
+    # admitir la operación) no detiene el lote: se anota como error y se sigue
+    # con las demás. Todavía no se ha escrito nada, así que no hay que borrar.
+    for entrada in entradas:
+        try:
+            cabecera = pnm.leer_cabecera(entrada)
+            canales, _ = Tuberia(operadores(operacion)).configurar(cabecera)
+        except Exception as e:
+            print("%s: %s" % (entrada, e), file = sys.stderr)
+            terminar(Resultado(entrada, None, 0, 0.0, "error"))
+            continue
+
+        salida = nombre_salida(entrada, directorio, operacion, canales)
+        pixeles = cabecera.ancho * cabecera.alto
+
+        if estado.al_dia(entrada, salida, operacion, por_resumen, niveles):
+            terminar(Resultado(entrada, salida, pixeles, 0.0, "omitida"))
+        elif pixeles >= umbral:
+            grandes.append((entrada, salida, pixeles))
+        else:
+            pequenas.append((entrada, salida, pixeles))
+
+    # Las imágenes pequeñas se encolan primero, de mayor a menor, para que
+    # los procesos tengan trabajo mientras el padre reparte las bandas de
+    # las grandes.
+    pequenas.sort(key = lambda imagen: imagen[2], reverse = True)
+    pendientes = [(imagen, pool.apply_async(
+        _procesar_imagen, ((imagen[0], imagen[1], operacion, filas,
+                            binario, niveles),))) for imagen in pequenas]
+
+    # Igual con los fallos durante el procesado, que además borran la salida
+    # a medio escribir.
+    for entrada, salida, pixeles in grandes:
+        inicio = perf_counter()
+        modo = "bandas"
+
+        try:
+            Tuberia(operadores(operacion), filas, pool = pool).ejecutar(
+                entrada, salida, binario,
+                sumideros(salida, niveles, binario))
+        except Exception as e:
+            fallo(entrada, salida, e)
+            modo = "error"
+
+        terminar(Resultado(entrada, salida, pixeles, perf_counter() - inicio,
+                           modo))
+
+    for (entrada, salida, pixeles), pendiente in pendientes:
+        try:
+            _, segundos = pendiente.get()
+            modo = "imagen"
+        except Exception as e:
+            fallo(entrada, salida, e)
+            segundos, modo = 0.0, "error"
+
+        terminar(Resultado(entrada, salida, pixeles, segundos, modo))
+
+    if por_resumen:
+        estado.guardar()
+
+    return [resultados[entrada] for entrada in entradas]
+
+def mostrar_resultado(resultado):
+    """
+    Muestra el tiempo de una imagen.
+    """
+    if resultado.modo == "omitida":
+        print("%-40s al día" % resultado.entrada)
+
+    elif resultado.modo == "error":
+        print("%-40s error" % resultado.entrada)
+
+    else:
+        print("%-40s %10.4f s  %8.2f Mpx/s  (%s)" % (
+            resultado.entrada, resultado.segundos,
+            resultado.pixeles / max(resultado.segundos, 1e-9) / 1e6,
+            resultado.modo))
+
+def main(argv = None):
+    """
+    Función principal.
+    """
+    parser = argparse.ArgumentParser(
+        description = "Procesado por lotes de imágenes PPM/PGM.")
+
+    parser.add_argument("fuente",
+                        help = "directorio, patrón glob o manifiesto")
+    parser.add_argument("-o", "--salida", required = True,
+                        help = "directorio de salida")
+    parser.add_argument("--operacion", default = "gris",
+                        help = "operaciones separadas por comas (%s)" %
+                        ", ".join(OPERACIONES))
+    parser.add_argument("-p", "--procesos", type = int,
+                        help = "número máximo de procesos (por defecto, uno "
+                        "por núcleo)")
+    parser.add_argument("--memoria", type = int,
+                        help = "memoria máxima del lote, en MB")
+    parser.add_argument("--filas", type = int, default = FILAS_BANDA,
+                        help = "filas de cada banda")
+    parser.add_argument("--ascii", action = "store_true",
+                        help = "escribir P3/P2 en lugar de P6/P5")
+    parser.add_argument("--resumen", action = "store_true",
+                        help = "decidir qué salidas están al día por el "
+                        "resumen SHA-256 de la entrada, no por la fecha")
+    parser.add_argument("--umbral", type = int, default = UMBRAL_BANDAS,
+                        help = "píxeles a partir de los cuales una imagen se "
+                        "reparte por bandas")
+    parser.add_argument("--piramide", type = int, default = 0,
+                        metavar = "NIVELES",
+                        help = "generar también NIVELES niveles de pirámide "
+                        "(cada uno la mitad del anterior) de cada salida")
+    parser.add_argument("--vigilar", type = float, metavar = "SEGUNDOS",
+                        help = "repetir el lote cada SEGUNDOS segundos")
+
+    args = parser.parse_args(argv)
+
+    try:
+        operadores(args.operacion)
+    except ValueError as e:
+        parser.error(str(e))
+
+    entradas = buscar_entradas(args.fuente)
+    memoria = args.memoria * 2 ** 20 if args.memoria else None
+    cabeceras = []
+
+    # Las imágenes que no se pueden leer se anotan como error en el lote.
+    for entrada in entradas:
+        try:
+            cabeceras.append(pnm.leer_cabecera(entrada))
+        except (OSError, ValueError):
+            pass
+
+    procesos = numero_procesos(cabeceras, args.filas, memoria, args.procesos)
+
+    print("Procesos: %d" % procesos, file = sys.stderr)
+
+    with Pool(procesos) as pool:
+        while True:
+            inicio = perf_counter()
+            resultados = procesar_lote(entradas, args.salida, args.operacion,
+                                       pool, args.filas, not args.ascii,
+                                       args.resumen, args.umbral,
+                                       mostrar_resultado, args.piramide)
+            modos = [r.modo for r in resultados]
+            omitidas = modos.count("omitida")
+            errores = modos.count("error")
+
+            print("Imágenes: %d procesadas, %d al día, %d con errores. El "
+                  "lote ha tardado %5.4f segundos." % (
+                      len(modos) - omitidas - errores, omitidas, errores,
+                      perf_counter() - inicio), file = sys.stderr)
+
+            if args.vigilar is None:
+                break
+
+            sleep(args.vigilar)
+            entradas = buscar_entradas(args.fuente)
+
+if __name__ == '__main__':
+    main()
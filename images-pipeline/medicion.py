@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+medicion.py
+
+Instrumentación de los programas de imágenes. color_procesos escribía en
+tiempo_Nprocesos.out las diferencias de time() que calculaba a mano y
+ecualizador sólo mostraba el total; aquí cada programa mide sus etapas con
+Medicion.etapa() (un gestor de contexto):
+
+    - decodificacion: lectura y conversión de la imagen de entrada.
+    - calculo: aplicación de la operación (incluidas las pasadas previas).
+    - codificacion: conversión y escritura de la imagen de salida.
+
+Cada etapa acumula sus segundos, los bytes y los píxeles que trata, y de ellos
+salen los bytes y píxeles por segundo. Las etapas pueden anidarse: el tiempo de
+una etapa interior se descuenta de la exterior (por ejemplo, la tubería de
+bandas decodifica cada banda dentro de la espera por el cálculo). Los procesos
+de cálculo miden su parte con trabajador() y envían el resultado por una cola.
+
+Al terminar se genera un único registro JSON por ejecución, con las etapas, los
+trabajadores, la memoria máxima (RSS) del proceso y de sus hijos y la fracción
+del tiempo que se va en E/S (decodificación y codificación), que indica si la
+ejecución está limitada por la E/S o por el cálculo. El registro se añade como
+una línea al fichero de la variable de entorno MEDICION_IMAGENES o, si no
+está definida, se escribe en la salida de errores.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import Queue
+from time import perf_counter
+import json
+import os
+import resource
+import sys
+import threading
+
+# Variable de entorno con el fichero (JSON Lines) al que se añaden los
+# registros.
+VARIABLE = "MEDICION_IMAGENES"
+
+# Etapas de E/S; el resto cuentan como cálculo.
+ETAPAS_ES = ("decodificacion", "codificacion")
+
+def rss_maximo():
+    """
+    Memoria máxima (RSS, en MB) de este proceso y del mayor de sus hijos.
+    """
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    # En Linux ru_maxrss está en kB.
+    return propio / 1024, hijos / 1024
+
+class Etapa:
+    """
+    Tiempo y volumen acumulados de una etapa.
+    """
+    def __init__(self):
+        self.segundos = 0.0
+        self.bytes = 0
+        self.pixeles = 0
+        self.veces = 0
+
+    def registro(self):
+        """
+        Diccionario con los datos de la etapa y su rendimiento.
+        """
+        registro = {"segundos": self.segundos, "bytes": self.bytes,
+                    "pixeles": self.pixeles, "veces": self.veces}
+
+        if self.segundos > 0 and self.bytes:
+            registro["bytes_por_segundo"] = self.bytes / self.segundos
+
+        if self.segundos > 0 and self.pixeles:
+            registro["pixeles_por_segundo"] = self.pixeles / self.segundos
+
+        return registro
+
+class Medicion:
+    """
+    Mediciones de una ejecución de un programa.
+    """
+    def __init__(self, programa, **parametros):
+        """
+        Inicializa la medición y empieza a contar el tiempo total.
+
+        INPUTS:
+            - programa (tipo string): nombre del programa.
+            - parametros: datos de la ejecución que se guardan en el registro
+            (fichero, número de procesos...).
+        """
+        self.programa = programa
+        self.parametros = parametros
+        self.etapas = {}
+        self.trabajadores = []
+        self.cola = None
+        self.fecha = datetime.now().isoformat(timespec = "seconds")
+        self.inicio = perf_counter()
+        self.final = None
+
+        # Etapas abiertas de cada hilo (el pool de la tubería decodifica en
+        # otro hilo), con el tiempo de sus etapas interiores.
+        self.abiertas = threading.local()
+
+    def obtener(self, nombre):
+        """
+        Devuelve la etapa con ese nombre, creándola si no existe.
+        """
+        if nombre not in self.etapas:
+            self.etapas[nombre] = Etapa()
+
+        return self.etapas[nombre]
+
+    @contextmanager
+    def etapa(self, nombre, bytes = 0, pixeles = 0):
+        """
+        Mide el bloque with como parte de una etapa.
+
+        INPUTS:
+            - nombre (tipo string): nombre de la etapa.
+            - bytes (tipo integer): bytes que trata el bloque.
+            - pixeles (tipo integer): píxeles que trata el bloque.
+
+        RETURN:
+            - (tipo Etapa): la etapa, para sumarle el volumen que sólo se
+            conoce al terminar el bloque.
+        """
+        etapa = self.obtener(nombre)
+        etapa.bytes += bytes
+        etapa.pixeles += pixeles
+
+        pila = getattr(self.abiertas, "pila", None)
+
+        if pila is None:
+            pila = self.abiertas.pila = []
+
+        pila.append(0.0)
+        inicio = perf_counter()
+
+        try:
+            yield etapa
+        finally:
+            transcurrido = perf_counter() - inicio
+            interiores = pila.pop()
+
+            etapa.segundos += transcurrido - interiores
+            etapa.veces += 1
+
+            if pila:
+                pila[-1] += transcurrido
+
+    def contar(self, nombre, bytes = 0, pixeles = 0):
+        """
+        Suma volumen a una etapa sin medir tiempo.
+        """
+        etapa = self.obtener(nombre)
+        etapa.bytes += bytes
+        etapa.pixeles += pixeles
+
+    def cola_trabajadores(self):
+        """
+        Cola por la que los procesos envían sus mediciones (ver trabajador()).
+        Se crea la primera vez que se pide.
+        """
+        if self.cola is None:
+            self.cola = Queue()
+
+        return self.cola
+
+    def recoger(self):
+        """
+        Guarda las mediciones que han enviado los procesos (que ya deben haber
+        terminado).
+        """
+        while self.cola is not None and not self.cola.empty():
+            self.trabajadores.append(self.cola.get())
+
+    def registro(self):
+        """
+        Registro de la ejecución.
+
+        RETURN:
+            - (tipo diccionario): programa, parámetros, fecha, segundos
+            totales, etapas, trabajadores, memoria máxima y fracción de E/S.
+        """
+        final = self.final if self.final is not None else perf_counter()
+        propio, hijos = rss_maximo()
+
+        es = sum(e.segundos for n, e in self.etapas.items() if n in ETAPAS_ES)
+        medido = sum(e.segundos for e in self.etapas.values())
+
+        return {
+            "programa": self.programa,
+            "parametros": self.parametros,
+            "fecha": self.fecha,
+            "segundos": final - self.inicio,
+            "etapas": {n: e.registro() for n, e in self.etapas.items()},
+            "trabajadores": sorted(self.trabajadores,
+                                   key = lambda t: str(t["nombre"])),
+            "rss_maximo_mb": {"propio": propio, "hijos": hijos},
+            "fraccion_es": es / medido if medido > 0 else None,
+            "limitante": "E/S" if es >= medido - es else "calculo",
+        }
+
+    def terminar(self, fichero = None):
+        """
+        Termina la medición y emite su registro como una línea JSON.
+
+        INPUT:
+            - fichero (tipo string): fichero al que se añade el registro. Si no
+            se indica, el de la variable de entorno MEDICION_IMAGENES o, si no
+            está definida, la salida de errores.
+
+        RETURN:
+            - (tipo diccionario): el registro (ver registro()).
+        """
+        self.final = perf_counter()
+        self.recoger()
+        registro = self.registro()
+        linea = json.dumps(registro, ensure_ascii = False)
+        fichero = fichero or os.environ.get(VARIABLE)
+
+        if fichero:
+            with open(fichero, "a", encoding = "utf-8") as f:
+                f.write(linea + "\n")
+        else:
+            print(linea, file = sys.stderr)
+
+        return registro
+
+@contextmanager
+def trabajador(cola, nombre, pixeles = 0):
+    """
+    Mide el bloque with en un proceso de cálculo y envía por la cola un
+    diccionario con su nombre, su pid, los segundos, los píxeles, los píxeles
+    por segundo y su memoria máxima. Si la cola es None no se mide nada.
+
+    INPUTS:
+        - cola (tipo Queue): cola de la medición (ver
+        Medicion.cola_trabajadores()).
+        - nombre (tipo string): nombre del proceso.
+        - pixeles (tipo integer): píxeles que trata.
+    """
+    if cola is None:
+        yield
+        return
+
+    inicio = perf_counter()
+
+    try:
+        yield
+    finally:
+        segundos = perf_counter() - inicio
+        cola.put({"nombre": nombre, "pid": os.getpid(),
+                  "segundos": segundos, "pixeles": pixeles,
+                  "pixeles_por_segundo": pixeles / segundos if segundos > 0
+                  else None,
+                  "rss_maximo_mb": rss_maximo()[0]})
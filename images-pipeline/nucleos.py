@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+nucleos.py
+
+Núcleos de cálculo vectorizados con NumPy para las imágenes. En lugar de
+recorrer los píxeles uno a uno, cada operación se aplica al canal (o a la
+banda) entero de una vez. Los usan EliminarColor (images-gray_conversion) y
+MaxMin y Ecualizar (images-equalization). Los canales pueden ser los
+multiprocessing.Array de esos programas: vista() los envuelve con np.frombuffer
+sin copiarlos, así que el resultado se escribe directamente en la memoria
+compartida.
+
+Con estos núcleos un solo proceso recorre la imagen a la velocidad de la
+memoria; los procesos sólo compensan para imágenes muy grandes, repartiendo
+bandas de píxeles (ver dividir()).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+import numpy as np
+
+def vista(canal, dtype = np.intc):
+    """
+    Devuelve el canal como un array de NumPy sin copiarlo.
+
+    INPUTS:
+        - canal (tipo Array, np.ndarray o buffer): valores del canal. Los
+        Array('i') de multiprocessing son enteros de C (np.intc).
+        - dtype (tipo np.dtype): tipo de los valores del buffer.
+
+    RETURN:
+        - (tipo np.ndarray): vista del canal.
+    """
+    if isinstance(canal, np.ndarray):
+        return canal
+
+    return np.frombuffer(canal, dtype = dtype)
+
+def dividir(n, p):
+    """
+    Divide n píxeles en p bandas consecutivas de tamaño lo más parecido
+    posible (el resto se reparte entre las primeras).
+
+    RETURN:
+        - (tipo lista): tuplas (inicio, final) de cada banda.
+    """
+    tamaño = n // p
+    resto = n % p
+    inicio = 0
+    bandas = []
+
+    for i in range(p):
+        final = inicio + tamaño
+
+        if resto != 0:
+            final += 1
+            resto -= 1
+
+        bandas.append((inicio, final))
+        inicio = final
+
+    return bandas
+
+def gris(rojo, verde, azul, salida = None):
+    """
+    Convierte a escala de grises con la media de los tres canales,
+    (r + g + b) // 3, igual que eliminar_color().
+
+    INPUTS:
+        - rojo, verde, azul (tipo Array o np.ndarray): canales de la imagen.
+        - salida (tipo Array o np.ndarray): si se indica, se escribe aquí el
+        gris (puede ser uno de los canales, como en EliminarColor).
+
+    RETURN:
+        - (tipo np.ndarray): valores de gris.
+    """
+    r = vista(rojo)
+    suma = r.astype(np.int64)
+    suma += vista(verde)
+    suma += vista(azul)
+    suma //= 3
+
+    if salida is None:
+        return suma.astype(r.dtype)
+
+    resultado = vista(salida)
+    resultado[...] = suma
+
+    return resultado
+
+def extremos(canal):
+    """
+    Máximo y mínimo de un canal (los que MaxMin envía por las colas).
+
+    RETURN:
+        - (tipo tupla): (máximo, mínimo), o None si el canal está vacío (un
+        proceso sin píxeles, cuando hay más procesos que píxeles).
+    """
+    c = vista(canal)
+
+    if c.size == 0:
+        return None
+
+    return int(c.max()), int(c.min())
+
+def normalizar(canal, maximo, minimo, salida = None):
+    """
+    Normalización máximo-mínimo de un canal, como Ecualizar:
+
+        val_norm = int((val_ori - min) / (max - min) * 255)
+
+    Se calcula en coma flotante igual que el original, así que el resultado es
+    idéntico. Si el canal es constante (max = min) queda a 0.
+
+    INPUTS:
+        - canal (tipo Array o np.ndarray): valores del canal.
+        - maximo (tipo integer): valor máximo del canal.
+        - minimo (tipo integer): valor mínimo del canal.
+        - salida (tipo Array o np.ndarray): si se indica, se escribe aquí el
+        resultado (puede ser el propio canal).
+
+    RETURN:
+        - (tipo np.ndarray): valores normalizados.
+    """
+    c = vista(canal)
+    rango = maximo - minimo
+
+    if rango == 0:
+        normalizado = np.zeros(len(c), dtype = c.dtype)
+
+    else:
+        normalizado = ((c - minimo) / rango * 255).astype(c.dtype)
+
+    if salida is None:
+        return normalizado
+
+    resultado = vista(salida)
+    resultado[...] = normalizado
+
+    return resultado
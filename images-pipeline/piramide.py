@@ -0,0 +1,299 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+piramide.py
+
+Reducción de imágenes para pirámides y miniaturas, por bandas de filas:
+
+    - Factores enteros: promedio por áreas. Cada bloque de f x f píxeles se
+    sustituye por su media, con un reshape a (filas, f, columnas, f, canales)
+    y una suma sobre los ejes de los bloques. Los bloques incompletos del
+    borde se promedian con los píxeles que tienen.
+    - Factores cualesquiera: remuestreo de Lanczos (a = 3), separable. Para
+    cada fila y columna de salida se precalculan los índices y los pesos de
+    las muestras de entrada; al reducir, el núcleo se ensancha por el factor
+    para que haga de filtro antialiasing.
+
+Los reductores reciben las bandas de la imagen en orden y devuelven las filas
+de salida que ya se pueden calcular (guardando las pocas filas de entrada que
+aún hacen falta), así que funcionan sobre la tubería de bandas: Piramide es un
+sumidero de tuberia.Tuberia.ejecutar() que genera todos los niveles en la misma
+pasada en la que se escribe la imagen procesada, sin volver a leerla.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+import os
+
+import numpy as np
+
+import pnm
+
+# Parámetro del núcleo de Lanczos (número de lóbulos).
+LOBULOS = 3
+
+def reducir_area(bloque, factor, maximo = None):
+    """
+    Reduce un bloque de filas por un factor entero promediando áreas de
+    factor x factor. Las últimas filas y columnas pueden formar bloques
+    incompletos, que se promedian con los píxeles que tienen.
+
+    INPUTS:
+        - bloque (tipo np.ndarray): muestras de forma (n, ancho, canales).
+        - factor (tipo integer): factor de reducción.
+        - maximo (tipo integer): si se indica, el resultado se redondea al
+        entero más cercano y se devuelve del tipo del bloque.
+
+    RETURN:
+        - (tipo np.ndarray): resultado de forma (ceil(n / factor),
+        ceil(ancho / factor), canales).
+    """
+    n, ancho, canales = bloque.shape
+    filas, columnas = -(-n // factor), -(-ancho // factor)
+
+    relleno = np.zeros((filas * factor, columnas * factor, canales),
+                       dtype = np.float64)
+    relleno[:n, :ancho] = bloque
+    suma = relleno.reshape(filas, factor, columnas, factor, canales).sum(
+        axis = (1, 3))
+
+    # Número de píxeles reales de cada bloque.
+    por_fila = np.minimum(n - np.arange(filas) * factor, factor)
+    por_columna = np.minimum(ancho - np.arange(columnas) * factor, factor)
+    media = suma / (por_fila[:, None, None] * por_columna[None, :, None])
+
+    if maximo is None:
+        return media
+
+    return np.clip(np.rint(media), 0, maximo).astype(bloque.dtype)
+
+def lanczos(x, a = LOBULOS):
+    """
+    Núcleo de Lanczos: sinc(x) * sinc(x / a) en (-a, a) y 0 fuera.
+    """
+    return np.where(np.abs(x) < a, np.sinc(x) * np.sinc(x / a), 0.0)
+
+def pesos_lanczos(entrada, salida, a = LOBULOS):
+    """
+    Índices y pesos del remuestreo de Lanczos de un eje.
+
+    INPUTS:
+        - entrada (tipo integer): número de posiciones de entrada.
+        - salida (tipo integer): número de posiciones de salida.
+        - a (tipo integer): parámetro del núcleo.
+
+    RETURNS:
+        - indices (tipo np.ndarray): array de forma (salida, muestras) con
+        las posiciones de entrada de cada salida (las de fuera se sustituyen
+        por la del borde).
+        - pesos (tipo np.ndarray): pesos de esas posiciones (suman 1).
+    """
+    escala = salida / entrada
+    ensanche = min(escala, 1.0)
+    soporte = a / ensanche
+
+    centros = (np.arange(salida) + 0.5) / escala - 0.5
+    primeras = np.floor(centros - soporte).astype(np.int64) + 1
+    muestras = int(np.ceil(2 * soporte)) + 1
+    posiciones = primeras[:, None] + np.arange(muestras)
+
+    pesos = lanczos((posiciones - centros[:, None]) * ensanche, a)
+    pesos /= pesos.sum(axis = 1, keepdims = True)
+
+    return np.clip(posiciones, 0, entrada - 1), pesos
+
+class ReductorArea:
+    """
+    Reduce por un factor entero una imagen que llega por bandas (ver
+    reducir_area()).
+    """
+    def __init__(self, ancho, alto, canales, factor, maximo):
+        self.factor = factor
+        self.maximo = maximo
+        self.alto = alto
+        self.ancho = -(-ancho // factor)
+        self.alto_salida = -(-alto // factor)
+        self.pendientes = np.empty((0, ancho, canales))
+        self.recibidas = 0
+
+    def escribir(self, banda):
+        """
+        Recibe las siguientes filas de entrada.
+
+        RETURN:
+            - (tipo np.ndarray): filas de salida que ya se pueden calcular
+            (puede no haber ninguna).
+        """
+        self.recibidas += len(banda)
+        filas = np.concatenate([self.pendientes, banda])
+
+        # En la última banda se reducen también las filas del bloque
+        # incompleto.
+        if self.recibidas >= self.alto:
+            completas = len(filas)
+        else:
+            completas = len(filas) // self.factor * self.factor
+
+        self.pendientes = filas[completas:]
+
+        return np.clip(np.rint(reducir_area(filas[:completas], self.factor)),
+                       0, self.maximo).astype(banda.dtype)
+
+class ReductorLanczos:
+    """
+    Remuestrea con Lanczos una imagen que llega por bandas. Las columnas se
+    remuestrean en cada banda y las filas en cuanto se han recibido todas las
+    filas de entrada que necesitan.
+    """
+    def __init__(self, ancho, alto, canales, nuevo_ancho, nuevo_alto, maximo,
+                 a = LOBULOS):
+        self.ancho = nuevo_ancho
+        self.alto_salida = nuevo_alto
+        self.alto = alto
+        self.maximo = maximo
+        self.columnas, self.pesos_columnas = pesos_lanczos(ancho, nuevo_ancho,
+                                                           a)
+        self.filas, self.pesos_filas = pesos_lanczos(alto, nuevo_alto, a)
+
+        # Filas de entrada (ya remuestreadas por columnas) guardadas, desde
+        # la fila self.inicio.
+        self.guardadas = np.empty((0, nuevo_ancho, canales))
+        self.inicio = 0
+        self.siguiente = 0
+
+    def escribir(self, banda):
+        """
+        Recibe las siguientes filas de entrada.
+
+        RETURN:
+            - (tipo np.ndarray): filas de salida que ya se pueden calcular
+            (puede no haber ninguna).
+        """
+        # (n, nuevo_ancho, muestras, canales) ponderado y sumado.
+        horizontal = np.einsum("ijkc,jk->ijc", banda[:, self.columnas],
+                               self.pesos_columnas)
+        self.guardadas = np.concatenate([self.guardadas, horizontal])
+        recibidas = self.inicio + len(self.guardadas)
+
+        # Filas de salida cuyas filas de entrada ya han llegado todas.
+        listas = self.siguiente
+
+        while (listas < self.alto_salida and
+               self.filas[listas].max() < recibidas):
+            listas += 1
+
+        filas = self.filas[self.siguiente:listas] - self.inicio
+        salida = np.einsum("ikjc,ik->ijc", self.guardadas[filas],
+                           self.pesos_filas[self.siguiente:listas])
+        self.siguiente = listas
+
+        # Se descartan las filas de entrada que ya no necesita ninguna salida.
+        if listas < self.alto_salida:
+            descartar = self.filas[listas:].min() - self.inicio
+            self.guardadas = self.guardadas[descartar:]
+            self.inicio += descartar
+
+        return np.clip(np.rint(salida), 0, self.maximo).astype(banda.dtype)
+
+def nombre_nivel(salida, nivel):
+    """
+    Nombre del fichero de un nivel de la pirámide: el de la salida con _n y el
+    número de nivel añadidos.
+    """
+    base, extension = os.path.splitext(salida)
+
+    return "%s_n%d%s" % (base, nivel, extension)
+
+class Piramide:
+    """
+    Sumidero de la tubería de bandas (ver tuberia.Tuberia.ejecutar()) que
+    genera los niveles de una pirámide a medida que llegan las bandas de la
+    imagen procesada. El nivel k se reduce factor ** k veces respecto a la
+    imagen, por áreas si factor es entero y con Lanczos si no.
+    """
+    def __init__(self, salida, niveles = 3, factor = 2, binario = True):
+        """
+        Inicializa la pirámide.
+
+        INPUTS:
+            - salida (tipo string): nombre base de los ficheros de los
+            niveles (ver nombre_nivel()).
+            - niveles (tipo integer): número de niveles (sin contar la imagen
+            original).
+            - factor (tipo integer o float): reducción entre niveles.
+            - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+        """
+        self.salida = salida
+        self.niveles = niveles
+        self.factor = factor
+        self.binario = binario
+        self.reductores = []
+        self.escritores = []
+
+    def abrir(self, ancho, alto, canales, maximo):
+        """
+        Crea los reductores y los ficheros de los niveles.
+        """
+        for nivel in range(1, self.niveles + 1):
+            factor = self.factor ** nivel
+
+            if float(self.factor).is_integer():
+                reductor = ReductorArea(ancho, alto, canales, int(factor),
+                                        maximo)
+            else:
+                reductor = ReductorLanczos(
+                    ancho, alto, canales, max(int(round(ancho / factor)), 1),
+                    max(int(round(alto / factor)), 1), maximo)
+
+            self.reductores.append(reductor)
+            self.escritores.append(pnm.EscritorPNM(
+                nombre_nivel(self.salida, nivel), reductor.ancho,
+                reductor.alto_salida, canales, maximo, self.binario))
+
+    def escribir(self, banda):
+        """
+        Reduce las siguientes filas de la imagen en cada nivel.
+        """
+        for reductor, escritor in zip(self.reductores, self.escritores):
+            filas = reductor.escribir(banda)
+
+            if len(filas):
+                escritor.escribir(filas)
+
+    def cerrar(self, comprobar = True):
+        """
+        Cierra los ficheros de todos los niveles y, si comprobar es True,
+        después comprueba que están completos (ver pnm.EscritorPNM.cerrar()).
+        """
+        error = None
+
+        for escritor in self.escritores:
+            try:
+                escritor.cerrar(comprobar)
+            except ValueError as e:
+                error = error or e
+
+        if error is not None:
+            raise error
+
+class Miniatura(Piramide):
+    """
+    Sumidero que genera una miniatura que cabe en lado x lado píxeles,
+    remuestreada con Lanczos.
+    """
+    def __init__(self, salida, lado = 256, binario = True):
+        super().__init__(salida, 1, None, binario)
+        self.lado = lado
+
+    def abrir(self, ancho, alto, canales, maximo):
+        escala = min(self.lado / max(ancho, alto), 1.0)
+        reductor = ReductorLanczos(ancho, alto, canales,
+                                   max(int(round(ancho * escala)), 1),
+                                   max(int(round(alto * escala)), 1), maximo)
+
+        self.reductores.append(reductor)
+        self.escritores.append(pnm.EscritorPNM(
+            self.salida, reductor.ancho, reductor.alto_salida, canales,
+            maximo, self.binario))
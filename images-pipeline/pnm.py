@@ -0,0 +1,467 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+pnm.py
+
+Lectura y escritura rápida de imágenes PPM/PGM (formatos PNM):
+
+    - P6 (PPM) y P5 (PGM) binarios: la cabecera se lee aparte y las muestras se
+    copian de una vez del fichero al array (readinto) o se proyectan en memoria
+    sin copiarlas (abrir_mapeada()).
+    - P3 (PPM) y P2 (PGM) ASCII: todas las muestras se convierten a la vez con
+    np.fromstring y se escriben con un formateo vectorizado (columnas de ancho
+    fijo, que el formato admite) en lugar de un write() por muestra.
+
+Se admiten valores máximos de hasta 65535 (16 bits por muestra, almacenados en
+big-endian en los formatos binarios). Las imágenes se devuelven como arrays de
+forma (alto, ancho, 3) para PPM o (alto, ancho) para PGM, de tipo uint8 si el
+máximo es menor que 256 y uint16 en caso contrario.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from collections import namedtuple
+import re
+import sys
+
+import numpy as np
+
+# Canales y si es binario, para cada número mágico.
+TIPOS = {
+    b"P2": (1, False),
+    b"P3": (3, False),
+    b"P5": (1, True),
+    b"P6": (3, True),
+}
+
+# Filas que se formatean de una vez al escribir en ASCII.
+FILAS_POR_BLOQUE = 256
+
+# Bytes de texto que se leen de una vez al leer en ASCII por bandas.
+TAM_LECTURA = 1 << 20
+
+Cabecera = namedtuple("Cabecera",
+                      "tipo ancho alto maximo canales binario desplazamiento")
+
+def _tokens_cabecera(f):
+    """
+    Lee los cuatro campos de la cabecera (número mágico, ancho, alto y valor
+    máximo), saltando comentarios. Devuelve los campos y la posición del primer
+    byte de datos (tras el blanco que sigue al valor máximo).
+    """
+    tokens = []
+    token = b""
+    comentario = False
+    posicion = 0
+
+    while len(tokens) < 4:
+        c = f.read(1)
+        posicion += 1
+
+        if not c:
+            raise ValueError("Cabecera PNM incompleta")
+
+        if comentario:
+            comentario = c not in b"\r\n"
+
+        elif c == b"#":
+            comentario = True
+
+        elif c.isspace():
+            if token:
+                tokens.append(token)
+                token = b""
+
+        else:
+            token += c
+
+    return tokens, posicion
+
+def leer_cabecera(fichero):
+    """
+    Lee la cabecera de un fichero PNM.
+
+    INPUT:
+        - fichero (tipo string): nombre del fichero.
+
+    RETURN:
+        - (tipo Cabecera): tipo (P2, P3, P5 o P6), ancho, alto, valor máximo,
+        canales, si es binario y desplazamiento de los datos en el fichero.
+    """
+    with open(fichero, "rb") as f:
+        tokens, desplazamiento = _tokens_cabecera(f)
+
+    tipo = tokens[0]
+
+    if tipo not in TIPOS:
+        raise ValueError("Formato PNM no soportado: %r" % tipo)
+
+    ancho, alto, maximo = (int(t) for t in tokens[1:])
+
+    if not 0 < maximo < 65536:
+        raise ValueError("Valor máximo fuera de rango: %d" % maximo)
+
+    canales, binario = TIPOS[tipo]
+
+    return Cabecera(tipo.decode("ascii"), ancho, alto, maximo, canales, binario,
+                    desplazamiento)
+
+def tipo_muestra(maximo):
+    """
+    Tipo de NumPy (en memoria) de las muestras según el valor máximo.
+    """
+    return np.uint8 if maximo < 256 else np.uint16
+
+def forma(cabecera):
+    """
+    Forma del array de una imagen: (alto, ancho, 3) o (alto, ancho).
+    """
+    if cabecera.canales == 1:
+        return (cabecera.alto, cabecera.ancho)
+
+    return (cabecera.alto, cabecera.ancho, cabecera.canales)
+
+def _quitar_comentarios(datos):
+    """
+    Elimina los comentarios (de # a final de línea) de los datos ASCII.
+    """
+    if b"#" not in datos:
+        return datos
+
+    return re.sub(rb"#[^\r\n]*", b" ", datos)
+
+def _convertir_ascii(datos):
+    """
+    Convierte de una vez los valores ASCII de los datos.
+    """
+    datos = _quitar_comentarios(datos)
+
+    # np.fromstring devuelve [0] con una cadena que sólo tiene blancos.
+    if not datos.strip():
+        return np.empty(0, dtype = np.uint32)
+
+    return np.fromstring(datos, dtype = np.uint32, sep = " ")
+
+def _comprobar_rango(valores, maximo):
+    """
+    Comprueba que los valores ASCII leídos no pasen del máximo de la cabecera
+    (al guardarlos en uint8 o uint16 se truncarían sin avisar).
+    """
+    if len(valores) and valores.max() > maximo:
+        raise ValueError("Muestras fuera del rango [0, %d]" % maximo)
+
+def leer_imagen(fichero, salida = None):
+    """
+    Lee una imagen PNM (P2, P3, P5 o P6).
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero.
+        - salida (tipo np.ndarray): array donde guardar las muestras (por
+        ejemplo, una vista de memoria compartida); debe tener la forma y el
+        tipo de la imagen. Si no se indica, se crea.
+
+    RETURNS:
+        - imagen (tipo np.ndarray): muestras de la imagen.
+        - cabecera (tipo Cabecera): datos de la cabecera.
+    """
+    cabecera = leer_cabecera(fichero)
+    dtype = tipo_muestra(cabecera.maximo)
+
+    if salida is None:
+        salida = np.empty(forma(cabecera), dtype = dtype)
+
+    elif salida.shape != forma(cabecera) or salida.dtype != dtype:
+        raise ValueError("El array de salida no corresponde con la imagen")
+
+    with open(fichero, "rb") as f:
+        f.seek(cabecera.desplazamiento)
+
+        if cabecera.binario:
+            leidos = f.readinto(memoryview(salida).cast("B"))
+
+            if leidos != salida.nbytes:
+                raise ValueError("Faltan datos en la imagen")
+
+            # En el fichero, las muestras de 16 bits están en big-endian.
+            if dtype == np.uint16 and sys.byteorder == "little":
+                salida.byteswap(inplace = True)
+
+        else:
+            valores = _convertir_ascii(f.read())
+
+            if len(valores) < salida.size:
+                raise ValueError("Faltan datos en la imagen")
+
+            valores = valores[:salida.size]
+            _comprobar_rango(valores, cabecera.maximo)
+            salida[...] = valores.reshape(salida.shape)
+
+    return salida, cabecera
+
+def abrir_mapeada(fichero, modo = "r"):
+    """
+    Proyecta en memoria (mmap) las muestras de una imagen binaria (P5 o P6),
+    sin leerlas. Las muestras de 16 bits se ven tal como están en el fichero
+    (big-endian).
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero.
+        - modo (tipo string): modo de np.memmap ("r", "r+" o "c").
+
+    RETURNS:
+        - imagen (tipo np.memmap): muestras de la imagen.
+        - cabecera (tipo Cabecera): datos de la cabecera.
+    """
+    cabecera = leer_cabecera(fichero)
+
+    if not cabecera.binario:
+        raise ValueError("Sólo se pueden proyectar en memoria imágenes "
+                         "binarias (P5 o P6)")
+
+    dtype = np.uint8 if cabecera.maximo < 256 else np.dtype(">u2")
+    imagen = np.memmap(fichero, dtype = dtype, mode = modo,
+                       offset = cabecera.desplazamiento,
+                       shape = forma(cabecera))
+
+    return imagen, cabecera
+
+def _valores_ascii(f):
+    """
+    Lee del fichero (ya situado tras la cabecera) los valores ASCII por
+    trozos de TAM_LECTURA bytes. Cada trozo se corta tras el último salto de
+    línea, para no partir un número ni un comentario.
+
+    RETURN:
+        - (tipo generador): arrays con los valores de cada trozo.
+    """
+    resto = b""
+
+    while True:
+        trozo = f.read(TAM_LECTURA)
+        datos = resto + trozo
+
+        if not trozo:
+            corte = len(datos)
+
+        else:
+            corte = datos.rfind(b"\n") + 1
+
+            # Una línea muy larga sin comentarios se puede cortar en un blanco.
+            if corte == 0 and b"#" not in datos:
+                corte = max(datos.rfind(b" "), datos.rfind(b"\t")) + 1
+
+            if corte == 0:
+                resto = datos
+                continue
+
+        resto = datos[corte:]
+        valores = _convertir_ascii(datos[:corte])
+
+        if len(valores):
+            yield valores
+
+        if not trozo:
+            return
+
+def leer_bandas(fichero, filas):
+    """
+    Lee una imagen PNM por bandas de filas, sin tenerla nunca entera en
+    memoria: las binarias se proyectan en memoria (ver abrir_mapeada()) y las
+    ASCII se convierten por trozos.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero.
+        - filas (tipo integer): número de filas de cada banda (la última puede
+        tener menos).
+
+    RETURN:
+        - (tipo generador): bandas de forma (n, ancho, 3) o (n, ancho), del
+        tipo de tipo_muestra().
+    """
+    cabecera = leer_cabecera(fichero)
+    dtype = tipo_muestra(cabecera.maximo)
+    forma_fila = forma(cabecera)[1:]
+    por_fila = cabecera.ancho * cabecera.canales
+
+    if cabecera.binario:
+        mapeada, _ = abrir_mapeada(fichero)
+
+        for i in range(0, cabecera.alto, filas):
+            yield mapeada[i:i + filas].astype(dtype)
+
+        return
+
+    with open(fichero, "rb") as f:
+        f.seek(cabecera.desplazamiento)
+
+        fila = 0
+        banda = np.empty(min(filas, cabecera.alto) * por_fila, dtype = dtype)
+        llenos = 0
+
+        for valores in _valores_ascii(f):
+            usados = 0
+
+            while usados < len(valores) and fila < cabecera.alto:
+                n = min(len(banda) - llenos, len(valores) - usados)
+                _comprobar_rango(valores[usados:usados + n], cabecera.maximo)
+                banda[llenos:llenos + n] = valores[usados:usados + n]
+                llenos += n
+                usados += n
+
+                if llenos == len(banda):
+                    yield banda.reshape((-1,) + forma_fila)
+
+                    fila += len(banda) // por_fila
+                    banda = np.empty(min(filas, cabecera.alto - fila) *
+                                     por_fila, dtype = dtype)
+                    llenos = 0
+
+        if fila < cabecera.alto:
+            raise ValueError("Faltan datos en la imagen")
+
+def formatear_ascii(filas, maximo):
+    """
+    Convierte un bloque de filas en texto ASCII (P2/P3) sin recorrer las
+    muestras en Python: cada muestra ocupa una columna de ancho fijo (el
+    número de cifras del valor máximo), alineada a la derecha y seguida de un
+    espacio, y cada fila termina en un salto de línea.
+
+    INPUTS:
+        - filas (tipo np.ndarray): filas de la imagen.
+        - maximo (tipo integer): valor máximo de las muestras.
+
+    RETURN:
+        - (tipo bytes): texto de las filas.
+    """
+    # Una muestra con más cifras que el máximo no cabría en su columna.
+    if filas.size and (filas.min() < 0 or filas.max() > maximo):
+        raise ValueError("Muestras fuera del rango [0, %d]" % maximo)
+
+    cifras = len(str(maximo))
+    valores = filas.reshape(len(filas), -1).astype(np.uint32)
+    texto = np.full(valores.shape + (cifras + 1,), ord(" "), dtype = np.uint8)
+
+    for d in range(cifras):
+        potencia = 10 ** (cifras - 1 - d)
+        digito = (valores // potencia % 10 + ord("0")).astype(np.uint8)
+
+        # Los ceros a la izquierda se quedan como espacios.
+        visible = (valores >= potencia) | (potencia == 1)
+        texto[..., d] = np.where(visible, digito, ord(" "))
+
+    texto = texto.reshape(len(filas), -1)
+    texto[:, -1] = ord("\n")
+
+    return texto.tobytes()
+
+class EscritorPNM:
+    """
+    Escribe una imagen PNM por bandas de filas, a medida que se calculan (la
+    imagen completa no tiene por qué estar en memoria).
+    """
+    def __init__(self, fichero, ancho, alto, canales = 3, maximo = 255,
+                 binario = True):
+        """
+        Abre el fichero y escribe la cabecera.
+
+        INPUTS:
+            - fichero (tipo string): nombre del fichero de salida.
+            - ancho (tipo integer): número de columnas.
+            - alto (tipo integer): número de filas.
+            - canales (tipo integer): 3 (PPM) o 1 (PGM).
+            - maximo (tipo integer): valor máximo de las muestras.
+            - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+        """
+        if canales not in (1, 3):
+            raise ValueError("Número de canales no soportado: %d" % canales)
+
+        if not 0 < maximo < 65536:
+            raise ValueError("Valor máximo fuera de rango: %d" % maximo)
+
+        tipo = {(1, False): "P2", (3, False): "P3", (1, True): "P5",
+                (3, True): "P6"}[(canales, binario)]
+
+        self.ancho = ancho
+        self.alto = alto
+        self.canales = canales
+        self.maximo = maximo
+        self.binario = binario
+        self.filas = 0
+        self.fichero = open(fichero, "wb")
+        self.fichero.write(b"%s\n%d %d\n%d\n" % (tipo.encode("ascii"), ancho,
+                                                  alto, maximo))
+
+    def escribir(self, banda):
+        """
+        Escribe las siguientes filas de la imagen.
+
+        INPUT:
+            - banda (tipo np.ndarray): filas de forma (n, ancho, canales) o
+            (n, ancho).
+        """
+        if banda.shape[1] != self.ancho or banda.size != (len(banda) *
+                                                          self.ancho *
+                                                          self.canales):
+            raise ValueError("La banda no corresponde con la imagen")
+
+        if self.binario:
+            dtype = np.uint8 if self.maximo < 256 else np.dtype(">u2")
+            datos = np.ascontiguousarray(banda, dtype = dtype)
+            self.fichero.write(memoryview(datos).cast("B"))
+
+        else:
+            for i in range(0, len(banda), FILAS_POR_BLOQUE):
+                self.fichero.write(formatear_ascii(
+                    banda[i:i + FILAS_POR_BLOQUE], self.maximo))
+
+        self.filas += len(banda)
+
+    def cerrar(self, comprobar = True):
+        """
+        Cierra el fichero. Si comprobar es True, comprueba que se han escrito
+        todas las filas (si se cierra por un error, no se comprueban).
+        """
+        self.fichero.close()
+
+        if comprobar and self.filas != self.alto:
+            raise ValueError("Se han escrito %d filas de %d" %
+                             (self.filas, self.alto))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *args):
+        # Si ha habido una excepción no se comprueban las filas.
+        self.cerrar(tipo is None)
+
+def guardar_imagen(fichero, imagen, maximo = None, binario = True):
+    """
+    Guarda una imagen en formato PNM: PPM si tiene tres canales y PGM si tiene
+    uno.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero de salida.
+        - imagen (tipo np.ndarray): muestras, de forma (alto, ancho, 3) o
+        (alto, ancho).
+        - maximo (tipo integer): valor máximo; por defecto, 255 para uint8,
+        65535 para uint16 y el máximo de la imagen para otros tipos.
+        - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+    """
+    if maximo is None:
+        if imagen.dtype == np.uint8:
+            maximo = 255
+
+        elif imagen.dtype == np.uint16:
+            maximo = 65535
+
+        else:
+            maximo = max(int(imagen.max()), 1)
+
+    canales = imagen.shape[2] if imagen.ndim == 3 else 1
+
+    with EscritorPNM(fichero, imagen.shape[1], imagen.shape[0], canales,
+                     maximo, binario) as escritor:
+        for i in range(0, len(imagen), FILAS_POR_BLOQUE):
+            escritor.escribir(imagen[i:i + FILAS_POR_BLOQUE])
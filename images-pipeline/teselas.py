@@ -0,0 +1,557 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+teselas.py
+
+Imágenes teseladas en disco, para imágenes que no caben en memoria. El
+ecualizador original (guardar_arrays()) tiene en memoria tres Array de
+alto * ancho enteros; aquí la imagen se guarda en un fichero binario dividido
+en teselas de tamaño fijo, que se proyecta en memoria (np.memmap) y se procesa
+tesela a tesela:
+
+    - Formato: una cabecera de TAM_CABECERA bytes (número mágico, alto, ancho,
+    canales, bytes por muestra, valor máximo y tamaño de las teselas) seguida
+    de las teselas por filas, cada una con sus muestras intercaladas en
+    little-endian. Las teselas del borde se rellenan hasta el tamaño
+    completo, así que la tesela (i, j) está siempre en la misma posición.
+    - Las teselas se reparten entre un pool de procesos (aplicar()). Cada
+    proceso abre los ficheros por su nombre y escribe sus teselas de salida
+    directamente en el fichero de salida proyectado en memoria, sin pasarlas
+    por el proceso padre ni por una caché. Los operadores globales
+    (Normalizar, EcualizarHistograma) hacen antes una pasada que combina los
+    estadísticos de cada tesela.
+    - Para accesos aleatorios las teselas se leen a través de una caché LRU
+    limitada en bytes (CacheTeselas), que guarda además las teselas
+    modificadas hasta que se expulsan. Sólo la usa la escritura de una región
+    del resultado (recortar(), opción --region); aplicar() no la usa.
+
+Las conversiones desde y hacia PPM/PGM (desde_pnm() y a_pnm()) se hacen por
+bandas de una fila de teselas, así que en memoria nunca está la imagen entera.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from collections import OrderedDict
+from multiprocessing import Pool
+from time import perf_counter
+import argparse
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+import pnm
+
+# Cabecera: número mágico, alto, ancho, canales, bytes por muestra, valor
+# máximo, alto y ancho de las teselas. Los datos empiezan en TAM_CABECERA (una
+# página), para que la proyección en memoria quede alineada.
+MAGIA = b"TESELAS1"
+CABECERA = struct.Struct("<8sQQIIIII")
+TAM_CABECERA = 4096
+
+# Tamaño por defecto de las teselas (filas, columnas).
+TAM_TESELA = (512, 512)
+
+# Bytes de la caché de teselas por defecto.
+TAM_CACHE = 256 << 20
+
+class ImagenTeselada:
+    """
+    Imagen guardada por teselas en un fichero proyectado en memoria. Se crea
+    con crear() o desde_pnm() y se abre con abrir().
+    """
+    def __init__(self, fichero, alto, ancho, canales, dtype, maximo,
+                 tam_tesela, modo = "r"):
+        """
+        Inicializa el objeto. No se usa directamente: ver crear(), abrir() y
+        desde_pnm().
+        """
+        self.fichero = fichero
+        self.alto = alto
+        self.ancho = ancho
+        self.canales = canales
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.maximo = maximo
+        self.tam_tesela = tuple(tam_tesela)
+
+        alto_tesela, ancho_tesela = self.tam_tesela
+        self.rejilla = (-(-alto // alto_tesela), -(-ancho // ancho_tesela))
+        self.datos = np.memmap(fichero, dtype = self.dtype, mode = modo,
+                               offset = TAM_CABECERA,
+                               shape = self.rejilla + self.tam_tesela +
+                               (canales,))
+
+    @classmethod
+    def crear(cls, fichero, alto, ancho, canales = 3, dtype = np.uint8,
+              tam_tesela = TAM_TESELA, maximo = None):
+        """
+        Crea el fichero de una imagen teselada (con las muestras a 0).
+
+        INPUTS:
+            - fichero (tipo string): nombre del fichero.
+            - alto (tipo integer): número de filas.
+            - ancho (tipo integer): número de columnas.
+            - canales (tipo integer): número de canales (3 o 1).
+            - dtype (tipo np.dtype): tipo de las muestras (uint8 o uint16).
+            - tam_tesela (tipo tupla): filas y columnas de cada tesela.
+            - maximo (tipo integer): valor máximo de las muestras (por
+            defecto, el del tipo).
+
+        RETURN:
+            - (tipo ImagenTeselada): imagen abierta para lectura y escritura.
+        """
+        dtype = np.dtype(dtype)
+
+        if maximo is None:
+            maximo = np.iinfo(dtype).max
+
+        alto_tesela, ancho_tesela = tam_tesela
+        tamano = (-(-alto // alto_tesela) * -(-ancho // ancho_tesela) *
+                  alto_tesela * ancho_tesela * canales * dtype.itemsize)
+
+        with open(fichero, "wb") as f:
+            f.write(CABECERA.pack(MAGIA, alto, ancho, canales, dtype.itemsize,
+                                  maximo, alto_tesela, ancho_tesela))
+            f.truncate(TAM_CABECERA + tamano)
+
+        return cls(fichero, alto, ancho, canales, dtype, maximo, tam_tesela,
+                   "r+")
+
+    @classmethod
+    def abrir(cls, fichero, modo = "r"):
+        """
+        Abre una imagen teselada.
+
+        INPUTS:
+            - fichero (tipo string): nombre del fichero.
+            - modo (tipo string): modo de np.memmap ("r", "r+" o "c").
+
+        RETURN:
+            - (tipo ImagenTeselada): imagen teselada.
+        """
+        with open(fichero, "rb") as f:
+            datos = f.read(CABECERA.size)
+
+        if len(datos) < CABECERA.size or datos[:len(MAGIA)] != MAGIA:
+            raise ValueError("%s no es una imagen teselada" % fichero)
+
+        (_, alto, ancho, canales, tam_muestra, maximo, alto_tesela,
+         ancho_tesela) = CABECERA.unpack(datos)
+        dtype = np.uint8 if tam_muestra == 1 else np.uint16
+
+        return cls(fichero, alto, ancho, canales, dtype, maximo,
+                   (alto_tesela, ancho_tesela), modo)
+
+    @classmethod
+    def desde_pnm(cls, entrada, fichero, tam_tesela = TAM_TESELA):
+        """
+        Convierte una imagen PPM/PGM en teselada, leyéndola por bandas de una
+        fila de teselas.
+
+        INPUTS:
+            - entrada (tipo string): fichero PPM o PGM.
+            - fichero (tipo string): fichero de la imagen teselada.
+            - tam_tesela (tipo tupla): filas y columnas de cada tesela.
+
+        RETURN:
+            - (tipo ImagenTeselada): imagen abierta para lectura y escritura.
+        """
+        cabecera = pnm.leer_cabecera(entrada)
+        imagen = cls.crear(fichero, cabecera.alto, cabecera.ancho,
+                           cabecera.canales, pnm.tipo_muestra(cabecera.maximo),
+                           tam_tesela, cabecera.maximo)
+        ancho_tesela = imagen.tam_tesela[1]
+
+        for i, banda in enumerate(pnm.leer_bandas(entrada,
+                                                  imagen.tam_tesela[0])):
+            banda = banda.reshape(len(banda), cabecera.ancho, -1)
+
+            for j in range(imagen.rejilla[1]):
+                trozo = banda[:, j * ancho_tesela:(j + 1) * ancho_tesela]
+                imagen.datos[i, j, :trozo.shape[0], :trozo.shape[1]] = trozo
+
+        imagen.datos.flush()
+
+        return imagen
+
+    def limites(self, i, j):
+        """
+        Filas y columnas de la imagen que ocupa la tesela (i, j).
+
+        RETURN:
+            - (tipo tupla): (fila inicial, fila final, columna inicial,
+            columna final), con los finales sin incluir.
+        """
+        alto_tesela, ancho_tesela = self.tam_tesela
+        y0, x0 = i * alto_tesela, j * ancho_tesela
+
+        return (y0, min(y0 + alto_tesela, self.alto),
+                x0, min(x0 + ancho_tesela, self.ancho))
+
+    def indices(self):
+        """
+        Índices (i, j) de todas las teselas, por filas.
+        """
+        filas, columnas = self.rejilla
+
+        return [(i, j) for i in range(filas) for j in range(columnas)]
+
+    def tesela(self, i, j):
+        """
+        Vista (sin copia y sin el relleno del borde) de la tesela (i, j), de
+        forma (filas, columnas, canales).
+        """
+        y0, y1, x0, x1 = self.limites(i, j)
+
+        return self.datos[i, j, :y1 - y0, :x1 - x0]
+
+    def a_pnm(self, salida, maximo = None, binario = True):
+        """
+        Guarda la imagen en formato PPM/PGM, por bandas de una fila de
+        teselas.
+
+        INPUTS:
+            - salida (tipo string): fichero de salida.
+            - maximo (tipo integer): valor máximo (por defecto, el de la
+            imagen).
+            - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+        """
+        if maximo is None:
+            maximo = self.maximo
+
+        with pnm.EscritorPNM(salida, self.ancho, self.alto, self.canales,
+                             maximo, binario) as escritor:
+            for i in range(self.rejilla[0]):
+                y0, y1, _, _ = self.limites(i, 0)
+
+                # (columnas, filas, ancho, canales) -> (filas, columnas *
+                # ancho, canales), sin el relleno.
+                banda = self.datos[i].transpose(1, 0, 2, 3).reshape(
+                    self.tam_tesela[0], -1, self.canales)
+                escritor.escribir(banda[:y1 - y0, :self.ancho])
+
+    def cerrar(self):
+        """
+        Escribe en el fichero los cambios pendientes y cierra la proyección.
+        """
+        if self.datos.mode != "r":
+            self.datos.flush()
+
+        self.datos = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+class CacheTeselas:
+    """
+    Caché LRU de teselas de una imagen teselada, limitada en bytes. Las
+    teselas se copian del fichero al leerlas; las modificadas se escriben en
+    el fichero al expulsarlas o con vaciar().
+    """
+    def __init__(self, imagen, capacidad = TAM_CACHE):
+        """
+        Inicializa la caché.
+
+        INPUTS:
+            - imagen (tipo ImagenTeselada): imagen teselada.
+            - capacidad (tipo integer): bytes máximos de las teselas guardadas.
+        """
+        self.imagen = imagen
+        self.capacidad = capacidad
+        self.teselas = OrderedDict()
+        self.modificadas = set()
+        self.ocupados = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def leer(self, i, j):
+        """
+        Devuelve la tesela (i, j) (una copia en memoria que se puede
+        modificar; si se modifica, hay que llamar a marcar()).
+        """
+        clave = (i, j)
+
+        if clave in self.teselas:
+            self.teselas.move_to_end(clave)
+            self.aciertos += 1
+
+            return self.teselas[clave]
+
+        self.fallos += 1
+        tesela = np.array(self.imagen.tesela(i, j))
+        self.teselas[clave] = tesela
+        self.ocupados += tesela.nbytes
+        self._expulsar()
+
+        return tesela
+
+    def marcar(self, i, j):
+        """
+        Marca como modificada la tesela (i, j), que debe estar en la caché.
+        """
+        if (i, j) not in self.teselas:
+            raise KeyError("La tesela (%d, %d) no está en la caché" % (i, j))
+
+        self.modificadas.add((i, j))
+
+    def _escribir(self, clave):
+        if clave in self.modificadas:
+            self.imagen.tesela(*clave)[...] = self.teselas[clave]
+            self.modificadas.discard(clave)
+
+    def _expulsar(self):
+        # Siempre se deja al menos la última tesela leída.
+        while self.ocupados > self.capacidad and len(self.teselas) > 1:
+            clave, tesela = next(iter(self.teselas.items()))
+            self._escribir(clave)
+            del self.teselas[clave]
+            self.ocupados -= tesela.nbytes
+
+    def vaciar(self):
+        """
+        Escribe en el fichero todas las teselas modificadas.
+        """
+        for clave in list(self.modificadas):
+            self._escribir(clave)
+
+    def region(self, y0, y1, x0, x1):
+        """
+        Copia la región [y0, y1) x [x0, x1) de la imagen a partir de las
+        teselas que la cubren.
+
+        RETURN:
+            - (tipo np.ndarray): región de forma (filas, columnas, canales).
+        """
+        alto_tesela, ancho_tesela = self.imagen.tam_tesela
+        y1, x1 = min(y1, self.imagen.alto), min(x1, self.imagen.ancho)
+        region = np.empty((y1 - y0, x1 - x0, self.imagen.canales),
+                          dtype = self.imagen.dtype)
+
+        for i in range(y0 // alto_tesela, -(-y1 // alto_tesela)):
+            for j in range(x0 // ancho_tesela, -(-x1 // ancho_tesela)):
+                ty0, ty1, tx0, tx1 = self.imagen.limites(i, j)
+                a, b = max(y0, ty0), min(y1, ty1)
+                c, d = max(x0, tx0), min(x1, tx1)
+                region[a - y0:b - y0, c - x0:d - x0] = self.leer(i, j)[
+                    a - ty0:b - ty0, c - tx0:d - tx0]
+
+        return region
+
+def recortar(imagen, salida, y0, y1, x0, x1, binario = True,
+             capacidad = TAM_CACHE):
+    """
+    Guarda en formato PPM/PGM la región [y0, y1) x [x0, x1) de una imagen
+    teselada. Se lee a través de una CacheTeselas, por bandas de una fila de
+    teselas, así que en memoria sólo están las teselas que cubren la banda.
+
+    INPUTS:
+        - imagen (tipo ImagenTeselada): imagen teselada.
+        - salida (tipo string): fichero de salida.
+        - y0, y1, x0, x1 (tipo integer): límites de la región (se recortan a
+        los de la imagen).
+        - binario (tipo booleano): P6/P5 si es True, P3/P2 si es False.
+        - capacidad (tipo integer): bytes máximos de la caché.
+
+    RETURN:
+        - cache (tipo CacheTeselas): caché utilizada (con sus aciertos y
+        fallos).
+    """
+    y1, x1 = min(y1, imagen.alto), min(x1, imagen.ancho)
+
+    if not (0 <= y0 < y1 and 0 <= x0 < x1):
+        raise ValueError("Región vacía o fuera de la imagen")
+
+    cache = CacheTeselas(imagen, capacidad)
+    alto_tesela = imagen.tam_tesela[0]
+
+    with pnm.EscritorPNM(salida, x1 - x0, y1 - y0, imagen.canales,
+                         imagen.maximo, binario) as escritor:
+        # Cada banda acaba en el borde de su fila de teselas.
+        while y0 < y1:
+            fin = min((y0 // alto_tesela + 1) * alto_tesela, y1)
+            escritor.escribir(cache.region(y0, fin, x0, x1))
+            y0 = fin
+
+    return cache
+
+# Estado de cada proceso del pool (ver _iniciar()).
+_entrada = None
+_salida = None
+_operadores = None
+
+def _iniciar(entrada, salida, operadores):
+    """
+    Inicializa un proceso del pool: abre las imágenes por su nombre y guarda
+    los operadores.
+    """
+    global _entrada, _salida, _operadores
+
+    _entrada = ImagenTeselada.abrir(entrada)
+    _salida = ImagenTeselada.abrir(salida, "r+") if salida else None
+    _operadores = operadores
+
+def _aplicar_operadores(operadores, tesela):
+    for operador in operadores:
+        tesela = operador.aplicar(tesela)
+
+    return tesela
+
+def _estadisticos_tesela(indice):
+    # El último operador de la cadena es el que acumula los estadísticos.
+    tesela = _aplicar_operadores(_operadores[:-1], _entrada.tesela(*indice))
+
+    return _operadores[-1].estadisticos(tesela)
+
+def _procesar_tesela(indice):
+    inicio = perf_counter()
+    _salida.tesela(*indice)[...] = _aplicar_operadores(
+        _operadores, _entrada.tesela(*indice))
+
+    return indice, perf_counter() - inicio, os.getpid()
+
+def aplicar(entrada, salida, operadores, procesos = 1, tiempos = None):
+    """
+    Aplica una cadena de operadores por píxel (ver tuberia.py) a una imagen
+    teselada, repartiendo las teselas entre un pool de procesos.
+
+    INPUTS:
+        - entrada (tipo string): fichero de la imagen teselada de entrada.
+        - salida (tipo string): fichero de la imagen teselada de salida (se
+        crea con el mismo tamaño de tesela).
+        - operadores (tipo lista): Operador que se aplican, en orden. Deben
+        ser por píxel (por_pixel), porque cada tesela se procesa sin sus
+        vecinas.
+        - procesos (tipo integer): número de procesos.
+        - tiempos (tipo lista): si se indica, se le añade una tupla (indice,
+        segundos, pid) por tesela.
+
+    RETURN:
+        - (tipo ImagenTeselada): imagen de salida, abierta para lectura.
+    """
+    for operador in operadores:
+        if not operador.por_pixel:
+            raise ValueError("%s no se puede aplicar por teselas" %
+                             type(operador).__name__)
+
+    imagen = ImagenTeselada.abrir(entrada)
+    canales, maximo = imagen.canales, imagen.maximo
+
+    for operador in operadores:
+        operador.configurar(imagen.ancho, imagen.alto, canales, maximo)
+        canales, maximo = operador.salida(canales, maximo)
+
+    ImagenTeselada.crear(salida, imagen.alto, imagen.ancho, canales,
+                         pnm.tipo_muestra(maximo), imagen.tam_tesela,
+                         maximo).cerrar()
+    indices = imagen.indices()
+    imagen.cerrar()
+
+    # Pasadas previas: una por operador global, con un pool cada una porque
+    # los operadores cambian al prepararse.
+    for k, operador in enumerate(operadores):
+        if operador.global_:
+            with Pool(procesos, _iniciar,
+                      (entrada, None, operadores[:k + 1])) as pool:
+                operador.preparar(pool.imap_unordered(_estadisticos_tesela,
+                                                      indices))
+
+    with Pool(procesos, _iniciar, (entrada, salida, operadores)) as pool:
+        for tiempo in pool.imap_unordered(_procesar_tesela, indices):
+            if tiempos is not None:
+                tiempos.append(tiempo)
+
+    return ImagenTeselada.abrir(salida)
+
+def main(argv = None):
+    """
+    Función principal: procesa una imagen PPM/PGM por teselas.
+    """
+    from lotes import OPERACIONES, operadores
+
+    parser = argparse.ArgumentParser(
+        description = "Procesado por teselas de imágenes PPM/PGM grandes.")
+
+    parser.add_argument("entrada", help = "fichero PPM/PGM de entrada")
+    parser.add_argument("salida", help = "fichero PPM/PGM de salida")
+    parser.add_argument("--operacion", default = "gris",
+                        help = "operaciones separadas por comas (%s)" %
+                        ", ".join(OPERACIONES))
+    parser.add_argument("-p", "--procesos", type = int,
+                        default = os.cpu_count() or 1,
+                        help = "número de procesos")
+    parser.add_argument("--tesela", type = int, nargs = 2,
+                        default = TAM_TESELA, metavar = ("FILAS", "COLUMNAS"),
+                        help = "tamaño de las teselas")
+    parser.add_argument("-d", "--directorio",
+                        help = "directorio de los ficheros teselados "
+                        "temporales")
+    parser.add_argument("--ascii", action = "store_true",
+                        help = "escribir P3/P2 en lugar de P6/P5")
+    parser.add_argument("--region", type = int, nargs = 4,
+                        metavar = ("Y0", "Y1", "X0", "X1"),
+                        help = "escribir sólo la región [Y0, Y1) x [X0, X1) "
+                        "del resultado")
+
+    args = parser.parse_args(argv)
+
+    try:
+        cadena = operadores(args.operacion)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not all(operador.por_pixel for operador in cadena):
+        parser.error("sólo se pueden usar operaciones por píxel")
+
+    try:
+        cabecera = pnm.leer_cabecera(args.entrada)
+    except (OSError, ValueError) as e:
+        parser.error("%s: %s" % (args.entrada, e))
+
+    if args.region:
+        y0, y1, x0, x1 = args.region
+
+        if not (0 <= y0 < min(y1, cabecera.alto) and
+                0 <= x0 < min(x1, cabecera.ancho)):
+            parser.error("la región está vacía o fuera de la imagen "
+                         "(%d x %d)" % (cabecera.alto, cabecera.ancho))
+
+    with tempfile.TemporaryDirectory(dir = args.directorio) as directorio:
+        teselada = os.path.join(directorio, "entrada.tes")
+        resultado = os.path.join(directorio, "salida.tes")
+
+        inicio = perf_counter()
+        ImagenTeselada.desde_pnm(args.entrada, teselada,
+                                 tuple(args.tesela)).cerrar()
+        conversion = perf_counter() - inicio
+
+        inicio = perf_counter()
+        tiempos = []
+        salida = aplicar(teselada, resultado, cadena, args.procesos, tiempos)
+        calculo = perf_counter() - inicio
+
+        inicio = perf_counter()
+
+        try:
+            if args.region:
+                recortar(salida, args.salida, *args.region,
+                         binario = not args.ascii)
+            else:
+                salida.a_pnm(args.salida, binario = not args.ascii)
+        finally:
+            salida.cerrar()
+
+        escritura = perf_counter() - inicio
+
+    print("Teselas: %d. Conversión %5.4f s, cálculo %5.4f s, escritura "
+          "%5.4f s." % (len(tiempos), conversion, calculo, escritura),
+          file = sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_color.py
+
+Pruebas de las conversiones de color (color.py) frente a las mismas fórmulas
+en coma flotante: la luminancia y el YCbCr en punto fijo se quedan a una
+unidad, como mucho, del redondeo exacto (y casi siempre coinciden), con 8 y
+16 bits por muestra; el HSV coincide con colorsys (salvo en el redondeo de
+los valores que caen justo en la mitad) y las conversiones de color
+rechazan las imágenes en gris.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import colorsys
+
+import numpy as np
+import pytest
+
+import color
+import pnm
+
+def aleatoria(maximo, alto = 40, ancho = 50, minimo = 0, semilla = 0):
+    rng = np.random.default_rng(semilla)
+
+    return rng.integers(minimo, maximo + 1, (alto, ancho, 3)).astype(
+        pnm.tipo_muestra(maximo))
+
+def referencia_ycbcr(banda, maximo, norma):
+    """
+    YCbCr en coma flotante, redondeado al entero más cercano.
+    """
+    centro = (maximo + 1) // 2
+    ycc = banda.astype(np.float64) @ color.coeficientes(norma).T + \
+        [0, centro, centro]
+
+    return np.clip(np.floor(ycc + 0.5), 0, maximo).astype(np.int64)
+
+def comparar(obtenida, esperada):
+    diferencia = np.abs(obtenida.astype(np.int64) - esperada)
+
+    assert diferencia.max() <= 1
+    assert np.mean(diferencia == 0) > 0.999
+
+@pytest.mark.parametrize("maximo", [255, 65535])
+@pytest.mark.parametrize("norma", sorted(color.NORMAS))
+def test_luma(norma, maximo):
+    banda = aleatoria(maximo)
+    operador = color.Luma(norma)
+    operador.configurar(50, 40, 3, maximo)
+    resultado = operador.aplicar(banda)
+
+    assert resultado.shape == (40, 50, 1)
+    assert resultado.dtype == banda.dtype
+    comparar(resultado[:, :, 0], referencia_ycbcr(banda, maximo, norma)[..., 0])
+
+@pytest.mark.parametrize("maximo", [255, 65535])
+@pytest.mark.parametrize("norma", sorted(color.NORMAS))
+def test_ycbcr(norma, maximo):
+    banda = aleatoria(maximo)
+    operador = color.YCbCr(norma)
+    operador.configurar(50, 40, 3, maximo)
+
+    comparar(operador.aplicar(banda), referencia_ycbcr(banda, maximo, norma))
+
+@pytest.mark.parametrize("norma", sorted(color.NORMAS))
+def test_ycbcr_ida_y_vuelta(norma):
+    # Sin colores extremos, que recortarían la crominancia.
+    banda = aleatoria(255, minimo = 16, semilla = 1) // 2 + 64
+    operador = color.YCbCr(norma)
+    operador.configurar(50, 40, 3, 255)
+    vuelta = color.ycbcr_a_rgb(operador.aplicar(banda), 255, norma)
+
+    assert np.abs(vuelta.astype(int) - banda).max() <= 2
+
+def test_gris_puro():
+    # En un gris, Y es el propio valor y la crominancia queda en el centro.
+    banda = np.repeat(np.arange(256, dtype = np.uint8), 3).reshape(16, 16, 3)
+    operador = color.YCbCr()
+    operador.configurar(16, 16, 3, 255)
+    ycbcr = operador.aplicar(banda).astype(int)
+
+    assert np.array_equal(ycbcr[..., 0], banda[..., 0])
+    assert np.abs(ycbcr[..., 1:] - 128).max() == 0
+
+@pytest.mark.parametrize("maximo", [255, 1023])
+def test_hsv(maximo):
+    banda = aleatoria(maximo, semilla = 2)
+    banda[0, :4] = [[0, 0, 0], [maximo, maximo, maximo], [7, 7, 7],
+                    [maximo, 0, 0]]
+    esperada = np.array([[colorsys.rgb_to_hsv(*(p / maximo)) for p in fila]
+                         for fila in banda.astype(np.float64)]) * maximo
+    diferencia = np.abs(color.rgb_a_hsv(banda, maximo).astype(np.int64) -
+                        np.rint(esperada))
+
+    # El tono casi rojo puede dar la vuelta (0 o maximo).
+    diferencia[..., 0] = np.minimum(diferencia[..., 0],
+                                    maximo - diferencia[..., 0])
+
+    # Sólo puede cambiar el redondeo de los valores que caen justo en x.5.
+    empate = np.abs(esperada % 1 - 0.5) < 1e-9
+
+    assert diferencia.max() <= 1
+    assert not diferencia[~empate].any()
+
+@pytest.mark.parametrize("clase", [color.YCbCr, color.HSV])
+def test_color_un_canal(clase):
+    with pytest.raises(ValueError):
+        clase().configurar(10, 10, 1, 255)
+
+def test_luma_un_canal():
+    # La luminancia de una imagen en gris es la propia imagen.
+    operador = color.Luma("709")
+    operador.configurar(4, 2, 1, 255)
+    banda = np.arange(8, dtype = np.uint8).reshape(2, 4, 1)
+
+    assert operador.aplicar(banda) is banda
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_compartida.py
+
+Pruebas de las imágenes en memoria compartida (compartida.py): se cargan igual
+en las dos disposiciones, las bandas son vistas sin copia y lo que escribe un
+proceso hijo en su banda lo ve el padre.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process
+
+import numpy as np
+import pytest
+
+import pnm
+from compartida import ImagenCompartida
+
+def _invertir_banda(descriptor, inicio, fin):
+    imagen = ImagenCompartida.adjuntar(*descriptor)
+    imagen.intercalada()[inicio:fin] = 255 - imagen.intercalada()[inicio:fin]
+    imagen.cerrar()
+
+@pytest.mark.parametrize("binario", [False, True])
+@pytest.mark.parametrize("disposicion", ["intercalada", "planar"])
+def test_cargar_guardar(tmp_path, disposicion, binario):
+    rng = np.random.default_rng(0)
+    imagen = rng.integers(0, 256, (31, 17, 3)).astype(np.uint8)
+    entrada = str(tmp_path / "entrada.ppm")
+    salida = str(tmp_path / "salida.ppm")
+    pnm.guardar_imagen(entrada, imagen, binario = binario)
+
+    with ImagenCompartida.cargar(entrada, disposicion) as compartida:
+        assert np.array_equal(compartida.intercalada(), imagen)
+        assert np.array_equal(compartida.canal(1), imagen[:, :, 1])
+
+        compartida.guardar(salida)
+
+    assert np.array_equal(pnm.leer_imagen(salida)[0], imagen)
+
+@pytest.mark.parametrize("disposicion", ["intercalada", "planar"])
+def test_bandas_en_procesos(disposicion):
+    imagen = np.arange(40 * 9, dtype = np.uint8).reshape(40, 9)
+
+    with ImagenCompartida.desde_array(imagen, disposicion) as compartida:
+        assert np.shares_memory(compartida.banda(3, 7), compartida.array)
+
+        procesos = [Process(target = _invertir_banda,
+                            args = (compartida.descriptor, inicio, fin))
+                    for inicio, fin in compartida.bandas(3)]
+
+        for proceso in procesos:
+            proceso.start()
+
+        for proceso in procesos:
+            proceso.join()
+
+        assert np.array_equal(compartida.intercalada()[:, :, 0], 255 - imagen)
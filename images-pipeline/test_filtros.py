@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_filtros.py
+
+Pruebas de los filtros de vecindad (filtros.py) frente a una referencia que
+rellena la imagen entera con np.pad y suma la ventana de cada píxel con el
+núcleo de dos dimensiones (o calcula su mediana): la misma imagen con
+cualquier tratamiento del borde, número de procesos y tamaño de bloque. Las
+convoluciones se hacen en float32, así que pueden quedarse a una unidad; la
+mediana es exacta.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import filtros
+import pnm
+from test_tuberia import generar, muestras
+
+def desplazadas(imagen, radio, borde):
+    """
+    Las (2r + 1) ** 2 copias de la imagen rellenada, desplazadas a cada
+    posición de la ventana.
+    """
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1).astype(
+        np.float64)
+    alto, ancho = imagen.shape[:2]
+    relleno = np.pad(imagen, ((radio, radio), (radio, radio), (0, 0)),
+                     mode = filtros.BORDES[borde])
+    diametro = 2 * radio + 1
+
+    return [[relleno[dy:dy + alto, dx:dx + ancho] for dx in range(diametro)]
+            for dy in range(diametro)]
+
+def convolucion(imagen, nucleo, borde):
+    copias = desplazadas(imagen, len(nucleo) // 2, borde)
+
+    return sum(nucleo[dy] * nucleo[dx] * copias[dy][dx]
+               for dy in range(len(nucleo)) for dx in range(len(nucleo)))
+
+def referencia(imagen, nombre, borde):
+    """
+    Resultado esperado de un filtro, de forma (alto, ancho, canales).
+    """
+    centro = imagen.reshape(imagen.shape[0], imagen.shape[1], -1)
+
+    if nombre == "mediana":
+        copias = desplazadas(imagen, 2, borde)
+
+        return np.median([c for fila in copias for c in fila], axis = 0)
+
+    if nombre == "gaussiano":
+        resultado = convolucion(imagen, filtros.nucleo_gaussiano(1.2), borde)
+
+    elif nombre == "caja":
+        resultado = convolucion(imagen, filtros.nucleo_caja(2), borde)
+
+    else:
+        resultado = centro + 1.5 * (centro - convolucion(
+            imagen, filtros.nucleo_gaussiano(1.0), borde))
+
+    return np.clip(np.rint(resultado), 0, 255)
+
+FILTROS = {
+    "gaussiano": lambda: filtros.Gaussiano(1.2),
+    "caja": lambda: filtros.Caja(2),
+    "enfocar": lambda: filtros.Enfocar(1.0, 1.5),
+    "mediana": lambda: filtros.Mediana(2),
+}
+
+@pytest.mark.parametrize("borde", sorted(filtros.BORDES))
+@pytest.mark.parametrize("nombre", sorted(FILTROS))
+def test_filtro(monkeypatch, tmp_path, nombre, borde):
+    # Bloques pequeños: los halos se leen de las filas vecinas.
+    monkeypatch.setattr(filtros, "FILAS_BLOQUE", 7)
+    monkeypatch.setattr(filtros, "MUESTRAS_MEDIANA", 500)
+    entrada, imagen = generar(str(tmp_path), 3, True, alto = 31, ancho = 23)
+    esperada = referencia(imagen, nombre, borde)
+    salida = str(tmp_path / "salida.ppm")
+
+    for procesos in (1, 3):
+        filtros.filtrar(entrada, salida, FILTROS[nombre](), procesos, borde)
+        diferencia = np.abs(muestras(salida) - esperada)
+
+        if nombre == "mediana":
+            assert not diferencia.any()
+        else:
+            assert diferencia.max() <= 1
+            assert np.mean(diferencia == 0) > 0.99
+
+def test_gris_ascii(tmp_path):
+    entrada, imagen = generar(str(tmp_path), 1, False, alto = 12, ancho = 9)
+    salida = str(tmp_path / "salida.pgm")
+
+    filtros.filtrar(entrada, salida, filtros.Mediana(1), 2, "replicar",
+                    binario = False)
+
+    assert pnm.leer_cabecera(salida).tipo == "P2"
+    assert np.array_equal(muestras(salida)[:, :, 0], np.median(
+        [c for fila in desplazadas(imagen, 1, "replicar") for c in fila],
+        axis = 0)[:, :, 0])
+
+def test_nucleos():
+    assert filtros.nucleo_gaussiano(2.0).sum() == pytest.approx(1)
+    assert len(filtros.nucleo_gaussiano(2.0)) == 13
+    assert np.allclose(filtros.nucleo_caja(1), [1 / 3] * 3)
+
+def test_borde_desconocido(tmp_path):
+    entrada, _ = generar(str(tmp_path), 1, True)
+
+    with pytest.raises(ValueError):
+        filtros.filtrar(entrada, str(tmp_path / "salida.pgm"),
+                        filtros.Caja(), borde = "espejo")
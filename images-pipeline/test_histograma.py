@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_histograma.py
+
+Pruebas de la ecualización por histograma y de CLAHE (histograma.py) frente a
+implementaciones de referencia que recorren los valores y las teselas una a
+una: la misma imagen con cualquier tamaño de banda y número de procesos.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import histograma
+from test_tuberia import generar, muestras
+from tuberia import Tuberia
+
+def referencia_histograma(imagen, maximo = 255):
+    """
+    Ecualización de cada canal con la CDF de su histograma, valor a valor.
+    """
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1)
+    resultado = np.empty(imagen.shape, dtype = np.int64)
+
+    for k in range(imagen.shape[2]):
+        cuentas = Counter(imagen[:, :, k].ravel().tolist())
+        total = imagen.shape[0] * imagen.shape[1]
+        cdf_min = cuentas[min(cuentas)]
+        tabla = {}
+        acumulado = 0
+
+        for v in sorted(cuentas):
+            acumulado += cuentas[v]
+            tabla[v] = (0 if total == cdf_min else
+                        round((acumulado - cdf_min) / (total - cdf_min) *
+                              maximo))
+
+        resultado[:, :, k] = np.vectorize(tabla.get)(imagen[:, :, k])
+
+    return resultado
+
+def referencia_clahe(imagen, teselas, limite, maximo = 255):
+    """
+    CLAHE tesela a tesela y píxel a píxel: tabla de cada tesela con su
+    histograma recortado e interpolación bilineal entre los centros de las
+    cuatro teselas más cercanas.
+    """
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1)
+    alto, ancho, canales = imagen.shape
+    niveles = maximo + 1
+    th, tw = -(-alto // teselas[0]), -(-ancho // teselas[1])
+    filas, columnas = -(-alto // th), -(-ancho // tw)
+    tablas = np.empty((canales, filas, columnas, niveles))
+
+    for k in range(canales):
+        for i in range(filas):
+            for j in range(columnas):
+                trozo = imagen[i * th:(i + 1) * th, j * tw:(j + 1) * tw, k]
+                cuentas = np.bincount(trozo.ravel(), minlength = niveles)
+                tope = max(limite * trozo.size / niveles, 1)
+                exceso = sum(max(c - tope, 0) for c in cuentas)
+                recortado = [min(c, tope) + exceso / niveles for c in cuentas]
+                cdf = np.cumsum(recortado)
+                tablas[k, i, j] = np.clip(np.rint(cdf / cdf[-1] * maximo), 0,
+                                          maximo)
+
+    def vecinas(posicion, tam, n):
+        centro = (posicion + 0.5) / tam - 0.5
+        primera = int(np.floor(centro))
+
+        return (min(max(primera, 0), n - 1), min(max(primera + 1, 0), n - 1),
+                centro - primera)
+
+    resultado = np.empty(imagen.shape, dtype = np.int64)
+
+    for y in range(alto):
+        f0, f1, pf = vecinas(y, th, filas)
+
+        for x in range(ancho):
+            c0, c1, pc = vecinas(x, tw, columnas)
+
+            for k in range(canales):
+                v = imagen[y, x, k]
+                t = tablas[k]
+                arriba = (1 - pc) * t[f0, c0, v] + pc * t[f0, c1, v]
+                abajo = (1 - pc) * t[f1, c0, v] + pc * t[f1, c1, v]
+                resultado[y, x, k] = np.rint((1 - pf) * arriba + pf * abajo)
+
+    return resultado
+
+@pytest.mark.parametrize("canales", [1, 3])
+def test_ecualizar_histograma(tmp_path, canales):
+    entrada, imagen = generar(str(tmp_path), canales, True)
+    esperada = referencia_histograma(imagen)
+    salida = str(tmp_path / "salida.pnm")
+
+    for procesos in (1, 2):
+        for filas in (1, 16, 70):
+            histograma.ecualizar(entrada, salida, filas, procesos)
+
+            assert np.array_equal(muestras(salida), esperada)
+
+def test_canal_constante():
+    tablas = histograma.tabla_cdf(np.array([[0, 0, 9, 0], [1, 0, 2, 1]]), 3)
+
+    assert tablas.tolist() == [[0, 0, 0, 0], [0, 0, 2, 3]]
+
+@pytest.mark.parametrize("teselas, limite", [((8, 8), 2.0), ((4, 3), 1.5),
+                                             ((1, 1), 40.0)])
+@pytest.mark.parametrize("canales", [1, 3])
+def test_clahe(tmp_path, canales, teselas, limite):
+    entrada, imagen = generar(str(tmp_path), canales, False, alto = 37,
+                              ancho = 29)
+    esperada = referencia_clahe(imagen, teselas, limite)
+    salida = str(tmp_path / "salida.pnm")
+
+    for procesos in (1, 2):
+        for filas in (1, 5, 37):
+            Tuberia([histograma.CLAHE(teselas, limite)], filas,
+                    procesos).ejecutar(entrada, salida)
+
+            assert np.array_equal(muestras(salida), esperada)
+
+def test_recortar():
+    # Con límite 1 el histograma recortado queda plano y conserva el total.
+    recortado = histograma.recortar(np.array([8, 0, 0, 0]), 1)
+
+    assert recortado.tolist() == [2.0 + 6 / 4, 6 / 4, 6 / 4, 6 / 4]
+    assert recortado.sum() == 8
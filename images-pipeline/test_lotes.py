@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_lotes.py
+
+Pruebas del procesado por lotes (lotes.py): cada salida es la misma que da la
+tubería con la imagen sola, tanto si la imagen va entera a un proceso como si
+se reparten sus bandas; las salidas al día se omiten (por fecha o por resumen)
+y una imagen que falla no detiene el lote.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from multiprocessing import Pool
+import json
+import os
+
+import numpy as np
+import pytest
+
+import lotes
+import piramide
+import pnm
+from test_tuberia import generar, muestras
+from tuberia import Tuberia
+
+@pytest.fixture(scope = "module")
+def pool():
+    with Pool(2) as pool:
+        yield pool
+
+def lote(directorio):
+    """
+    Imágenes de distintos tamaños y canales en el directorio.
+    """
+    return [generar(directorio, canales, binario, alto, ancho, semilla,
+                    "imagen%d" % semilla)[0]
+            for semilla, (canales, binario, alto, ancho)
+            in enumerate([(3, True, 70, 45), (1, False, 20, 90),
+                          (3, False, 5, 7), (1, True, 64, 64)])]
+
+@pytest.mark.parametrize("umbral", [0, 1000, lotes.UMBRAL_BANDAS])
+@pytest.mark.parametrize("operacion", ["gris", "ecualizar", "gris,clahe"])
+def test_lote(tmp_path, pool, operacion, umbral):
+    # Con umbral 0 todas se reparten por bandas; con el umbral por defecto
+    # todas van enteras a un proceso.
+    entradas = lote(str(tmp_path))
+    directorio = str(tmp_path / "salida")
+
+    resultados = lotes.procesar_lote(entradas, directorio, operacion, pool,
+                                     filas = 16, umbral = umbral)
+
+    assert [r.entrada for r in resultados] == entradas
+
+    for resultado in resultados:
+        assert resultado.modo == ("bandas" if resultado.pixeles >= umbral
+                                  else "imagen")
+
+        esperada = str(tmp_path / "esperada.pnm")
+        Tuberia(lotes.operadores(operacion)).ejecutar(resultado.entrada,
+                                                      esperada)
+
+        assert np.array_equal(muestras(resultado.salida), muestras(esperada))
+
+@pytest.mark.parametrize("por_resumen", [False, True])
+def test_omitir_al_dia(tmp_path, pool, por_resumen):
+    entradas = lote(str(tmp_path))
+    directorio = str(tmp_path / "salida")
+
+    primero = lotes.procesar_lote(entradas, directorio, "gris", pool,
+                                  por_resumen = por_resumen)
+    segundo = lotes.procesar_lote(entradas, directorio, "gris", pool,
+                                  por_resumen = por_resumen)
+
+    assert [r.modo for r in primero] == ["imagen"] * 4
+    assert [r.modo for r in segundo] == ["omitida"] * 4
+
+    # Una entrada modificada (con fecha posterior a su salida) se repite.
+    generar(str(tmp_path), 3, True, 70, 45, 9, "imagen0")
+    os.utime(entradas[0], (os.path.getmtime(primero[0].salida) + 10,) * 2)
+
+    tercero = lotes.procesar_lote(entradas, directorio, "gris", pool,
+                                  por_resumen = por_resumen)
+
+    assert [r.modo for r in tercero] == ["imagen"] + ["omitida"] * 3
+
+@pytest.mark.parametrize("por_resumen", [False, True])
+def test_piramide_al_dia(tmp_path, pool, por_resumen):
+    entradas = lote(str(tmp_path))[:2]
+    directorio = str(tmp_path / "salida")
+
+    def modos(niveles):
+        return [r.modo for r in lotes.procesar_lote(
+            entradas, directorio, "gris", pool, por_resumen = por_resumen,
+            niveles = niveles)]
+
+    primero = lotes.procesar_lote(entradas, directorio, "gris", pool,
+                                  por_resumen = por_resumen, niveles = 2)
+
+    assert modos(2) == ["omitida"] * 2
+
+    # Falta un nivel de la primera: se repite sólo ésa.
+    os.remove(piramide.nombre_nivel(primero[0].salida, 2))
+
+    assert modos(2) == ["imagen", "omitida"]
+
+    # Con más niveles de los generados, se repiten todas.
+    assert modos(3) == ["imagen"] * 2
+    assert all(os.path.exists(piramide.nombre_nivel(r.salida, 3))
+               for r in primero)
+
+    # Un nivel anterior a la entrada no está al día.
+    fecha = os.path.getmtime(entradas[1])
+    os.utime(piramide.nombre_nivel(primero[1].salida, 1), (fecha - 10,) * 2)
+
+    assert modos(3) == ["omitida", "omitida" if por_resumen else "imagen"]
+
+def test_mostrar_y_registrar(tmp_path, pool):
+    entradas = lote(str(tmp_path))
+    roto = str(tmp_path / "roto.ppm")
+    corto = str(tmp_path / "corto.ppm")
+    directorio = str(tmp_path / "salida")
+
+    with open(roto, "wb") as f:
+        f.write(b"P7 1 1 255\n")
+
+    with open(corto, "wb") as f:
+        f.write(b"P6 10 10 255\n" + bytes(30))
+
+    entradas = [roto, corto] + entradas
+
+    for modos in (["error", "error"] + ["imagen"] * 4,
+                  ["error", "error"] + ["omitida"] * 4):
+        mostrados = []
+        resultados = lotes.procesar_lote(entradas, directorio, "gris", pool,
+                                         por_resumen = True,
+                                         mostrar = mostrados.append)
+
+        # Todas las imágenes pasan por mostrar, también las omitidas y las
+        # que fallan al leer la cabecera.
+        assert [r.modo for r in resultados] == modos
+        assert sorted(mostrados) == sorted(resultados)
+
+        # Sólo se registran las salidas generadas.
+        with open(os.path.join(directorio, lotes.FICHERO_ESTADO)) as f:
+            assert sorted(json.load(f)) == sorted(
+                os.path.basename(r.salida) for r in resultados[2:])
+
+def test_errores(tmp_path, pool):
+    entradas = lote(str(tmp_path))
+    roto = str(tmp_path / "roto.ppm")
+    corto = str(tmp_path / "corto.ppm")
+
+    with open(roto, "wb") as f:
+        f.write(b"P7 1 1 255\n")
+
+    with open(corto, "wb") as f:
+        f.write(b"P6 10 10 255\n" + bytes(30))
+
+    # La operación de color no admite imágenes de un canal.
+    resultados = lotes.procesar_lote([roto, corto] + entradas,
+                                     str(tmp_path / "salida"), "ycbcr", pool,
+                                     umbral = 1000)
+
+    assert [r.modo for r in resultados] == ["error", "error", "bandas",
+                                            "error", "imagen", "error"]
+    assert not os.path.exists(resultados[1].salida)
+
+def test_buscar_entradas(tmp_path):
+    entradas = lote(str(tmp_path))
+    (tmp_path / "notas.txt").write_text("no es una imagen\n")
+    manifiesto = tmp_path / "lista.txt"
+    manifiesto.write_text("# comentario\nimagen2.ppm\n\nimagen0.ppm\n"
+                          "imagen2.ppm\n")
+
+    assert lotes.buscar_entradas(str(tmp_path)) == entradas
+    assert lotes.buscar_entradas(str(tmp_path / "*.pgm")) == \
+        [entradas[1], entradas[3]]
+    assert lotes.buscar_entradas(str(manifiesto)) == \
+        [entradas[2], entradas[0]]
+
+def test_numero_procesos():
+    cabecera = pnm.Cabecera("P6", 1000, 1000, 255, 3, True, 0)
+    banda = 64 * 1000 * 3 * lotes.FACTOR_MEMORIA
+
+    assert lotes.numero_procesos([cabecera], 64, 3 * banda, 8) == 3
+    assert lotes.numero_procesos([cabecera], 64, 3 * banda, 2) == 2
+    assert lotes.numero_procesos([cabecera], 64, 0, 8) == 1
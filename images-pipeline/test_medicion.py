@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_medicion.py
+
+Pruebas de la instrumentación (medicion.py) con un reloj simulado: el tiempo de
+las etapas interiores se descuenta de las exteriores, el rendimiento y la
+fracción de E/S salen de los tiempos y volúmenes acumulados, los trabajadores
+envían su medición por la cola y cada ejecución añade una línea JSON al
+fichero de registro, también desde la tubería y los programas originales.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import medicion
+from test_nucleos import RAIZ, generar
+from tuberia import Normalizar, Tuberia
+
+class Reloj:
+    """
+    Reloj simulado: avanza sólo cuando se le pide.
+    """
+    def __init__(self):
+        self.ahora = 100.0
+
+    def __call__(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(medicion, "perf_counter", reloj)
+
+    return reloj
+
+def test_etapas_anidadas(reloj):
+    medida = medicion.Medicion("prueba", procesos = 2)
+
+    with medida.etapa("calculo", pixeles = 1000):
+        reloj.avanzar(1.0)
+
+        with medida.etapa("decodificacion", bytes = 300):
+            reloj.avanzar(2.0)
+
+        reloj.avanzar(0.5)
+
+    with medida.etapa("codificacion", bytes = 100) as etapa:
+        etapa.pixeles += 50
+        reloj.avanzar(0.5)
+
+    medida.contar("codificacion", bytes = 100)
+    reloj.avanzar(1.0)
+    registro = medida.registro()
+
+    assert registro["segundos"] == 5.0
+    assert registro["parametros"] == {"procesos": 2}
+    assert registro["etapas"]["calculo"] == {
+        "segundos": 1.5, "bytes": 0, "pixeles": 1000, "veces": 1,
+        "pixeles_por_segundo": 1000 / 1.5}
+    assert registro["etapas"]["decodificacion"]["bytes_por_segundo"] == 150
+    assert registro["etapas"]["codificacion"]["bytes"] == 200
+    assert registro["fraccion_es"] == 2.5 / 4.0
+    assert registro["limitante"] == "E/S"
+
+def test_limitante_calculo(reloj):
+    medida = medicion.Medicion("prueba")
+
+    assert medida.registro()["fraccion_es"] is None
+
+    with medida.etapa("calculo"):
+        reloj.avanzar(3.0)
+
+    with medida.etapa("codificacion"):
+        reloj.avanzar(1.0)
+
+    assert medida.registro()["limitante"] == "calculo"
+
+def test_etapa_con_excepcion(reloj):
+    # El tiempo se cuenta aunque el bloque termine con una excepción.
+    medida = medicion.Medicion("prueba")
+
+    with pytest.raises(ZeroDivisionError):
+        with medida.etapa("calculo"):
+            reloj.avanzar(2.0)
+            1 / 0
+
+    assert medida.etapas["calculo"].segundos == 2.0
+
+def _trabajar(cola, nombre):
+    with medicion.trabajador(cola, nombre, pixeles = 500):
+        pass
+
+def test_trabajadores():
+    medida = medicion.Medicion("prueba")
+    procesos = [Process(target = _trabajar,
+                        args = (medida.cola_trabajadores(), "P%d" % i))
+                for i in (2, 1)]
+
+    for proceso in procesos:
+        proceso.start()
+
+    for proceso in procesos:
+        proceso.join()
+
+    registro = medida.terminar(os.devnull)
+
+    assert [t["nombre"] for t in registro["trabajadores"]] == ["P1", "P2"]
+    assert all(t["pixeles"] == 500 and t["pid"] != os.getpid()
+               for t in registro["trabajadores"])
+
+def test_trabajador_sin_cola():
+    with medicion.trabajador(None, "P1"):
+        pass
+
+def test_terminar(monkeypatch, tmp_path, reloj):
+    fichero = tmp_path / "medicion.jsonl"
+    monkeypatch.setenv(medicion.VARIABLE, str(fichero))
+
+    for i in range(2):
+        medida = medicion.Medicion("prueba", indice = i)
+        reloj.avanzar(1.0)
+        medida.terminar()
+
+    registros = [json.loads(linea) for linea
+                 in fichero.read_text().splitlines()]
+
+    assert [r["parametros"]["indice"] for r in registros] == [0, 1]
+    assert all(r["segundos"] == 1.0 for r in registros)
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_tuberia(tmp_path, procesos):
+    entrada, imagen = generar(str(tmp_path), True)
+    salida = str(tmp_path / "salida.ppm")
+    medida = medicion.Medicion("tuberia")
+
+    Tuberia([Normalizar()], 16, procesos).ejecutar(entrada, salida,
+                                                   medicion = medida)
+
+    etapas = medida.registro()["etapas"]
+    pixeles = imagen.shape[0] * imagen.shape[1]
+
+    assert etapas["calculo"]["pixeles"] == pixeles
+    assert etapas["codificacion"]["pixeles"] == pixeles
+    assert etapas["codificacion"]["bytes"] == os.path.getsize(salida)
+
+    # Dos pasadas: la previa (máximo y mínimo) y la de la salida.
+    assert etapas["decodificacion"]["bytes"] == 2 * os.path.getsize(entrada)
+
+def test_programa_original(tmp_path):
+    entrada, _ = generar(str(tmp_path), True)
+    fichero = tmp_path / "medicion.jsonl"
+
+    subprocess.run([sys.executable, os.path.join(
+        RAIZ, "images-equalization", "ecualizador.py")],
+                   input = entrada + "\n2\n", text = True, check = True,
+                   cwd = str(tmp_path), stdout = subprocess.DEVNULL,
+                   env = dict(os.environ, MEDICION_IMAGENES = str(fichero)))
+
+    registro, = [json.loads(linea) for linea
+                 in fichero.read_text().splitlines()]
+
+    assert registro["programa"] == "ecualizador"
+    assert registro["parametros"]["procesos"] == 2
+    assert {"decodificacion", "calculo", "codificacion"} <= set(
+        registro["etapas"])
+    assert len(registro["trabajadores"]) > 0
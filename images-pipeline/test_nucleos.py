@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_nucleos.py
+
+Pruebas de los núcleos vectorizados (nucleos.py) y de los programas originales
+que los usan (color_secuencial.py, color_procesos.py y ecualizador.py) frente
+al resultado calculado píxel a píxel: (r + g + b) // 3 para el gris y
+int((v - min) / (max - min) * 255) para la ecualización.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from multiprocessing import Array
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import nucleos
+import pnm
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+def referencia(imagen, operacion):
+    """
+    Resultado esperado de una operación, de forma (alto, ancho, canales).
+    """
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1).astype(
+        np.int64)
+
+    if operacion == "gris":
+        return (imagen.sum(axis = 2) // imagen.shape[2])[:, :, None]
+
+    minimos = imagen.min(axis = (0, 1))
+    rango = imagen.max(axis = (0, 1)) - minimos
+
+    return ((imagen - minimos) / rango * 255).astype(np.int64)
+
+def generar(directorio, binario, alto = 70, ancho = 45, semilla = 0):
+    """
+    Guarda una imagen PPM aleatoria y devuelve su nombre y sus muestras.
+    """
+    rng = np.random.default_rng(semilla)
+    imagen = rng.integers(16, 240, (alto, ancho, 3)).astype(np.uint8)
+    fichero = os.path.join(directorio, "imagen_%s.ppm" % (
+        "binario" if binario else "ascii"))
+    pnm.guardar_imagen(fichero, imagen, binario = binario)
+
+    return fichero, imagen
+
+def test_dividir():
+    assert nucleos.dividir(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert nucleos.dividir(2, 4) == [(0, 1), (1, 2), (2, 2), (2, 2)]
+
+def test_gris_en_memoria_compartida():
+    # Como EliminarColor: el resultado se escribe en el propio canal rojo.
+    rng = np.random.default_rng(1)
+    canales = [rng.integers(0, 256, 1000) for _ in range(3)]
+    compartidos = [Array('i', c.tolist(), lock = False) for c in canales]
+
+    nucleos.gris(*compartidos, salida = compartidos[0])
+
+    assert list(compartidos[0]) == [(r + g + b) // 3 for r, g, b
+                                    in zip(*canales)]
+
+@pytest.mark.parametrize("minimo, maximo", [(16, 239), (0, 255), (7, 7)])
+def test_normalizar(minimo, maximo):
+    canal = np.linspace(minimo, maximo, 500).astype(np.intc)
+
+    assert nucleos.extremos(canal) == (maximo, minimo)
+
+    esperado = [0 if maximo == minimo else
+                int((v - minimo) / (maximo - minimo) * 255) for v in canal]
+
+    assert nucleos.normalizar(canal, maximo, minimo).tolist() == esperado
+
+def test_extremos_vacio():
+    assert nucleos.extremos(np.zeros(0, dtype = np.intc)) is None
+
+PROGRAMAS = {
+    "gris": (("images-gray_conversion", "color_secuencial.py", "_gray.pgm",
+              False),
+             ("images-gray_conversion", "color_procesos.py", "_gray.pgm",
+              True)),
+    "ecualizar": (("images-equalization", "ecualizador.py", "_ecual.ppm",
+                   True),),
+}
+
+def ejecutar(directorio, programa, entrada, procesos = None):
+    """
+    Ejecuta uno de los programas originales respondiendo a sus preguntas (el
+    nombre de la imagen y, si lo pide, el número de procesos). Devuelve lo
+    que ha escrito en la salida de errores (incluidos sus procesos).
+    """
+    respuestas = entrada + "\n" + ("%d\n" % procesos if procesos else "")
+
+    return subprocess.run(
+        [sys.executable, os.path.join(RAIZ, directorio, programa)],
+        input = respuestas, text = True, check = True,
+        cwd = os.path.dirname(entrada), stdout = subprocess.DEVNULL,
+        stderr = subprocess.PIPE,
+        env = dict(os.environ, MEDICION_IMAGENES = os.devnull)).stderr
+
+@pytest.mark.parametrize("binario", [False, True])
+@pytest.mark.parametrize("operacion", sorted(PROGRAMAS))
+def test_programas_originales(tmp_path, operacion, binario):
+    entrada, imagen = generar(str(tmp_path), binario)
+    esperada = referencia(imagen, operacion)
+
+    for directorio, programa, sufijo, pide_procesos in PROGRAMAS[operacion]:
+        ejecutar(directorio, programa, entrada, 2 if pide_procesos else None)
+        salida, _ = pnm.leer_imagen(os.path.splitext(entrada)[0] + sufijo)
+
+        assert np.array_equal(salida.reshape(esperada.shape), esperada)
+
+@pytest.mark.parametrize("binario", [False, True])
+def test_ecualizador_mas_procesos_que_pixeles(tmp_path, binario):
+    # Los procesos sin píxeles no envían máximo ni mínimo.
+    entrada, imagen = generar(str(tmp_path), binario, 2, 2)
+    esperada = referencia(imagen, "ecualizar")
+
+    errores = ejecutar("images-equalization", "ecualizador.py", entrada, 8)
+    salida, _ = pnm.leer_imagen(os.path.splitext(entrada)[0] + "_ecual.ppm")
+
+    assert np.array_equal(salida.reshape(esperada.shape), esperada)
+    assert errores == ""
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_piramide.py
+
+Pruebas de la reducción de imágenes (piramide.py): el promedio por áreas
+coincide con la media de cada bloque calculada uno a uno, y los reductores dan
+lo mismo recibiendo la imagen por bandas de cualquier tamaño que de una vez.
+Los niveles de la pirámide y la miniatura se generan en la misma pasada de la
+tubería.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import piramide
+from test_tuberia import generar, muestras
+from tuberia import Gris, Tuberia
+
+def medias_bloques(imagen, factor):
+    """
+    Media de cada bloque de factor x factor (incompletos en el borde),
+    bloque a bloque.
+    """
+    alto, ancho, canales = imagen.shape
+    resultado = np.empty((-(-alto // factor), -(-ancho // factor), canales))
+
+    for i in range(resultado.shape[0]):
+        for j in range(resultado.shape[1]):
+            bloque = imagen[i * factor:(i + 1) * factor,
+                            j * factor:(j + 1) * factor]
+            resultado[i, j] = bloque.reshape(-1, canales).mean(axis = 0)
+
+    return resultado
+
+def por_bandas(reductor, imagen, filas):
+    return np.concatenate([reductor.escribir(imagen[i:i + filas])
+                           for i in range(0, len(imagen), filas)])
+
+@pytest.mark.parametrize("factor", [2, 3, 4, 8])
+def test_reducir_area(factor):
+    imagen = np.random.default_rng(0).integers(0, 256, (37, 23, 3))
+
+    assert np.allclose(piramide.reducir_area(imagen, factor),
+                       medias_bloques(imagen, factor))
+
+@pytest.mark.parametrize("filas", [1, 3, 5, 16, 37])
+@pytest.mark.parametrize("factor", [2, 3, 4])
+def test_reductor_area(factor, filas):
+    imagen = np.random.default_rng(1).integers(0, 256, (37, 23, 3)).astype(
+        np.uint8)
+    reductor = piramide.ReductorArea(23, 37, 3, factor, 255)
+    esperada = piramide.reducir_area(imagen, factor, 255)
+
+    assert np.array_equal(por_bandas(reductor, imagen, filas), esperada)
+
+def test_pesos_lanczos():
+    assert np.allclose(piramide.lanczos(np.array([0.0, 1.0, -2.0, 3.0, 4.5])),
+                       [1, 0, 0, 0, 0])
+
+    for entrada, salida in ((100, 37), (37, 100), (10, 10)):
+        indices, pesos = piramide.pesos_lanczos(entrada, salida)
+
+        assert np.allclose(pesos.sum(axis = 1), 1)
+        assert indices.min() >= 0 and indices.max() < entrada
+
+    # Con el mismo tamaño, cada salida es su entrada.
+    indices, pesos = piramide.pesos_lanczos(10, 10)
+
+    assert np.allclose((pesos * (indices == np.arange(10)[:, None])).sum(
+        axis = 1), 1)
+
+@pytest.mark.parametrize("filas", [1, 4, 11, 40])
+@pytest.mark.parametrize("nuevo", [(17, 9), (23, 40), (5, 1)])
+def test_reductor_lanczos(nuevo, filas):
+    imagen = np.random.default_rng(2).integers(0, 256, (40, 23, 3)).astype(
+        np.uint8)
+    nuevo_ancho, nuevo_alto = nuevo
+    columnas, pesos_columnas = piramide.pesos_lanczos(23, nuevo_ancho)
+    filas_entrada, pesos_filas = piramide.pesos_lanczos(40, nuevo_alto)
+
+    # Remuestreo separable de la imagen entera, píxel a píxel.
+    horizontal = np.array([[(imagen[y, columnas[j]] *
+                             pesos_columnas[j][:, None]).sum(axis = 0)
+                            for j in range(nuevo_ancho)] for y in range(40)])
+    esperada = np.array([(horizontal[filas_entrada[i]] *
+                          pesos_filas[i][:, None, None]).sum(axis = 0)
+                         for i in range(nuevo_alto)])
+    esperada = np.clip(np.rint(esperada), 0, 255)
+
+    reductor = piramide.ReductorLanczos(23, 40, 3, nuevo_ancho, nuevo_alto,
+                                        255)
+    resultado = por_bandas(reductor, imagen, filas)
+
+    assert resultado.shape == (nuevo_alto, nuevo_ancho, 3)
+    assert np.abs(resultado - esperada).max() <= 1
+
+def test_lanczos_constante():
+    imagen = np.full((30, 20, 1), 77, dtype = np.uint8)
+    reductor = piramide.ReductorLanczos(20, 30, 1, 7, 11, 255)
+
+    assert (por_bandas(reductor, imagen, 4) == 77).all()
+
+@pytest.mark.parametrize("binario", [False, True])
+def test_piramide_en_tuberia(tmp_path, binario):
+    entrada, _ = generar(str(tmp_path), 3, True)
+    salida = str(tmp_path / "salida.pgm")
+
+    Tuberia([Gris()], 7, 2).ejecutar(
+        entrada, salida, binario,
+        [piramide.Piramide(salida, 3, 2, binario),
+         piramide.Miniatura(str(tmp_path / "mini.pgm"), 20, binario)])
+
+    gris = muestras(salida)
+
+    for nivel in (1, 2, 3):
+        fichero = piramide.nombre_nivel(salida, nivel)
+
+        assert fichero == str(tmp_path / ("salida_n%d.pgm" % nivel))
+        assert np.array_equal(muestras(fichero), piramide.reducir_area(
+            gris, 2 ** nivel, 255))
+
+    assert muestras(str(tmp_path / "mini.pgm")).shape == (20, 13, 1)
+
+def test_piramide_lanczos(tmp_path):
+    entrada, _ = generar(str(tmp_path), 1, True)
+    salida = str(tmp_path / "salida.pgm")
+
+    Tuberia([Gris()], 16).ejecutar(entrada, salida, True,
+                                   [piramide.Piramide(salida, 2, 1.5)])
+
+    assert muestras(piramide.nombre_nivel(salida, 1)).shape == (47, 30, 1)
+    assert muestras(piramide.nombre_nivel(salida, 2)).shape == (31, 20, 1)
+
+class Fallo:
+    """
+    Sumidero que falla al recibir la segunda banda.
+    """
+    def abrir(self, ancho, alto, canales, maximo):
+        self.bandas = 0
+
+    def escribir(self, banda):
+        self.bandas += 1
+
+        if self.bandas == 2:
+            raise RuntimeError("fallo del sumidero")
+
+    def cerrar(self, comprobar = True):
+        self.comprobar = comprobar
+
+def test_error_en_tuberia(tmp_path):
+    # Los niveles a medio escribir se cierran sin comprobar, para que se
+    # propague el error original.
+    entrada, _ = generar(str(tmp_path), 1, True)
+    salida = str(tmp_path / "salida.pgm")
+    niveles = piramide.Piramide(salida, 2)
+    fallo = Fallo()
+
+    with pytest.raises(RuntimeError):
+        Tuberia([Gris()], 16).ejecutar(entrada, salida, True,
+                                       [niveles, fallo])
+
+    assert fallo.comprobar is False
+    assert all(escritor.fichero.closed for escritor in niveles.escritores)
+
+def test_cerrar_incompleta(tmp_path):
+    # Se cierran todos los niveles antes de informar de que faltan filas.
+    niveles = piramide.Piramide(str(tmp_path / "salida.pgm"), 3)
+    niveles.abrir(45, 70, 1, 255)
+
+    with pytest.raises(ValueError):
+        niveles.cerrar()
+
+    assert all(escritor.fichero.closed for escritor in niveles.escritores)
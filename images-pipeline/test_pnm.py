@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_pnm.py
+
+Pruebas del códec PPM/PGM (pnm.py): una imagen guardada en ASCII o en binario,
+con 8 o 16 bits por muestra, se lee igual que se guardó, tanto entera como por
+bandas de cualquier tamaño. Se rechazan los ficheros incompletos o con
+muestras mayores que el máximo de la cabecera y, al escribir en ASCII, las
+muestras que no caben en su columna.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import pnm
+
+def aleatoria(canales, maximo, alto = 37, ancho = 23, semilla = 0):
+    rng = np.random.default_rng(semilla)
+    forma = (alto, ancho, canales) if canales == 3 else (alto, ancho)
+
+    return rng.integers(0, maximo + 1, forma).astype(pnm.tipo_muestra(maximo))
+
+@pytest.mark.parametrize("binario", [False, True])
+@pytest.mark.parametrize("maximo", [255, 1000, 65535])
+@pytest.mark.parametrize("canales", [1, 3])
+def test_ida_y_vuelta(tmp_path, canales, maximo, binario):
+    imagen = aleatoria(canales, maximo)
+    fichero = str(tmp_path / "imagen.pnm")
+    pnm.guardar_imagen(fichero, imagen, maximo, binario)
+
+    leida, cabecera = pnm.leer_imagen(fichero)
+
+    assert cabecera.tipo == {(1, False): "P2", (3, False): "P3",
+                             (1, True): "P5", (3, True): "P6"}[canales,
+                                                               binario]
+    assert (cabecera.ancho, cabecera.alto, cabecera.maximo) == (23, 37, maximo)
+    assert leida.dtype == imagen.dtype
+    assert np.array_equal(leida, imagen)
+
+@pytest.mark.parametrize("binario", [False, True])
+@pytest.mark.parametrize("filas", [1, 5, 37, 100])
+def test_leer_bandas(monkeypatch, tmp_path, filas, binario):
+    # Trozos de lectura pequeños: los números y las líneas se cortan.
+    monkeypatch.setattr(pnm, "TAM_LECTURA", 50)
+    imagen = aleatoria(3, 1000)
+    fichero = str(tmp_path / "imagen.ppm")
+    pnm.guardar_imagen(fichero, imagen, binario = binario)
+
+    bandas = list(pnm.leer_bandas(fichero, filas))
+
+    assert all(len(b) == filas for b in bandas[:-1])
+    assert np.array_equal(np.concatenate(bandas), pnm.leer_imagen(fichero)[0])
+
+def test_comentarios(tmp_path):
+    fichero = tmp_path / "imagen.pgm"
+    fichero.write_bytes(b"P2\n# comentario\n3 2\n# otro 99\n255\n"
+                        b"1 2 3 # fin de fila 4 5\n4 5 6\n")
+
+    assert pnm.leer_imagen(str(fichero))[0].tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert np.concatenate(list(pnm.leer_bandas(str(fichero), 1))).tolist() \
+        == [[1, 2, 3], [4, 5, 6]]
+
+@pytest.mark.parametrize("datos", [b"P2 3 2 255 1 2 3 4 5",
+                                   b"P5 3 2 255 \x01\x02\x03\x04\x05"])
+def test_faltan_datos(tmp_path, datos):
+    fichero = str(tmp_path / "imagen.pgm")
+
+    with open(fichero, "wb") as f:
+        f.write(datos)
+
+    with pytest.raises(ValueError):
+        pnm.leer_imagen(fichero)
+
+    if not datos.startswith(b"P5"):
+        with pytest.raises(ValueError):
+            list(pnm.leer_bandas(fichero, 1))
+
+@pytest.mark.parametrize("datos", [b"P3 2 1 255 300 0 0 0 0 0",
+                                   b"P2 2 2 1000 0 1000 1001 5"])
+def test_ascii_fuera_de_rango(tmp_path, datos):
+    # 300 no se puede leer como 44 (300 % 256).
+    fichero = str(tmp_path / "imagen.pnm")
+
+    with open(fichero, "wb") as f:
+        f.write(datos)
+
+    with pytest.raises(ValueError, match = "fuera del rango"):
+        pnm.leer_imagen(fichero)
+
+    with pytest.raises(ValueError, match = "fuera del rango"):
+        list(pnm.leer_bandas(fichero, 1))
+
+def test_formatear_ascii():
+    assert pnm.formatear_ascii(np.array([[7, 255], [10, 0]]), 255) == \
+        b"  7 255\n 10   0\n"
+
+    with pytest.raises(ValueError):
+        pnm.formatear_ascii(np.array([[[256, 0, 0]]]), 255)
+
+def test_escritor_cuenta_filas(tmp_path):
+    fichero = str(tmp_path / "imagen.pgm")
+    escritor = pnm.EscritorPNM(fichero, 4, 3, 1)
+    escritor.escribir(np.zeros((2, 4), dtype = np.uint8))
+
+    with pytest.raises(ValueError):
+        escritor.cerrar()
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_teselas.py
+
+Pruebas de las imágenes teseladas (teselas.py): con cualquier tamaño de tesela
+y número de procesos, aplicar() da la misma imagen que la tubería por bandas;
+las regiones leídas a través de la caché son las mismas que recortando el
+array, aunque la caché sólo quepa una tesela.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import teselas
+from histograma import CLAHE
+from lotes import OPERACIONES, operadores
+from test_tuberia import generar, muestras
+from tuberia import Tuberia
+
+# Operaciones por píxel (las que se pueden aplicar por teselas).
+POR_PIXEL = sorted(nombre for nombre, crear in OPERACIONES.items()
+                   if crear().por_pixel)
+
+def teselar(entrada, fichero, tam_tesela):
+    teselas.ImagenTeselada.desde_pnm(entrada, fichero, tam_tesela).cerrar()
+
+    return fichero
+
+@pytest.mark.parametrize("operacion", POR_PIXEL)
+def test_aplicar(tmp_path, operacion):
+    entrada, _ = generar(str(tmp_path), 3, True, semilla = 1)
+    esperada = str(tmp_path / "esperada.pnm")
+    salida = str(tmp_path / "salida.pnm")
+    Tuberia(operadores(operacion)).ejecutar(entrada, esperada)
+
+    for procesos, tam_tesela in ((1, (16, 20)), (2, (7, 64)), (2, (70, 45)),
+                                 (3, (1, 1))):
+        teselada = teselar(entrada, str(tmp_path / "entrada.tes"), tam_tesela)
+        tiempos = []
+
+        with teselas.aplicar(teselada, str(tmp_path / "salida.tes"),
+                             operadores(operacion), procesos,
+                             tiempos) as imagen:
+            imagen.a_pnm(salida)
+
+        assert len(tiempos) == len(imagen.indices())
+        assert np.array_equal(muestras(salida), muestras(esperada))
+
+def test_aplicar_rechaza_clahe(tmp_path):
+    entrada, _ = generar(str(tmp_path), 3, True)
+    teselada = teselar(entrada, str(tmp_path / "entrada.tes"), (16, 16))
+
+    with pytest.raises(ValueError):
+        teselas.aplicar(teselada, str(tmp_path / "salida.tes"), [CLAHE()])
+
+@pytest.mark.parametrize("capacidad", [1, teselas.TAM_CACHE])
+@pytest.mark.parametrize("region", [(0, 70, 0, 45), (5, 6, 3, 40),
+                                    (13, 61, 19, 21), (60, 100, 30, 100)])
+def test_recortar(tmp_path, region, capacidad):
+    entrada, imagen = generar(str(tmp_path), 3, True)
+    salida = str(tmp_path / "region.ppm")
+    y0, y1, x0, x1 = region
+
+    with teselas.ImagenTeselada.abrir(teselar(
+            entrada, str(tmp_path / "entrada.tes"), (16, 20))) as teselada:
+        cache = teselas.recortar(teselada, salida, *region,
+                                 capacidad = capacidad)
+
+    assert np.array_equal(muestras(salida), imagen[y0:y1, x0:x1])
+    assert len(cache.teselas) >= 1
+
+def test_region_vacia(tmp_path):
+    entrada, _ = generar(str(tmp_path), 1, True)
+
+    with teselas.ImagenTeselada.abrir(teselar(
+            entrada, str(tmp_path / "entrada.tes"), (16, 20))) as teselada:
+        with pytest.raises(ValueError):
+            teselas.recortar(teselada, str(tmp_path / "region.pgm"), 70, 80,
+                             0, 10)
+
+@pytest.mark.parametrize("region", [None, ["10", "50", "5", "200"]])
+def test_main(tmp_path, region):
+    entrada, _ = generar(str(tmp_path), 3, True)
+    esperada = str(tmp_path / "esperada.pgm")
+    salida = str(tmp_path / "salida.pgm")
+    Tuberia(operadores("gris")).ejecutar(entrada, esperada)
+
+    teselas.main([entrada, salida, "-p", "2", "--tesela", "16", "20",
+                  "-d", str(tmp_path)] +
+                 (["--region"] + region if region else []))
+
+    gris = muestras(esperada)
+
+    assert np.array_equal(muestras(salida),
+                          gris[10:50, 5:] if region else gris)
+
+@pytest.mark.parametrize("region", [["70", "80", "0", "10"],
+                                    ["0", "10", "45", "50"],
+                                    ["5", "5", "0", "10"]])
+def test_main_region_no_valida(tmp_path, region):
+    # La región se comprueba con la cabecera, antes de convertir la entrada.
+    entrada, _ = generar(str(tmp_path), 3, True)
+    salida = tmp_path / "salida.pgm"
+
+    with pytest.raises(SystemExit) as error:
+        teselas.main([entrada, str(salida), "-d", str(tmp_path),
+                      "--region"] + region)
+
+    assert error.value.code == 2
+    assert not salida.exists()
+
+def test_cache_escribe_modificadas(tmp_path):
+    entrada, imagen = generar(str(tmp_path), 1, True)
+    fichero = teselar(entrada, str(tmp_path / "entrada.tes"), (16, 20))
+
+    with teselas.ImagenTeselada.abrir(fichero, "r+") as teselada:
+        # Caché de una tesela: la primera se escribe al expulsarla.
+        cache = teselas.CacheTeselas(teselada, 1)
+
+        for i, j in ((0, 0), (2, 1)):
+            cache.leer(i, j)[...] = 0
+            cache.marcar(i, j)
+
+        cache.vaciar()
+
+        assert cache.fallos == 2
+
+    imagen = imagen.copy()
+    imagen[0:16, 0:20] = 0
+    imagen[32:48, 20:40] = 0
+
+    with teselas.ImagenTeselada.abrir(fichero) as teselada:
+        teselada.a_pnm(str(tmp_path / "salida.pgm"))
+
+    assert np.array_equal(muestras(str(tmp_path / "salida.pgm"))[:, :, 0],
+                          imagen)
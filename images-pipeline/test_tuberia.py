@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_tuberia.py
+
+Pruebas de la tubería por bandas (tuberia.py) frente al resultado calculado
+directamente con NumPy: la misma imagen con uno o varios procesos, con
+cualquier tamaño de banda y con entradas PPM/PGM en ASCII o en binario.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from multiprocessing import Pool
+import os
+
+import numpy as np
+import pytest
+
+import pnm
+import tuberia
+
+def referencia(imagen, operacion):
+    """
+    Resultado esperado de una operación, de forma (alto, ancho, canales):
+    (r + g + b) // 3 para gris y (v - min) / (max - min) * 255 (truncado) en
+    cada canal para ecualizar.
+    """
+    imagen = imagen.reshape(imagen.shape[0], imagen.shape[1], -1).astype(
+        np.int64)
+
+    if operacion == "gris":
+        return (imagen.sum(axis = 2) // imagen.shape[2])[:, :, None]
+
+    minimos = imagen.min(axis = (0, 1))
+    rango = imagen.max(axis = (0, 1)) - minimos
+
+    return ((imagen - minimos) / rango * 255).astype(np.int64)
+
+def generar(directorio, canales, binario, alto = 70, ancho = 45, semilla = 0,
+            nombre = None):
+    """
+    Guarda una imagen aleatoria (de tamaño que no es múltiplo de las bandas ni
+    de las teselas) y devuelve su nombre y sus muestras.
+    """
+    rng = np.random.default_rng(semilla)
+    forma = (alto, ancho, canales) if canales == 3 else (alto, ancho)
+    imagen = rng.integers(16, 240, forma).astype(np.uint8)
+
+    if nombre is None:
+        nombre = "imagen%d_%s" % (canales, "binario" if binario else "ascii")
+
+    fichero = os.path.join(directorio, nombre + (".ppm" if canales == 3
+                                                 else ".pgm"))
+    pnm.guardar_imagen(fichero, imagen, binario = binario)
+
+    return fichero, imagen
+
+def muestras(fichero):
+    """
+    Muestras de una imagen, siempre de forma (alto, ancho, canales).
+    """
+    imagen, _ = pnm.leer_imagen(fichero)
+
+    return imagen.reshape(imagen.shape[0], imagen.shape[1], -1)
+
+OPERADORES = {
+    "gris": tuberia.Gris,
+    "ecualizar": tuberia.Normalizar,
+}
+
+@pytest.mark.parametrize("binario", [False, True])
+@pytest.mark.parametrize("canales", [1, 3])
+@pytest.mark.parametrize("operacion", sorted(OPERADORES))
+def test_tuberia_referencia(tmp_path, operacion, canales, binario):
+    entrada, imagen = generar(str(tmp_path), canales, binario)
+    esperada = referencia(imagen, operacion)
+    salida = str(tmp_path / "salida.pnm")
+
+    for procesos in (1, 2):
+        for filas in (1, 16, 33, 70):
+            tuberia.Tuberia([OPERADORES[operacion]()], filas,
+                            procesos).ejecutar(entrada, salida, binario)
+
+            assert np.array_equal(muestras(salida), esperada)
+
+def test_cadena_y_tablas(tmp_path):
+    # Gris, normalización y gamma encadenados, con el pool de un servicio.
+    entrada, imagen = generar(str(tmp_path), 3, True)
+    salida = str(tmp_path / "salida.pgm")
+    normalizada = referencia(referencia(imagen, "gris"), "ecualizar")
+    esperada = tuberia.Gamma(2.2).tabla[normalizada]
+
+    with Pool(2) as pool:
+        tuberia.Tuberia([tuberia.Gris(), tuberia.Normalizar(),
+                         tuberia.Gamma(2.2)], 9, pool = pool).ejecutar(
+                             entrada, salida)
+
+    assert np.array_equal(muestras(salida), esperada)
+
+def test_tabla_por_canal():
+    tabla = np.array([np.arange(256), 255 - np.arange(256),
+                      np.zeros(256, dtype = np.int64)])
+    banda = np.arange(2 * 4 * 3).reshape(2, 4, 3)
+    resultado = tuberia.Tabla(tabla).aplicar(banda)
+
+    assert np.array_equal(resultado[..., 0], banda[..., 0])
+    assert np.array_equal(resultado[..., 1], 255 - banda[..., 1])
+    assert not resultado[..., 2].any()
+
+def test_canal_constante(tmp_path):
+    # Un canal constante queda a 0, como en ecualizador.py.
+    imagen = np.full((5, 6, 3), 77, dtype = np.uint8)
+    imagen[..., 0] = np.arange(30).reshape(5, 6)
+    entrada = str(tmp_path / "entrada.ppm")
+    salida = str(tmp_path / "salida.ppm")
+    pnm.guardar_imagen(entrada, imagen)
+
+    tuberia.ecualizar(entrada, salida, filas = 2)
+
+    resultado = muestras(salida)
+
+    assert not resultado[..., 1:].any()
+    assert np.array_equal(resultado[..., 0],
+                          (np.arange(30).reshape(5, 6) / 29 * 255).astype(int))
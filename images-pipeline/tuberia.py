@@ -0,0 +1,443 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+tuberia.py
+
+Tubería de procesado de imágenes por bandas de filas. ecualizador.main() lee
+la imagen entera, la recorre con MaxMin, la vuelve a recorrer con Ecualizar y
+la escribe, creando procesos nuevos en cada paso. Aquí la imagen se decodifica
+por bandas (ver pnm.leer_bandas()), cada banda pasa por la cadena de operadores
+(gris, normalización, gamma, tabla) y se codifica en el fichero de salida
+(pnm.EscritorPNM) antes de leer la siguiente: en memoria sólo hay unas pocas
+bandas, nunca la imagen.
+
+Los operadores que necesitan datos de toda la imagen (como Normalizar, que
+necesita el máximo y el mínimo) se resuelven con pasadas previas sobre la
+entrada: en cada una se aplican los operadores anteriores, se calculan los
+estadísticos parciales de cada banda y se van combinando. Las imágenes
+binarias se releen proyectadas en memoria, así que una pasada extra no copia el
+fichero.
+
+Con procesos > 1, las bandas se reparten entre un pool de procesos (imap, que
+devuelve los resultados en orden) y el proceso padre sólo lee y escribe.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from contextlib import nullcontext
+from functools import partial
+from multiprocessing import Pool
+import os
+
+import numpy as np
+
+import pnm
+
+# Filas de cada banda.
+FILAS_BANDA = 64
+
+class Operador:
+    """
+    Operador de la tubería. Por defecto es un operador por píxel que no
+    necesita estadísticos de la imagen; las subclases redefinen aplicar() y,
+    si necesitan una pasada previa, estadisticos() y preparar(). Las bandas
+    llegan con la fila de la imagen en la que empiezan, para los operadores
+    que dependen de la posición.
+    """
+    # True si el operador necesita una pasada previa sobre la imagen.
+    global_ = False
+
+    # True si el resultado de cada píxel sólo depende de su valor (y de los
+    # estadísticos), no de su posición ni de sus vecinos: entonces la imagen
+    # se puede procesar por trozos cualesquiera, no sólo por bandas.
+    por_pixel = True
+
+    def configurar(self, ancho, alto, canales, maximo):
+        """
+        Recibe las dimensiones de la imagen y los canales y el valor máximo
+        de la entrada del operador, antes de cualquier pasada.
+        """
+
+    def salida(self, canales, maximo):
+        """
+        Canales y valor máximo de la salida del operador a partir de los de
+        su entrada.
+        """
+        return canales, maximo
+
+    def estadisticos(self, banda, fila = 0):
+        """
+        Estadísticos parciales de una banda (en la pasada previa).
+        """
+        return None
+
+    def preparar(self, parciales):
+        """
+        Combina los estadísticos parciales de todas las bandas, que llegan en
+        orden por un iterador (sin guardarlos todos a la vez).
+        """
+
+    def aplicar(self, banda, fila = 0):
+        """
+        Aplica el operador a una banda de forma (n, ancho, canales) que
+        empieza en la fila indicada.
+
+        RETURN:
+            - (tipo np.ndarray): banda resultante, también con tres
+            dimensiones.
+        """
+        raise NotImplementedError
+
+class Gris(Operador):
+    """
+    Escala de grises con la media de los tres canales, (r + g + b) // 3, como
+    EliminarColor.
+    """
+    def salida(self, canales, maximo):
+        return 1, maximo
+
+    def aplicar(self, banda, fila = 0):
+        if banda.shape[2] == 1:
+            return banda
+
+        suma = banda.sum(axis = 2, dtype = np.uint32, keepdims = True)
+
+        return (suma // banda.shape[2]).astype(banda.dtype)
+
+class Normalizar(Operador):
+    """
+    Normalización máximo-mínimo de cada canal a [0, maximo], como Ecualizar
+    (con maximo = 255 el resultado es idéntico). Necesita una pasada previa
+    para conocer el máximo y el mínimo de cada canal.
+    """
+    global_ = True
+
+    def __init__(self, maximo = 255):
+        self.maximo = maximo
+        self.minimos = None
+        self.maximos = None
+
+    def salida(self, canales, maximo):
+        return canales, self.maximo
+
+    def estadisticos(self, banda, fila = 0):
+        return banda.min(axis = (0, 1)), banda.max(axis = (0, 1))
+
+    def preparar(self, parciales):
+        self.minimos = self.maximos = None
+
+        for minimos, maximos in parciales:
+            if self.minimos is None:
+                self.minimos, self.maximos = minimos, maximos
+
+            else:
+                self.minimos = np.minimum(self.minimos, minimos)
+                self.maximos = np.maximum(self.maximos, maximos)
+
+    def aplicar(self, banda, fila = 0):
+        minimos = self.minimos.astype(np.float64)
+        rango = self.maximos.astype(np.float64) - minimos
+        dtype = pnm.tipo_muestra(self.maximo)
+
+        # Los canales constantes (rango 0) quedan a 0.
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            normalizada = (banda - minimos) / rango * self.maximo
+
+        normalizada[:, :, rango == 0] = 0
+
+        return normalizada.astype(dtype)
+
+class Tabla(Operador):
+    """
+    Tabla de consulta (LUT): cada muestra v se sustituye por tabla[v]. Si la
+    tabla es de dos dimensiones, la fila k es la tabla del canal k.
+    """
+    def __init__(self, tabla):
+        self.tabla = np.asarray(tabla)
+
+        if self.tabla.dtype.kind not in "ui":
+            raise ValueError("La tabla debe ser de enteros")
+
+        self.tabla = self.tabla.astype(pnm.tipo_muestra(int(self.tabla.max())))
+
+    def salida(self, canales, maximo):
+        return canales, max(int(self.tabla.max()), 1)
+
+    def aplicar(self, banda, fila = 0):
+        if self.tabla.ndim == 1:
+            return self.tabla[banda]
+
+        canales = np.arange(banda.shape[2])
+
+        return self.tabla[canales, banda]
+
+class Gamma(Tabla):
+    """
+    Corrección gamma, maximo * (v / maximo) ** (1 / gamma), mediante una
+    tabla con una entrada por valor posible.
+    """
+    def __init__(self, gamma, maximo = 255):
+        valores = np.arange(maximo + 1) / maximo
+        super().__init__(np.rint(maximo * valores ** (1 / gamma)).astype(
+            np.int64))
+
+    def salida(self, canales, maximo):
+        return canales, maximo
+
+def _etapa(medicion, nombre, pixeles = 0):
+    """
+    Etapa de la medición (ver medicion.Medicion.etapa()) o, si no se mide, un
+    contexto que no hace nada.
+    """
+    if medicion is None:
+        return nullcontext()
+
+    return medicion.etapa(nombre, pixeles = pixeles)
+
+def _bandas(entrada, filas, medicion = None):
+    """
+    Lee la entrada por bandas (ver pnm.leer_bandas()), midiendo la lectura de
+    cada una como decodificación si se indica una medición.
+
+    RETURN:
+        - (tipo generador): tuplas (fila, banda) con la fila en la que empieza
+        cada banda.
+    """
+    fila = 0
+    bandas = pnm.leer_bandas(entrada, filas)
+
+    while True:
+        with _etapa(medicion, "decodificacion") as etapa:
+            banda = next(bandas, None)
+
+            if banda is not None and etapa is not None:
+                etapa.pixeles += len(banda) * banda.shape[1]
+
+        if banda is None:
+            break
+
+        yield fila, banda
+        fila += len(banda)
+
+    if medicion is not None:
+        medicion.contar("decodificacion", os.path.getsize(entrada))
+
+def _aplicar(operadores, fila, banda):
+    """
+    Aplica la cadena de operadores a una banda.
+    """
+    if banda.ndim == 2:
+        banda = banda[:, :, np.newaxis]
+
+    for operador in operadores:
+        banda = operador.aplicar(banda, fila)
+
+    return banda
+
+# Estado de cada proceso del pool (ver _iniciar()).
+_operadores = None
+
+def _iniciar(operadores):
+    """
+    Inicializa un proceso del pool: guarda la cadena de operadores, que así no
+    se envía con cada banda.
+    """
+    global _operadores
+
+    _operadores = operadores
+
+def _procesar_banda(trozo):
+    return _aplicar(_operadores, *trozo)
+
+def _estadisticos_banda(trozo):
+    # El último operador de la cadena es el que acumula los estadísticos.
+    fila, banda = trozo
+
+    return _operadores[-1].estadisticos(_aplicar(_operadores[:-1], fila,
+                                                 banda), fila)
+
+def _con_operadores(funcion, operadores, trozo):
+    # En un pool compartido los operadores viajan con cada banda.
+    _iniciar(operadores)
+
+    return funcion(trozo)
+
+def _recorrer(funcion, operadores, bandas, procesos, pool = None):
+    """
+    Aplica funcion (que usa _operadores) a cada banda (tuplas (fila, banda)),
+    en este proceso, en un pool de procesos propio o en el pool indicado.
+
+    RETURN:
+        - (tipo generador): resultado de cada banda, en orden.
+    """
+    if pool is not None:
+        yield from pool.imap(partial(_con_operadores, funcion, operadores),
+                             bandas)
+        return
+
+    if procesos <= 1:
+        _iniciar(operadores)
+        yield from map(funcion, bandas)
+        return
+
+    with Pool(procesos, _iniciar, (operadores,)) as pool:
+        yield from pool.imap(funcion, bandas)
+
+class Tuberia:
+    """
+    Cadena de operadores que se aplica por bandas a una imagen PNM.
+    """
+    def __init__(self, operadores, filas = FILAS_BANDA, procesos = 1,
+                 pool = None):
+        """
+        Inicializa la tubería.
+
+        INPUTS:
+            - operadores (tipo lista): Operador que se aplican, en orden.
+            - filas (tipo integer): filas de cada banda.
+            - procesos (tipo integer): número de procesos que aplican los
+            operadores.
+            - pool (tipo Pool): pool ya creado (por ejemplo, el de un
+            servicio que procesa muchas imágenes) en el que repartir las
+            bandas; si se indica, no se crea uno nuevo y procesos se ignora.
+        """
+        self.operadores = list(operadores)
+        self.filas = filas
+        self.procesos = procesos
+        self.pool = pool
+
+    def configurar(self, cabecera):
+        """
+        Pasa a cada operador las dimensiones de la imagen y los canales y el
+        valor máximo de su entrada.
+
+        INPUT:
+            - cabecera (tipo Cabecera): cabecera de la imagen de entrada.
+
+        RETURN:
+            - (tipo tupla): canales y valor máximo de la salida.
+        """
+        canales, maximo = cabecera.canales, cabecera.maximo
+
+        for operador in self.operadores:
+            operador.configurar(cabecera.ancho, cabecera.alto, canales, maximo)
+            canales, maximo = operador.salida(canales, maximo)
+
+        return canales, maximo
+
+    def preparar(self, entrada, medicion = None):
+        """
+        Hace las pasadas previas sobre la entrada: una por cada operador
+        global, aplicando los anteriores y combinando sus estadísticos.
+
+        INPUTS:
+            - entrada (tipo string): nombre del fichero PPM o PGM.
+            - medicion (tipo Medicion): si se indica, cada pasada se mide como
+            cálculo (y su lectura como decodificación).
+
+        RETURN:
+            - (tipo integer): número de pasadas hechas.
+        """
+        pasadas = 0
+
+        for i, operador in enumerate(self.operadores):
+            if operador.global_:
+                with _etapa(medicion, "calculo"):
+                    operador.preparar(_recorrer(
+                        _estadisticos_banda, self.operadores[:i + 1],
+                        _bandas(entrada, self.filas, medicion),
+                        self.procesos, self.pool))
+
+                pasadas += 1
+
+        return pasadas
+
+    def ejecutar(self, entrada, salida, binario = True, sumideros = (),
+                 medicion = None):
+        """
+        Procesa la imagen de entrada y escribe el resultado: primero las
+        pasadas previas (ver preparar()) y después la pasada que decodifica,
+        aplica los operadores y codifica cada banda.
+
+        INPUTS:
+            - entrada (tipo string): nombre del fichero PPM o PGM.
+            - salida (tipo string): nombre del fichero de salida (PPM si
+            quedan tres canales y PGM si queda uno).
+            - binario (tipo booleano): salida P6/P5 si es True, P3/P2 si es
+            False.
+            - sumideros (tipo lista): objetos que reciben también las bandas
+            resultantes, en orden, en la misma pasada (por ejemplo, los
+            niveles de una pirámide, ver piramide.py). Deben tener los
+            métodos abrir(ancho, alto, canales, maximo), escribir(banda) y
+            cerrar(comprobar = True); si la pasada falla se llama a
+            cerrar(comprobar = False), para que no se comprueben los ficheros
+            incompletos y se propague el error original.
+            - medicion (tipo Medicion): si se indica, se miden la lectura de
+            las bandas (decodificacion), la espera por los resultados de los
+            operadores (calculo) y la escritura (codificacion, incluidos los
+            sumideros). Con procesos, las bandas se leen en un hilo del pool,
+            a la vez que se espera por el cálculo.
+
+        RETURN:
+            - (tipo Cabecera): cabecera de la imagen de entrada.
+        """
+        cabecera = pnm.leer_cabecera(entrada)
+        canales, maximo = self.configurar(cabecera)
+        self.preparar(entrada, medicion)
+
+        for sumidero in sumideros:
+            sumidero.abrir(cabecera.ancho, cabecera.alto, canales, maximo)
+
+        try:
+            with pnm.EscritorPNM(salida, cabecera.ancho, cabecera.alto,
+                                 canales, maximo, binario) as escritor:
+                resultados = _recorrer(_procesar_banda, self.operadores,
+                                       _bandas(entrada, self.filas, medicion),
+                                       self.procesos, self.pool)
+
+                while True:
+                    with _etapa(medicion, "calculo") as etapa:
+                        banda = next(resultados, None)
+
+                        if banda is not None and etapa is not None:
+                            etapa.pixeles += len(banda) * cabecera.ancho
+
+                    if banda is None:
+                        break
+
+                    with _etapa(medicion, "codificacion",
+                                len(banda) * cabecera.ancho):
+                        escritor.escribir(banda)
+
+                        for sumidero in sumideros:
+                            sumidero.escribir(banda)
+        except BaseException:
+            for sumidero in sumideros:
+                sumidero.cerrar(comprobar = False)
+
+            raise
+
+        for sumidero in sumideros:
+            sumidero.cerrar()
+
+        if medicion is not None:
+            medicion.contar("codificacion", os.path.getsize(salida))
+
+        return cabecera
+
+def ecualizar(entrada, salida, filas = FILAS_BANDA, procesos = 1,
+              binario = True):
+    """
+    Normalización máximo-mínimo de cada color (lo que hace ecualizador.main()).
+    """
+    return Tuberia([Normalizar()], filas, procesos).ejecutar(entrada, salida,
+                                                             binario)
+
+def gris(entrada, salida, filas = FILAS_BANDA, procesos = 1, binario = True):
+    """
+    Conversión a escala de grises (lo que hace color_procesos.main()).
+    """
+    return Tuberia([Gris()], filas, procesos).ejecutar(entrada, salida,
+                                                       binario)
@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+distancias.py
+
+Motor de métricas de grafos sobre una matriz de distancias de NumPy. En
+grafos.py, get_min_dist() pasa el resultado de Floyd-Warshall (un diccionario
+de diccionarios) a una lista de listas, y get_diameter(), get_average_dist(),
+get_10min_average_dist() y get_nodes() vuelven a calcular cada una la matriz
+entera. Aquí la matriz se calcula una sola vez:
+
+    - Grafos sin pesos: un recorrido en anchura (BFS) desde cada nodo sobre la
+    matriz de adyacencia en formato CSR. Cada nivel se expande de una vez,
+    juntando con NumPy los vecinos de todos los nodos de la frontera.
+    - Grafos con pesos: Dijkstra desde cada nodo (scipy.sparse.csgraph).
+
+El resultado es un array (n, n) de float64, con np.inf entre los nodos que no
+están conectados (como en Floyd-Warshall), junto a la lista de nodos en el
+orden de las filas y un diccionario nodo -> índice. Todas las métricas se
+obtienen de ese array con reducciones vectorizadas. Para grafos grandes, apsp.py
+calcula una matriz de enteros (uint8 o uint16, con el valor máximo del tipo
+entre los nodos no conectados) en memoria compartida, y las métricas la tratan
+igual que a la de float64.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+def vecinos(indptr, indices, nodos):
+    """
+    Devuelve los vecinos de un conjunto de nodos de un grafo en formato CSR,
+    sin recorrer los nodos uno a uno.
+
+    ARGS:
+        - indptr: tipo np.ndarray. Inicio de la fila de cada nodo en indices
+        (con un elemento más al final).
+        - indices: tipo np.ndarray. Columnas (vecinos) de todas las filas.
+        - nodos: tipo np.ndarray. Índices de los nodos.
+
+    RETURNS:
+        - vecinos: tipo np.ndarray. Vecinos de todos los nodos, con
+        repeticiones.
+    """
+    inicios = indptr[nodos]
+    longitudes = indptr[nodos + 1] - inicios
+
+    # Posición en indices de cada vecino: el inicio de su fila más su orden
+    # dentro de ella.
+    desplazamientos = np.repeat(inicios - np.cumsum(longitudes) + longitudes,
+                                longitudes)
+
+    return indices[desplazamientos + np.arange(longitudes.sum())]
+
+def bfs(indptr, indices, origen):
+    """
+    Distancias (número de aristas) desde un nodo al resto, con un recorrido en
+    anchura por niveles.
+
+    ARGS:
+        - indptr: tipo np.ndarray. Ver vecinos().
+        - indices: tipo np.ndarray. Ver vecinos().
+        - origen: tipo integer o np.ndarray. Índice del nodo de origen. Si son
+        varios, la distancia de cada nodo es la del más cercano.
+
+    RETURNS:
+        - distancias: tipo np.ndarray. Distancia a cada nodo (np.inf si no se
+        puede llegar).
+    """
+    distancias = np.full(len(indptr) - 1, np.inf)
+    distancias[origen] = 0
+    frontera = np.atleast_1d(origen)
+    nivel = 0
+
+    while frontera.size:
+        nivel += 1
+        siguientes = vecinos(indptr, indices, frontera)
+        siguientes = np.unique(siguientes[np.isinf(distancias[siguientes])])
+        distancias[siguientes] = nivel
+        frontera = siguientes
+
+    return distancias
+
+def inalcanzable(dtype):
+    """
+    Valor de una matriz de distancias del tipo indicado entre los nodos no
+    conectados: np.inf, o el máximo del tipo si es de enteros (ver apsp.py).
+    """
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max
+
+    return np.inf
+
+class MatrizDistancias:
+    """
+    Matriz de distancias mínimas de un grafo y las métricas que se obtienen
+    de ella.
+    """
+    def __init__(self, nodos, matriz, adyacencia, compartida = None):
+        """
+        Cada instancia tiene los atributos self.nodos (lista de nodos en el
+        orden de las filas), self.indices (diccionario nodo -> fila),
+        self.matriz (array (n, n) de distancias mínimas), self.adyacencia
+        (matriz de adyacencia dispersa en formato CSR) y self.inalcanzable
+        (valor de la matriz entre nodos no conectados: np.inf, o el máximo
+        del tipo si es de enteros). Si la matriz está en memoria compartida
+        (ver apsp.py), self.compartida es el objeto que hay que cerrar.
+        """
+        self.nodos = nodos
+        self.indices = {nodo: i for i, nodo in enumerate(nodos)}
+        self.matriz = matriz
+        self.adyacencia = adyacencia
+        self.compartida = compartida
+        self.inalcanzable = inalcanzable(matriz.dtype)
+
+    @classmethod
+    def desde_grafo(cls, G, weight = "weight"):
+        """
+        Calcula la matriz de distancias de un grafo: BFS desde cada nodo si
+        no tiene pesos (o todos valen 1) y Dijkstra si los tiene.
+
+        ARGS:
+            - G: tipo grafo (networkx).
+            - weight: tipo string. Atributo de las aristas con el peso.
+
+        RETURNS:
+            - tipo MatrizDistancias.
+        """
+        nodos = list(G.nodes())
+        adyacencia = nx.to_scipy_sparse_array(G, nodelist = nodos,
+                                              weight = weight, format = "csr")
+
+        if np.all(adyacencia.data == 1):
+            indptr, indices = adyacencia.indptr, adyacencia.indices
+            matriz = np.empty((len(nodos), len(nodos)))
+
+            for i in range(len(nodos)):
+                matriz[i] = bfs(indptr, indices, i)
+
+        else:
+            matriz = shortest_path(adyacencia, method = "D",
+                                   directed = G.is_directed())
+
+        return cls(nodos, matriz, adyacencia)
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def cerrar(self):
+        """
+        Libera la memoria compartida de la matriz, si la tiene.
+        """
+        if self.compartida is not None:
+            self.matriz = None
+            self.compartida.cerrar()
+            self.compartida = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def diametro(self):
+        """
+        Diámetro: la mayor de las distancias mínimas (np.inf si el grafo no
+        es conexo).
+        """
+        diametro = self.matriz.max()
+
+        return np.inf if diametro == self.inalcanzable else diametro
+
+    def sumas(self):
+        """
+        Suma de las distancias de cada nodo al resto (np.inf si hay alguno al
+        que no se puede llegar).
+        """
+        if self.inalcanzable == np.inf:
+            return self.matriz.sum(axis = 1)
+
+        # Con enteros, las filas con el valor de los no conectados se buscan
+        # con su máximo, sin crear una matriz (n, n) de booleanos.
+        sumas = self.matriz.sum(axis = 1, dtype = np.float64)
+        sumas[self.matriz.max(axis = 1) == self.inalcanzable] = np.inf
+
+        return sumas
+
+    def medias(self):
+        """
+        Distancia promedio de cada nodo al resto (sin contar la distancia a sí
+        mismo).
+        """
+        return self.sumas() / (len(self) - 1)
+
+    def distancia_media(self):
+        """
+        Promedio de las distancias promedio de cada nodo (get_average_dist()).
+        """
+        return self.medias().mean()
+
+    def grados(self):
+        """
+        Número de vecinos de cada nodo, sin contar los lazos.
+        """
+        grados = np.diff(self.adyacencia.indptr)
+
+        return grados - (self.adyacencia.diagonal() != 0)
+
+    def por_interacciones(self):
+        """
+        Nodos ordenados de mayor a menor número de vecinos (los empates, en el
+        orden de los nodos), como get_direct_interact().
+        """
+        orden = np.argsort(-self.grados(), kind = "stable")
+
+        return [self.nodos[i] for i in orden]
+
+    def menor_distancia_media(self, k = 10):
+        """
+        Los k nodos con menor distancia promedio al resto (los empates, en el
+        orden de los nodos), como get_10min_average_dist().
+        """
+        orden = np.argsort(self.sumas(), kind = "stable")
+
+        return [self.nodos[i] for i in orden[:k]]
@@ -0,0 +1,386 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+estimadores.py
+
+Estadísticas de grafos sin pesos que no necesitan la matriz de distancias
+entre todos los pares de nodos (ver apsp.py), para redes demasiado grandes
+para ella:
+
+    - Diámetro exacto con iFUB: dos dobles barridos (cuatro recorridos en
+    anchura) dan una cota inferior y un nodo central, y desde él se recorren
+    los niveles de más lejanos a más cercanos, calculando solo las
+    excentricidades de sus nodos hasta que la cota superior (el doble del
+    nivel) ya no supera a la inferior. En redes reales se calcula con unas
+    pocas decenas de recorridos en lugar de n.
+    - Distancia promedio y cercanía (closeness) estimadas con recorridos
+    desde una muestra aleatoria de orígenes, con intervalos de confianza
+    (aproximación normal, con la corrección de población finita). Con tantos
+    orígenes como nodos el resultado es exacto.
+
+Los recorridos se hacen por lotes de apsp.TAM_LOTE orígenes con fronteras de
+bits, acumulando las sumas por niveles, sin guardar las distancias.
+
+Ejemplo:
+
+    python3 estimadores.py red.txt --muestras 256
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+from collections import namedtuple
+from statistics import NormalDist
+from time import perf_counter
+import argparse
+
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from apsp import (csr_entrada, desplegar, excentricidades_lote, niveles_lote,
+                  TAM_LOTE)
+from distancias import bfs
+
+# Resultado de una estimación: valor, extremos del intervalo de confianza y
+# número de orígenes de la muestra.
+Estimacion = namedtuple("Estimacion", "valor inferior superior muestras")
+
+def conexo(adyacencia, dirigido = False):
+    """
+    Indica si un grafo es conexo (fuertemente conexo si es dirigido), es
+    decir, si su diámetro y su distancia promedio son finitos.
+    """
+    componentes, _ = connected_components(adyacencia, directed = dirigido,
+                                          connection = "strong")
+
+    return componentes == 1
+
+def excentricidades(indptr, indices, nodos):
+    """
+    Excentricidad de varios nodos, en lotes de TAM_LOTE (ver
+    apsp.excentricidades_lote()).
+    """
+    return np.concatenate([
+        excentricidades_lote(indptr, indices, nodos[inicio:inicio + TAM_LOTE])
+        for inicio in range(0, len(nodos), TAM_LOTE)] or [np.zeros(0, int)])
+
+def doble_barrido(indptr, indices, origen):
+    """
+    Doble barrido: un recorrido desde origen encuentra el nodo más lejano, a,
+    y otro desde a, el más lejano de a, b. La excentricidad de a es una cota
+    inferior del diámetro (que suele coincidir con él), y el punto medio del
+    camino entre a y b, un nodo central desde el que empezar iFUB.
+
+    ARGS:
+        - indptr: tipo np.ndarray. Ver distancias.vecinos().
+        - indices: tipo np.ndarray. Ver distancias.vecinos().
+        - origen: tipo integer. Índice del nodo de partida.
+
+    RETURNS:
+        - cota: tipo integer. Excentricidad de a.
+        - centro: tipo integer. Índice del punto medio entre a y b.
+    """
+    a = int(np.argmax(bfs(indptr, indices, origen)))
+    desde_a = bfs(indptr, indices, a)
+    b = int(np.argmax(desde_a))
+    desde_b = bfs(indptr, indices, b)
+    cota = int(desde_a[b])
+
+    # Nodos de los caminos mínimos entre a y b a mitad de camino.
+    medios = np.flatnonzero((desde_a + desde_b == cota) &
+                            (desde_a == cota // 2))
+
+    return cota, int(medios[0])
+
+def ifub(indptr, indices, raiz, cota = 0):
+    """
+    Diámetro exacto de un grafo conexo no dirigido con iFUB. Si los nodos a
+    distancia i de raiz tienen como mucho una excentricidad B(i), cualquier
+    par de nodos a i o menos de raiz está a 2i o menos: en cuanto la mayor de
+    las excentricidades de los niveles ya recorridos (completos) supera
+    2(i - 1), es el diámetro.
+
+    ARGS:
+        - indptr: tipo np.ndarray. Ver distancias.vecinos().
+        - indices: tipo np.ndarray. Ver distancias.vecinos().
+        - raiz: tipo integer. Índice del nodo de partida (mejor si es
+        central; ver doble_barrido()).
+        - cota: tipo integer. Cota inferior del diámetro ya conocida.
+
+    RETURNS:
+        - diametro: tipo integer.
+        - recorridos: tipo integer. Excentricidades calculadas.
+    """
+    niveles = bfs(indptr, indices, raiz)
+    i = int(niveles.max())
+    inferior = max(i, cota)
+    recorridos = 1
+
+    while 2 * i > inferior:
+        nodos = np.flatnonzero(niveles == i)
+
+        # Dentro del nivel solo se puede parar si se alcanza la cota superior
+        # (2i): los nodos del nivel que faltan aún podrían estar a 2i.
+        for inicio in range(0, len(nodos), TAM_LOTE):
+            lote = nodos[inicio:inicio + TAM_LOTE]
+            inferior = max(inferior, int(excentricidades_lote(
+                indptr, indices, lote).max()))
+            recorridos += len(lote)
+
+            if inferior >= 2 * i:
+                return inferior, recorridos
+
+        # Con el nivel completo, los pares que quedan están a 2(i - 1) o menos.
+        if inferior > 2 * (i - 1):
+            break
+
+        i -= 1
+
+    return inferior, recorridos
+
+def perfil(indptr, indices, nodo):
+    """
+    Excentricidad de un nodo y número de nodos a esa distancia: cuanto menores
+    sean, menos excentricidades tendrá que calcular iFUB desde él.
+    """
+    niveles = bfs(indptr, indices, nodo)
+    excentricidad = niveles.max()
+
+    return excentricidad, int(np.count_nonzero(niveles == excentricidad))
+
+def diametro(G):
+    """
+    Diámetro exacto de un grafo sin pesos, sin la matriz de distancias: con
+    iFUB si no es dirigido y con la excentricidad de todos los nodos (por
+    lotes) si lo es. Como get_diameter(), es np.inf si el grafo no es conexo.
+
+    ARGS:
+        - G: tipo grafo (networkx).
+
+    RETURNS:
+        - tipo integer (o np.inf).
+    """
+    adyacencia, entrada = csr_entrada(G)
+    dirigido = G.is_directed()
+
+    if not conexo(adyacencia, dirigido):
+        return np.inf
+
+    if dirigido:
+        return int(excentricidades(entrada.indptr, entrada.indices,
+                                   np.arange(len(G))).max())
+
+    # Cuatro barridos desde el nodo de mayor grado. La raíz de iFUB es, de
+    # ese nodo y el punto medio del último barrido, la que tenga mejor perfil.
+    indptr, indices = adyacencia.indptr, adyacencia.indices
+    mayor = int(np.argmax(np.diff(indptr)))
+    cota, centro = doble_barrido(indptr, indices, mayor)
+    segunda, centro = doble_barrido(indptr, indices, centro)
+    raiz = min((mayor, centro), key = lambda nodo: perfil(indptr, indices,
+                                                          nodo))
+
+    return ifub(indptr, indices, raiz, max(cota, segunda))[0]
+
+def fuentes_muestra(n, muestras, semilla = None):
+    """
+    Orígenes (índices de nodos, sin repetir) elegidos al azar.
+    """
+    rng = np.random.default_rng(semilla)
+
+    return np.sort(rng.choice(n, size = min(muestras, n), replace = False))
+
+def acumular(indptr, indices, fuentes):
+    """
+    Recorre el grafo desde los orígenes de la muestra (en lotes de TAM_LOTE)
+    y acumula, sin guardar las distancias, sus sumas por origen y por nodo.
+
+    ARGS:
+        - indptr: tipo np.ndarray. Ver apsp.niveles_lote().
+        - indices: tipo np.ndarray. Ver apsp.niveles_lote().
+        - fuentes: tipo np.ndarray. Índices de los orígenes.
+
+    RETURNS:
+        - tipo diccionario. "suma" y "alcanzados" (arrays de len(fuentes)):
+        suma de las distancias de cada origen a los nodos a los que llega y
+        número de esos nodos (contando el origen). "suma_nodo",
+        "cuadrados_nodo" y "alcanzados_nodo" (arrays de n): suma de las
+        distancias desde los orígenes a cada nodo, de sus cuadrados, y número
+        de orígenes que llegan a él (contando el propio nodo si es uno).
+    """
+    n = len(indptr) - 1
+    sumas = {"suma": np.zeros(len(fuentes)),
+             "alcanzados": np.ones(len(fuentes)),
+             "suma_nodo": np.zeros(n),
+             "cuadrados_nodo": np.zeros(n),
+             "alcanzados_nodo": np.zeros(n)}
+
+    sumas["alcanzados_nodo"][fuentes] += 1
+
+    for inicio in range(0, len(fuentes), TAM_LOTE):
+        lote = fuentes[inicio:inicio + TAM_LOTE]
+        suma = sumas["suma"][inicio:inicio + TAM_LOTE]
+        alcanzados = sumas["alcanzados"][inicio:inicio + TAM_LOTE]
+
+        for nivel, nodos, frontera in niveles_lote(indptr, indices, lote):
+            marcas = desplegar(frontera, len(lote))
+
+            # Nodos que alcanza cada origen y orígenes que alcanzan cada nodo.
+            por_origen = marcas.sum(axis = 1)
+            por_nodo = marcas.sum(axis = 0)
+
+            suma += nivel * por_origen
+            alcanzados += por_origen
+            sumas["suma_nodo"][nodos] += nivel * por_nodo
+            sumas["cuadrados_nodo"][nodos] += nivel * nivel * por_nodo
+            sumas["alcanzados_nodo"][nodos] += por_nodo
+
+    return sumas
+
+def _margen(confianza):
+    """
+    Número de desviaciones típicas del intervalo de confianza (1,96 al 95%).
+    """
+    return NormalDist().inv_cdf(0.5 + confianza / 2)
+
+def _correccion(n, k):
+    """
+    Corrección de población finita: 0 si la muestra son todos los nodos.
+    """
+    return np.sqrt((n - k) / (n - 1)) if n > 1 else 0.0
+
+def distancia_media(G, muestras = 256, confianza = 0.95, semilla = None,
+                    alcanzables = False):
+    """
+    Estima la distancia promedio de get_average_dist() con recorridos desde
+    una muestra de orígenes: la media de sus distancias promedio al resto.
+
+    ARGS:
+        - G: tipo grafo (networkx) sin pesos.
+        - muestras: tipo integer. Número de orígenes.
+        - confianza: tipo float. Nivel del intervalo de confianza.
+        - semilla: tipo integer. Semilla de la elección de los orígenes.
+        - alcanzables: tipo booleano. Si es True, promedio de las distancias
+        entre los pares de nodos conectados (estimador de razón). Si es False,
+        como get_average_dist(): np.inf si el grafo no es conexo.
+
+    RETURNS:
+        - tipo Estimacion.
+    """
+    adyacencia, entrada = csr_entrada(G)
+    n = len(G)
+
+    if not alcanzables and not conexo(adyacencia, G.is_directed()):
+        return Estimacion(np.inf, np.inf, np.inf, 0)
+
+    fuentes = fuentes_muestra(n, muestras, semilla)
+    k = len(fuentes)
+    sumas = acumular(entrada.indptr, entrada.indices, fuentes)
+
+    if alcanzables:
+        pares = sumas["alcanzados"] - 1
+        valor = sumas["suma"].sum() / pares.sum()
+        residuos = sumas["suma"] - valor * pares
+        escala = pares.mean()
+
+    else:
+        residuos = sumas["suma"] / (n - 1)
+        valor = residuos.mean()
+        escala = 1.0
+
+    error = 0.0
+
+    if k > 1:
+        error = (residuos.std(ddof = 1) / np.sqrt(k) / escala *
+                 _correccion(n, k))
+
+    margen = _margen(confianza) * error
+
+    return Estimacion(valor, valor - margen, valor + margen, k)
+
+def cercania(G, muestras = 256, confianza = 0.95, semilla = None):
+    """
+    Estima la cercanía (closeness) de cada nodo v, (r - 1) / (suma de las
+    distancias a v desde los r nodos que llegan a él), con recorridos desde
+    una muestra de orígenes. Con tantos orígenes como nodos es
+    nx.closeness_centrality(G, wf_improved = False) (que, si el grafo es
+    conexo, es lo mismo que con wf_improved = True).
+
+    ARGS:
+        - G: tipo grafo (networkx) sin pesos.
+        - muestras: tipo integer. Número de orígenes.
+        - confianza: tipo float. Nivel del intervalo de confianza.
+        - semilla: tipo integer. Semilla de la elección de los orígenes.
+
+    RETURNS:
+        - tipo Estimacion. valor, inferior y superior son arrays con la
+        cercanía de cada nodo, en el orden de G.nodes().
+    """
+    _, entrada = csr_entrada(G)
+    n = len(G)
+    fuentes = fuentes_muestra(n, muestras, semilla)
+    k = len(fuentes)
+    sumas = acumular(entrada.indptr, entrada.indices, fuentes)
+
+    # Suma de las distancias y número de nodos que llegan, extrapolados de
+    # la muestra a todos los nodos.
+    media = sumas["suma_nodo"] / k
+    suma = n * media
+    otros = np.maximum(n * sumas["alcanzados_nodo"] / k - 1, 0)
+
+    error = np.zeros(n)
+
+    if k > 1:
+        varianza = np.maximum(sumas["cuadrados_nodo"] / k - media ** 2, 0)
+        error = (n * np.sqrt(varianza / (k - 1)) * _correccion(n, k))
+
+    margen = _margen(confianza) * error
+
+    # Cada nodo que llega está al menos a distancia 1: la suma no baja de
+    # otros (y la cercanía no pasa de 1).
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        valor = np.where(suma > 0, otros / suma, 0.0)
+        inferior = np.where(suma > 0, otros / (suma + margen), 0.0)
+        superior = np.where(suma > 0,
+                            otros / np.maximum(suma - margen, otros), 0.0)
+
+    return Estimacion(valor, inferior, superior, k)
+
+def main(argv = None):
+    """
+    Función principal: diámetro exacto y distancia promedio estimada de una
+    red (en el formato de nx.read_adjlist()).
+    """
+    parser = argparse.ArgumentParser(
+        description = "Diámetro y distancia promedio sin la matriz de "
+        "distancias.")
+
+    parser.add_argument("red", help = "fichero de la red (lista de "
+                        "adyacencias)")
+    parser.add_argument("--muestras", type = int, default = 256,
+                        help = "número de orígenes de la muestra")
+    parser.add_argument("--confianza", type = float, default = 0.95,
+                        help = "nivel de los intervalos de confianza")
+    parser.add_argument("--semilla", type = int, help = "semilla de la "
+                        "muestra")
+    parser.add_argument("--alcanzables", action = "store_true",
+                        help = "promediar solo los pares de nodos conectados")
+
+    args = parser.parse_args(argv)
+
+    G = nx.read_adjlist(args.red)
+
+    inicio = perf_counter()
+    print("Diámetro:", diametro(G))
+    print("Tiempo: %5.4f segundos." % (perf_counter() - inicio))
+
+    inicio = perf_counter()
+    media = distancia_media(G, args.muestras, args.confianza, args.semilla,
+                            args.alcanzables)
+    print("Distancia promedio: %.4f (%.4f - %.4f al %d%%, %d orígenes)" %
+          (media.valor, media.inferior, media.superior,
+           round(100 * args.confianza), media.muestras))
+    print("Tiempo: %5.4f segundos." % (perf_counter() - inicio))
+
+if __name__ == '__main__':
+    main()
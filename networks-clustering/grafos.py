@@ -11,8 +11,13 @@ Fecha: 03/03/2020
 """
 import networkx as nx
 import matplotlib.pyplot as plt
+import numpy as np
 import random
 
+from apsp import apsp
+from distancias import MatrizDistancias, inalcanzable
+import estimadores
+
 def draw_net(graph):
     """
     Utilizaremos esta función para crear y mostrar el gráfico con la red que
@@ -48,53 +53,50 @@ def get_adj(G):
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
 
     RETURNS:
-        - final_matrix: tipo matriz (lista de listas). Básicamente, es una
-        matriz de adyacencia para el grafo proporcionado.
+        - final_matrix: tipo matriz (np.ndarray). Básicamente, es una matriz de
+        adyacencia para el grafo proporcionado.
     """
-    A = nx.adjacency_matrix(G)
-
-    A = A.toarray() # Para visualizar como array de adyacencias como 0 y 1.
-
-    matrix = [] # Será la matriz de adyacencias.
-
-    for row in A:
-        fila = []
-
-        for element in row:
-            fila.append(element)
-
-        matrix.append(fila)
-
-    final_matrix = []
+    A = nx.adjacency_matrix(G).toarray() # Matriz de adyacencias (0 y 1).
 
-    for i in range(len(matrix)):
-        new_row = []
+    # Se sustituye la matriz entera de una vez: 1 = relación directa, 200 =
+    # infinito (sin relación directa) y 0 en la diagonal (nodo con sí mismo).
+    final_matrix = np.where(A != 0, 1, 200)
+    np.fill_diagonal(final_matrix, 0)
 
-        for j in range(len(matrix[i])):
-
-            if i == j: # Nodo con sí mismo = 0.
-                new_element = 0
-
-            elif matrix[i][j] == 0: # Nodos sin relación directa = infinito.
-                new_element = 200
+    return final_matrix
 
-            elif matrix[i][j] == 1: # Nodos con relación directa = 1.
-                new_element = 1
+def get_distances(G, processes = None):
+    """
+    Calcula una sola vez la matriz de distancias mínimas de un grafo (ver
+    distancias.py), para pasársela al resto de funciones en lugar de que cada
+    una la vuelva a calcular.
 
-            new_row.append(new_element)
+    ARGS:
+        - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - processes: tipo integer. Si se indica, las distancias se calculan
+        con apsp.py (recorridos en anchura por lotes, repartidos entre ese
+        número de procesos) en una matriz de enteros en memoria compartida,
+        que hay que liberar con distances.cerrar(). Es lo indicado para redes
+        grandes sin pesos.
 
-        final_matrix.append(new_row)
+    RETURNS:
+        - distances: tipo MatrizDistancias. Matriz de distancias mínimas (array
+        de NumPy) con la lista de nodos y el índice de cada nodo.
+    """
+    if processes is not None:
+        return apsp(G, processes)
 
-    return final_matrix
+    return MatrizDistancias.desde_grafo(G)
 
-def get_min_dist(G):
+def get_min_dist(G, distances = None):
     """
     Esta función calcula la matriz de distancias mínimas para los nodos de un
     grafo. Se define como distancia mínima al número mínimo de nodos que habrá
-    que recorrer para llegar de un nodo a otro. Esta matriz se calcula
-    utilizando el algoritmo de Floyd-Warshall, que ya viene implementado en el
-    paquete de networkx. Este algoritmo puede escribirse en pseucódigo de la
-    siguiente manera:
+    que recorrer para llegar de un nodo a otro. Antes se calculaba con el
+    algoritmo de Floyd-Warshall de networkx, que es O(n^3); ahora, si el grafo
+    no tiene pesos, se hace un recorrido en anchura desde cada nodo (ver
+    distancias.py), con el mismo resultado. El algoritmo de Floyd-Warshall puede
+    escribirse en pseucódigo de la siguiente manera:
 
     procedimiento FloydWarshall ()
     {
@@ -109,26 +111,25 @@ def get_min_dist(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular.
 
     RETURNS:
-        - min_dist: tipo matriz (lista de lista). Se trata de una matriz que
-        contiene las distancias mínimas entre los nodos de un grafo.
+        - min_dist: tipo matriz (np.ndarray). Se trata de una matriz que
+        contiene las distancias mínimas entre los nodos de un grafo (np.inf
+        entre los nodos no conectados). Si la matriz de distances está en
+        memoria compartida (ver apsp.py) se devuelve una copia, que se puede
+        seguir usando después de distances.cerrar().
     """
-    B = nx.floyd_warshall(G) # Devuelve un diccionario de diccionarios.
-
-    min_dist = []
+    if distances is None:
+        distances = get_distances(G)
 
-    for key in nx.nodes(G):
-        row = []
+    if distances.compartida is not None:
+        return distances.matriz.copy()
 
-        for subkey in nx.nodes(G):
-            row.append(B[key][subkey])
+    return distances.matriz
 
-        min_dist.append(row)
-
-    return min_dist
-
-def get_diameter(G):
+def get_diameter(G, distances = None, ifub = False):
     """
     Se entiende como diametro de un grafo al camino más largo de los caminos más
     cortos entre los nodos. Esta función recibe, por tanto, un objeto grafo
@@ -137,23 +138,25 @@ def get_diameter(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
+        - ifub: tipo booleano. Si es True (y no se indica distances), el
+        diámetro, también exacto, se calcula sin la matriz de distancias
+        (ver estimadores.diametro()). Solo para grafos sin pesos.
 
     RETURNS:
         - max_distance: tipo float. Número con coma flotante que representa el
         diámetro del grafo.
     """
-    min_dist = get_min_dist(G)
-
-    max_distance = 0
+    if distances is None:
+        if ifub:
+            return estimadores.diametro(G)
 
-    for row in min_dist:
+        distances = get_distances(G)
 
-        if max(row) > max_distance:
-            max_distance = max(row)
+    return distances.diametro()
 
-    return max_distance
-
-def get_average_dist(G):
+def get_average_dist(G, distances = None, sample = None):
     """
     Esta función se encarga de calcular la distancia promedio. Para cada nodo de
     la matriz de distancias mínimas se calcula su distancia promedio al resto de
@@ -161,31 +164,28 @@ def get_average_dist(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
+        - sample: tipo integer. Si se indica (y no se indica distances), la
+        distancia promedio se estima sin la matriz de distancias, con
+        recorridos desde ese número de nodos al azar (ver
+        estimadores.distancia_media()). Solo para grafos sin pesos.
 
     RETURNS:
         - average_distance: tipo float. Número con coma flotante que representa
-        la distancia promedio de los grafos.
+        la distancia promedio de los grafos. Si se indica sample, es una
+        Estimacion (valor e intervalo de confianza al 95%).
     """
-    min_dist = get_min_dist(G)
-
-    rows_average = 0
-
-    for row in min_dist:
-
-        average = 0
-
-        for element in row:
-            average += element # Distancia de un nodo con sigo mismo es 0.
-
-        average = average / (len(row) - 1) # No se hace de un nodo con él mismo.
+    if distances is None:
+        if sample is not None:
+            return estimadores.distancia_media(G, sample)
 
-        rows_average += average
+        distances = get_distances(G)
 
-    average_distance = rows_average / len(min_dist)
+    # La distancia de un nodo consigo mismo es 0 y no cuenta en su promedio.
+    return distances.distancia_media()
 
-    return average_distance
-
-def get_direct_interact(G):
+def get_direct_interact(G, distances = None):
     """
     Devuelve un listado de los nodos de un grafo ordenado de mayor a menor según
     el número de interacciones directas que tienen con otros nodos (es decir,
@@ -193,67 +193,42 @@ def get_direct_interact(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        se usa su matriz de adyacencia.
 
     RETURNS:
         - direct_inter: tipo lista. Lista de nodos del grafo ordenada de mayor a
         menor según el número de arcos o relaciones que tengan.
     """
-    adj = get_adj(G)
-
-    lis = []
-
-    for index in range(len(adj)):
-
-        count = 0
-
-        for element in adj[index]:
-
-            if element == 1:
-                count += 1
+    if distances is not None:
+        return distances.por_interacciones()
 
-        lis.append(count)
+    # Número de relaciones directas de cada nodo y orden estable (los empates
+    # quedan en el orden de los nodos, como con sorted()).
+    count = (get_adj(G) == 1).sum(axis = 1)
+    nodes = list(nx.nodes(G))
 
-    dic = {}
+    return [nodes[i] for i in np.argsort(-count, kind = "stable")]
 
-    for node in nx.nodes(G):
-        dic[node] = lis[0]
-        del lis[0]
-
-    direct_inter = []
-
-    for w in sorted(dic, key = dic.get, reverse = True):
-        direct_inter.append(w)
-
-    return direct_inter
-
-def get_10min_average_dist(G):
+def get_10min_average_dist(G, distances = None):
     """
     Esta función nos devuelve los 10 nodos que tienen una menor distancia
     promedio al resto de nodos.
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
 
     RETURNS:
         - sor_aver_dist[0:10]: tipo lista. Se trata de los 10 primeros elementos
         de la lista (de nodos) ordenada de menor a mayor según la distancia al
         resto de nodos.
     """
-    min_dist = get_min_dist(G)
+    if distances is None:
+        distances = get_distances(G)
 
-    average_dist = {}
-
-    row = 0
-    for node in nx.nodes(G):
-        average_dist[node] = sum(min_dist[row]) / len(min_dist[row])
-        row += 1
-
-    sor_aver_dist = []
-
-    for w in sorted(average_dist, key = average_dist.get):
-        sor_aver_dist.append(w)
-
-    return sor_aver_dist[0:10]
+    return distances.menor_distancia_media(10)
 
 class Node:
     """
@@ -282,7 +257,7 @@ class Node:
         """
         return self.node
 
-def get_nodes(G):
+def get_nodes(G, distances = None):
     """
     Esta función se utiliza para obtener una lista de los nodos del grafo cuyos
     elementos son instancias de la clase Node. Por tanto, cada nodo tiene su id
@@ -291,13 +266,15 @@ def get_nodes(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
 
     RETURNS:
         - nodes: tipo lista. Lista con los nodos de un grafo
     """
     nodes = []
 
-    min_dist = get_min_dist(G)
+    min_dist = get_min_dist(G, distances)
 
     count_id = 0
 
@@ -316,7 +293,7 @@ def get_nodes(G):
 
     return nodes
 
-def get_initial_clusters(G):
+def get_initial_clusters(G, distances = None):
     """
     Esta función recibe un grafo y devuelve un diccionario con los 4 clusters
     iniciales. Los nodos en los clusters se colocan al azar: primero se coloca
@@ -328,13 +305,15 @@ def get_initial_clusters(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
 
     RETURNS:
         - clusters: tipo diccionario. Cada clave es un cluster (c + número del
         cluster). Cada cluster tiene 9 u 8 nodos asignados al azar (para el caso
         de 'cubos.txt').
     """
-    nodes = get_nodes(G)
+    nodes = get_nodes(G, distances)
 
     clusters = {'c1' : [],
                 'c2' : [],
@@ -394,40 +373,27 @@ def get_cluster_score(cluster):
     lista la utilizaremos para calcular la distancia promedio de un nodo con el
     resto.
     """
-    id_list = []
-    for e in cluster:
-        id_list.append(e.id)
-
-    cluster_distance = 0
+    id_list = np.array([e.id for e in cluster])
 
     """
-    Para cada elemento del cluster, calculamos su distancia promedio al resto y
-    la sumamos a la variable 'distance'
+    Para cada elemento del cluster, tomamos de su fila de la matriz de
+    distancias las distancias al resto (de una vez, con los id) y calculamos
+    su distancia promedio. La distancia con uno mismo es 0 (no afecta a la
+    suma), pero el nodo mismo no se cuenta en el promedio. Si la matriz es de
+    enteros (ver apsp.py), los nodos no conectados tienen el máximo del tipo
+    en lugar de np.inf, así que se cambia por np.inf.
     """
-    for e in cluster:
-
-        distance = 0
-
-        for i in id_list:
-            distance = distance + e.distances[i] # Distancia con uno mismo es 0,
-                                                 # (no afecta a la media).
-
-        distance = distance / (len(id_list) - 1) # No contamos el nodo mismo.
-
-        """
-        Esa distancia de cada nodo del cluster con el resto se suma a la
-        variable 'cluster_distance', que se encarga de acumular el sumatorio de
-        estas distancias para, una vez ya se han sumado la de todos los nodos
-        del cluster, realizar el promedio.
-        """
-        cluster_distance = cluster_distance + distance
+    distances = np.array([e.distances[id_list] for e in cluster])
+    sums = distances.sum(axis = 1, dtype = np.float64)
+    sums[(distances == inalcanzable(distances.dtype)).any(axis = 1)] = np.inf
+    distance = sums / (len(id_list) - 1)
 
     # Finalmente, esta es la distancia promedio entre los elementos del cluster:
-    cluster_distance = cluster_distance / len(cluster)
+    cluster_distance = distance.mean()
 
     return cluster_distance
 
-def clusters_shuffling(G):
+def clusters_shuffling(G, distances = None):
     """
     Función que, proporcionándole un objeto grafo del módulo 'networkx':
 
@@ -462,6 +428,8 @@ def clusters_shuffling(G):
 
     ARGS:
         - G: tipo grafo (networkx). Objeto grafo creado con el paquete networkx.
+        - distances: tipo MatrizDistancias. Si se indica (ver get_distances()),
+        no se vuelve a calcular la matriz de distancias mínimas.
 
     RETURNS:
         - clusters: tipo diccionario. Las claves son los nombres de los
@@ -470,7 +438,7 @@ def clusters_shuffling(G):
     """
     # Creamos los 4 clusters iniciales.
     print('Creando los 4 clusters iniciales...')
-    clusters = get_initial_clusters(G)
+    clusters = get_initial_clusters(G, distances)
     print('Hecho.\n')
 
     print('Los clusters INICIALES son:')
@@ -577,26 +545,28 @@ def main():
     adj = get_adj(G)
 
     """
-    Creamos la matriz de distancias mínimas 'C' con utilizando el algoritmo de
-    Floyd-Marshall que ya viene implementado en el módulo networkx. Seguidamente
-    resolvemos las 5 primeras cuestiones de la Act1.
+    Creamos una sola vez la matriz de distancias mínimas (un recorrido en
+    anchura desde cada nodo, ver distancias.py) y se la pasamos al resto de
+    funciones. Seguidamente resolvemos las 5 primeras cuestiones de la Act1.
     """
-    min_dist = get_min_dist(G) # Q2
+    distances = get_distances(G)
+
+    min_dist = get_min_dist(G, distances) # Q2
 
-    diameter = get_diameter(G) # Q1
+    diameter = get_diameter(G, distances) # Q1
 
-    average_distance = get_average_dist(G) # Q3
+    average_distance = get_average_dist(G, distances) # Q3
 
-    direct_inter = get_direct_interact(G) # Q4
+    direct_inter = get_direct_interact(G, distances) # Q4
 
-    min10_average_dist = get_10min_average_dist(G) # Q5
+    min10_average_dist = get_10min_average_dist(G, distances) # Q5
 
     """
     Creamos los 4 clusters iniciales y los reordenamos mediante un algoritmo
     (explicado en la función 'clusters_shuffling()') de manera que la distancia
     entre los nodos que forman un cluster es mínima.
     """
-    clusters = clusters_shuffling(G) # Q6
+    clusters = clusters_shuffling(G, distances) # Q6
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_apsp.py
+
+Pruebas de apsp.py frente a networkx: la matriz de distancias es la misma con
+uno o varios procesos, también en grafos no conexos (con el máximo del tipo
+entre los nodos no conectados) y dirigidos, y las métricas no dependen del
+tipo de la matriz.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import apsp
+from distancias import MatrizDistancias, inalcanzable
+from test_distancias import GRAFOS, esperada
+
+@pytest.mark.parametrize("procesos", [1, 2])
+@pytest.mark.parametrize("nombre", sorted(GRAFOS))
+def test_apsp(nombre, procesos):
+    G = GRAFOS[nombre]()
+    tiempos = []
+
+    with apsp.apsp(G, procesos, tiempos) as distancias:
+        assert np.issubdtype(distancias.matriz.dtype, np.integer)
+        assert np.array_equal(distancias.matriz, esperada(
+            G, distancias.nodos, inalcanzable(distancias.matriz.dtype)))
+        assert len(tiempos) == -(-len(G) // apsp.TAM_LOTE)
+
+    assert distancias.matriz is None
+
+def test_camino_largo_uint16():
+    # Cota del diámetro por encima de 255: matriz de uint16.
+    with apsp.apsp(GRAFOS["camino_largo"]()) as distancias:
+        assert distancias.matriz.dtype == np.uint16
+        assert distancias.diametro() == 199
+
+@pytest.mark.parametrize("nombre", sorted(GRAFOS))
+def test_metricas_enteros(nombre):
+    # Las métricas de la matriz de enteros de apsp() son las de la matriz de
+    # flotantes, con np.inf en los nodos no conectados.
+    G = GRAFOS[nombre]()
+    flotantes = MatrizDistancias.desde_grafo(G)
+
+    with apsp.apsp(G) as enteros:
+        assert enteros.diametro() == flotantes.diametro()
+        assert np.array_equal(enteros.sumas(), flotantes.sumas())
+        assert enteros.distancia_media() == flotantes.distancia_media()
+        assert enteros.menor_distancia_media() == \
+            flotantes.menor_distancia_media()
+
+def test_tipo_distancias():
+    assert apsp.tipo_distancias(254) == np.uint8
+    assert apsp.tipo_distancias(255) == np.uint16
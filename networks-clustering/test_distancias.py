@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_distancias.py
+
+Pruebas de distancias.py frente a networkx: la matriz de distancias (con BFS
+o, si hay pesos, con Dijkstra) es la misma en grafos conexos, no conexos y
+dirigidos, y las métricas que se obtienen de ella coinciden con las de
+networkx.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import networkx as nx
+import numpy as np
+import pytest
+
+from distancias import MatrizDistancias, bfs, vecinos
+
+def esperada(G, nodos, valor):
+    """
+    Matriz de distancias de networkx, con valor entre los nodos no conectados.
+    """
+    indices = {nodo: i for i, nodo in enumerate(nodos)}
+    matriz = np.full((len(nodos), len(nodos)), valor, dtype = np.float64)
+
+    for origen, longitudes in nx.all_pairs_shortest_path_length(G):
+        for destino, d in longitudes.items():
+            matriz[indices[origen], indices[destino]] = d
+
+    return matriz
+
+GRAFOS = {
+    "conexo": lambda: nx.connected_watts_strogatz_graph(300, 4, 0.1, seed = 1),
+    "no_conexo": lambda: nx.disjoint_union_all(
+        [nx.path_graph(90), nx.cycle_graph(40), nx.empty_graph(3)]),
+    "camino_largo": lambda: nx.path_graph(200),
+    "dirigido": lambda: nx.gnp_random_graph(150, 0.03, seed = 2,
+                                            directed = True),
+}
+
+@pytest.mark.parametrize("nombre", sorted(GRAFOS))
+def test_desde_grafo(nombre):
+    G = GRAFOS[nombre]()
+    distancias = MatrizDistancias.desde_grafo(G)
+
+    assert np.array_equal(distancias.matriz,
+                          esperada(G, distancias.nodos, np.inf))
+
+@pytest.mark.parametrize("dirigido", [False, True])
+def test_desde_grafo_pesos(dirigido):
+    G = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed = 3)
+
+    if dirigido:
+        G = G.to_directed()
+
+    rng = np.random.default_rng(3)
+
+    for u, v in G.edges():
+        G.edges[u, v]["weight"] = float(rng.integers(1, 10))
+
+    distancias = MatrizDistancias.desde_grafo(G)
+    longitudes = dict(nx.all_pairs_dijkstra_path_length(G))
+
+    for i, u in enumerate(distancias.nodos):
+        for j, v in enumerate(distancias.nodos):
+            assert distancias.matriz[i, j] == longitudes[u][v]
+
+def test_metricas():
+    G = GRAFOS["conexo"]()
+    distancias = MatrizDistancias.desde_grafo(G)
+    medias = {nodo: sum(longitudes.values()) / (len(G) - 1) for nodo,
+              longitudes in nx.all_pairs_shortest_path_length(G)}
+
+    assert distancias.diametro() == nx.diameter(G)
+    assert distancias.distancia_media() == \
+        pytest.approx(nx.average_shortest_path_length(G))
+    assert distancias.menor_distancia_media() == sorted(
+        G, key = lambda nodo: (medias[nodo], distancias.indices[nodo]))[:10]
+
+def test_metricas_no_conexo():
+    distancias = MatrizDistancias.desde_grafo(GRAFOS["no_conexo"]())
+
+    assert distancias.diametro() == np.inf
+    assert np.isinf(distancias.sumas()).all()
+
+def test_grados_sin_lazos():
+    G = nx.Graph([(0, 1), (1, 2), (1, 3), (3, 3)])
+    distancias = MatrizDistancias.desde_grafo(G)
+
+    assert distancias.grados().tolist() == [1, 3, 1, 1]
+    assert distancias.por_interacciones() == [1, 0, 2, 3]
+
+def test_bfs_varios_origenes():
+    G = nx.path_graph(7)
+    adyacencia = nx.to_scipy_sparse_array(G, format = "csr")
+
+    assert sorted(vecinos(adyacencia.indptr, adyacencia.indices,
+                          np.array([0, 3])).tolist()) == [1, 2, 4]
+    assert bfs(adyacencia.indptr, adyacencia.indices,
+               np.array([0, 6])).tolist() == [0, 1, 2, 3, 2, 1, 0]
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_estimadores.py
+
+Pruebas de estimadores.py frente a networkx: el diámetro con iFUB debe ser
+exacto, y las estimaciones con todos los nodos como orígenes, también.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import networkx as nx
+import numpy as np
+import pytest
+
+import estimadores
+
+def grafo_hubs():
+    """
+    Grafo en el que iFUB, si para a mitad de un nivel, da 3 en lugar de 4: la
+    raíz r une los concentradores Ha, Hb y C0..C9 (cada C unido a los demás),
+    con 30 hojas en r, 7 en cada C y una (x, y) en Ha y en Hb.
+    """
+    G = nx.Graph()
+    concentradores = ["Ha", "Hb"] + ["C%d" % i for i in range(10)]
+
+    for h in concentradores:
+        G.add_edge("r", h)
+
+    for c in concentradores[2:]:
+        for h in concentradores:
+            if h != c:
+                G.add_edge(c, h)
+
+        for k in range(7):
+            G.add_edge(c, "%s_%d" % (c, k))
+
+    for k in range(30):
+        G.add_edge("r", "p%d" % k)
+
+    G.add_edge("Ha", "x")
+    G.add_edge("Hb", "y")
+
+    return G
+
+def grafos_aleatorios():
+    """
+    Grafos conexos variados: árboles, caminos, libres de escala y aleatorios.
+    """
+    grafos = [nx.path_graph(1), nx.path_graph(2), nx.path_graph(57),
+              nx.cycle_graph(40), nx.star_graph(30), nx.grid_2d_graph(9, 13),
+              nx.barabasi_albert_graph(500, 2, seed = 3)]
+
+    for semilla in range(20):
+        grafos.append(nx.random_labeled_tree(80 + semilla, seed = semilla))
+        G = nx.gnp_random_graph(120, 0.03, seed = semilla)
+        grafos.append(G.subgraph(max(nx.connected_components(G),
+                                     key = len)).copy())
+
+    return grafos
+
+def test_diametro_ifub_hubs():
+    G = grafo_hubs()
+
+    assert len(G) == 115
+    assert estimadores.diametro(G) == nx.diameter(G) == 4
+
+@pytest.mark.parametrize("G", grafos_aleatorios())
+def test_diametro_ifub(G):
+    assert estimadores.diametro(G) == nx.diameter(G)
+
+def test_diametro_dirigido():
+    for semilla in range(10):
+        G = nx.gnp_random_graph(60, 0.08, seed = semilla, directed = True)
+
+        if nx.is_strongly_connected(G):
+            assert estimadores.diametro(G) == nx.diameter(G)
+
+        else:
+            assert estimadores.diametro(G) == np.inf
+
+def test_diametro_no_conexo():
+    G = nx.disjoint_union(nx.path_graph(5), nx.path_graph(3))
+
+    assert estimadores.diametro(G) == np.inf
+
+def test_distancia_media_exacta():
+    G = nx.barabasi_albert_graph(300, 2, seed = 1)
+    media = estimadores.distancia_media(G, muestras = len(G))
+
+    assert media.valor == pytest.approx(nx.average_shortest_path_length(G))
+    assert media.inferior == pytest.approx(media.superior)
+
+def test_distancia_media_intervalo():
+    G = nx.barabasi_albert_graph(1000, 2, seed = 2)
+    exacta = nx.average_shortest_path_length(G)
+    aciertos = sum(
+        media.inferior <= exacta <= media.superior
+        for media in (estimadores.distancia_media(G, 64, semilla = semilla)
+                      for semilla in range(40)))
+
+    # Al 95%, con 40 muestras, fallar más de 8 veces es muy improbable.
+    assert aciertos >= 32
+
+def test_cercania_exacta():
+    G = nx.gnp_random_graph(150, 0.02, seed = 4, directed = True)
+    cercania = estimadores.cercania(G, muestras = len(G))
+    esperada = nx.closeness_centrality(G, wf_improved = False)
+
+    assert np.allclose(cercania.valor, [esperada[v] for v in G])
@@ -18,6 +18,7 @@ Fecha: 12/11/2020
 """
 from multiprocessing import Process, Queue
 from time import time
+from array import array
 
 class BuscaCoincidencias(Process):
 
@@ -45,8 +46,8 @@ class BuscaCoincidencias(Process):
     def run(self):
         coincidencias = boyer_moore(self.dic, self.patron, self.secuencia)
 
-        for n in coincidencias:
-            self.q.put(n + self.inicio)
+        # Se envían todas las coincidencias del proceso en un único lote.
+        self.q.put(array('q', [n + self.inicio for n in coincidencias]))
 
 def leer_fasta(file):
     """
@@ -236,6 +237,7 @@ def main():
 
         if resto != 0:
             tamañofinal = tamaño + 1
+            resto -= 1
 
         else:
             tamañofinal = tamaño
@@ -247,14 +249,18 @@ def main():
         lista_procesos[i].start()
         inicio = fin - longPatron
 
-    # Unimos los procesos
+    # Recogemos un lote por proceso antes de unirlos: un proceso no termina
+    # hasta que la cola ha recibido todo lo que ha enviado.
+    coincidencias = []
+
     for i in range(p):
-        lista_procesos[i].join()
+        coincidencias.extend(q.get())
 
-    coincidencias = []
+    coincidencias.sort()
 
-    while not q.empty():
-        coincidencias.append(q.get())
+    # Unimos los procesos
+    for i in range(p):
+        lista_procesos[i].join()
 
     # Tomamos el tiempo en el que finaliza la búsqueda.
     tiempo_fin = time()
@@ -18,6 +18,7 @@ Fecha: 12/11/2020
 """
 from time import time
 from multiprocessing import Process,Queue
+from array import array
 
 class Matches(Process):
 
@@ -43,8 +44,8 @@ class Matches(Process):
     def run(self):
         coincidencias = alineamiento(self.patron, self.secuencia)
 
-        for n in coincidencias:
-            self.q.put(n+self.inicio)
+        # Se envían todas las coincidencias del proceso en un único lote.
+        self.q.put(array('q', [n + self.inicio for n in coincidencias]))
 
 def leer_fasta(file):
     """
@@ -126,7 +127,7 @@ def alineamiento(patron, sec):
 
     i = 0
 
-    for i in range(longS -longP):
+    for i in range(longS - longP + 1):
         # con este bucle buscamos coincidencias de la cad_patron, partir del indice i,
         # en la sec empezando por el indice 0 (j) solo hasta un rango
         j = 0
@@ -177,6 +178,7 @@ def main():
 
         if resto != 0:
             tamañofinal = tamaño + 1
+            resto -= 1
 
         else:
             tamañofinal = tamaño
@@ -187,14 +189,18 @@ def main():
         lista_procesos[i].start()
         inicio = fin - longPatron
 
+    # Recogemos un lote por proceso antes de unirlos: un proceso no termina
+    # hasta que la cola ha recibido todo lo que ha enviado.
+    coincidencias = []
+    for i in range(p):
+        coincidencias.extend(q.get())
+
+    coincidencias.sort()
+
     # Unimos los procesos.
     for i in range(p):
         lista_procesos[i].join()
 
-    coincidencias = []
-    while not q.empty():
-        coincidencias.append(q.get())
-
     # Tomamos el tiempo en el que finaliza la búsqueda.
     tiempo_fin = time()
 
@@ -100,7 +100,7 @@ def alineamiento(patron, sec):
 
     # Con este bucle buscamos coincidencias de la cad_patron, partir del
     # índice i, en la sec empezando por el índice 0 (j) sólo hasta un rango.
-    for i in range(longS - longP):
+    for i in range(longS - longP + 1):
 
         j = 0
 
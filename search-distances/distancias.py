@@ -13,6 +13,7 @@ Fecha: 12/11/2020
 """
 from multiprocessing import Process, Queue
 from time import time
+from array import array
 
 class CalculaDistancias(Process):
 
@@ -46,8 +47,8 @@ class CalculaDistancias(Process):
         """
         coincidencias = distancias_Hamming(self.referencia, self.patron,
                                            self.similitud)
-        for c in coincidencias:
-            self.q.put(c + self.inicio)
+        # Se envían todas las coincidencias del proceso en un único lote.
+        self.q.put(array('q', [c + self.inicio for c in coincidencias]))
 
 def leer_fasta(file):
     """
@@ -128,9 +129,10 @@ def distancias_Hamming(referencia, patron, similitud):
     """
     coincidencias = []
 
-    # Iteramos tantas veces como nucleótidos hay en la secuencia de referencia
-    # menos el número de nucleótidos en el patrón.
-    for i in range((len(referencia) - len(patron))):
+    # Iteramos sobre todas las ventanas de la secuencia de referencia (tantas
+    # como nucleótidos hay en ella menos el número de nucleótidos en el patrón,
+    # más uno).
+    for i in range(len(referencia) - len(patron) + 1):
         match = 0
 
         for x, y in zip(list(referencia[i:]), list(patron)):
@@ -185,28 +187,33 @@ def main():
     for i in range(p):
         if resto != 0:
             tamaño_final = tamaño + 1
+            resto -= 1
         else:
             tamaño_final = tamaño
 
         # Como se va a dividir la secuencia de referencia y puede haber
         # coincidencias que no aparecieran a raíz de esto, a cada procesos se le
         # pasa un trozo de secuencia adicional equivalente a la longitud del
-        # patrón.
-        fin = inicio + tamaño_final + long_patron
+        # patrón menos uno (la última ventana que empieza en su trozo).
+        fin = inicio + tamaño_final + long_patron - 1
         referencia = sec[inicio:fin]
         lista_procesos.append(CalculaDistancias(referencia, patron, inicio,
                                                 similitud, q))
         lista_procesos[i].start()
-        inicio = fin - long_patron
+        inicio = fin - (long_patron - 1)
+
+    # Recogemos un lote por proceso antes de unirlos: un proceso no termina
+    # hasta que la cola ha recibido todo lo que ha enviado.
+    posiciones = []
 
-    # Unimos los procesos
     for i in range(p):
-        lista_procesos[i].join()
+        posiciones.extend(q.get())
 
-    posiciones = []
+    posiciones.sort()
 
-    while not q.empty():
-        posiciones.append(q.get())
+    # Unimos los procesos
+    for i in range(p):
+        lista_procesos[i].join()
 
     # Tomamos el tiempo en el que finaliza la búsqueda.
     tiempo_fin = time()
@@ -0,0 +1,579 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+alineador.py
+
+Búsqueda por alineamiento con huecos (gaps). La búsqueda por distancias de
+Hamming (ver distancias.py) sólo admite sustituciones; aquí el patrón se alinea
+con la referencia admitiendo también inserciones y borrados, con penalización
+afín de los huecos (abrir un hueco cuesta más que alargarlo; algoritmo de
+Gotoh). Hay dos modos:
+
+    - semiglobal: el patrón se alinea entero y la referencia no penaliza los
+    extremos (lecturas contra un genoma).
+    - local: Smith-Waterman, se alinea el mejor trozo del patrón.
+
+La programación dinámica está vectorizada con NumPy por filas: para cada
+carácter del patrón se calcula a la vez la fila entera de la matriz (todas las
+posiciones de la referencia), usando un perfil de puntuaciones por carácter.
+Los huecos a lo largo de la referencia, que dependen de la propia fila, se
+obtienen con un máximo acumulado (np.maximum.accumulate) en lugar del bucle
+secuencial. Es el equivalente en NumPy de las versiones SIMD de Farrar, que
+vectorizan en bandas del patrón en lugar de en la referencia.
+
+Para no recorrer todo el genoma, se usa un filtro de semillas (principio del
+palomar): con a lo sumo k errores, al menos uno de k + 1 trozos del patrón
+aparece sin errores. Sólo se alinean las regiones alrededor de esas semillas y
+con una banda de k diagonales a cada lado. Cada alineamiento se devuelve con su
+puntuación, posición y CIGAR.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from bisect import bisect_left
+from collections import namedtuple
+from multiprocessing import Pool
+import re
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from hebras import HEBRAS, patrones_hebras
+from memoria import GenomaCompartido
+from planificador import teselas, TAM_TESELA
+from vectorizado import a_uint8, exacta_numpy
+
+MODOS = ("semiglobal", "local")
+
+# Puntuación de una coincidencia y de un fallo y penalización de un hueco de
+# longitud L: abrir + L * extender.
+Puntuacion = namedtuple("Puntuacion", "coincidencia fallo abrir extender")
+
+PUNTUACION = Puntuacion(2, -3, 5, 2)
+
+# Alineamiento del patrón con la referencia [inicio, fin) (empezando en 0).
+Alineamiento = namedtuple("Alineamiento", "inicio fin puntuacion cigar hebra",
+                          defaults = ("+",))
+
+# Valor de las celdas imposibles (fuera de la banda, por ejemplo).
+INFINITO_NEGATIVO = -(1 << 40)
+
+# Longitud mínima de las semillas. Con semillas más cortas habría tantas
+# regiones candidatas que es más rápido alinear toda la referencia.
+SEMILLA_MINIMA = 8
+
+def umbral_por_defecto(longP, max_errores, puntuacion = PUNTUACION):
+    """
+    Puntuación mínima de un alineamiento del patrón con a lo sumo max_errores
+    errores (sustituciones o huecos de un carácter), en el peor caso.
+    """
+    peor = max(puntuacion.coincidencia - puntuacion.fallo,
+               puntuacion.coincidencia + puntuacion.abrir +
+               puntuacion.extender)
+
+    return longP * puntuacion.coincidencia - max_errores * peor
+
+def _perfil(p, g, puntuacion):
+    """
+    Perfil de puntuaciones: para cada carácter del patrón, la puntuación de
+    alinearlo con cada posición de la referencia.
+    """
+    return {letra: np.where(g == letra, puntuacion.coincidencia,
+                            puntuacion.fallo).astype(np.int64)
+            for letra in set(p.tolist())}
+
+def programacion_dinamica(p, g, modo = "semiglobal", puntuacion = PUNTUACION,
+                          banda = None, matrices = False):
+    """
+    Rellena la matriz de alineamiento fila a fila (una fila por carácter del
+    patrón, una columna por posición de la referencia). H es la mejor
+    puntuación de cada celda, E la de terminar con un hueco en la referencia
+    (inserción, vertical) y F la de terminar con un hueco en el patrón (borrado,
+    horizontal). F se obtiene de la fila sin borrados con un máximo acumulado:
+
+        F[j] = max(Hp[k] + k * extender, k < j) - j * extender - abrir
+
+    INPUTS:
+        - p (tipo np.ndarray): patrón (uint8).
+        - g (tipo np.ndarray): referencia (uint8).
+        - modo (tipo string): "semiglobal" o "local".
+        - puntuacion (tipo Puntuacion): esquema de puntuación.
+        - banda (tipo tupla): diagonales permitidas (mínimo y máximo de j - i);
+        None para no limitar.
+        - matrices (tipo booleano): si es True se guardan todas las filas (para
+        reconstruir el alineamiento).
+
+    RETURNS:
+        - finales (tipo np.ndarray): mejor puntuación de un alineamiento que
+        termina en cada columna.
+        - filas (tipo np.ndarray): fila donde se alcanza (en modo local).
+        - (tipo tupla): matrices H, Hp (H sin borrados), E y F, o None.
+    """
+    n = len(g)
+    abrir = puntuacion.abrir + puntuacion.extender
+    extender = puntuacion.extender
+    perfil = _perfil(p, g, puntuacion)
+    columnas = np.arange(n + 1, dtype = np.int64)
+    local = modo == "local"
+
+    H = np.zeros(n + 1, dtype = np.int64)
+    E = np.full(n + 1, INFINITO_NEGATIVO, dtype = np.int64)
+
+    if banda is not None:
+        H[(columnas < banda[0]) | (columnas > banda[1])] = INFINITO_NEGATIVO
+
+    mejores = H.copy()
+    filas = np.zeros(n + 1, dtype = np.int64)
+    guardadas = [(H, H, E, E)]
+
+    for i in range(1, len(p) + 1):
+        E = np.maximum(H - abrir, E - extender)
+        Hp = E.copy()
+        np.maximum(Hp[1:], H[:-1] + perfil[p[i - 1]], out = Hp[1:])
+
+        if local:
+            np.maximum(Hp, 0, out = Hp)
+
+        if banda is not None:
+            fuera = (columnas - i < banda[0]) | (columnas - i > banda[1])
+            Hp[fuera] = INFINITO_NEGATIVO
+            E[fuera] = INFINITO_NEGATIVO
+
+        F = np.full(n + 1, INFINITO_NEGATIVO, dtype = np.int64)
+        F[1:] = (np.maximum.accumulate(Hp + columnas * extender)[:-1] -
+                 columnas[1:] * extender - abrir + extender)
+
+        if banda is not None:
+            F[fuera] = INFINITO_NEGATIVO
+
+        H = np.maximum(Hp, F)
+
+        if local:
+            mejora = H > mejores
+            mejores[mejora] = H[mejora]
+            filas[mejora] = i
+
+        if matrices:
+            guardadas.append((H, Hp, E, F))
+
+    if not local:
+        mejores = H
+        filas[:] = len(p)
+
+    if not matrices:
+        return mejores, filas, None
+
+    return mejores, filas, tuple(np.array(m) for m in zip(*guardadas))
+
+def _cigar(operaciones):
+    """
+    Convierte la lista de operaciones (M, I, D, S) en una cadena CIGAR.
+    """
+    cigar = []
+    anterior = None
+    cuenta = 0
+
+    for op in operaciones:
+        if op == anterior:
+            cuenta += 1
+
+        else:
+            if anterior:
+                cigar.append("%d%s" % (cuenta, anterior))
+
+            anterior = op
+            cuenta = 1
+
+    if anterior:
+        cigar.append("%d%s" % (cuenta, anterior))
+
+    return "".join(cigar)
+
+def reconstruir(p, g, matrices, i, j, modo = "semiglobal",
+                puntuacion = PUNTUACION):
+    """
+    Reconstruye (traceback) el alineamiento que termina en la celda (i, j). En
+    modo local, los extremos del patrón que quedan sin alinear se indican en el
+    CIGAR como recortados (S).
+
+    INPUTS:
+        - p (tipo np.ndarray): patrón (uint8).
+        - g (tipo np.ndarray): referencia (uint8).
+        - matrices (tipo tupla): H, Hp, E y F (ver programacion_dinamica()).
+        - i (tipo integer): fila final (m en modo semiglobal).
+        - j (tipo integer): columna final.
+        - modo (tipo string): "semiglobal" o "local".
+        - puntuacion (tipo Puntuacion): esquema de puntuación.
+
+    RETURNS:
+        - inicio (tipo integer): columna donde empieza el alineamiento.
+        - cigar (tipo string): operaciones del alineamiento (M, I, D, S).
+    """
+    H, Hp, E, F = matrices
+    abrir = puntuacion.abrir + puntuacion.extender
+    local = modo == "local"
+    operaciones = ["S"] * (len(p) - i)
+    estado = "H"
+
+    while i > 0:
+        if estado == "H":
+            estado = "P" if H[i, j] == Hp[i, j] else "F"
+
+        elif estado == "P":
+            if local and Hp[i, j] == 0:
+                break
+
+            if j > 0 and Hp[i, j] == H[i - 1, j - 1] + (
+                    puntuacion.coincidencia if g[j - 1] == p[i - 1]
+                    else puntuacion.fallo):
+                operaciones.append("M")
+                i -= 1
+                j -= 1
+                estado = "H"
+
+            else:
+                estado = "E"
+
+        elif estado == "E":
+            operaciones.append("I")
+
+            if E[i, j] == H[i - 1, j] - abrir:
+                estado = "H"
+
+            i -= 1
+
+        else:
+            operaciones.append("D")
+
+            if F[i, j] == Hp[i, j - 1] - abrir:
+                estado = "P"
+
+            j -= 1
+
+    operaciones += ["S"] * i
+
+    return j, _cigar(reversed(operaciones))
+
+def _picos(finales, umbral, max_errores):
+    """
+    Columnas finales de los alineamientos: las que superan el umbral y son
+    máximas entre sus vecinas a distancia max_errores (desplazar el final de un
+    alineamiento unas pocas posiciones da otro casi igual).
+    """
+    radio = max(max_errores, 1)
+    relleno = np.pad(finales, radio, constant_values = INFINITO_NEGATIVO)
+    vecinas = sliding_window_view(relleno, 2 * radio + 1).max(axis = 1)
+
+    return np.flatnonzero((finales >= umbral) & (finales == vecinas))
+
+# Operaciones del principio del CIGAR que consumen el patrón sin avanzar en
+# la referencia: recortes (modo local) e inserciones.
+RECORTE = re.compile(r"^(?:\d+[SI])+")
+
+def diagonal(alineamiento):
+    """
+    Diagonal de un alineamiento: posición de la referencia en la que quedaría
+    el primer carácter del patrón (su inicio menos lo que se recorta o se
+    inserta al principio).
+    """
+    recorte = RECORTE.match(alineamiento.cigar)
+
+    if recorte is None:
+        return alineamiento.inicio
+
+    return alineamiento.inicio - sum(map(int, re.findall(r"\d+",
+                                                         recorte.group())))
+
+def _clave(alineamiento):
+    """
+    Orden de preferencia entre alineamientos del mismo locus: mayor
+    puntuación y, a igualdad, el que empieza antes y es más corto.
+    """
+    return (-alineamiento.puntuacion, alineamiento.inicio, alineamiento.fin,
+            alineamiento.cigar)
+
+def mejores_por_locus(alineamientos, max_errores):
+    """
+    Deja un solo alineamiento por locus: se descarta cada alineamiento que se
+    solapa, en la misma hebra y con una diagonal a max_errores o menos, con
+    otro mejor (ver _clave()). En modo local, alargar o acortar el final de un
+    alineamiento da otros parecidos con distinto CIGAR.
+
+    Que un alineamiento se quede depende sólo de los que se solapan con él (no
+    del orden en que se comparan), así que el resultado es el mismo buscando
+    en toda la referencia que juntando lo encontrado por teselas.
+
+    INPUTS:
+        - alineamientos (tipo iterable): Alineamiento de cada coincidencia.
+        - max_errores (tipo integer): número máximo de errores (k).
+
+    RETURN:
+        - (tipo lista): los alineamientos elegidos, ordenados por posición.
+    """
+    ordenados = sorted(set(alineamientos))
+    inicios = [a.inicio for a in ordenados]
+    diagonales = [diagonal(a) for a in ordenados]
+    alcance = max((a.fin - a.inicio for a in ordenados), default = 0)
+    elegidos = []
+
+    for a, d in zip(ordenados, diagonales):
+        clave = _clave(a)
+        desde = bisect_left(inicios, a.inicio - alcance)
+        hasta = bisect_left(inicios, a.fin)
+
+        if not any(b.hebra == a.hebra and a.inicio < b.fin and
+                   abs(diagonales[n] - d) <= max_errores and
+                   _clave(b) < clave
+                   for n, b in enumerate(ordenados[desde:hasta], desde)):
+            elegidos.append(a)
+
+    return elegidos
+
+def regiones_semillas(p, g, max_errores):
+    """
+    Regiones candidatas de la referencia según el filtro de semillas: el patrón
+    se divide en max_errores + 1 trozos y cada aparición exacta de uno de ellos
+    fija una diagonal. La región de cada diagonal d es [d - k, d + m + k) y las
+    regiones que se solapan se unen.
+
+    INPUTS:
+        - p (tipo np.ndarray): patrón (uint8).
+        - g (tipo np.ndarray): referencia (uint8).
+        - max_errores (tipo integer): número máximo de errores (k).
+
+    RETURN:
+        - regiones (tipo lista): tuplas (inicio, fin, banda); la banda es
+        relativa al inicio de la región, o None si la región une varias
+        diagonales.
+    """
+    longP = len(p)
+    longS = longP // (max_errores + 1)
+    n = len(g)
+
+    diagonales = np.unique(np.concatenate(
+        [exacta_numpy(p[q * longS:(q + 1) * longS], g) - q * longS
+         for q in range(max_errores + 1)]))
+
+    regiones = []
+
+    for d in diagonales.tolist():
+        inicio = max(d - max_errores, 0)
+        fin = min(d + longP + max_errores, n)
+
+        if regiones and inicio <= regiones[-1][1]:
+            regiones[-1] = (regiones[-1][0], max(fin, regiones[-1][1]), None)
+
+        else:
+            regiones.append((inicio, fin, (d - max_errores - inicio,
+                                           d + max_errores - inicio)))
+
+    return regiones
+
+def buscar_alineamientos(patron, referencia, max_errores, modo = "semiglobal",
+                         umbral = None, puntuacion = PUNTUACION,
+                         semillas = True):
+    """
+    Busca los alineamientos del patrón en la referencia con una puntuación de
+    al menos umbral, el mejor de cada locus (ver candidatos() y
+    mejores_por_locus()). Los argumentos son los de candidatos().
+
+    RETURN:
+        - alineamientos (tipo lista): Alineamiento de cada coincidencia,
+        ordenados por posición.
+    """
+    return mejores_por_locus(candidatos(patron, referencia, max_errores, modo,
+                                        umbral, puntuacion, semillas),
+                             max_errores)
+
+def candidatos(patron, referencia, max_errores, modo = "semiglobal",
+               umbral = None, puntuacion = PUNTUACION, semillas = True):
+    """
+    Alineamientos candidatos del patrón en la referencia con una puntuación de
+    al menos umbral. Primero se calcula la puntuación final de cada columna
+    (sin guardar la matriz) y, para cada final elegido, se reconstruye el
+    alineamiento en una ventana de m + k posiciones. Un mismo locus puede dar
+    varios candidatos.
+
+    INPUTS:
+        - patron (tipo string o bytes): cadena que se va a buscar.
+        - referencia (tipo string, bytes o memoryview): secuencia de
+        referencia.
+        - max_errores (tipo integer): número máximo de errores (k), para la
+        banda, las semillas y el umbral por defecto.
+        - modo (tipo string): "semiglobal" o "local".
+        - umbral (tipo integer): puntuación mínima; por defecto, la de k
+        errores en el peor caso (ver umbral_por_defecto()).
+        - puntuacion (tipo Puntuacion): esquema de puntuación.
+        - semillas (tipo booleano): si es True se usa el filtro de semillas.
+
+    RETURN:
+        - alineamientos (tipo lista): Alineamiento de cada candidato.
+    """
+    if modo not in MODOS:
+        raise ValueError("Modo de alineamiento desconocido: %s" % modo)
+
+    p = a_uint8(patron)
+    g = a_uint8(referencia)
+    longP = len(p)
+
+    if umbral is None:
+        umbral = umbral_por_defecto(longP, max_errores, puntuacion)
+
+    if longP == 0 or len(g) == 0:
+        return []
+
+    if semillas and longP // (max_errores + 1) >= SEMILLA_MINIMA:
+        regiones = regiones_semillas(p, g, max_errores)
+
+    else:
+        regiones = [(0, len(g), None)]
+
+    alineamientos = []
+
+    for inicio, fin, banda in regiones:
+        finales, _, _ = programacion_dinamica(p, g[inicio:fin], modo,
+                                              puntuacion, banda)
+
+        for j in _picos(finales, umbral, max_errores).tolist():
+            final = inicio + j
+            ventana = max(final - longP - max_errores, inicio)
+            g_ventana = g[ventana:final]
+            _, filas, matrices = programacion_dinamica(p, g_ventana, modo,
+                                                       puntuacion,
+                                                       matrices = True)
+            i = filas[-1]
+            comienzo, cigar = reconstruir(p, g_ventana, matrices, i,
+                                          len(g_ventana), modo, puntuacion)
+            valor = int(matrices[0][i, -1])
+
+            if valor >= umbral:
+                alineamientos.append(Alineamiento(ventana + comienzo, final,
+                                                  valor, cigar))
+
+    return alineamientos
+
+# Estado de cada proceso del pool (ver _iniciar()).
+_genoma = None
+_busqueda = None
+
+def _iniciar(nombre, longitud, patron, max_errores, modo, umbral,
+             ambas_hebras):
+    """
+    Inicializa un proceso del pool: se conecta al genoma compartido y guarda
+    los datos de la búsqueda.
+    """
+    global _genoma, _busqueda
+
+    _genoma = GenomaCompartido.adjuntar(nombre, longitud)
+    _busqueda = (patron, max_errores, modo, umbral, ambas_hebras)
+
+def _alinear_tesela(tesela):
+    """
+    Busca los candidatos de una tesela (en un proceso del pool). Sólo se
+    devuelven los que empiezan en las posiciones propias de la tesela, pero
+    se lee el genoma con margen por los dos lados (ver
+    buscar_alineamientos_procesos()) para que se encuentren igual que
+    buscando en todo el genoma.
+    """
+    _, inicio, propio, fin = tesela
+    patron, max_errores, modo, umbral, ambas_hebras = _busqueda
+    patrones = patrones_hebras(patron) if ambas_hebras else [patron]
+    lectura = max(inicio - 2 * (len(patron) + 2 * max_errores), 0)
+    alineamientos = []
+    ventana = _genoma.ventana(lectura, fin)
+
+    try:
+        for hebra, p in zip(HEBRAS, patrones):
+            for a in candidatos(p, ventana, max_errores, modo, umbral):
+                if inicio <= a.inicio + lectura < propio:
+                    alineamientos.append(a._replace(
+                        inicio = a.inicio + lectura, fin = a.fin + lectura,
+                        hebra = hebra))
+    finally:
+        ventana.release()
+
+    return sorted(alineamientos)
+
+def buscar_alineamientos_procesos(genoma, patron, p, max_errores,
+                                  modo = "semiglobal", umbral = None,
+                                  ambas_hebras = False,
+                                  tam_tesela = TAM_TESELA):
+    """
+    Busca los alineamientos del patrón sobre el genoma compartido con un pool
+    de p procesos que se reparten las teselas (ver planificador.py), igual que
+    los procesos CalculaDistancias de distancias.py se reparten el genoma. Las
+    teselas se leen con m + 2k caracteres más por detrás (un alineamiento
+    puede ocupar hasta m + k posiciones y sus vecinos se necesitan para elegir
+    el final) y con el doble por delante (las semillas de las diagonales
+    vecinas, en modo local, pueden quedar hasta m antes del inicio). Cada
+    tesela devuelve los candidatos que empiezan en sus posiciones propias y el
+    padre elige el mejor de cada locus (ver mejores_por_locus()) cuando ya
+    tiene todos los que se pueden solapar con él, así que el resultado es el
+    de buscar_alineamientos() en todo el genoma, sea cual sea tam_tesela.
+
+    INPUTS:
+        - genoma (tipo GenomaCompartido): genoma en memoria compartida.
+        - patron (tipo string): cadena que se va a buscar.
+        - p (tipo integer): número de procesos.
+        - max_errores (tipo integer): número máximo de errores.
+        - modo (tipo string): "semiglobal" o "local".
+        - umbral (tipo integer): puntuación mínima (ver buscar_alineamientos()).
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - tam_tesela (tipo integer): número de posiciones propias por tesela.
+
+    RETURN:
+        - (tipo generador): Alineamiento de cada coincidencia, en orden.
+    """
+    solape = len(patron) + 2 * max_errores
+    lista = list(teselas(len(genoma), len(patron), tam_tesela, solape))
+    pendientes = []
+    emitidos = 0 # Posición hasta la que ya se han devuelto alineamientos.
+
+    with Pool(p, _iniciar, (genoma.nombre, len(genoma), patron, max_errores,
+                            modo, umbral, ambas_hebras)) as pool:
+
+        for tesela, alineamientos in zip(lista, pool.imap(_alinear_tesela,
+                                                          lista)):
+            pendientes += alineamientos
+
+            # Un alineamiento ocupa a lo sumo m + k posiciones: los que
+            # empiezan antes de este límite no se solapan con los de las
+            # teselas siguientes, que empiezan a partir del final propio, y
+            # ya se puede decidir si se quedan.
+            limite = tesela[2] - len(patron) - max_errores
+
+            for a in mejores_por_locus(pendientes, max_errores):
+                if emitidos <= a.inicio < limite:
+                    yield a
+
+            # Se olvidan los que ya no se solapan con ninguno sin decidir.
+            emitidos = max(emitidos, limite)
+            pendientes = [a for a in pendientes if a.fin > emitidos]
+
+    for a in mejores_por_locus(pendientes, max_errores):
+        if a.inicio >= emitidos:
+            yield a
+
+def escribir_alineamientos(genoma, patron, p, escritor, max_errores,
+                           modo = "semiglobal", umbral = None,
+                           ambas_hebras = False, tam_tesela = TAM_TESELA):
+    """
+    Igual que buscar_alineamientos_procesos(), pero escribiendo los
+    alineamientos con el escritor indicado (ver
+    resultados.EscritorCoincidencias.escribir_alineamiento()).
+
+    RETURNS:
+        - (tipo integer): número de alineamientos escritos.
+    """
+    total = 0
+
+    for alineamiento in buscar_alineamientos_procesos(genoma, patron, p,
+                                                      max_errores, modo,
+                                                      umbral, ambas_hebras,
+                                                      tam_tesela):
+        escritor.escribir_alineamiento(alineamiento)
+        total += 1
+
+    return total
@@ -0,0 +1,471 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+
+Banco de pruebas de los motores de búsqueda. Genera genomas sintéticos
+reproducibles (a partir de una semilla) de tres tipos:
+
+    - aleatorio: nucleótidos uniformes e independientes.
+    - repetitivo: baja complejidad, con repeticiones en tándem de motivos
+    cortos (microsatélites) intercaladas con secuencia aleatoria.
+    - gc: parecido a un genoma real, con regiones de distinto contenido en GC
+    (isocoras) y sesgo G/C que cambia de signo a mitad del genoma (como entre
+    el origen y el término de replicación de un cromosoma bacteriano).
+
+Sobre cada genoma se ejecuta cada motor con cada número de procesos y se
+mide el rendimiento (MB/s), las coincidencias por segundo, la memoria máxima
+(RSS) del proceso principal y de los procesos de búsqueda y la eficiencia
+paralela (t1 / (p * tp)). Las coincidencias de cada ejecución se comprueban
+con las de alineamiento() (search-brute_force) sobre el principio del genoma.
+
+Ejemplos:
+
+    python3 benchmark.py
+    python3 benchmark.py --tamanos 1M 100M --motores numpy boyer_moore -p 1 4
+    python3 benchmark.py --tipos gc --tamanos 10G --motores numpy -p 8 --json r.json
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process, Queue
+from time import perf_counter
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import tempfile
+
+import numpy as np
+
+from externa import buscar_fuera_de_memoria, TAM_VENTANA
+from fasta import ventanas_fasta
+from hebras import complemento_inverso, HEBRAS
+from memoria import GenomaCompartido
+from motores import MOTORES
+from planificador import escribir_teselas
+from procesos import escribir_procesos
+
+TIPOS = ("aleatorio", "repetitivo", "gc")
+
+NUCLEOTIDOS = np.frombuffer(b"ACGT", dtype = np.uint8)
+
+# Caracteres por línea de los ficheros FASTA generados.
+ANCHO_LINEA = 60
+
+# Nucleótidos generados de cada vez (múltiplo de ANCHO_LINEA, unos 4 MB).
+TAM_BLOQUE = ANCHO_LINEA << 16
+
+# Longitud de las regiones de contenido en GC constante (genoma gc).
+TAM_ISOCORA = 100000
+
+# Posiciones del principio del genoma comprobadas con alineamiento().
+TAM_VERIFICACION = 1 << 20
+
+SUFIJOS = {"K": 10 ** 3, "M": 10 ** 6, "G": 10 ** 9}
+
+def leer_tamano(cadena):
+    """
+    Convierte un tamaño como 1M o 10G (potencias de 10) en un entero.
+    """
+    cadena = cadena.strip().upper()
+
+    if cadena[-1:] in SUFIJOS:
+        return int(float(cadena[:-1]) * SUFIJOS[cadena[-1]])
+
+    return int(cadena)
+
+def _bloque_aleatorio(rng, n):
+    """
+    Nucleótidos uniformes e independientes.
+    """
+    return NUCLEOTIDOS[rng.integers(0, 4, n)]
+
+def _bloque_repetitivo(rng, n):
+    """
+    Secuencia de baja complejidad: tramos aleatorios seguidos de repeticiones
+    en tándem de un motivo de 1 a 6 nucleótidos.
+    """
+    trozos = []
+    total = 0
+
+    while total < n:
+        trozos.append(_bloque_aleatorio(rng, int(rng.integers(50, 500))))
+        motivo = _bloque_aleatorio(rng, int(rng.integers(1, 7)))
+        trozos.append(np.resize(motivo, int(rng.integers(100, 5000))))
+        total += len(trozos[-2]) + len(trozos[-1])
+
+    return np.concatenate(trozos)[:n]
+
+def _bloque_gc(rng, n, inicio, longitud):
+    """
+    Secuencia con regiones de TAM_ISOCORA nucleótidos de contenido en GC
+    variable y sesgo (G - C) / (G + C) positivo en la primera mitad del genoma
+    y negativo en la segunda.
+    """
+    trozos = []
+    pos = inicio
+
+    while pos < inicio + n:
+        tam = min(TAM_ISOCORA - pos % TAM_ISOCORA, inicio + n - pos)
+        gc = rng.beta(8, 11)                  # Media de 0.42, como el humano.
+        sesgo = 0.05 if pos < longitud // 2 else -0.05
+        prob = [(1 - gc) / 2, gc * (1 - sesgo) / 2, gc * (1 + sesgo) / 2,
+                (1 - gc) / 2]                 # A, C, G, T.
+        trozos.append(NUCLEOTIDOS[rng.choice(4, tam, p = prob)])
+        pos += tam
+
+    return np.concatenate(trozos)
+
+def generar_fasta(fichero, tipo, longitud, semilla = 0):
+    """
+    Escribe un genoma sintético en formato FASTA (un solo registro). Se genera
+    por bloques, así que la memoria necesaria no depende de la longitud. Cada
+    bloque usa su propio generador (semilla, número de bloque): el mismo tipo,
+    longitud y semilla producen siempre el mismo fichero.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero FASTA.
+        - tipo (tipo string): "aleatorio", "repetitivo" o "gc".
+        - longitud (tipo integer): número de nucleótidos.
+        - semilla (tipo integer): semilla de los generadores aleatorios.
+    """
+    if tipo not in TIPOS:
+        raise ValueError("Tipo de genoma desconocido: %s" % tipo)
+
+    with open(fichero, "wb") as f:
+        f.write(b">%s_%d longitud=%d semilla=%d\n" %
+                (tipo.encode("ascii"), longitud, longitud, semilla))
+
+        for k, inicio in enumerate(range(0, longitud, TAM_BLOQUE)):
+            n = min(TAM_BLOQUE, longitud - inicio)
+            rng = np.random.default_rng([semilla, k])
+
+            if tipo == "aleatorio":
+                bloque = _bloque_aleatorio(rng, n)
+
+            elif tipo == "repetitivo":
+                bloque = _bloque_repetitivo(rng, n)
+
+            else:
+                bloque = _bloque_gc(rng, n, inicio, longitud)
+
+            # Se añade un salto de línea cada ANCHO_LINEA nucleótidos.
+            lineas = len(bloque) // ANCHO_LINEA
+            completas = bloque[:lineas * ANCHO_LINEA].reshape(lineas,
+                                                              ANCHO_LINEA)
+            saltos = np.full((lineas, 1), ord("\n"), dtype = np.uint8)
+            f.write(np.hstack((completas, saltos)).tobytes())
+
+            if len(bloque) % ANCHO_LINEA:
+                f.write(bloque[lineas * ANCHO_LINEA:].tobytes() + b"\n")
+
+def genoma_prueba(directorio, tipo, longitud, semilla = 0):
+    """
+    Devuelve el fichero FASTA del genoma pedido, generándolo sólo si no existe
+    (los genomas grandes tardan en crearse y se reutilizan entre ejecuciones).
+    """
+    fichero = os.path.join(directorio, "%s_%d_%d.fasta" %
+                           (tipo, longitud, semilla))
+
+    if not os.path.exists(fichero):
+        temporal = fichero + ".tmp"
+        generar_fasta(temporal, tipo, longitud, semilla)
+        os.replace(temporal, fichero)
+
+    return fichero
+
+def elegir_patron(fichero, longP, semilla = 0):
+    """
+    Toma como patrón un trozo del principio del genoma (así tiene al menos una
+    coincidencia) en una posición elegida con la semilla.
+    """
+    datos = next(ventanas_fasta(fichero, TAM_VERIFICACION, 0))[2]
+    inicio = random.Random(semilla).randrange(max(len(datos) - longP, 0) + 1)
+
+    return datos[inicio:inicio + longP].decode("ascii")
+
+def _alineamiento():
+    """
+    Importa alineamiento() del programa de fuerza bruta original.
+    """
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                        "search-brute_force", "fuerzab_secuencial.py")
+    spec = importlib.util.spec_from_file_location("fuerzab_secuencial", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+
+    return modulo.alineamiento
+
+def coincidencias_referencia(fichero, patron, ambas_hebras = False,
+                             limite = TAM_VERIFICACION):
+    """
+    Coincidencias de alineamiento() en las limite primeras posiciones del
+    primer registro, que sirven de referencia para comprobar los motores.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero FASTA.
+        - patron (tipo string): cadena que se va a buscar.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - limite (tipo integer): número de posiciones comprobadas.
+
+    RETURN:
+        - (tipo lista): posiciones (empezando en 0) del match, o tuplas
+        (posicion, hebra) si se busca en las dos hebras, en orden.
+    """
+    alineamiento = _alineamiento()
+    sec = next(ventanas_fasta(fichero, limite, 0))[2].decode("ascii")
+
+    # alineamiento() devuelve las posiciones empezando en 1.
+    if not ambas_hebras:
+        return [n - 1 for n in alineamiento(patron, sec)]
+
+    patrones = [patron, complemento_inverso(patron)]
+
+    return sorted((n - 1, HEBRAS[k]) for k, p in enumerate(patrones)
+                  for n in alineamiento(p, sec))
+
+class Contador:
+    """
+    Destino de coincidencias (con la interfaz de EscritorCoincidencias) que
+    sólo las cuenta y guarda las que caen en la zona comprobada.
+    """
+    def __init__(self, patron, limite = TAM_VERIFICACION):
+        self.limite = limite - len(patron)
+        self.registro = None
+        self.total = 0
+        self.comprobadas = []
+
+    def escribir(self, posicion, cromosoma = None, hebra = None):
+        """
+        Añade una coincidencia. Sólo se tiene en cuenta el primer registro.
+        """
+        self.total += 1
+
+        if self.registro is None:
+            self.registro = cromosoma
+
+        if posicion <= self.limite and cromosoma == self.registro:
+            self.comprobadas.append((posicion, hebra) if hebra else posicion)
+
+    def escribir_todas(self, coincidencias):
+        """
+        Añade todas las coincidencias de un iterable (ver
+        EscritorCoincidencias.escribir_todas()).
+        """
+        for c in coincidencias:
+            if isinstance(c, tuple):
+                self.escribir(c[0], hebra = c[1])
+
+            else:
+                self.escribir(c)
+
+def _rss_maximo():
+    """
+    Memoria máxima (RSS, en MB) de este proceso y del mayor de sus hijos.
+    """
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    # En Linux ru_maxrss está en kB.
+    return propio / 1024, hijos / 1024
+
+def _ejecutar(fichero, patron, motor, p, modo, ambas_hebras, tam_ventana, q):
+    """
+    Ejecuta una búsqueda (en un proceso nuevo, para medir su memoria sin la de
+    las anteriores) y envía por la cola el tiempo, el número de coincidencias,
+    las coincidencias comprobables y la memoria máxima.
+    """
+    contador = Contador(patron)
+    inicio = perf_counter()
+
+    if modo == "compartida":
+        with GenomaCompartido.cargar_fasta(fichero) as genoma:
+            escribir_procesos(genoma, patron, p, contador, motor, 0,
+                              ambas_hebras)
+    elif modo == "teselas":
+        with GenomaCompartido.cargar_fasta(fichero) as genoma:
+            escribir_teselas(genoma, patron, p, contador, motor, 0,
+                             ambas_hebras)
+    else:
+        for c in buscar_fuera_de_memoria(fichero, patron, motor, 0, p,
+                                         tam_ventana, ambas_hebras):
+            contador.escribir(c[1], c[0], *c[2:])
+
+    tiempo = perf_counter() - inicio
+
+    q.put((tiempo, contador.total, contador.comprobadas) + _rss_maximo())
+
+def medir(fichero, patron, motor, p, modo = "ventanas", ambas_hebras = False,
+          tam_ventana = TAM_VENTANA):
+    """
+    Mide una búsqueda con un motor y un número de procesos.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero FASTA.
+        - patron (tipo string): cadena que se va a buscar.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - p (tipo integer): número de procesos.
+        - modo (tipo string): "ventanas" (ver externa.py), "compartida" (ver
+        procesos.py) o "teselas" (ver planificador.py).
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - tam_ventana (tipo integer): posiciones por ventana en el modo
+        ventanas.
+
+    RETURNS:
+        - tiempo (tipo float): segundos que ha tardado la búsqueda.
+        - total (tipo integer): número de coincidencias.
+        - comprobadas (tipo lista): coincidencias en la zona comprobada.
+        - rss_principal (tipo float): memoria máxima del proceso principal
+        (MB).
+        - rss_hijo (tipo float): memoria máxima del mayor proceso de búsqueda
+        (MB).
+    """
+    q = Queue()
+    proceso = Process(target = _ejecutar,
+                      args = (fichero, patron, motor, p, modo, ambas_hebras,
+                              tam_ventana, q))
+    proceso.start()
+    resultado = q.get()
+    proceso.join()
+
+    return resultado
+
+def benchmark(tipos, tamanos, motores, procesos, longP = 12, modo = "ventanas",
+              ambas_hebras = False, directorio = None, semilla = 0,
+              tam_ventana = TAM_VENTANA, mostrar = print):
+    """
+    Ejecuta todas las combinaciones de genoma, motor y número de procesos.
+
+    INPUTS:
+        - tipos (tipo lista): tipos de genoma (ver TIPOS).
+        - tamanos (tipo lista): longitudes de los genomas.
+        - motores (tipo lista): nombres de los motores (ver MOTORES).
+        - procesos (tipo lista): números de procesos.
+        - longP (tipo integer): longitud del patrón.
+        - modo (tipo string): "ventanas", "compartida" o "teselas".
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - directorio (tipo string): directorio de los genomas generados.
+        - semilla (tipo integer): semilla de los genomas y del patrón.
+        - tam_ventana (tipo integer): posiciones por ventana en el modo
+        ventanas.
+        - mostrar (tipo función): función a la que se pasa cada línea de la
+        tabla de resultados (None para no mostrar nada).
+
+    RETURN:
+        - resultados (tipo lista): un diccionario por ejecución.
+    """
+    directorio = directorio or os.path.join(tempfile.gettempdir(),
+                                            "benchmark-busqueda")
+    os.makedirs(directorio, exist_ok = True)
+    procesos = sorted(procesos)
+    resultados = []
+
+    if mostrar:
+        mostrar("%-10s %12s %-14s %3s %9s %9s %12s %9s %9s %6s %s" %
+                ("genoma", "longitud", "motor", "p", "tiempo(s)", "MB/s",
+                 "coinc./s", "RSS(MB)", "hijo(MB)", "efic.", "correcto"))
+
+    for tipo in tipos:
+        for longitud in tamanos:
+            fichero = genoma_prueba(directorio, tipo, longitud, semilla)
+            patron = elegir_patron(fichero, longP, semilla)
+            esperadas = coincidencias_referencia(fichero, patron, ambas_hebras)
+
+            for motor in motores:
+                base = None
+
+                for p in procesos:
+                    tiempo, total, comprobadas, rss, rss_hijo = medir(
+                        fichero, patron, motor, p, modo, ambas_hebras,
+                        tam_ventana)
+
+                    # Eficiencia respecto al menor número de procesos medido.
+                    base = base or (tiempo * p)
+
+                    resultado = {
+                        "genoma": tipo,
+                        "longitud": longitud,
+                        "patron": patron,
+                        "motor": motor,
+                        "procesos": p,
+                        "modo": modo,
+                        "ambas_hebras": ambas_hebras,
+                        "tiempo": tiempo,
+                        "mb_s": longitud / 1e6 / tiempo,
+                        "coincidencias": total,
+                        "coincidencias_s": total / tiempo,
+                        "rss_mb": rss,
+                        "rss_hijo_mb": rss_hijo,
+                        "eficiencia": base / (p * tiempo),
+                        "correcto": comprobadas == esperadas,
+                    }
+                    resultados.append(resultado)
+
+                    if mostrar:
+                        mostrar("%-10s %12d %-14s %3d %9.3f %9.2f %12.0f "
+                                "%9.1f %9.1f %6.2f %s" %
+                                (tipo, longitud, motor, p, tiempo,
+                                 resultado["mb_s"],
+                                 resultado["coincidencias_s"], rss, rss_hijo,
+                                 resultado["eficiencia"],
+                                 "sí" if resultado["correcto"] else "NO"))
+
+    return resultados
+
+def main(argv = None):
+    """
+    Función principal.
+    """
+    parser = argparse.ArgumentParser(
+        description = "Banco de pruebas de los motores de búsqueda.")
+
+    parser.add_argument("--tipos", nargs = "+", choices = TIPOS,
+                        default = list(TIPOS), help = "tipos de genoma")
+    parser.add_argument("--tamanos", nargs = "+", type = leer_tamano,
+                        default = [10 ** 6],
+                        help = "longitudes de los genomas (p. ej. 1M 10G)")
+    parser.add_argument("--motores", nargs = "+", choices = sorted(MOTORES),
+                        default = sorted(MOTORES), help = "motores de búsqueda")
+    parser.add_argument("-p", "--procesos", nargs = "+", type = int,
+                        default = [1, 2, 4], help = "números de procesos")
+    parser.add_argument("-l", "--longitud-patron", type = int, default = 12,
+                        help = "longitud del patrón")
+    parser.add_argument("--hebras", choices = ["+", "ambas"], default = "+",
+                        help = "buscar sólo en la hebra directa o en ambas")
+    parser.add_argument("--modo", choices = ["ventanas", "compartida",
+                                             "teselas"],
+                        default = "ventanas", help = "modo de búsqueda (ver "
+                        "buscar.py)")
+    parser.add_argument("--tam-ventana", type = leer_tamano,
+                        default = TAM_VENTANA,
+                        help = "posiciones por ventana en el modo ventanas")
+    parser.add_argument("-d", "--directorio",
+                        help = "directorio de los genomas generados")
+    parser.add_argument("--semilla", type = int, default = 0,
+                        help = "semilla de los genomas y del patrón")
+    parser.add_argument("--json", help = "fichero donde guardar los resultados")
+
+    args = parser.parse_args(argv)
+
+    if min(args.procesos) < 1:
+        parser.error("el número de procesos debe ser al menos 1")
+
+    resultados = benchmark(args.tipos, args.tamanos, args.motores,
+                           args.procesos, args.longitud_patron, args.modo,
+                           args.hebras == "ambas", args.directorio,
+                           args.semilla, args.tam_ventana)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent = 4)
+
+    if not all(r["correcto"] for r in resultados):
+        raise SystemExit("Hay resultados distintos de los de alineamiento()")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+buscar.py
+
+Programa único (no interactivo) de búsqueda de una secuencia patrón sobre una
+secuencia de referencia en formato FASTA. Sustituye a los programas
+interactivos de search-brute_force, search-boyer_moore y search-distances:
+el motor de búsqueda se elige por nombre (ver motores.MOTORES) o
+automáticamente según el modelo de costes (ver seleccion.py).
+
+Ejemplos:
+
+    python3 buscar.py genoma.fasta ACGTTGCA
+    python3 buscar.py genoma.fasta ACGTTGCA -p 4 --hebras ambas -o hits.bed
+    python3 buscar.py genoma.fasta ACGTTGCAAC --similitud 90 --motor hamming
+    python3 buscar.py genoma.fasta ACGTTGCAACGTTAGCAT -k 2 --huecos semiglobal
+    python3 buscar.py --calibrar
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from time import time
+import argparse
+import os
+import sys
+
+from alineador import escribir_alineamientos, MODOS
+from externa import escribir_fuera_de_memoria, TAM_VENTANA
+from fasta import ventanas_fasta
+from hebras import patrones_hebras
+from memoria import GenomaCompartido
+from motores import MOTORES, ADMITEN_FALLOS
+from planificador import escribir_teselas, tiempo_por_proceso, TAM_TESELA
+from procesos import escribir_procesos
+from resultados import EscritorCoincidencias
+from seleccion import elegir_motor, calibrar, composicion, entropia
+
+# Tamaño de la muestra de la referencia usada para elegir el motor.
+TAM_MUESTRA = 1 << 20
+
+def validar_patron(cadena):
+    """
+    Convierte el patrón a mayúsculas y comprueba que sólo contiene nucleótidos
+    (G, C, T, A o U), igual que introducir_cadena() en los programas
+    interactivos.
+
+    INPUT:
+        - cadena (tipo string): patrón introducido.
+
+    RETURN:
+        - cad_patron (tipo string): patrón en mayúsculas.
+    """
+    cad_patron = cadena.upper()
+
+    if not cad_patron or cad_patron.strip("ACGTU"):
+        raise argparse.ArgumentTypeError("No se ha introducido una secuencia "
+                                         "de ADN/ARN: %s" % cadena)
+
+    return cad_patron
+
+def fallos_permitidos(longP, similitud):
+    """
+    Número máximo de fallos para exigir un porcentaje de identidad mínimo. Si
+    la división no es exacta se exige una coincidencia más (ver distancias.py).
+
+    INPUTS:
+        - longP (tipo integer): longitud del patrón.
+        - similitud (tipo float): porcentaje de identidad mínimo.
+
+    RETURN:
+        - (tipo integer): número máximo de fallos.
+    """
+    coincidencias = int(similitud * longP / 100)
+
+    if similitud * longP % 100 != 0:
+        coincidencias += 1
+
+    return longP - coincidencias
+
+def argumentos(argv = None):
+    """
+    Lee los argumentos de la línea de órdenes.
+    """
+    parser = argparse.ArgumentParser(
+        description = "Búsqueda de una secuencia patrón en un fichero FASTA.")
+
+    parser.add_argument("fasta", nargs = "?",
+                        help = "fichero FASTA con la secuencia de referencia")
+    parser.add_argument("patron", nargs = "?", type = validar_patron,
+                        help = "secuencia patrón (ADN o ARN)")
+    parser.add_argument("-m", "--motor", default = "auto",
+                        choices = ["auto"] + sorted(MOTORES),
+                        help = "motor de búsqueda (por defecto, auto)")
+    parser.add_argument("-p", "--procesos", type = int, default = 1,
+                        help = "número de procesos")
+    parser.add_argument("--hebras", choices = ["+", "ambas"], default = "+",
+                        help = "buscar sólo en la hebra directa o en ambas")
+
+    umbral = parser.add_mutually_exclusive_group()
+    umbral.add_argument("-k", "--max-fallos", type = int, default = 0,
+                        help = "número máximo de fallos (distancia de Hamming)")
+    umbral.add_argument("-s", "--similitud", type = float,
+                        help = "porcentaje de identidad mínimo")
+
+    parser.add_argument("--modo", choices = ["ventanas", "compartida",
+                                             "teselas"],
+                        default = "ventanas",
+                        help = "leer la referencia por ventanas (coordenadas "
+                        "por registro) o cargarla entera en memoria compartida "
+                        "(coordenadas sobre todos los registros unidos, como "
+                        "los programas originales) y repartirla en p trozos "
+                        "o en teselas pequeñas que los procesos toman de una "
+                        "cola")
+    parser.add_argument("--tam-ventana", type = int, default = TAM_VENTANA,
+                        help = "posiciones por ventana en el modo ventanas")
+    parser.add_argument("--tam-tesela", type = int, default = TAM_TESELA,
+                        help = "posiciones por tesela en el modo teselas")
+    parser.add_argument("-g", "--huecos", choices = MODOS,
+                        help = "buscar por alineamiento con huecos (local o "
+                        "semiglobal) admitiendo k errores, con el genoma en "
+                        "memoria compartida y repartido en teselas")
+    parser.add_argument("--umbral", type = int,
+                        help = "puntuación mínima de los alineamientos con "
+                        "huecos (por defecto, la de k errores)")
+    parser.add_argument("-f", "--formato", choices = ["bed", "tsv"],
+                        default = "bed", help = "formato de salida")
+    parser.add_argument("-o", "--salida", default = "-",
+                        help = "fichero de salida (por defecto, la salida "
+                        "estándar)")
+    parser.add_argument("-v", "--detalles", action = "store_true",
+                        help = "mostrar la estimación de cada motor")
+    parser.add_argument("--calibrar", action = "store_true",
+                        help = "medir el coste de cada motor en esta máquina y "
+                        "guardarlo para el modo auto")
+
+    args = parser.parse_args(argv)
+
+    if not args.calibrar and (args.fasta is None or args.patron is None):
+        parser.error("hay que indicar el fichero FASTA y el patrón")
+
+    if args.procesos < 1:
+        parser.error("el número de procesos debe ser al menos 1")
+
+    if args.max_fallos < 0:
+        parser.error("el número máximo de fallos no puede ser negativo")
+
+    if args.similitud is not None and not 0 <= args.similitud <= 100:
+        parser.error("la similitud debe estar entre 0 y 100")
+
+    if args.patron and args.similitud is not None:
+        args.max_fallos = fallos_permitidos(len(args.patron), args.similitud)
+
+    if args.huecos and args.motor != "auto":
+        parser.error("la búsqueda con huecos no usa --motor")
+
+    if args.motor != "auto" and args.max_fallos and \
+       args.motor not in ADMITEN_FALLOS:
+        parser.error("el motor %s sólo admite búsqueda exacta" % args.motor)
+
+    return args
+
+def main(argv = None):
+    """
+    Función principal.
+    """
+    args = argumentos(argv)
+
+    if args.calibrar:
+        for nombre, coste in calibrar().items():
+            print("%-22s %.3e s/unidad" % (nombre, coste))
+
+        return
+
+    ambas_hebras = args.hebras == "ambas"
+    motor = args.motor
+
+    if args.huecos:
+        motor = "alineamiento %s" % args.huecos
+
+    elif motor == "auto":
+        muestra = next(ventanas_fasta(args.fasta, TAM_MUESTRA, 0),
+                       (None, 0, b""))[2]
+        patrones = patrones_hebras(args.patron) if ambas_hebras \
+            else [args.patron]
+        motor, estimaciones = elegir_motor(patrones, muestra,
+                                           os.path.getsize(args.fasta),
+                                           args.max_fallos)
+
+        if args.detalles:
+            print("Entropía de la referencia: %.3f bits" %
+                  entropia(composicion(muestra)), file = sys.stderr)
+
+            for nombre in sorted(estimaciones, key = estimaciones.get):
+                print("    %-22s %10.4f s (estimado)" %
+                      (nombre, estimaciones[nombre]), file = sys.stderr)
+
+    print("Motor: %s" % motor, file = sys.stderr)
+
+    # Tomamos el tiempo en el que comienza la búsqueda.
+    tiempo_inicio = time()
+
+    with EscritorCoincidencias(args.salida, args.patron,
+                               formato = args.formato) as escritor:
+
+        if args.huecos:
+            with GenomaCompartido.cargar_fasta(args.fasta) as genoma:
+                total = escribir_alineamientos(genoma, args.patron,
+                                               args.procesos, escritor,
+                                               args.max_fallos, args.huecos,
+                                               args.umbral, ambas_hebras,
+                                               args.tam_tesela)
+
+        elif args.modo == "compartida":
+            with GenomaCompartido.cargar_fasta(args.fasta) as genoma:
+                total = escribir_procesos(genoma, args.patron, args.procesos,
+                                          escritor, motor, args.max_fallos,
+                                          ambas_hebras)
+        elif args.modo == "teselas":
+            tiempos = []
+
+            with GenomaCompartido.cargar_fasta(args.fasta) as genoma:
+                total = escribir_teselas(genoma, args.patron, args.procesos,
+                                         escritor, motor, args.max_fallos,
+                                         ambas_hebras, args.tam_tesela,
+                                         tiempos)
+        else:
+            total = escribir_fuera_de_memoria(args.fasta, args.patron,
+                                              escritor, motor, args.max_fallos,
+                                              args.procesos, args.tam_ventana,
+                                              ambas_hebras)
+
+    # Tomamos el tiempo en el que finaliza la búsqueda.
+    tiempo_busqueda = time() - tiempo_inicio
+
+    print("Coincidencias: %d" % total, file = sys.stderr)
+
+    # Un genoma vacío (o más corto que el patrón) no tiene teselas.
+    if (args.modo == "teselas" and args.detalles and not args.huecos
+            and tiempos):
+        lenta = max(tiempos, key = lambda t: t.segundos)
+        print("Teselas: %d (la más lenta, [%d, %d), %5.4f segundos)" %
+              (len(tiempos), lenta.inicio, lenta.fin, lenta.segundos),
+              file = sys.stderr)
+
+        for pid, segundos in sorted(tiempo_por_proceso(tiempos).items()):
+            print("    proceso %-8d %10.4f s" % (pid, segundos),
+                  file = sys.stderr)
+    print("La búsqueda ha tardado %5.4f segundos." % tiempo_busqueda,
+          file = sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+compilado.py
+
+Patrones compilados para Boyer-Moore. Las tablas de desplazamientos (carácter
+malo y sufijo bueno) dependen sólo del patrón, así que se calculan una vez y se
+guardan junto a él en un PatronCompilado. Las tablas son arrays indexados por
+el valor del byte (o por la posición en el patrón), de modo que el objeto se
+serializa (pickle) en un solo envío a los procesos de búsqueda.
+
+compilar() guarda los últimos patrones compilados en una caché LRU: un servicio
+que responde muchas veces a las mismas consultas no vuelve a preprocesarlas.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from array import array
+from functools import lru_cache
+
+# Número de patrones compilados que se guardan en la caché.
+TAM_CACHE = 1024
+
+def tabla_caracter_malo(patron):
+    """
+    Tabla del carácter malo: para cada byte, índice de su última aparición en
+    el patrón (-1 si no aparece). Si hay un fallo en la posición j del patrón
+    con el carácter c del genoma, se puede desplazar j - tabla[c].
+
+    INPUT:
+        - patron (tipo bytes): cadena que se va a buscar.
+
+    RETURN:
+        - tabla (tipo array): 256 índices.
+    """
+    tabla = array('q', [-1]) * 256
+
+    for i, letra in enumerate(patron):
+        tabla[letra] = i
+
+    return tabla
+
+def tabla_sufijo_bueno(patron):
+    """
+    Tabla del sufijo bueno (versión fuerte): si hay un fallo en la posición
+    j - 1 del patrón tras coincidir el sufijo patron[j:], se puede desplazar
+    tabla[j]. La posición 0 es el desplazamiento tras una coincidencia
+    completa. Se calcula a partir de los bordes de cada sufijo.
+
+    INPUT:
+        - patron (tipo bytes): cadena que se va a buscar.
+
+    RETURN:
+        - tabla (tipo array): m + 1 desplazamientos.
+    """
+    longP = len(patron)
+    tabla = array('q', [0]) * (longP + 1)
+    borde = array('q', [0]) * (longP + 1)
+    i = longP
+    j = longP + 1
+    borde[i] = j
+
+    # Sufijos cuyo borde vuelve a aparecer precedido de otro carácter.
+    while i > 0:
+        while j <= longP and patron[i - 1] != patron[j - 1]:
+            if tabla[j] == 0:
+                tabla[j] = j - i
+
+            j = borde[j]
+
+        i -= 1
+        j -= 1
+        borde[i] = j
+
+    # Resto de posiciones: desplazamiento hasta el mayor borde del patrón.
+    j = borde[0]
+
+    for i in range(longP + 1):
+        if tabla[i] == 0:
+            tabla[i] = j
+
+        if i == j:
+            j = borde[j]
+
+    return tabla
+
+class PatronCompilado:
+    """
+    Patrón con sus tablas de Boyer-Moore ya calculadas. Se puede usar en lugar
+    del patrón en cualquier motor (ver motores.a_bytes()).
+    """
+    def __init__(self, patron):
+        """
+        Inicializa el objeto y calcula las tablas.
+
+        INPUT:
+            - patron (tipo string o bytes): cadena que se va a buscar.
+        """
+        if isinstance(patron, str):
+            patron = patron.encode("ascii")
+
+        self.patron = bytes(patron)
+        self.caracter_malo = tabla_caracter_malo(self.patron)
+        self.sufijo_bueno = tabla_sufijo_bueno(self.patron)
+
+    def __len__(self):
+        return len(self.patron)
+
+    def __repr__(self):
+        return "PatronCompilado(%r)" % self.patron
+
+    def buscar(self, genoma):
+        """
+        Busca el patrón mediante el algoritmo de Boyer-Moore: se compara desde
+        el final del patrón y, ante un fallo, se desplaza lo máximo que
+        permitan las tablas del carácter malo y del sufijo bueno.
+
+        INPUT:
+            - genoma (tipo bytes o memoryview): secuencia de referencia.
+
+        RETURN:
+            - coincidencias (tipo lista): posiciones (empezando en 0) del
+            match.
+        """
+        patron = self.patron
+        caracter_malo = self.caracter_malo
+        sufijo_bueno = self.sufijo_bueno
+        coincidencias = []
+        longP = len(patron)
+        dif = len(genoma) - longP
+        i = 0
+
+        if longP == 0:
+            return coincidencias
+
+        while i <= dif:
+
+            j = longP - 1
+
+            while j >= 0 and genoma[i + j] == patron[j]:
+                j -= 1
+
+            if j < 0:
+                coincidencias.append(i)
+                i += sufijo_bueno[0]
+
+            else:
+                i += max(sufijo_bueno[j + 1],
+                         j - caracter_malo[genoma[i + j]])
+
+        return coincidencias
+
+@lru_cache(maxsize = TAM_CACHE)
+def _compilar(patron):
+    return PatronCompilado(patron)
+
+def compilar(patron):
+    """
+    Devuelve el patrón compilado, desde la caché si ya se compiló.
+
+    INPUT:
+        - patron (tipo string, bytes o PatronCompilado): cadena que se va a
+        buscar.
+
+    RETURN:
+        - (tipo PatronCompilado): patrón con sus tablas.
+    """
+    if isinstance(patron, PatronCompilado):
+        return patron
+
+    if isinstance(patron, str):
+        patron = patron.encode("ascii")
+
+    return _compilar(bytes(patron))
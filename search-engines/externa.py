@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+externa.py
+
+Búsqueda fuera de memoria ("out-of-core") para genomas más grandes que la
+memoria disponible. El fichero FASTA se lee en streaming por ventanas solapadas
+(ver fasta.py) y cada ventana se pasa al motor de búsqueda elegido (ver
+motores.py). Con varios procesos, las ventanas se reparten entre ellos pero
+nunca hay más de 2 * p ventanas en vuelo, así que la memoria máxima es del orden
+de tam_ventana * p.
+
+Las coincidencias se devuelven en orden y con coordenadas relativas a cada
+registro del fichero FASTA. Opcionalmente se busca en las dos hebras (ver
+hebras.py).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from collections import deque
+from multiprocessing import Pool
+
+from compilado import compilar
+from fasta import ventanas_fasta
+from hebras import HEBRAS, patrones_hebras
+from motores import MOTORES, MOTORES_VARIOS
+
+# Número de posiciones nuevas por ventana (64 MB).
+TAM_VENTANA = 1 << 26
+
+def buscar_ventana(motor, patron, max_fallos, ambas_hebras, registro,
+                   desplazamiento, datos, tam_ventana):
+    """
+    Busca el patrón en una ventana. Sólo se devuelven las coincidencias que
+    empiezan en las tam_ventana primeras posiciones: las que empiezan en el
+    solape pertenecen a la ventana siguiente.
+
+    INPUTS:
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - patron (tipo string o PatronCompilado): cadena que se va a buscar.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - registro (tipo string): nombre de la secuencia.
+        - desplazamiento (tipo integer): posición de la ventana en la secuencia.
+        - datos (tipo bytes): contenido de la ventana.
+        - tam_ventana (tipo integer): número de posiciones nuevas por ventana.
+
+    RETURN:
+        - (tipo lista): tuplas (registro, posicion) de cada coincidencia, con
+        la posición relativa al registro (empezando en 0). Si se busca en las
+        dos hebras, tuplas (registro, posicion, hebra).
+    """
+    if ambas_hebras:
+        coincidencias = MOTORES_VARIOS[motor](patrones_hebras(patron), datos,
+                                              max_fallos)
+
+        return [(registro, int(n) + desplazamiento, HEBRAS[k])
+                for n, k in coincidencias if n < tam_ventana]
+
+    coincidencias = MOTORES[motor](patron, datos, max_fallos)
+
+    return [(registro, int(n) + desplazamiento) for n in coincidencias
+            if n < tam_ventana]
+
+def buscar_fuera_de_memoria(fichero, patron, motor = "numpy", max_fallos = 0,
+                            p = 1, tam_ventana = TAM_VENTANA,
+                            ambas_hebras = False):
+    """
+    Busca el patrón sobre todos los registros de un fichero FASTA sin cargarlo
+    entero en memoria.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero FASTA.
+        - patron (tipo string): cadena que se va a buscar.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - p (tipo integer): número de procesos.
+        - tam_ventana (tipo integer): número de posiciones nuevas por ventana.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+
+    RETURN:
+        - (tipo generador): tuplas (registro, posicion) de cada coincidencia,
+        en el orden del fichero; (registro, posicion, hebra) si se busca en las
+        dos hebras.
+    """
+    # Las tablas de Boyer-Moore se calculan una vez y se envían con cada tarea.
+    patron_motor = patron
+
+    if motor == "boyer_moore" and not ambas_hebras:
+        patron_motor = compilar(patron)
+
+    ventanas = ((motor, patron_motor, max_fallos, ambas_hebras, registro,
+                 desplazamiento, datos, tam_ventana)
+                for registro, desplazamiento, datos
+                in ventanas_fasta(fichero, tam_ventana, len(patron) - 1))
+
+    if p == 1:
+        for args in ventanas:
+            yield from buscar_ventana(*args)
+
+        return
+
+    # Pool.imap() leería todas las ventanas de golpe; aquí se mantienen como
+    # mucho 2 * p tareas pendientes y se recogen en orden de envío.
+    with Pool(p) as pool:
+        pendientes = deque()
+
+        for args in ventanas:
+            pendientes.append(pool.apply_async(buscar_ventana, args))
+
+            if len(pendientes) >= 2 * p:
+                yield from pendientes.popleft().get()
+
+        while pendientes:
+            yield from pendientes.popleft().get()
+
+def escribir_fuera_de_memoria(fichero, patron, escritor, motor = "numpy",
+                              max_fallos = 0, p = 1, tam_ventana = TAM_VENTANA,
+                              ambas_hebras = False):
+    """
+    Igual que buscar_fuera_de_memoria(), pero escribiendo las coincidencias con
+    el escritor indicado (ver resultados.EscritorCoincidencias).
+
+    RETURNS:
+        - (tipo integer): número de coincidencias escritas.
+    """
+    total = 0
+
+    for c in buscar_fuera_de_memoria(fichero, patron, motor, max_fallos, p,
+                                     tam_ventana, ambas_hebras):
+        escritor.escribir(c[1], c[0], *c[2:])
+        total += 1
+
+    return total
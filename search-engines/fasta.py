@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+fasta.py
+
+Lectura de ficheros FASTA por ventanas. A diferencia de leer_fasta(), que carga
+toda la secuencia en memoria (y junta todos los registros en una sola cadena),
+aquí se recorre el fichero en streaming y se devuelve cada registro en ventanas
+de tamaño fijo. Ventanas consecutivas se solapan en m - 1 caracteres (m =
+longitud del patrón), igual que los trozos que se reparten entre procesos, para
+no perder las coincidencias que empiezan al final de una ventana.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+# Número máximo de bytes leídos de una vez (aunque la línea sea más larga).
+TAM_LECTURA = 1 << 16
+
+# Nombre que se da a la secuencia cuando el fichero no tiene cabecera.
+SIN_NOMBRE = "genoma"
+
+def nombre_registro(cabecera):
+    """
+    Devuelve el nombre de un registro a partir de su cabecera: la primera
+    palabra tras el carácter '>'.
+
+    INPUT:
+        - cabecera (tipo bytes): línea de cabecera.
+
+    RETURN:
+        - (tipo string): nombre del registro.
+    """
+    palabras = cabecera[1:].split()
+
+    if not palabras:
+        return SIN_NOMBRE
+
+    return palabras[0].decode("ascii", "replace")
+
+def ventanas_fasta(fichero, tam_ventana, solape):
+    """
+    Recorre un fichero FASTA devolviendo, para cada registro, ventanas de como
+    mucho tam_ventana + solape caracteres. La ventana k de un registro empieza
+    en la posición k * tam_ventana; los solape caracteres finales se repiten al
+    principio de la ventana siguiente. La memoria necesaria es del orden de una
+    ventana, sea cual sea el tamaño del fichero o la longitud de sus líneas.
+
+    INPUTS:
+        - fichero (tipo string): nombre del fichero FASTA.
+        - tam_ventana (tipo integer): número de posiciones nuevas por ventana.
+        - solape (tipo integer): caracteres compartidos con la ventana
+        siguiente (longitud del patrón menos uno).
+
+    RETURN:
+        - (tipo generador): tuplas (registro, desplazamiento, datos) donde
+        registro es el nombre de la secuencia, desplazamiento la posición de la
+        ventana dentro de ella (empezando en 0) y datos la ventana (bytes).
+    """
+    registro = SIN_NOMBRE
+    desplazamiento = 0
+    buffer = bytearray()
+    inicio_linea = True
+    en_cabecera = False
+
+    with open(fichero, "rb") as f:
+        while True:
+            trozo = f.readline(TAM_LECTURA)
+
+            if not trozo:
+                break
+
+            if inicio_linea and trozo.startswith(b">"):
+                # Se termina el registro anterior y empieza uno nuevo.
+                if len(buffer) > solape:
+                    yield registro, desplazamiento, bytes(buffer)
+
+                registro = nombre_registro(trozo)
+                desplazamiento = 0
+                buffer = bytearray()
+                en_cabecera = True
+
+            elif not en_cabecera:
+                buffer += trozo.strip()
+
+                while len(buffer) >= tam_ventana + solape:
+                    yield (registro, desplazamiento,
+                           bytes(buffer[:tam_ventana + solape]))
+
+                    del buffer[:tam_ventana]
+                    desplazamiento += tam_ventana
+
+            inicio_linea = trozo.endswith(b"\n")
+
+            if inicio_linea:
+                en_cabecera = False
+
+    # Última ventana del último registro (si cabe alguna coincidencia nueva).
+    if len(buffer) > solape:
+        yield registro, desplazamiento, bytes(buffer)
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+hebras.py
+
+Búsqueda en las dos hebras. Buscar un patrón en la hebra complementaria de la
+referencia es lo mismo que buscar su complementario inverso en la hebra
+directa, así que basta con buscar a la vez el patrón y su complementario
+inverso con un motor de varios patrones (ver motores.MOTORES_VARIOS): cada
+coincidencia indica su hebra y la mayoría de los motores recorren la referencia
+una sola vez (el exacto con NumPy hace una pasada filtrada por patrón).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+# Hebra de cada patrón: el patrón original (+) y su complementario inverso (-).
+HEBRAS = ("+", "-")
+
+COMPLEMENTO_ADN = str.maketrans("ACGTN", "TGCAN")
+COMPLEMENTO_ARN = str.maketrans("ACGUN", "UGCAN")
+
+def complemento_inverso(patron):
+    """
+    Devuelve el complementario inverso de una secuencia de nucleótidos. Si la
+    secuencia contiene uracilo (U) se considera ARN (A se empareja con U).
+
+    INPUT:
+        - patron (tipo string): secuencia de ADN o ARN en mayúsculas.
+
+    RETURN:
+        - (tipo string): complementario inverso de la secuencia.
+    """
+    if "U" in patron:
+        return patron.translate(COMPLEMENTO_ARN)[::-1]
+
+    return patron.translate(COMPLEMENTO_ADN)[::-1]
+
+def patrones_hebras(patron):
+    """
+    Patrones que hay que buscar para cubrir las dos hebras, en el orden de
+    HEBRAS.
+
+    INPUT:
+        - patron (tipo string): secuencia patrón.
+
+    RETURN:
+        - (tipo lista): el patrón y su complementario inverso.
+    """
+    return [patron, complemento_inverso(patron)]
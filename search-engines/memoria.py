@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+memoria.py
+
+Almacén de la secuencia de referencia en memoria compartida. El proceso padre
+carga el genoma una sola vez en un bloque de multiprocessing.shared_memory y los
+procesos de búsqueda se conectan a él por su nombre. Cada proceso recorre su
+trozo del genoma mediante un memoryview, sin copiarlo ni recibirlo serializado
+(como ocurría al pasar la subcadena al constructor del proceso).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import shared_memory
+
+class GenomaCompartido:
+    """
+    Secuencia de referencia guardada en un bloque de memoria compartida. Se
+    crea en el proceso padre con crear() o cargar_fasta() y los procesos hijos
+    la abren con adjuntar() usando el nombre y la longitud del bloque.
+    """
+    def __init__(self, shm, longitud, propietario):
+        """
+        Inicializa el objeto. No se usa directamente: ver crear(),
+        cargar_fasta() y adjuntar().
+
+        INPUTS:
+            - shm (tipo SharedMemory): bloque de memoria compartida.
+            - longitud (tipo integer): número de nucleótidos del genoma.
+            - propietario (tipo booleano): True si este objeto creó el bloque
+            (y, por tanto, es el encargado de liberarlo).
+        """
+        self.shm = shm
+        self.longitud = longitud
+        self.propietario = propietario
+
+    @property
+    def nombre(self):
+        """
+        Nombre del bloque de memoria compartida. Es lo único (junto con la
+        longitud) que hay que pasar a los procesos hijos.
+        """
+        return self.shm.name
+
+    @classmethod
+    def crear(cls, sec):
+        """
+        Crea el bloque de memoria compartida y copia en él la secuencia.
+
+        INPUT:
+            - sec (tipo string o bytes): secuencia de referencia.
+
+        RETURN:
+            - (tipo GenomaCompartido): genoma en memoria compartida.
+        """
+        if isinstance(sec, str):
+            sec = sec.encode("ascii")
+
+        # Un bloque de tamaño 0 no está permitido.
+        shm = shared_memory.SharedMemory(create = True, size = max(len(sec), 1))
+        shm.buf[:len(sec)] = sec
+
+        return cls(shm, len(sec), True)
+
+    @classmethod
+    def cargar_fasta(cls, fichero):
+        """
+        Lee un fichero FASTA directamente en memoria compartida. Se hace una
+        primera pasada para conocer la longitud de la secuencia y una segunda
+        para copiarla línea a línea, de modo que el genoma nunca está dos veces
+        en memoria. Igual que leer_fasta(), se ignoran las cabeceras.
+
+        INPUT:
+            - fichero (tipo string): nombre del fichero FASTA.
+
+        RETURN:
+            - (tipo GenomaCompartido): genoma en memoria compartida.
+        """
+        longitud = 0
+
+        with open(fichero, "rb") as f:
+            for line in f:
+                if b">" not in line:
+                    longitud += len(line.strip())
+
+        shm = shared_memory.SharedMemory(create = True, size = max(longitud, 1))
+        pos = 0
+
+        with open(fichero, "rb") as f:
+            for line in f:
+                if b">" not in line:
+                    line = line.strip()
+                    shm.buf[pos:pos + len(line)] = line
+                    pos += len(line)
+
+        return cls(shm, longitud, True)
+
+    @classmethod
+    def adjuntar(cls, nombre, longitud):
+        """
+        Abre, desde un proceso hijo, un genoma creado por el proceso padre.
+
+        INPUTS:
+            - nombre (tipo string): nombre del bloque de memoria compartida.
+            - longitud (tipo integer): número de nucleótidos del genoma.
+
+        RETURN:
+            - (tipo GenomaCompartido): genoma en memoria compartida.
+        """
+        return cls(shared_memory.SharedMemory(name = nombre), longitud, False)
+
+    def ventana(self, inicio, fin):
+        """
+        Devuelve el trozo [inicio, fin) del genoma sin copiarlo. El memoryview
+        debe liberarse (release() o dejar de referenciarlo) antes de cerrar().
+
+        INPUTS:
+            - inicio (tipo integer): primera posición del trozo.
+            - fin (tipo integer): posición siguiente a la última del trozo.
+
+        RETURN:
+            - (tipo memoryview): vista de sólo lectura del trozo.
+        """
+        fin = min(fin, self.longitud)
+
+        return self.shm.buf[inicio:fin].toreadonly()
+
+    def cerrar(self):
+        """
+        Cierra el acceso a la memoria compartida. Si este objeto la creó,
+        además la libera.
+        """
+        self.shm.close()
+
+        if self.propietario:
+            self.shm.unlink()
+
+    def __len__(self):
+        return self.longitud
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
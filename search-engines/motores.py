@@ -0,0 +1,353 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+motores.py
+
+Motores de búsqueda de un patrón sobre una secuencia de referencia. Son los
+algoritmos de search-brute_force (fuerza bruta), search-boyer_moore
+(Boyer-Moore) y search-distances (distancias de Hamming), adaptados para
+trabajar sobre secuencias en bytes (bytes, bytearray o memoryview). Así pueden
+recorrer directamente un trozo del genoma en memoria compartida.
+
+Todos los motores tienen la misma firma, motor(patron, genoma, max_fallos), y
+devuelven las posiciones (empezando en 0) donde comienza cada coincidencia, en
+orden creciente. Los motores exactos no admiten fallos. El patrón puede ser
+también un patrón compilado (ver compilado.py).
+
+Cada motor tiene también una versión para varios patrones de la misma longitud
+(MOTORES_VARIOS), motor(patrones, genoma, max_fallos), que devuelve tuplas
+(posicion, indice del patrón) ordenadas. Las versiones en Python y la de
+distancias con NumPy recorren el genoma una sola vez para todos los patrones; la
+exacta con NumPy hace una pasada filtrada por patrón (ver
+exacta_vectorizada_varios()).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+import numpy as np
+
+from compilado import PatronCompilado, compilar
+from vectorizado import exacta_numpy, hamming_numpy, buscar_varios_numpy
+
+def a_bytes(sec):
+    """
+    Devuelve la secuencia como un objeto de bytes. Las cadenas de texto se
+    codifican (ASCII), de los patrones compilados se toma el patrón y el resto
+    se devuelve tal cual, sin copiar.
+    """
+    if isinstance(sec, str):
+        return sec.encode("ascii")
+
+    if isinstance(sec, PatronCompilado):
+        return sec.patron
+
+    return sec
+
+def _solo_exacta(nombre, max_fallos):
+    """
+    Comprueba que no se pidan fallos a un motor de búsqueda exacta.
+    """
+    if max_fallos:
+        raise ValueError("El motor %s sólo admite búsqueda exacta" % nombre)
+
+def fuerza_bruta(patron, genoma, max_fallos = 0):
+    """
+    Búsqueda por fuerza bruta (ver alineamiento() en search-brute_force): para
+    cada posición del genoma se compara el patrón carácter a carácter hasta el
+    primer fallo.
+
+    INPUTS:
+        - patron (tipo string o bytes): cadena que se va a buscar.
+        - genoma (tipo bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): debe ser 0.
+
+    RETURNS:
+        - coincidencias (tipo lista): posiciones del match.
+    """
+    _solo_exacta("fuerza_bruta", max_fallos)
+
+    patron = a_bytes(patron)
+    genoma = a_bytes(genoma)
+    coincidencias = []
+    longP = len(patron)
+
+    for i in range(len(genoma) - longP + 1):
+
+        j = 0
+
+        while j < longP and genoma[i + j] == patron[j]:
+            j += 1
+
+        if j == longP:
+            coincidencias.append(i)
+
+    return coincidencias
+
+def boyer_moore(patron, genoma, max_fallos = 0):
+    """
+    Búsqueda mediante el algoritmo de Boyer-Moore (ver boyer_moore() en
+    search-boyer_moore), con las tablas del carácter malo y del sufijo bueno
+    (ver compilado.py). Las tablas del patrón se toman de la caché de patrones
+    compilados, así que sólo se calculan la primera vez.
+
+    INPUTS:
+        - patron (tipo string, bytes o PatronCompilado): cadena que se va a
+        buscar.
+        - genoma (tipo bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): debe ser 0.
+
+    RETURNS:
+        - coincidencias (tipo lista): posiciones del match.
+    """
+    _solo_exacta("boyer_moore", max_fallos)
+
+    return compilar(patron).buscar(a_bytes(genoma))
+
+def hamming(patron, genoma, max_fallos = 0):
+    """
+    Búsqueda por distancias de Hamming (ver distancias_Hamming() en
+    search-distances): se aceptan las ventanas del genoma con, a lo sumo,
+    max_fallos caracteres distintos del patrón.
+
+    INPUTS:
+        - patron (tipo string o bytes): cadena que se va a buscar.
+        - genoma (tipo bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+
+    RETURNS:
+        - coincidencias (tipo lista): posiciones del match.
+    """
+    patron = a_bytes(patron)
+    genoma = a_bytes(genoma)
+    coincidencias = []
+    longP = len(patron)
+
+    for i in range(len(genoma) - longP + 1):
+
+        fallos = 0
+
+        for j in range(longP):
+            if genoma[i + j] != patron[j]:
+                fallos += 1
+
+                if fallos > max_fallos:
+                    break
+
+        if fallos <= max_fallos:
+            coincidencias.append(i)
+
+    return coincidencias
+
+def exacta_vectorizada(patron, genoma, max_fallos = 0):
+    """
+    Búsqueda exacta con NumPy (ver vectorizado.exacta_numpy()).
+    """
+    _solo_exacta("numpy", max_fallos)
+
+    return exacta_numpy(a_bytes(patron), genoma).tolist()
+
+def hamming_vectorizada(patron, genoma, max_fallos = 0):
+    """
+    Búsqueda por distancias de Hamming con NumPy (ver
+    vectorizado.hamming_numpy()).
+    """
+    return hamming_numpy(a_bytes(patron), genoma, max_fallos).tolist()
+
+def _misma_longitud(patrones):
+    """
+    Comprueba que todos los patrones tengan la misma longitud y la devuelve.
+    """
+    longP = len(patrones[0])
+
+    if any(len(patron) != longP for patron in patrones):
+        raise ValueError("Todos los patrones deben tener la misma longitud")
+
+    return longP
+
+def hamming_varios(patrones, genoma, max_fallos = 0):
+    """
+    Búsqueda por fuerza bruta (o por distancias de Hamming, si max_fallos > 0)
+    de varios patrones de la misma longitud en una sola pasada: en cada posición
+    del genoma se comparan todos los patrones.
+
+    INPUTS:
+        - patrones (tipo lista): cadenas que se van a buscar.
+        - genoma (tipo bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+
+    RETURNS:
+        - coincidencias (tipo lista): tuplas (posicion, indice del patrón).
+    """
+    patrones = [a_bytes(patron) for patron in patrones]
+    genoma = a_bytes(genoma)
+    longP = _misma_longitud(patrones)
+    coincidencias = []
+
+    for i in range(len(genoma) - longP + 1):
+
+        for k, patron in enumerate(patrones):
+
+            fallos = 0
+
+            for j in range(longP):
+                if genoma[i + j] != patron[j]:
+                    fallos += 1
+
+                    if fallos > max_fallos:
+                        break
+
+            if fallos <= max_fallos:
+                coincidencias.append((i, k))
+
+    return coincidencias
+
+def fuerza_bruta_varios(patrones, genoma, max_fallos = 0):
+    """
+    Versión de fuerza_bruta() para varios patrones (ver hamming_varios()).
+    """
+    _solo_exacta("fuerza_bruta", max_fallos)
+
+    return hamming_varios(patrones, genoma)
+
+def tabla_horspool(patrones):
+    """
+    Tabla de desplazamientos compartida por varios patrones de la misma
+    longitud (algoritmo de Horspool para conjuntos de patrones). Para cada
+    carácter se guarda el menor de los desplazamientos seguros de todos los
+    patrones, calculados respecto al carácter del genoma alineado con el final
+    del patrón.
+
+    INPUT:
+        - patrones (tipo lista): cadenas que se van a buscar (bytes).
+
+    RETURN:
+        - tabla (tipo lista): lista de 256 desplazamientos.
+    """
+    longP = _misma_longitud(patrones)
+    tabla = [longP] * 256
+
+    for patron in patrones:
+        for i in range(longP - 1):
+            tabla[patron[i]] = min(tabla[patron[i]], longP - 1 - i)
+
+    return tabla
+
+def boyer_moore_varios(patrones, genoma, max_fallos = 0):
+    """
+    Versión de boyer_moore() para varios patrones de la misma longitud. En cada
+    alineamiento se comprueban todos los patrones (desde el final) y después se
+    desplaza según la tabla compartida (ver tabla_horspool()).
+
+    INPUTS:
+        - patrones (tipo lista): cadenas que se van a buscar.
+        - genoma (tipo bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): debe ser 0.
+
+    RETURNS:
+        - coincidencias (tipo lista): tuplas (posicion, indice del patrón).
+    """
+    _solo_exacta("boyer_moore", max_fallos)
+
+    patrones = [a_bytes(patron) for patron in patrones]
+    genoma = a_bytes(genoma)
+    longP = _misma_longitud(patrones)
+    tabla = tabla_horspool(patrones)
+    coincidencias = []
+    dif = len(genoma) - longP
+    i = 0
+
+    if longP == 0:
+        return coincidencias
+
+    while i <= dif:
+
+        for k, patron in enumerate(patrones):
+
+            a = longP - 1
+
+            while a >= 0 and genoma[i + a] == patron[a]:
+                a -= 1
+
+            if a < 0:
+                coincidencias.append((i, k))
+
+        i += tabla[genoma[i + longP - 1]]
+
+    return coincidencias
+
+def _mezclar(por_patron):
+    """
+    Mezcla las posiciones de cada patrón (arrays de NumPy) en tuplas
+    (posicion, indice del patrón) ordenadas.
+    """
+    posiciones = np.concatenate(por_patron)
+    indices = np.concatenate([np.full(len(p), k)
+                              for k, p in enumerate(por_patron)])
+    orden = np.lexsort((indices, posiciones))
+
+    return list(zip(posiciones[orden].tolist(), indices[orden].tolist()))
+
+def hamming_vectorizada_varios(patrones, genoma, max_fallos = 0):
+    """
+    Búsqueda de varios patrones con NumPy (ver
+    vectorizado.buscar_varios_numpy()).
+    """
+    return _mezclar(buscar_varios_numpy(patrones, genoma, max_fallos))
+
+def exacta_vectorizada_varios(patrones, genoma, max_fallos = 0):
+    """
+    Búsqueda exacta de varios patrones con NumPy. No es una sola pasada sobre
+    el genoma: cada patrón se busca por separado con vectorizado.exacta_numpy()
+    (una pasada contigua con el filtro de tres caracteres, que descarta casi
+    todas las posiciones, y la comprobación de los candidatos que quedan) y
+    las coincidencias se mezclan al final. Aun así es más rápido que acumular
+    los fallos de todas las posiciones en m pasadas (buscar_varios_numpy()).
+    """
+    _solo_exacta("numpy", max_fallos)
+
+    patrones = [a_bytes(patron) for patron in patrones]
+    _misma_longitud(patrones)
+
+    return _mezclar([exacta_numpy(patron, genoma) for patron in patrones])
+
+# Motores disponibles, por nombre (registro de motores). Los procesos reciben
+# el nombre del motor (y no la función) para poder crearse con cualquier método
+# de arranque. Para añadir un motor nuevo, ver registrar().
+MOTORES = {
+    "fuerza_bruta": fuerza_bruta,
+    "boyer_moore": boyer_moore,
+    "hamming": hamming,
+    "numpy": exacta_vectorizada,
+    "hamming_numpy": hamming_vectorizada,
+}
+
+# Versiones de los motores para varios patrones de la misma longitud.
+MOTORES_VARIOS = {
+    "fuerza_bruta": fuerza_bruta_varios,
+    "boyer_moore": boyer_moore_varios,
+    "hamming": hamming_varios,
+    "numpy": exacta_vectorizada_varios,
+    "hamming_numpy": hamming_vectorizada_varios,
+}
+
+# Motores que admiten fallos (búsqueda por distancias).
+ADMITEN_FALLOS = {"hamming", "hamming_numpy"}
+
+def registrar(nombre, motor, motor_varios, admite_fallos = False):
+    """
+    Añade un motor al registro. Debe hacerse al importar el módulo que lo
+    define, para que también esté registrado en los procesos hijos.
+
+    INPUTS:
+        - nombre (tipo string): nombre del motor.
+        - motor (tipo función): motor(patron, genoma, max_fallos).
+        - motor_varios (tipo función): motor(patrones, genoma, max_fallos).
+        - admite_fallos (tipo booleano): si el motor admite max_fallos > 0.
+    """
+    MOTORES[nombre] = motor
+    MOTORES_VARIOS[nombre] = motor_varios
+
+    if admite_fallos:
+        ADMITEN_FALLOS.add(nombre)
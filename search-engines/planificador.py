@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+planificador.py
+
+Reparto dinámico de la búsqueda sobre un genoma en memoria compartida. En lugar
+de dividir el genoma en p trozos iguales (ver procesos.repartir()), se corta en
+muchas teselas pequeñas que se ponen en una cola de tareas: cada proceso del
+pool toma la siguiente tesela en cuanto termina la anterior. Así, si una zona
+del genoma es más lenta (por ejemplo, por tener muchas coincidencias), el resto
+de procesos sigue trabajando en lugar de quedarse esperando.
+
+Las teselas se solapan para no perder las coincidencias que empiezan al final
+de cada una. Cada coincidencia pertenece a la tesela en la que empieza, así que
+las que aparecen en la zona de solape (las duplicadas) se descartan. Los
+resultados se devuelven en orden y, opcionalmente, con el tiempo de cada
+tesela.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from array import array
+from collections import deque, namedtuple
+from multiprocessing import Pool
+from time import perf_counter
+import os
+
+from compilado import compilar
+from hebras import HEBRAS, patrones_hebras
+from memoria import GenomaCompartido
+from motores import MOTORES, MOTORES_VARIOS
+
+# Número de posiciones propias de cada tesela (1 MB).
+TAM_TESELA = 1 << 20
+
+# Teselas pendientes por proceso: el padre deja de enviar teselas cuando hay
+# TESELAS_POR_PROCESO * p sin recoger, para que una tesela lenta no haga que
+# se acumulen en memoria los resultados de todas las siguientes.
+TESELAS_POR_PROCESO = 4
+
+# Tiempo de búsqueda de una tesela: su número, sus posiciones propias
+# [inicio, fin), el número de coincidencias, los segundos que ha tardado y el
+# identificador (pid) del proceso que la ha buscado.
+TiempoTesela = namedtuple("TiempoTesela",
+                          "indice inicio fin coincidencias segundos proceso")
+
+def teselas(longitud, longP, tam_tesela = TAM_TESELA, solape = None):
+    """
+    Divide el genoma en teselas de tam_tesela posiciones propias. Cada tesela
+    se lee con solape caracteres más (por defecto, m - 1).
+
+    INPUTS:
+        - longitud (tipo integer): longitud del genoma.
+        - longP (tipo integer): longitud del patrón.
+        - tam_tesela (tipo integer): número de posiciones propias por tesela.
+        - solape (tipo integer): caracteres leídos tras las posiciones propias.
+
+    RETURN:
+        - (tipo generador): tuplas (indice, inicio, propio, fin): la tesela es
+        dueña de las coincidencias que empiezan en [inicio, propio) y se lee
+        el trozo [inicio, fin) del genoma.
+    """
+    if solape is None:
+        solape = max(longP - 1, 0)
+
+    for indice, inicio in enumerate(range(0, longitud, tam_tesela)):
+        propio = min(inicio + tam_tesela, longitud)
+
+        yield indice, inicio, propio, min(propio + solape, longitud)
+
+# Estado de cada proceso del pool (ver _iniciar()).
+_genoma = None
+_busqueda = None
+
+def _iniciar(nombre, longitud, motor, patron, max_fallos, ambas_hebras):
+    """
+    Inicializa un proceso del pool: se conecta al genoma compartido y guarda
+    los datos de la búsqueda, que así no se envían con cada tesela.
+    """
+    global _genoma, _busqueda
+
+    _genoma = GenomaCompartido.adjuntar(nombre, longitud)
+    _busqueda = (motor, patron, max_fallos, ambas_hebras)
+
+def _buscar_tesela(tesela):
+    """
+    Busca el patrón en una tesela (en un proceso del pool).
+
+    INPUT:
+        - tesela (tipo tupla): (indice, inicio, propio, fin), ver teselas().
+
+    RETURNS:
+        - indice (tipo integer): número de la tesela.
+        - coincidencias (tipo array): posiciones absolutas del match; si se
+        busca en las dos hebras, pares (posicion, indice de la hebra) seguidos.
+        - tiempo (tipo TiempoTesela): tiempo de búsqueda de la tesela.
+    """
+    indice, inicio, propio, fin = tesela
+    motor, patron, max_fallos, ambas_hebras = _busqueda
+    limite = propio - inicio
+
+    tiempo_inicio = perf_counter()
+    ventana = _genoma.ventana(inicio, fin)
+
+    try:
+        if ambas_hebras:
+            encontradas = MOTORES_VARIOS[motor](patrones_hebras(patron),
+                                                ventana, max_fallos)
+            coincidencias = array('q')
+
+            for n, k in encontradas:
+                if n < limite:
+                    coincidencias.extend((n + inicio, k))
+
+            total = len(coincidencias) // 2
+
+        else:
+            encontradas = MOTORES[motor](patron, ventana, max_fallos)
+            coincidencias = array('q', [n + inicio for n in encontradas
+                                        if n < limite])
+            total = len(coincidencias)
+
+    finally:
+        ventana.release()
+
+    tiempo = TiempoTesela(indice, inicio, propio, total,
+                          perf_counter() - tiempo_inicio, os.getpid())
+
+    return indice, coincidencias, tiempo
+
+def buscar_teselas(genoma, patron, p, motor = "fuerza_bruta", max_fallos = 0,
+                   ambas_hebras = False, tam_tesela = TAM_TESELA,
+                   tiempos = None):
+    """
+    Busca el patrón sobre el genoma compartido con un pool de p procesos que
+    se reparten dinámicamente las teselas.
+
+    INPUTS:
+        - genoma (tipo GenomaCompartido): genoma en memoria compartida.
+        - patron (tipo string): cadena que se va a buscar.
+        - p (tipo integer): número de procesos.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+        - tam_tesela (tipo integer): número de posiciones propias por tesela.
+        - tiempos (tipo lista): si se indica, se le añade el TiempoTesela de
+        cada tesela (en orden).
+
+    RETURN:
+        - (tipo generador): posiciones (empezando en 0) del match, en orden
+        creciente. Si se busca en las dos hebras, tuplas (posicion, hebra).
+    """
+    # Las tablas de Boyer-Moore se calculan una vez y se envían a los procesos.
+    patron_motor = patron
+
+    if motor == "boyer_moore" and not ambas_hebras:
+        patron_motor = compilar(patron)
+
+    with Pool(p, _iniciar, (genoma.nombre, len(genoma), motor, patron_motor,
+                            max_fallos, ambas_hebras)) as pool:
+
+        # Las teselas terminan en cualquier orden, pero se recogen en orden de
+        # envío. Pool.imap_unordered() las enviaría todas de golpe y el padre
+        # tendría que guardar las que llegan antes de tiempo sin límite; aquí
+        # se mantienen como mucho TESELAS_POR_PROCESO * p pendientes.
+        pendientes = deque()
+        lista = teselas(len(genoma), len(patron), tam_tesela)
+
+        while True:
+            for tesela in lista:
+                pendientes.append(pool.apply_async(_buscar_tesela, (tesela,)))
+
+                if len(pendientes) >= TESELAS_POR_PROCESO * p:
+                    break
+
+            if not pendientes:
+                break
+
+            _, coincidencias, tiempo = pendientes.popleft().get()
+
+            if tiempos is not None:
+                tiempos.append(tiempo)
+
+            if ambas_hebras:
+                yield from ((n, HEBRAS[k]) for n, k
+                            in zip(coincidencias[::2], coincidencias[1::2]))
+            else:
+                yield from coincidencias
+
+def escribir_teselas(genoma, patron, p, escritor, motor = "fuerza_bruta",
+                     max_fallos = 0, ambas_hebras = False,
+                     tam_tesela = TAM_TESELA, tiempos = None):
+    """
+    Igual que buscar_teselas(), pero escribiendo las coincidencias con el
+    escritor indicado (ver resultados.EscritorCoincidencias).
+
+    RETURNS:
+        - (tipo integer): número de coincidencias escritas.
+    """
+    total = escritor.total
+
+    escritor.escribir_todas(buscar_teselas(genoma, patron, p, motor,
+                                           max_fallos, ambas_hebras,
+                                           tam_tesela, tiempos))
+
+    return escritor.total - total
+
+def tiempo_por_proceso(tiempos):
+    """
+    Suma el tiempo de búsqueda de cada proceso, para ver si el trabajo ha
+    quedado equilibrado.
+
+    INPUT:
+        - tiempos (tipo lista): TiempoTesela de cada tesela.
+
+    RETURN:
+        - (tipo diccionario): segundos ocupados por pid del proceso.
+    """
+    por_proceso = {}
+
+    for tiempo in tiempos:
+        por_proceso[tiempo.proceso] = (por_proceso.get(tiempo.proceso, 0) +
+                                       tiempo.segundos)
+
+    return por_proceso
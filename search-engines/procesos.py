@@ -0,0 +1,333 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+procesos.py
+
+Búsqueda concurrente de un patrón sobre un genoma en memoria compartida. El
+proceso padre carga el genoma una sola vez (ver memoria.py) y reparte el trabajo
+en p trozos. Cada proceso recibe únicamente el nombre del bloque compartido y
+los límites de su trozo, [inicio, fin + m - 1), y lo recorre con el motor de
+búsqueda indicado (ver motores.py). Las coincidencias de cada proceso se vuelcan
+por lotes en un fichero temporal y el padre las mezcla en orden (ver
+resultados.py). Opcionalmente se busca en las dos hebras (ver hebras.py). Si un
+proceso falla (o muere sin avisar), el padre lanza una excepción con su error
+en lugar de esperarlo indefinidamente.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from multiprocessing import Process, Queue
+import queue
+import tempfile
+import traceback
+
+from compilado import compilar
+from hebras import HEBRAS, patrones_hebras
+from memoria import GenomaCompartido
+from motores import MOTORES, MOTORES_VARIOS
+from resultados import Volcado, fusionar
+
+# Número de posiciones de inicio que se buscan de una vez dentro de un trozo: las
+# coincidencias de cada subventana se vuelcan antes de buscar en la siguiente,
+# así que la memoria del proceso no depende del número de matches del trozo.
+TAM_SUBVENTANA = 1 << 20
+
+# Segundos que espera el padre un mensaje antes de comprobar si algún proceso
+# ha muerto.
+ESPERA = 0.5
+
+class BuscaVentana(Process):
+
+    def __init__(self, indice, nombre, longitud, patron, inicio, fin, motor,
+                 max_fallos, ambas_hebras, directorio, q):
+        """
+        Se inicializa la instancia de clase. Esta clase hereda de Process.
+
+        INPUTS:
+            - indice (tipo integer): número de trozo (para ordenar resultados).
+            - nombre (tipo string): nombre del bloque de memoria compartida.
+            - longitud (tipo integer): longitud total del genoma.
+            - patron (tipo string o PatronCompilado): cadena que se va a
+            buscar.
+            - inicio (tipo integer): posición absoluta del genoma en la que
+            empieza el trozo.
+            - fin (tipo integer): posición absoluta siguiente a la última del
+            trozo (incluye los m - 1 caracteres de solapamiento).
+            - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+            - max_fallos (tipo integer): número máximo de fallos permitidos.
+            - ambas_hebras (tipo booleano): si es True se busca también el
+            complementario inverso del patrón.
+            - directorio (tipo string): directorio de los ficheros de volcado.
+            - q (tipo Queue): cola para comunicarse entre los procesos.
+        """
+        Process.__init__(self)
+        self.indice = indice
+        self.nombre = nombre
+        self.longitud = longitud
+        self.patron = patron
+        self.inicio = inicio
+        self.fin = fin
+        self.motor = motor
+        self.max_fallos = max_fallos
+        self.ambas_hebras = ambas_hebras
+        self.directorio = directorio
+        self.q = q
+
+    def run(self):
+        """
+        Al lanzar el proceso se conecta al genoma compartido, busca el patrón en
+        su trozo y vuelca las posiciones absolutas del match en un fichero
+        temporal. Por la cola sólo se envía el nombre de ese fichero, o None y
+        el traceback si la búsqueda falla.
+        """
+        try:
+            self.q.put((self.indice,) + self.buscar())
+
+        except Exception:
+            self.q.put((self.indice, None, traceback.format_exc()))
+
+    def buscar(self):
+        """
+        Busca el patrón en el trozo, por subventanas de TAM_SUBVENTANA
+        posiciones de inicio (con los m - 1 caracteres de solapamiento), y
+        vuelca las coincidencias de cada una antes de pasar a la siguiente.
+
+        RETURNS:
+            - ruta (tipo string): nombre del fichero de volcado.
+            - total (tipo integer): número de coincidencias volcadas.
+        """
+        genoma = GenomaCompartido.adjuntar(self.nombre, self.longitud)
+        volcado = Volcado(self.directorio, self.inicio, self.ambas_hebras)
+        longP = len(self.patron)
+
+        try:
+            for inicio in range(self.inicio, self.fin - longP + 1,
+                                TAM_SUBVENTANA):
+                ventana = genoma.ventana(inicio, min(inicio + TAM_SUBVENTANA +
+                                                     longP - 1, self.fin))
+
+                try:
+                    volcado.extender(self.buscar_ventana(ventana),
+                                     inicio - self.inicio)
+
+                except Exception as error:
+                    # Los marcos del traceback guardan las vistas de la ventana
+                    # (arrays de NumPy) del motor, que impedirían liberarla.
+                    traceback.clear_frames(error.__traceback__)
+                    raise
+
+                finally:
+                    ventana.release()
+
+        finally:
+            genoma.cerrar()
+
+        return volcado.cerrar()
+
+    def buscar_ventana(self, ventana):
+        """
+        Busca el patrón (o los de las dos hebras) en una subventana con el motor
+        del proceso.
+
+        INPUT:
+            - ventana (tipo memoryview): subventana del genoma.
+
+        RETURN:
+            - coincidencias (tipo lista): posiciones (o tuplas) del match,
+            relativas a la subventana.
+        """
+        if self.ambas_hebras:
+            return MOTORES_VARIOS[self.motor](patrones_hebras(self.patron),
+                                              ventana, self.max_fallos)
+
+        return MOTORES[self.motor](self.patron, ventana, self.max_fallos)
+
+def repartir(longitud, longP, p):
+    """
+    Divide el genoma en p trozos de tamaño lo más parecido posible. A cada
+    trozo se le añaden los m - 1 caracteres siguientes (m = longitud del patrón)
+    para no perder las coincidencias que empiezan al final del trozo.
+
+    INPUTS:
+        - longitud (tipo integer): longitud del genoma.
+        - longP (tipo integer): longitud del patrón.
+        - p (tipo integer): número de trozos.
+
+    RETURNS:
+        - trozos (tipo lista): lista de tuplas (inicio, fin).
+    """
+    tamaño = longitud // p
+    resto = longitud % p
+    inicio = 0
+    trozos = []
+
+    for i in range(p):
+        tamaño_final = tamaño
+
+        if resto != 0:
+            tamaño_final += 1
+            resto -= 1
+
+        trozos.append((inicio, min(inicio + tamaño_final + longP - 1,
+                                   longitud)))
+        inicio += tamaño_final
+
+    return trozos
+
+def buscar_volcados(genoma, patron, p, directorio, motor = "fuerza_bruta",
+                    max_fallos = 0, ambas_hebras = False):
+    """
+    Busca el patrón sobre el genoma compartido utilizando p procesos. Cada
+    proceso deja sus coincidencias en un fichero de volcado.
+
+    INPUTS:
+        - genoma (tipo GenomaCompartido): genoma en memoria compartida.
+        - patron (tipo string): cadena que se va a buscar.
+        - p (tipo integer): número de procesos.
+        - directorio (tipo string): directorio de los ficheros de volcado.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+
+    RETURNS:
+        - rutas (tipo lista): ficheros de volcado, uno por proceso.
+    """
+    lista_procesos = []
+    q = Queue()
+
+    # Las tablas de Boyer-Moore se calculan una vez y se envían a los procesos.
+    patron_motor = patron
+
+    if motor == "boyer_moore" and not ambas_hebras:
+        patron_motor = compilar(patron)
+
+    for i, (inicio, fin) in enumerate(repartir(len(genoma), len(patron), p)):
+        lista_procesos.append(BuscaVentana(i, genoma.nombre, len(genoma),
+                                           patron_motor, inicio, fin, motor,
+                                           max_fallos, ambas_hebras,
+                                           directorio, q))
+        lista_procesos[i].start()
+
+    # Se recogen los mensajes antes de unir los procesos: un proceso no
+    # termina hasta que la cola ha recibido todo lo que ha enviado.
+    try:
+        rutas = recoger(q, lista_procesos)
+
+    except BaseException:
+        for proceso in lista_procesos:
+            proceso.terminate()
+
+        raise
+
+    finally:
+        for proceso in lista_procesos:
+            proceso.join()
+
+    return rutas
+
+def recoger(q, lista_procesos):
+    """
+    Recoge de la cola el volcado de cada proceso. Si un proceso envía un error,
+    o termina sin enviar nada (porque ha muerto), se lanza una excepción.
+
+    INPUTS:
+        - q (tipo Queue): cola de los procesos.
+        - lista_procesos (tipo lista): procesos BuscaVentana, por índice.
+
+    RETURNS:
+        - rutas (tipo lista): ficheros de volcado, uno por proceso.
+    """
+    rutas = [None] * len(lista_procesos)
+    pendientes = set(range(len(lista_procesos)))
+
+    while pendientes:
+        try:
+            indice, ruta, dato = q.get(timeout = ESPERA)
+
+        except queue.Empty:
+            muertos = [i for i in sorted(pendientes)
+                       if lista_procesos[i].exitcode is not None]
+
+            if not muertos:
+                continue
+
+            # Un proceso que ha terminado ya ha dejado en la cola todo lo que
+            # ha enviado: si tampoco llega ahora, no ha enviado nada.
+            try:
+                indice, ruta, dato = q.get(timeout = ESPERA)
+
+            except queue.Empty:
+                raise RuntimeError("El proceso %d ha terminado con el código "
+                                   "%d sin enviar resultados" %
+                                   (muertos[0],
+                                    lista_procesos[muertos[0]].exitcode))
+
+        if ruta is None:
+            raise RuntimeError("Error en el proceso %d:\n%s" % (indice, dato))
+
+        rutas[indice] = ruta
+        pendientes.discard(indice)
+
+    return rutas
+
+def buscar_procesos(genoma, patron, p, motor = "fuerza_bruta", max_fallos = 0,
+                    ambas_hebras = False):
+    """
+    Busca el patrón sobre el genoma compartido utilizando p procesos y devuelve
+    todas las coincidencias en una lista. Para resultados muy grandes es mejor
+    usar escribir_procesos().
+
+    INPUTS:
+        - genoma (tipo GenomaCompartido): genoma en memoria compartida.
+        - patron (tipo string): cadena que se va a buscar.
+        - p (tipo integer): número de procesos.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+
+    RETURNS:
+        - coincidencias (tipo lista): posiciones (empezando en 0) del match,
+        en orden creciente. Si se busca en las dos hebras, tuplas (posicion,
+        hebra).
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = buscar_volcados(genoma, patron, p, directorio, motor,
+                                max_fallos, ambas_hebras)
+
+        if ambas_hebras:
+            return [(n, HEBRAS[k]) for n, k in fusionar(rutas, pares = True)]
+
+        return list(fusionar(rutas))
+
+def escribir_procesos(genoma, patron, p, escritor, motor = "fuerza_bruta",
+                      max_fallos = 0, ambas_hebras = False):
+    """
+    Busca el patrón sobre el genoma compartido utilizando p procesos y escribe
+    las coincidencias, en orden y en streaming, con el escritor indicado.
+
+    INPUTS:
+        - genoma (tipo GenomaCompartido): genoma en memoria compartida.
+        - patron (tipo string): cadena que se va a buscar.
+        - p (tipo integer): número de procesos.
+        - escritor (tipo EscritorCoincidencias): destino de las coincidencias.
+        - motor (tipo string): nombre del motor de búsqueda (ver MOTORES).
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - ambas_hebras (tipo booleano): si es True se busca en las dos hebras.
+
+    RETURNS:
+        - (tipo integer): número de coincidencias escritas.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = buscar_volcados(genoma, patron, p, directorio, motor,
+                                max_fallos, ambas_hebras)
+        total = escritor.total
+
+        if ambas_hebras:
+            escritor.escribir_todas((n, HEBRAS[k]) for n, k
+                                    in fusionar(rutas, pares = True))
+        else:
+            escritor.escribir_todas(fusionar(rutas))
+
+    return escritor.total - total
@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+resultados.py
+
+Transporte y escritura de las coincidencias encontradas por los procesos de
+búsqueda. En lugar de enviar cada coincidencia por una cola (una operación
+Queue.put por match), cada proceso vuelca sus coincidencias, ya ordenadas, en
+un fichero temporal propio mediante lotes array('q'). El proceso padre sólo
+recibe por la cola el nombre de ese fichero y, al final, mezcla todos los
+ficheros (mezcla de k vías) escribiendo las coincidencias en orden y en
+streaming, de forma que la memoria necesaria no depende del número de matches.
+
+En la búsqueda en las dos hebras (ver hebras.py) cada coincidencia es un par
+(posicion, indice del patrón) y se guarda como dos enteros consecutivos.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from array import array
+import heapq
+import os
+import sys
+import tempfile
+
+# Número de coincidencias que se acumulan antes de escribirlas en disco.
+TAM_LOTE = 1 << 16
+
+class Volcado:
+    """
+    Fichero temporal en el que un proceso va escribiendo sus coincidencias por
+    lotes. Las coincidencias deben añadirse en orden creciente.
+    """
+    def __init__(self, directorio = None, desplazamiento = 0, pares = False):
+        """
+        Inicializa el objeto y crea el fichero temporal.
+
+        INPUTS:
+            - directorio (tipo string): directorio donde se crea el fichero.
+            - desplazamiento (tipo integer): valor que se suma a cada posición
+            (posición absoluta del trozo en el genoma).
+            - pares (tipo booleano): si es True, cada coincidencia es una tupla
+            (posicion, indice del patrón).
+        """
+        fd, self.ruta = tempfile.mkstemp(prefix = "coincidencias_",
+                                         suffix = ".bin", dir = directorio)
+        self.fichero = os.fdopen(fd, "wb")
+        self.desplazamiento = desplazamiento
+        self.pares = pares
+        self.lote = array("q")
+        self.total = 0
+
+    def extender(self, posiciones, desplazamiento = 0):
+        """
+        Añade coincidencias (relativas al trozo) al volcado.
+
+        INPUTS:
+            - posiciones (tipo iterable): posiciones del match.
+            - desplazamiento (tipo integer): valor que se suma, además, a cada
+            posición (inicio de la subventana dentro del trozo).
+        """
+        desplazamiento += self.desplazamiento
+
+        for n in posiciones:
+            if self.pares:
+                n, k = n
+                self.lote.append(int(n) + desplazamiento)
+                self.lote.append(k)
+
+            else:
+                self.lote.append(int(n) + desplazamiento)
+
+            if len(self.lote) >= TAM_LOTE:
+                self.vaciar()
+
+    def vaciar(self):
+        """
+        Escribe en disco el lote pendiente.
+        """
+        self.lote.tofile(self.fichero)
+        self.total += len(self.lote) // (2 if self.pares else 1)
+        self.lote = array("q")
+
+    def cerrar(self):
+        """
+        Escribe el último lote y cierra el fichero.
+
+        RETURNS:
+            - ruta (tipo string): nombre del fichero temporal.
+            - total (tipo integer): número de coincidencias volcadas.
+        """
+        self.vaciar()
+        self.fichero.close()
+
+        return self.ruta, self.total
+
+def leer_volcado(ruta, pares = False):
+    """
+    Lee, lote a lote, las coincidencias de un fichero de volcado.
+
+    INPUTS:
+        - ruta (tipo string): nombre del fichero de volcado.
+        - pares (tipo booleano): si es True, el volcado contiene tuplas
+        (posicion, indice del patrón).
+
+    RETURN:
+        - (tipo generador): posiciones del match, en orden.
+    """
+    # Los lotes se leen de tamaño par para no separar una tupla.
+    with open(ruta, "rb") as f:
+        while True:
+            lote = array("q")
+
+            try:
+                lote.fromfile(f, TAM_LOTE - TAM_LOTE % 2)
+
+            except EOFError: # Último lote (incompleto); ya se ha leído.
+                pass
+
+            if not lote:
+                break
+
+            if pares:
+                it = iter(lote)
+                yield from zip(it, it)
+
+            else:
+                yield from lote
+
+def fusionar(rutas, borrar = True, pares = False):
+    """
+    Mezcla de k vías de varios ficheros de volcado ordenados. Sólo se mantiene
+    en memoria un lote por fichero.
+
+    INPUTS:
+        - rutas (tipo lista): nombres de los ficheros de volcado.
+        - borrar (tipo booleano): si es True se borran los ficheros al acabar.
+        - pares (tipo booleano): si es True, los volcados contienen tuplas
+        (posicion, indice del patrón).
+
+    RETURN:
+        - (tipo generador): todas las posiciones del match, en orden.
+    """
+    try:
+        yield from heapq.merge(*[leer_volcado(ruta, pares)
+                                   for ruta in rutas])
+
+    finally:
+        if borrar:
+            for ruta in rutas:
+                os.remove(ruta)
+
+class EscritorCoincidencias:
+    """
+    Escribe coincidencias en un fichero de texto a medida que llegan. Admite el
+    formato BED (cromosoma, inicio, fin, nombre; coordenadas empezando en 0 y
+    fin no incluido) y TSV (cromosoma y posición empezando en 1, como las
+    versiones originales de los programas). Si las coincidencias tienen hebra,
+    se añade como última columna (en BED, precedida de la puntuación 0).
+    """
+    def __init__(self, salida, patron, cromosoma = "genoma", formato = "bed"):
+        """
+        Inicializa el objeto y abre el fichero de salida.
+
+        INPUTS:
+            - salida (tipo string): nombre del fichero de salida ("-" para la
+            salida estándar).
+            - patron (tipo string): patrón buscado (nombre de cada línea BED).
+            - cromosoma (tipo string): nombre de la secuencia de referencia.
+            - formato (tipo string): "bed" o "tsv".
+        """
+        if formato not in ("bed", "tsv"):
+            raise ValueError("Formato de salida desconocido: %s" % formato)
+
+        if salida == "-":
+            self.fichero = sys.stdout
+            self.cerrar_fichero = False
+
+        else:
+            self.fichero = open(salida, "w")
+            self.cerrar_fichero = True
+
+        self.patron = patron
+        self.cromosoma = cromosoma
+        self.formato = formato
+        self.lineas = []
+        self.total = 0
+
+    def escribir(self, posicion, cromosoma = None, hebra = None):
+        """
+        Añade una coincidencia. Las líneas se escriben por lotes.
+
+        INPUTS:
+            - posicion (tipo integer): posición del match (empezando en 0).
+            - cromosoma (tipo string): nombre de la secuencia de referencia, si
+            es distinta de la indicada al crear el objeto.
+            - hebra (tipo string): hebra del match ("+" o "-"), si se conoce.
+        """
+        cromosoma = cromosoma or self.cromosoma
+
+        if self.formato == "bed":
+            linea = "%s\t%d\t%d\t%s" % (cromosoma, posicion,
+                                        posicion + len(self.patron),
+                                        self.patron)
+            if hebra:
+                linea += "\t0\t" + hebra
+
+        else:
+            linea = "%s\t%d" % (cromosoma, posicion + 1)
+
+            if hebra:
+                linea += "\t" + hebra
+
+        self.lineas.append(linea + "\n")
+
+        self.total += 1
+
+        if len(self.lineas) >= TAM_LOTE:
+            self.vaciar()
+
+    def escribir_alineamiento(self, alineamiento, cromosoma = None):
+        """
+        Añade un alineamiento con huecos (ver alineador.Alineamiento). En BED
+        se escriben su inicio y su fin, la puntuación, la hebra y, como columna
+        adicional, el CIGAR; en TSV, la posición (empezando en 1), el fin, la
+        puntuación, el CIGAR y la hebra.
+        """
+        cromosoma = cromosoma or self.cromosoma
+        a = alineamiento
+
+        if self.formato == "bed":
+            linea = "%s\t%d\t%d\t%s\t%d\t%s\t%s" % (cromosoma, a.inicio, a.fin,
+                                                   self.patron, a.puntuacion,
+                                                   a.hebra, a.cigar)
+        else:
+            linea = "%s\t%d\t%d\t%d\t%s\t%s" % (cromosoma, a.inicio + 1, a.fin,
+                                               a.puntuacion, a.cigar, a.hebra)
+
+        self.lineas.append(linea + "\n")
+
+        self.total += 1
+
+        if len(self.lineas) >= TAM_LOTE:
+            self.vaciar()
+
+    def escribir_todas(self, coincidencias):
+        """
+        Añade todas las coincidencias de un iterable. Cada coincidencia es una
+        posición o una tupla (posicion, hebra).
+        """
+        for c in coincidencias:
+            if isinstance(c, tuple):
+                self.escribir(c[0], hebra = c[1])
+
+            else:
+                self.escribir(c)
+
+    def vaciar(self):
+        """
+        Escribe en el fichero las líneas pendientes.
+        """
+        self.fichero.write("".join(self.lineas))
+        self.lineas = []
+
+    def cerrar(self):
+        """
+        Escribe las líneas pendientes y cierra el fichero.
+        """
+        self.vaciar()
+
+        if self.cerrar_fichero:
+            self.fichero.close()
+
+        else:
+            self.fichero.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
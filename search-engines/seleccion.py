@@ -0,0 +1,301 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+seleccion.py
+
+Selección automática del motor de búsqueda. Para cada motor se estima el
+trabajo que hará (número de comparaciones, alineamientos o pasadas) a partir de
+la longitud del patrón, la composición de la referencia (frecuencia de cada
+carácter, de la que se obtiene su entropía) y el tamaño del genoma. El tiempo
+estimado es ese trabajo por un coste unitario propio de cada motor (y de su
+versión para varios patrones, con el sufijo "_varios"), que se puede calibrar
+en la máquina donde se va a ejecutar (ver calibrar()).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+from math import log2
+from time import perf_counter
+import json
+import os
+import random
+
+from hebras import patrones_hebras
+from motores import MOTORES, MOTORES_VARIOS, ADMITEN_FALLOS, tabla_horspool
+
+# Segundos por unidad de trabajo de cada motor (medidos con calibrar()).
+COSTES_POR_DEFECTO = {
+    "fuerza_bruta": 8.5e-8,
+    "boyer_moore": 1.6e-7,
+    "hamming": 1.7e-7,
+    "numpy": 3.5e-10,
+    "hamming_numpy": 1.3e-10,
+    "fuerza_bruta_varios": 2.9e-7,
+    "boyer_moore_varios": 1.4e-7,
+    "hamming_varios": 2.0e-7,
+    "numpy_varios": 3.0e-10,
+    "hamming_numpy_varios": 1.5e-10,
+}
+
+# Coste de comprobar un carácter en una posición candidata (acceso disperso)
+# respecto al de compararlo en todas las posiciones de un trozo contiguo, en la
+# búsqueda exacta con NumPy (ver _trabajo_filtro()).
+COSTE_DISPERSO = 40
+
+# Coste de mezclar cada coincidencia de la búsqueda exacta de varios patrones
+# con NumPy (crear su tupla (posicion, indice del patrón)), en las mismas
+# unidades.
+COSTE_MEZCLA = 600
+
+# Ejecuciones de cada motor al calibrarlo (se toma la más rápida).
+REPETICIONES = 3
+
+# Fichero donde se guardan los costes calibrados.
+FICHERO_COSTES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "costes.json")
+
+def composicion(muestra):
+    """
+    Frecuencia relativa de cada carácter en una muestra de la referencia.
+
+    INPUT:
+        - muestra (tipo bytes): trozo de la secuencia de referencia.
+
+    RETURN:
+        - frecuencias (tipo lista): 256 frecuencias (una por byte).
+    """
+    cuentas = [0] * 256
+
+    for letra in set(muestra):
+        cuentas[letra] = muestra.count(letra)
+
+    total = max(len(muestra), 1)
+
+    return [c / total for c in cuentas]
+
+def entropia(frecuencias):
+    """
+    Entropía (en bits por carácter) del alfabeto de la referencia.
+    """
+    return -sum(f * log2(f) for f in frecuencias if f > 0)
+
+def _comparaciones(patron, frecuencias):
+    """
+    Número esperado de caracteres comparados hasta el primer fallo al alinear
+    el patrón en una posición al azar (comparando en el orden del patrón).
+    """
+    esperado = 0.0
+    prob = 1.0
+
+    for letra in patron:
+        esperado += prob
+        prob *= frecuencias[letra]
+
+    return esperado
+
+def _trabajo_filtro(patron, frecuencias, n):
+    """
+    Trabajo de la búsqueda exacta con NumPy de un patrón (ver
+    vectorizado.exacta_numpy()): una comparación contigua por posición y
+    carácter del filtro, más la comprobación, con accesos dispersos, de los
+    candidatos que quedan en cada uno de los demás caracteres (y de las
+    coincidencias, que también se recorren al final).
+
+    RETURNS:
+        - (tipo float): trabajo estimado.
+        - (tipo float): número esperado de coincidencias.
+    """
+    longP = len(patron)
+    filtro = sorted({0, min(1, longP - 1), longP - 1})
+    candidatos = 1.0
+
+    for j in filtro:
+        candidatos *= frecuencias[patron[j]]
+
+    dispersos = 0.0
+
+    for j in range(longP):
+        if j not in filtro:
+            dispersos += candidatos
+            candidatos *= frecuencias[patron[j]]
+
+    dispersos += candidatos
+
+    return n * (len(filtro) + COSTE_DISPERSO * dispersos), n * candidatos
+
+def trabajo(motor, patrones, frecuencias, longitud, max_fallos = 0):
+    """
+    Estima el trabajo de un motor (en unidades propias de ese motor).
+
+    INPUTS:
+        - motor (tipo string): nombre del motor.
+        - patrones (tipo lista): patrones en bytes (uno, o dos si se busca en
+        las dos hebras).
+        - frecuencias (tipo lista): composición de la referencia.
+        - longitud (tipo integer): longitud de la referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+
+    RETURN:
+        - (tipo float): trabajo estimado.
+    """
+    longP = len(patrones[0])
+    n = max(longitud - longP + 1, 0)
+
+    if motor == "fuerza_bruta":
+        return n * sum(_comparaciones(p, frecuencias) for p in patrones)
+
+    if motor == "boyer_moore":
+        # Alineamientos = n / desplazamiento medio de la tabla de Horspool.
+        tabla = tabla_horspool(patrones)
+        desplazamiento = sum(f * d for f, d in zip(frecuencias, tabla))
+        por_alineamiento = 1 + sum(_comparaciones(p[::-1], frecuencias)
+                                   for p in patrones)
+
+        return n / max(desplazamiento, 1) * por_alineamiento
+
+    if motor == "hamming":
+        # Se compara hasta superar max_fallos (o hasta el final del patrón).
+        acierto = sum(frecuencias[l] for l in patrones[0]) / max(longP, 1)
+        por_posicion = min(longP, (max_fallos + 1) / max(1 - acierto, 1e-9))
+
+        return n * len(patrones) * por_posicion
+
+    if motor == "numpy":
+        # Una pasada filtrada por patrón, no una sola pasada para todos. Con
+        # varios patrones, las coincidencias se mezclan después en tuplas.
+        total = 0.0
+
+        for patron in patrones:
+            filtrado, coincidencias = _trabajo_filtro(patron, frecuencias, n)
+            total += filtrado
+
+            if len(patrones) > 1:
+                total += COSTE_MEZCLA * coincidencias
+
+        return total
+
+    # Motores vectorizados que recorren el genoma en m pasadas por patrón.
+    return n * longP * len(patrones)
+
+def cargar_costes(fichero = FICHERO_COSTES):
+    """
+    Devuelve los costes unitarios calibrados, si existen, o los de por defecto.
+    """
+    costes = dict(COSTES_POR_DEFECTO)
+
+    if os.path.exists(fichero):
+        with open(fichero) as f:
+            costes.update(json.load(f))
+
+    return costes
+
+def candidatos(max_fallos):
+    """
+    Motores registrados adecuados para la búsqueda pedida: los exactos si no se
+    admiten fallos (los de distancias, con 0 fallos, son una búsqueda exacta más
+    lenta) y los de distancias en caso contrario.
+    """
+    return [m for m in MOTORES if (m in ADMITEN_FALLOS) == (max_fallos > 0)]
+
+def _clave(motor, patrones):
+    """
+    Clave del coste unitario de un motor según el número de patrones.
+    """
+    return motor + "_varios" if len(patrones) > 1 else motor
+
+def estimar(patrones, frecuencias, longitud, max_fallos = 0, costes = None):
+    """
+    Estima el tiempo (en segundos) de cada motor capaz de hacer la búsqueda.
+    Los motores sin coste conocido no se tienen en cuenta.
+
+    RETURN:
+        - (tipo diccionario): tiempo estimado por nombre de motor.
+    """
+    costes = costes or cargar_costes()
+
+    return {m: costes[_clave(m, patrones)] * trabajo(m, patrones, frecuencias,
+                                                     longitud, max_fallos)
+            for m in candidatos(max_fallos) if _clave(m, patrones) in costes}
+
+def elegir_motor(patrones, muestra, longitud, max_fallos = 0, costes = None):
+    """
+    Elige el motor más rápido según el modelo de costes.
+
+    INPUTS:
+        - patrones (tipo lista): patrones que se van a buscar (string o bytes).
+        - muestra (tipo bytes): trozo de la referencia para estimar su
+        composición.
+        - longitud (tipo integer): longitud (aproximada) de la referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - costes (tipo diccionario): costes unitarios; por defecto, los
+        calibrados.
+
+    RETURNS:
+        - motor (tipo string): nombre del motor elegido.
+        - estimaciones (tipo diccionario): tiempo estimado de cada motor.
+    """
+    patrones = [p.encode("ascii") if isinstance(p, str) else p
+                for p in patrones]
+    estimaciones = estimar(patrones, composicion(muestra), longitud,
+                           max_fallos, costes)
+
+    return min(estimaciones, key = estimaciones.get), estimaciones
+
+def _medir(motor, *args):
+    """
+    Menor tiempo de REPETICIONES ejecuciones de un motor: la primera paga,
+    además, la reserva de memoria y la carga de la caché, que en los motores
+    vectorizados son una parte apreciable del tiempo con el genoma de prueba.
+    """
+    tiempos = []
+
+    for i in range(REPETICIONES):
+        inicio = perf_counter()
+        motor(*args)
+        tiempos.append(perf_counter() - inicio)
+
+    return min(tiempos)
+
+def calibrar(longitud = 200000, fichero = FICHERO_COSTES, semilla = 0):
+    """
+    Mide el coste unitario de cada motor en esta máquina: se ejecuta cada uno
+    (con un patrón y con dos, como en la búsqueda en las dos hebras) sobre un
+    genoma aleatorio y se divide su mejor tiempo (ver _medir()) entre el
+    trabajo estimado.
+    Los costes se guardan en un fichero JSON que cargar_costes() lee después.
+
+    INPUTS:
+        - longitud (tipo integer): longitud del genoma de prueba.
+        - fichero (tipo string): fichero donde se guardan los costes.
+        - semilla (tipo integer): semilla del generador aleatorio.
+
+    RETURN:
+        - costes (tipo diccionario): coste unitario por motor.
+    """
+    aleatorio = random.Random(semilla)
+    genoma = bytes(aleatorio.choice(b"ACGT") for i in range(longitud))
+    patron = genoma[longitud // 2:longitud // 2 + 12]
+    # Los mismos patrones que en la búsqueda en las dos hebras: el patrón y
+    # su complementario inverso (ver hebras.py).
+    patrones = [p.encode("ascii")
+                for p in patrones_hebras(patron.decode("ascii"))]
+    frecuencias = composicion(genoma)
+    costes = {}
+
+    for nombre in MOTORES:
+        max_fallos = 1 if nombre in ADMITEN_FALLOS else 0
+
+        tiempo = _medir(MOTORES[nombre], patron, genoma, max_fallos)
+        costes[nombre] = tiempo / trabajo(nombre, [patron], frecuencias,
+                                          longitud, max_fallos)
+
+        tiempo = _medir(MOTORES_VARIOS[nombre], patrones, genoma, max_fallos)
+        costes[_clave(nombre, patrones)] = tiempo / trabajo(
+            nombre, patrones, frecuencias, longitud, max_fallos)
+
+    with open(fichero, "w") as f:
+        json.dump(costes, f, indent = 4)
+
+    return costes
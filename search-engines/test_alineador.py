@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_alineador.py
+
+Pruebas de alineador.py con coincidencias plantadas (con sustituciones,
+inserciones y borrados) en un genoma aleatorio: cada una se encuentra una sola
+vez, en los dos modos, y el resultado por teselas no depende de su tamaño.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import alineador
+from hebras import HEBRAS, patrones_hebras
+from memoria import GenomaCompartido
+
+BASES = np.array(list("ACGT"))
+
+def plantar(semilla, longitud = 12000, longP = 32, coincidencias = 24,
+            separacion = 450, inversas = 0.0):
+    """
+    Genoma aleatorio con coincidencias del patrón (o de su complementario
+    inverso) con hasta dos errores cada una.
+
+    RETURNS:
+        - genoma (tipo string), patron (tipo string) y posiciones (tipo lista)
+        de las coincidencias plantadas.
+    """
+    rng = np.random.default_rng(semilla)
+    genoma = list(BASES[rng.integers(0, 4, longitud)])
+    patron = "".join(BASES[rng.integers(0, 4, longP)])
+    posiciones = []
+
+    for n in range(coincidencias):
+        inicio = 100 + n * separacion
+        copia = list(patrones_hebras(patron)[rng.random() < inversas])
+
+        for _ in range(rng.integers(0, 3)):
+            operacion = rng.integers(0, 3)
+            i = int(rng.integers(1, len(copia) - 1))
+
+            if operacion == 0:
+                copia[i] = BASES[rng.integers(0, 4)]
+
+            elif operacion == 1:
+                del copia[i]
+
+            else:
+                copia.insert(i, BASES[rng.integers(0, 4)])
+
+        genoma[inicio:inicio + len(copia)] = copia
+        posiciones.append(inicio)
+
+    return "".join(genoma), patron, posiciones
+
+@pytest.fixture(scope = "module")
+def plantado():
+    genoma, patron, posiciones = plantar(7, inversas = 0.3)
+    compartido = GenomaCompartido.crear(genoma)
+
+    yield genoma, patron, posiciones, compartido
+
+    compartido.cerrar()
+
+@pytest.mark.parametrize("modo", alineador.MODOS)
+def test_una_coincidencia_por_locus(modo):
+    genoma, patron, posiciones = plantar(3)
+    alineamientos = alineador.buscar_alineamientos(patron, genoma, 3, modo)
+
+    assert len(alineamientos) == len(posiciones)
+
+    for a, inicio in zip(alineamientos, posiciones):
+        assert abs(alineador.diagonal(a) - inicio) <= 3
+
+@pytest.mark.parametrize("modo", alineador.MODOS)
+def test_teselas_no_cambian_resultado(plantado, modo):
+    genoma, patron, posiciones, compartido = plantado
+    esperados = alineador.mejores_por_locus(
+        [a._replace(hebra = hebra)
+         for hebra, p in zip(HEBRAS, patrones_hebras(patron))
+         for a in alineador.candidatos(p, genoma, 3, modo)], 3)
+
+    assert len(esperados) == len(posiciones)
+
+    for tam_tesela in (23, 97, 450, 1000, 4096, len(genoma)):
+        assert list(alineador.buscar_alineamientos_procesos(
+            compartido, patron, 2, 3, modo, ambas_hebras = True,
+            tam_tesela = tam_tesela)) == esperados
+
+def test_teselas_umbral_bajo():
+    # Con un umbral casi nulo hay alineamientos de ruido por todas partes,
+    # solapados entre sí: también deben coincidir.
+    genoma, patron, _ = plantar(11, longitud = 3000, longP = 19,
+                                coincidencias = 6)
+    compartido = GenomaCompartido.crear(genoma)
+
+    try:
+        esperados = alineador.buscar_alineamientos(patron, genoma, 4, "local")
+
+        for tam_tesela in (23, 64, 301):
+            assert list(alineador.buscar_alineamientos_procesos(
+                compartido, patron, 1, 4, "local",
+                tam_tesela = tam_tesela)) == esperados
+
+    finally:
+        compartido.cerrar()
+
+def test_mejores_por_locus():
+    a = alineador.Alineamiento(100, 123, 46, "23M9S")
+    b = alineador.Alineamiento(100, 133, 57, "22M1D10M")
+    c = alineador.Alineamiento(100, 133, 57, "22M1D10M", "-")
+    d = alineador.Alineamiento(140, 172, 64, "32M")
+
+    assert alineador.mejores_por_locus([a, b, c, d, b], 3) == [b, c, d]
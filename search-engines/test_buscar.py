@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_buscar.py
+
+Pruebas del programa de búsqueda (buscar.py): los argumentos no válidos se
+rechazan con un error de uso y, en cualquier modo y con cualquier motor, se
+escriben las mismas coincidencias que da la búsqueda de referencia.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import pytest
+
+import buscar
+from test_motores import aleatorio, referencia
+
+@pytest.mark.parametrize("argv", [
+    ["genoma.fa"],
+    ["genoma.fa", "ACGX"],
+    ["genoma.fa", "ACGT", "-p", "0"],
+    ["genoma.fa", "ACGT", "-k", "-1"],
+    ["genoma.fa", "ACGT", "-s", "-5"],
+    ["genoma.fa", "ACGT", "-s", "101"],
+    ["genoma.fa", "ACGT", "-k", "1", "-s", "90"],
+    ["genoma.fa", "ACGT", "-k", "1", "-m", "boyer_moore"],
+    ["genoma.fa", "ACGT", "-g", "local", "-m", "numpy"],
+])
+def test_argumentos_no_validos(argv):
+    with pytest.raises(SystemExit) as error:
+        buscar.argumentos(argv)
+
+    assert error.value.code == 2
+
+def test_similitud():
+    args = buscar.argumentos(["genoma.fa", "acgtacgtac", "-s", "85"])
+
+    assert args.patron == "ACGTACGTAC"
+    assert args.max_fallos == 1
+    assert buscar.fallos_permitidos(10, 100) == 0
+    assert buscar.fallos_permitidos(10, 0) == 10
+
+@pytest.mark.parametrize("modo, motor", [("ventanas", "auto"),
+                                         ("ventanas", "hamming"),
+                                         ("compartida", "hamming_numpy"),
+                                         ("teselas", "auto")])
+def test_main(tmp_path, modo, motor):
+    genoma = aleatorio(8, 3000)
+    fasta = tmp_path / "genoma.fa"
+    fasta.write_text(">genoma\n" + "\n".join(
+        genoma[i:i + 70] for i in range(0, len(genoma), 70)) + "\n")
+    salida = tmp_path / "salida.tsv"
+    patron = "GATTACA"
+
+    buscar.main([str(fasta), patron, "-k", "1", "-p", "2", "-m", motor,
+                 "--modo", modo, "--tam-ventana", "500", "--tam-tesela",
+                 "400", "-f", "tsv", "-o", str(salida)])
+
+    assert salida.read_text() == "".join(
+        "genoma\t%d\n" % (n + 1) for n in referencia(patron, genoma, 1))
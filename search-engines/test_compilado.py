@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_compilado.py
+
+Pruebas de los patrones compilados de Boyer-Moore (compilado.py): encuentran
+lo mismo que la búsqueda de referencia (también con patrones periódicos, que
+son los que ponen a prueba la tabla del sufijo bueno), se pueden enviar a otro
+proceso y la caché devuelve el mismo objeto.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import pickle
+
+import pytest
+
+import motores
+from compilado import PatronCompilado, compilar
+from test_motores import aleatorio, referencia
+
+@pytest.mark.parametrize("patron", ["A", "AAAA", "ACACAC", "ABCAB", "GATTACA",
+                                    "CGTACGTTCGTACG"])
+def test_compilado(patron):
+    # Genoma con pocas letras distintas: muchos sufijos que se repiten.
+    genoma = aleatorio(7, 4000).replace("G", "A").replace("T", "C")
+    genoma = genoma[:2000] + patron + genoma[2000:]
+    compilado = compilar(patron)
+
+    assert compilado.buscar(genoma.encode("ascii")) == \
+        referencia(patron, genoma)
+    assert list(motores.MOTORES["boyer_moore"](compilado, genoma)) == \
+        referencia(patron, genoma)
+
+def test_pickle():
+    compilado = compilar("GATTACA")
+    copia = pickle.loads(pickle.dumps(compilado))
+
+    assert copia.patron == compilado.patron
+    assert copia.caracter_malo == compilado.caracter_malo
+    assert copia.sufijo_bueno == compilado.sufijo_bueno
+
+def test_cache():
+    assert compilar("ACGTA") is compilar(b"ACGTA")
+    assert compilar(compilar("ACGTA")) is compilar("ACGTA")
+    assert isinstance(compilar("ACGTA"), PatronCompilado)
+    assert len(compilar("ACGTA")) == 5
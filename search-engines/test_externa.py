@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_externa.py
+
+Pruebas de la búsqueda fuera de memoria (fasta.py y externa.py): con cualquier
+tamaño de ventana y de línea, y con uno o varios procesos, se encuentran las
+mismas posiciones que con la búsqueda de referencia en cada registro del
+fichero FASTA.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import pytest
+
+import externa
+from test_motores import aleatorio, referencia
+from test_procesos import referencia_hebras
+
+REGISTROS = [("chr1 primer registro", aleatorio(4, 3000)),
+             ("chr2", aleatorio(5, 1700)),
+             ("chr3", aleatorio(6, 5))]
+
+def escribir_fasta(fichero, ancho_linea):
+    with open(fichero, "w") as f:
+        for nombre, secuencia in REGISTROS:
+            f.write(">%s\n" % nombre)
+
+            for i in range(0, len(secuencia), ancho_linea):
+                f.write(secuencia[i:i + ancho_linea] + "\n")
+
+def esperadas(patron, max_fallos = 0, ambas_hebras = False):
+    if ambas_hebras:
+        return [(nombre.split()[0], n, hebra) for nombre, secuencia
+                in REGISTROS for n, hebra
+                in referencia_hebras(patron, secuencia, max_fallos)]
+
+    return [(nombre.split()[0], n) for nombre, secuencia in REGISTROS
+            for n in referencia(patron, secuencia, max_fallos)]
+
+@pytest.mark.parametrize("ancho_linea", [7, 60, 10000])
+@pytest.mark.parametrize("tam_ventana", [10, 256, 1 << 20])
+@pytest.mark.parametrize("motor", ["fuerza_bruta", "boyer_moore", "numpy"])
+def test_fuera_de_memoria(tmp_path, motor, tam_ventana, ancho_linea):
+    fichero = str(tmp_path / "genoma.fa")
+    escribir_fasta(fichero, ancho_linea)
+    patron = "GATTA"
+
+    assert list(externa.buscar_fuera_de_memoria(
+        fichero, patron, motor, tam_ventana = tam_ventana)) == \
+        esperadas(patron)
+
+@pytest.mark.parametrize("p", [1, 2])
+@pytest.mark.parametrize("motor", ["numpy", "hamming_numpy"])
+def test_fuera_de_memoria_hebras(tmp_path, motor, p):
+    fichero = str(tmp_path / "genoma.fa")
+    escribir_fasta(fichero, 60)
+    patron = "GATTACA"
+    max_fallos = 1 if motor == "hamming_numpy" else 0
+
+    assert list(externa.buscar_fuera_de_memoria(
+        fichero, patron, motor, max_fallos, p, tam_ventana = 100,
+        ambas_hebras = True)) == esperadas(patron, max_fallos, True)
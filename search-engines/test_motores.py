@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_motores.py
+
+Pruebas de los motores de búsqueda (motores.py) contra una búsqueda de
+referencia: las mismas posiciones, con el genoma en texto o en una memoryview
+y, en los motores de distancias, con fallos. Las versiones para varios patrones
+se prueban con el patrón y su complementario inverso (hebras.py).
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import numpy as np
+import pytest
+
+import motores
+import vectorizado
+from hebras import complemento_inverso, patrones_hebras
+
+BASES = np.array(list("ACGT"))
+
+def aleatorio(semilla, longitud):
+    """
+    Secuencia aleatoria de ACGT (con pocas bases, para que haya coincidencias).
+    """
+    rng = np.random.default_rng(semilla)
+
+    return "".join(BASES[rng.integers(0, 4, longitud)])
+
+def referencia(patron, genoma, max_fallos = 0):
+    """
+    Posiciones en las que el patrón aparece con, a lo sumo, max_fallos
+    caracteres distintos.
+    """
+    longP = len(patron)
+
+    return [i for i in range(len(genoma) - longP + 1)
+            if sum(a != b for a, b in zip(patron, genoma[i:i + longP]))
+            <= max_fallos]
+
+@pytest.fixture(scope = "module")
+def genoma():
+    return aleatorio(1, 5000)
+
+@pytest.mark.parametrize("motor", sorted(motores.MOTORES))
+@pytest.mark.parametrize("patron", ["ACG", "GATTACA", "A", "ACGTACGTACGTAAAA"])
+def test_motor_exacto(genoma, motor, patron):
+    esperadas = referencia(patron, genoma)
+
+    assert list(motores.MOTORES[motor](patron, genoma)) == esperadas
+    assert list(motores.MOTORES[motor](patron.encode("ascii"),
+                                       memoryview(genoma.encode("ascii")))) \
+        == esperadas
+
+@pytest.mark.parametrize("motor", sorted(motores.ADMITEN_FALLOS))
+@pytest.mark.parametrize("max_fallos", [1, 2])
+def test_motor_con_fallos(genoma, motor, max_fallos):
+    patron = "GATTACAG"
+
+    assert list(motores.MOTORES[motor](patron, genoma, max_fallos)) == \
+        referencia(patron, genoma, max_fallos)
+
+@pytest.mark.parametrize("motor", sorted(set(motores.MOTORES) -
+                                         motores.ADMITEN_FALLOS))
+def test_motor_exacto_rechaza_fallos(genoma, motor):
+    with pytest.raises(ValueError):
+        motores.MOTORES[motor]("ACGT", genoma, 1)
+
+@pytest.mark.parametrize("bloque", [1, 7, 1000, vectorizado.TAM_BLOQUE])
+def test_bloques_numpy(genoma, bloque):
+    # El resultado no depende del número de ventanas de cada bloque.
+    patron = "ACGTA"
+
+    assert list(vectorizado.exacta_numpy(patron, genoma, bloque)) == \
+        referencia(patron, genoma)
+    assert list(vectorizado.hamming_numpy(patron, genoma, 1, bloque)) == \
+        referencia(patron, genoma, 1)
+
+def referencia_varios(patrones, genoma, max_fallos = 0):
+    """
+    Como referencia(), pero con varios patrones: tuplas (posicion, indice del
+    patrón), en orden.
+    """
+    return sorted((n, k) for k, p in enumerate(patrones)
+                  for n in referencia(p, genoma, max_fallos))
+
+def test_complemento_inverso():
+    assert complemento_inverso("GATTACA") == "TGTAATC"
+    assert complemento_inverso("ACGUN") == "NACGU"
+    assert patrones_hebras("AACG") == ["AACG", "CGTT"]
+
+@pytest.mark.parametrize("motor", sorted(motores.MOTORES_VARIOS))
+@pytest.mark.parametrize("patron", ["ACG", "GATTACA", "AAAATTTT", "ACGT"])
+def test_motor_varios(genoma, motor, patron):
+    # ACGT es su propio complementario inverso: cada posición aparece con
+    # los dos índices.
+    patrones = patrones_hebras(patron)
+    vista = memoryview(genoma.encode("ascii"))
+
+    assert [tuple(c) for c in motores.MOTORES_VARIOS[motor](patrones, vista)] \
+        == referencia_varios(patrones, genoma)
+
+@pytest.mark.parametrize("motor", sorted(motores.ADMITEN_FALLOS))
+def test_motor_varios_con_fallos(genoma, motor):
+    patrones = patrones_hebras("GATTACAG")
+
+    assert [tuple(c) for c in motores.MOTORES_VARIOS[motor](
+        patrones, genoma, 2)] == referencia_varios(patrones, genoma, 2)
+
+@pytest.mark.parametrize("motor", sorted(motores.MOTORES_VARIOS))
+def test_motor_varios_longitudes_distintas(genoma, motor):
+    with pytest.raises(ValueError):
+        motores.MOTORES_VARIOS[motor](["ACGT", "ACG"], genoma)
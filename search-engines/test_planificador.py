@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_planificador.py
+
+Pruebas del reparto dinámico por teselas (planificador.py): con cualquier
+tamaño de tesela se encuentran las mismas posiciones que con la búsqueda de
+referencia, sin perder ni repetir las que caen en el solape, y el tiempo de
+cada tesela se devuelve en orden.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import pytest
+
+import planificador
+from memoria import GenomaCompartido
+from test_motores import aleatorio, referencia
+from test_procesos import referencia_hebras
+
+@pytest.fixture(scope = "module")
+def genoma():
+    return aleatorio(3, 5000)
+
+@pytest.fixture(scope = "module")
+def compartido(genoma):
+    compartido = GenomaCompartido.crear(genoma)
+
+    yield compartido
+
+    compartido.cerrar()
+
+def test_teselas():
+    # Las posiciones propias cubren el genoma sin huecos ni repeticiones.
+    lista = list(planificador.teselas(1000, 8, 300))
+
+    assert [(i, a, b) for i, a, b, _ in lista] == \
+        [(0, 0, 300), (1, 300, 600), (2, 600, 900), (3, 900, 1000)]
+    assert [fin for *_, fin in lista] == [307, 607, 907, 1000]
+
+@pytest.mark.parametrize("tam_tesela", [50, 333, 5000])
+@pytest.mark.parametrize("motor", ["fuerza_bruta", "boyer_moore", "numpy"])
+def test_buscar_teselas(genoma, compartido, motor, tam_tesela):
+    patron = "GATTACA"
+    tiempos = []
+
+    assert list(planificador.buscar_teselas(compartido, patron, 3, motor,
+                                            tam_tesela = tam_tesela,
+                                            tiempos = tiempos)) == \
+        referencia(patron, genoma)
+    assert [t.indice for t in tiempos] == \
+        list(range(-(-len(genoma) // tam_tesela)))
+    assert sum(t.coincidencias for t in tiempos) == \
+        len(referencia(patron, genoma))
+
+@pytest.mark.parametrize("tam_tesela", [50, 333, 5000])
+@pytest.mark.parametrize("motor", ["numpy", "hamming_numpy"])
+def test_buscar_teselas_hebras(genoma, compartido, motor, tam_tesela):
+    patron = "GATTACA"
+    max_fallos = 1 if motor == "hamming_numpy" else 0
+
+    assert list(planificador.buscar_teselas(
+        compartido, patron, 2, motor, max_fallos, ambas_hebras = True,
+        tam_tesela = tam_tesela)) == \
+        referencia_hebras(patron, genoma, max_fallos)
+
+def test_pocas_teselas_pendientes(monkeypatch, genoma, compartido):
+    # Con una sola tesela pendiente por proceso el resultado es el mismo.
+    monkeypatch.setattr(planificador, "TESELAS_POR_PROCESO", 1)
+    patron = "ACGTA"
+
+    assert list(planificador.buscar_teselas(compartido, patron, 2, "numpy",
+                                            tam_tesela = 64)) == \
+        referencia(patron, genoma)
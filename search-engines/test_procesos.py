@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_procesos.py
+
+Pruebas de la búsqueda con el genoma en memoria compartida (memoria.py y
+procesos.py): los procesos encuentran lo mismo que la búsqueda de referencia
+con cualquier número de trozos y de subventanas, los volcados se mezclan en
+orden (resultados.py), y si un proceso falla o muere el padre lanza una
+excepción en lugar de esperarlo.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import os
+
+import pytest
+
+import motores
+import procesos
+import resultados
+from hebras import HEBRAS, patrones_hebras
+from memoria import GenomaCompartido
+from test_motores import aleatorio, referencia
+
+@pytest.fixture(scope = "module")
+def genoma():
+    return aleatorio(2, 5000)
+
+@pytest.fixture(scope = "module")
+def compartido(genoma):
+    compartido = GenomaCompartido.crear(genoma)
+
+    yield compartido
+
+    compartido.cerrar()
+
+def test_ventana(genoma, compartido):
+    adjunto = GenomaCompartido.adjuntar(compartido.nombre, len(genoma))
+    ventana = adjunto.ventana(100, 200)
+
+    try:
+        assert bytes(ventana) == genoma[100:200].encode("ascii")
+        assert ventana.readonly
+    finally:
+        ventana.release()
+        adjunto.cerrar()
+
+@pytest.mark.parametrize("p", [1, 3, 7])
+@pytest.mark.parametrize("motor", ["fuerza_bruta", "boyer_moore", "numpy"])
+def test_procesos(genoma, compartido, p, motor):
+    patron = "GATTACA"
+
+    assert procesos.buscar_procesos(compartido, patron, p, motor) == \
+        referencia(patron, genoma)
+
+def referencia_hebras(patron, genoma, max_fallos = 0):
+    """
+    Como referencia(), pero en las dos hebras: tuplas (posicion, hebra), en
+    orden.
+    """
+    return [(n, HEBRAS[k]) for n, k in sorted(
+        (n, k) for k, p in enumerate(patrones_hebras(patron))
+        for n in referencia(p, genoma, max_fallos))]
+
+@pytest.mark.parametrize("p", [1, 3])
+@pytest.mark.parametrize("motor", ["boyer_moore", "numpy", "hamming_numpy"])
+def test_subventanas(monkeypatch, genoma, compartido, p, motor):
+    # Subventanas más pequeñas que los trozos de cada proceso (los procesos
+    # hijos heredan el valor al crearse).
+    monkeypatch.setattr(procesos, "TAM_SUBVENTANA", 97)
+    patron = "GATTACA"
+    max_fallos = 1 if motor in motores.ADMITEN_FALLOS else 0
+
+    assert procesos.buscar_procesos(compartido, patron, p, motor,
+                                    max_fallos) == \
+        referencia(patron, genoma, max_fallos)
+    assert procesos.buscar_procesos(compartido, patron, p, motor, max_fallos,
+                                    ambas_hebras = True) == \
+        referencia_hebras(patron, genoma, max_fallos)
+
+def test_volcados(monkeypatch, tmp_path):
+    # Lotes pequeños: cada volcado se escribe en varias veces.
+    monkeypatch.setattr(resultados, "TAM_LOTE", 4)
+    primero = resultados.Volcado(str(tmp_path), 0)
+    segundo = resultados.Volcado(str(tmp_path), 100)
+    primero.extender([1, 5, 9, 40])
+    primero.extender([3, 7], 50)
+    segundo.extender(range(0, 30, 3))
+
+    (ruta1, total1), (ruta2, total2) = primero.cerrar(), segundo.cerrar()
+
+    assert (total1, total2) == (6, 10)
+    assert list(resultados.fusionar([ruta1, ruta2])) == \
+        [1, 5, 9, 40, 53, 57] + list(range(100, 130, 3))
+    assert not (tmp_path / ruta1).exists()
+
+def test_escribir_procesos(genoma, compartido, tmp_path):
+    patron = "ACGTA"
+    salida = str(tmp_path / "salida.tsv")
+
+    with resultados.EscritorCoincidencias(salida, patron,
+                                          formato = "tsv") as escritor:
+        total = procesos.escribir_procesos(compartido, patron, 3, escritor,
+                                           ambas_hebras = True)
+
+    esperadas = referencia_hebras(patron, genoma)
+
+    with open(salida) as f:
+        assert f.read() == "".join("genoma\t%d\t%s\n" % (n + 1, hebra)
+                                   for n, hebra in esperadas)
+
+    assert total == len(esperadas)
+
+def _fallar(patron, genoma, max_fallos = 0):
+    raise ZeroDivisionError("motor roto")
+
+def _morir(patron, genoma, max_fallos = 0):
+    os._exit(3)
+
+def test_error_en_proceso(monkeypatch, compartido):
+    # Los procesos hijos heredan el registro al crearse.
+    monkeypatch.setitem(motores.MOTORES, "roto", _fallar)
+
+    with pytest.raises(RuntimeError, match = "ZeroDivisionError"):
+        procesos.buscar_procesos(compartido, "ACGT", 2, "roto")
+
+def test_proceso_muerto(monkeypatch, compartido):
+    monkeypatch.setitem(motores.MOTORES, "muerto", _morir)
+
+    with pytest.raises(RuntimeError, match = "código 3"):
+        procesos.buscar_procesos(compartido, "ACGT", 2, "muerto")
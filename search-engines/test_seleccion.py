@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+test_seleccion.py
+
+Pruebas del modelo de costes de seleccion.py: el trabajo de la búsqueda exacta
+con NumPy (una pasada filtrada por patrón) no crece con la longitud del patrón,
+y con los costes por defecto el modo auto la elige para patrones largos en las
+dos hebras.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+Fecha: 19/10/2026
+"""
+import random
+
+import seleccion
+from hebras import patrones_hebras
+
+def genoma_aleatorio(longitud, semilla = 0):
+    aleatorio = random.Random(semilla)
+
+    return bytes(aleatorio.choice(b"ACGT") for i in range(longitud))
+
+def test_trabajo_numpy_no_depende_de_la_longitud():
+    genoma = genoma_aleatorio(20000)
+    frecuencias = seleccion.composicion(genoma)
+    corto = seleccion.trabajo("numpy", [genoma[100:112]], frecuencias,
+                              3 * 10 ** 6)
+    largo = seleccion.trabajo("numpy", [genoma[100:1100]], frecuencias,
+                              3 * 10 ** 6)
+
+    assert largo < 1.1 * corto
+
+def test_trabajo_numpy_varios():
+    # Dos patrones: dos pasadas filtradas (más la mezcla de las coincidencias).
+    genoma = genoma_aleatorio(20000)
+    frecuencias = seleccion.composicion(genoma)
+    patrones = [p.encode("ascii") for p
+                in patrones_hebras(genoma[100:124].decode("ascii"))]
+    uno = seleccion.trabajo("numpy", patrones[:1], frecuencias, 10 ** 6)
+    dos = seleccion.trabajo("numpy", patrones, frecuencias, 10 ** 6)
+
+    assert 1.9 * uno < dos < 2.2 * uno
+
+def test_auto_elige_numpy_en_patrones_largos():
+    genoma = genoma_aleatorio(200000)
+
+    for longP in (24, 1000):
+        patron = genoma[5000:5000 + longP].decode("ascii")
+        motor, _ = seleccion.elegir_motor(
+            patrones_hebras(patron), genoma, 3 * 10 ** 6,
+            costes = dict(seleccion.COSTES_POR_DEFECTO))
+
+        assert motor == "numpy"
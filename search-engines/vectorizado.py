@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+vectorizado.py
+
+Motor de búsqueda vectorizado con NumPy. El genoma se ve como un array de bytes
+(uint8) sin copiarlo y, en lugar de comparar carácter a carácter en bucles de
+Python, se compara cada posición del patrón contra todas las ventanas del
+genoma a la vez:
+
+    - Búsqueda exacta: se parte de las posiciones donde coincide el primer
+    carácter del patrón y se van filtrando con el resto de caracteres.
+    - Búsqueda por distancias (Hamming): se acumula, en m pasadas vectorizadas
+    (m = longitud del patrón), el número de fallos de cada ventana.
+
+Las ventanas se procesan por bloques de tamaño fijo, de modo que la memoria
+auxiliar no depende del tamaño del genoma.
+
+Versión: 1.0
+Autor: Francisco Martínez Picó
+
+Fecha: 19/10/2026
+"""
+import numpy as np
+
+# Número de ventanas evaluadas en cada bloque.
+TAM_BLOQUE = 1 << 20
+
+def a_uint8(sec):
+    """
+    Devuelve la secuencia como un array de bytes (uint8). Si la secuencia ya es
+    un objeto que soporta el protocolo buffer (bytes, bytearray, memoryview,
+    mmap...) no se copia.
+
+    INPUT:
+        - sec (tipo string, bytes, memoryview o array): secuencia a convertir.
+
+    RETURN:
+        - (tipo np.ndarray): vista uint8 de la secuencia.
+    """
+    if isinstance(sec, np.ndarray):
+        return sec
+
+    if isinstance(sec, str):
+        sec = sec.encode("ascii")
+
+    return np.frombuffer(sec, dtype = np.uint8)
+
+def _tipo_contador(longP):
+    """
+    Tipo entero más pequeño capaz de contar hasta longP fallos.
+    """
+    if longP < 2 ** 8:
+        return np.uint8
+
+    elif longP < 2 ** 16:
+        return np.uint16
+
+    return np.uint32
+
+def exacta_numpy(patron, genoma, bloque = TAM_BLOQUE):
+    """
+    Búsqueda exacta del patrón en el genoma. Para cada bloque de ventanas se
+    obtienen las posiciones candidatas (las que coinciden con el primer, el
+    segundo y el último carácter del patrón, comparando trozos contiguos del
+    genoma) y se descartan, posición a posición del resto del patrón, las que
+    dejan de coincidir. Con un alfabeto de 4 letras el filtro deja una de cada
+    64 posiciones, así que apenas quedan accesos dispersos.
+
+    INPUTS:
+        - patron (tipo string o bytes): cadena que se va a buscar.
+        - genoma (tipo string, bytes o memoryview): secuencia de referencia.
+        - bloque (tipo integer): número de ventanas evaluadas a la vez.
+
+    RETURNS:
+        - (tipo np.ndarray): posiciones (empezando en 0) del genoma donde
+        comienza una coincidencia completa del patrón, en orden creciente.
+    """
+    p = a_uint8(patron)
+    g = a_uint8(genoma)
+    longP = len(p)
+    n_ventanas = len(g) - longP + 1
+
+    if longP == 0 or n_ventanas <= 0:
+        return np.empty(0, dtype = np.int64)
+
+    filtro = sorted({0, min(1, longP - 1), longP - 1})
+    resto = [j for j in range(longP) if j not in filtro]
+    resultados = []
+
+    for inicio in range(0, n_ventanas, bloque):
+        fin = min(inicio + bloque, n_ventanas)
+
+        mascara = g[inicio:fin] == p[0]
+
+        for j in filtro[1:]:
+            mascara &= g[inicio + j:fin + j] == p[j]
+
+        candidatos = np.flatnonzero(mascara) + inicio
+
+        for j in resto:
+
+            if candidatos.size == 0:
+                break
+
+            candidatos = candidatos[g[candidatos + j] == p[j]]
+
+        resultados.append(candidatos)
+
+    return np.concatenate(resultados)
+
+def fallos_numpy(patron, genoma, inicio, fin):
+    """
+    Cuenta los fallos (distancia de Hamming) entre el patrón y cada una de las
+    ventanas del genoma que empiezan en [inicio, fin). Se acumula una máscara de
+    desigualdad por cada posición del patrón.
+
+    INPUTS:
+        - patron (tipo np.ndarray): patrón como array uint8.
+        - genoma (tipo np.ndarray): genoma como array uint8.
+        - inicio (tipo integer): primera ventana a evaluar.
+        - fin (tipo integer): ventana siguiente a la última a evaluar.
+
+    RETURNS:
+        - fallos (tipo np.ndarray): número de fallos de cada ventana.
+    """
+    longP = len(patron)
+    fallos = np.zeros(fin - inicio, dtype = _tipo_contador(longP))
+
+    for j in range(longP):
+        fallos += genoma[inicio + j:fin + j] != patron[j]
+
+    return fallos
+
+def hamming_numpy(patron, genoma, max_fallos, bloque = TAM_BLOQUE,
+                  con_fallos = False):
+    """
+    Búsqueda por distancias de Hamming: devuelve las ventanas del genoma con, a
+    lo sumo, max_fallos caracteres distintos del patrón. Con max_fallos = 0 es
+    equivalente a exacta_numpy() (y se delega en ella por ser más rápida).
+
+    INPUTS:
+        - patron (tipo string o bytes): cadena que se va a buscar.
+        - genoma (tipo string, bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - bloque (tipo integer): número de ventanas evaluadas a la vez.
+        - con_fallos (tipo booleano): si es True también se devuelve el número
+        de fallos de cada coincidencia.
+
+    RETURNS:
+        - posiciones (tipo np.ndarray): posiciones (empezando en 0) de las
+        coincidencias, en orden creciente.
+        - fallos (tipo np.ndarray): sólo si con_fallos es True. Número de
+        fallos de cada coincidencia.
+    """
+    p = a_uint8(patron)
+    g = a_uint8(genoma)
+    n_ventanas = len(g) - len(p) + 1
+
+    if max_fallos <= 0 and not con_fallos:
+        return exacta_numpy(p, g, bloque)
+
+    posiciones = [np.empty(0, dtype = np.int64)]
+    lista_fallos = [np.empty(0, dtype = _tipo_contador(len(p)))]
+
+    for inicio in range(0, max(n_ventanas, 0), bloque):
+        fin = min(inicio + bloque, n_ventanas)
+        fallos = fallos_numpy(p, g, inicio, fin)
+        aceptadas = np.flatnonzero(fallos <= max_fallos)
+
+        posiciones.append(aceptadas + inicio)
+        lista_fallos.append(fallos[aceptadas])
+
+    posiciones = np.concatenate(posiciones)
+
+    if con_fallos:
+        return posiciones, np.concatenate(lista_fallos)
+
+    return posiciones
+
+def alineamiento_numpy(patron, sec):
+    """
+    Equivalente vectorizado de alineamiento() (search-brute_force). Devuelve las
+    mismas coordenadas que esa función: la posición de cada match contada a
+    partir de 1.
+
+    INPUTS:
+        - patron (tipo cadena): es la cadena que se va a buscar sobre la
+        secuencia de referencia.
+        - sec (tipo cadena): es la secuencia de referencia (en este caso, el
+        genoma). No contiene la cabecera.
+
+    RETURNS:
+        - coincidencias (tipo lista): posiciones del match.
+    """
+    return (exacta_numpy(patron, sec) + 1).tolist()
+
+def distancias_numpy(referencia, patron, similitud):
+    """
+    Equivalente vectorizado de distancias_Hamming() (search-distances). Devuelve
+    las mismas coordenadas que esa función (empezando en 0).
+
+    INPUTS:
+        - referencia (tipo string): cadena sobre la que se va a buscar
+        el patrón.
+        - patron (tipo string): subcadena que estás buscando en la cadena de
+        referencia.
+        - similitud (tipo integer): número de coincidencias mínimo que tiene
+        que haber entre la secuencia patrón y la de referencia.
+
+    RETURNS:
+        - coincidencias (tipo lista): inicio de cada match.
+    """
+    return hamming_numpy(patron, referencia, len(patron) - similitud).tolist()
+
+def buscar_varios_numpy(patrones, genoma, max_fallos = 0, bloque = TAM_BLOQUE):
+    """
+    Búsqueda simultánea de varios patrones de la misma longitud (por ejemplo,
+    un patrón y su complementario inverso). Cada trozo del genoma se lee una
+    sola vez por bloque y posición del patrón y se compara con todos los
+    patrones, en lugar de recorrer el genoma una vez por patrón.
+
+    INPUTS:
+        - patrones (tipo lista): cadenas que se van a buscar.
+        - genoma (tipo string, bytes o memoryview): secuencia de referencia.
+        - max_fallos (tipo integer): número máximo de fallos permitidos.
+        - bloque (tipo integer): número de ventanas evaluadas a la vez.
+
+    RETURNS:
+        - (tipo lista): para cada patrón, np.ndarray con las posiciones
+        (empezando en 0) de sus coincidencias, en orden creciente.
+    """
+    ps = [a_uint8(patron) for patron in patrones]
+    g = a_uint8(genoma)
+    longP = len(ps[0])
+
+    if any(len(p) != longP for p in ps):
+        raise ValueError("Todos los patrones deben tener la misma longitud")
+
+    n_ventanas = len(g) - longP + 1
+    resultados = [[np.empty(0, dtype = np.int64)] for p in ps]
+
+    for inicio in range(0, max(n_ventanas, 0), bloque):
+        fin = min(inicio + bloque, n_ventanas)
+        fallos = [np.zeros(fin - inicio, dtype = _tipo_contador(longP))
+                  for p in ps]
+
+        for j in range(longP):
+            trozo = g[inicio + j:fin + j]
+
+            for k, p in enumerate(ps):
+                fallos[k] += trozo != p[j]
+
+        for k in range(len(ps)):
+            resultados[k].append(np.flatnonzero(fallos[k] <= max_fallos) +
+                                 inicio)
+
+    return [np.concatenate(r) for r in resultados]